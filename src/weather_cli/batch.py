@@ -0,0 +1,320 @@
+"""Columnar container for large batches of weather results.
+
+A list of WeatherData objects costs several hundred bytes per row: every row has
+its own instance dictionary, its own copies of the city name and description,
+and boxed numbers. WeatherBatch stores the same rows as columns instead:
+
+- numbers in packed arrays, with a sentinel for missing values
+- city names as one UTF-8 buffer with row offsets
+- descriptions dictionary-encoded as small integer codes
+- the confidence and age of rows estimated from a forecast, kept only for
+  those rows since they are rare
+
+Rows are turned back into WeatherData, or DerivedWeatherData for estimated rows,
+only when they are read.
+"""
+
+import csv
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, overload
+
+from .history import NO_CONDITION
+from .weather_data import DerivedWeatherData, WeatherData
+
+MISSING = -(2**63)
+MAX_DESCRIPTIONS = 2**16
+MAX_CONDITION_ID = 2**16 - 1
+
+COLUMNS = (
+    "city",
+    "temperature_celsius",
+    "description",
+    "observed_at",
+    "city_id",
+    "condition_id",
+    "latitude",
+    "longitude",
+    "derived",
+    "confidence",
+    "age_seconds",
+)
+
+
+class WeatherBatch:
+    """Weather results for many cities, stored as compact columnar arrays.
+
+    Attributes:
+        temperatures: Temperature of each row in Celsius
+        observed_at: Observation time of each row (unix, UTC), MISSING if unknown
+        city_ids: Upstream city identifier of each row, MISSING if unknown
+        condition_ids: Upstream condition code of each row, 0 if unknown
+        latitudes: Latitude of each row in degrees, NaN if unknown
+        longitudes: Longitude of each row in degrees, NaN if unknown
+        descriptions: The distinct descriptions, indexed by description_codes
+        description_codes: Index into descriptions of each row
+        derived: Confidence and forecast age of each row estimated from a
+            forecast, by row position
+        errors: Error message for each city whose lookup failed
+    """
+
+    __slots__ = (
+        "temperatures",
+        "observed_at",
+        "city_ids",
+        "condition_ids",
+        "latitudes",
+        "longitudes",
+        "descriptions",
+        "description_codes",
+        "derived",
+        "errors",
+        "_names",
+        "_name_offsets",
+        "_description_index",
+    )
+
+    def __init__(self) -> None:
+        """Initialize an empty batch."""
+        self.temperatures: "array[float]" = array("d")
+        self.observed_at: "array[int]" = array("q")
+        self.city_ids: "array[int]" = array("q")
+        self.condition_ids: "array[int]" = array("H")
+        self.latitudes: "array[float]" = array("d")
+        self.longitudes: "array[float]" = array("d")
+        self.descriptions: List[str] = []
+        self.description_codes: "array[int]" = array("H")
+        self.derived: Dict[int, Tuple[float, float]] = {}
+        self.errors: Dict[str, str] = {}
+        self._names = bytearray()
+        self._name_offsets: "array[int]" = array("I", [0])
+        self._description_index: Dict[str, int] = {}
+
+    @classmethod
+    def from_weather(cls, rows: Iterable[WeatherData]) -> "WeatherBatch":
+        """Build a batch from weather data.
+
+        Args:
+            rows: The weather data to store
+
+        Returns:
+            A batch holding the rows in order
+        """
+        batch = cls()
+        batch.extend(rows)
+        return batch
+
+    def append(self, weather_data: WeatherData) -> None:
+        """Add a row to the end of the batch.
+
+        Args:
+            weather_data: The weather data to store
+
+        Raises:
+            ValueError: If the condition code does not fit the column, or the batch
+                already holds the maximum number of distinct descriptions
+        """
+        condition_id = weather_data.condition_id
+        if condition_id is not None and not 0 <= condition_id <= MAX_CONDITION_ID:
+            raise ValueError(f"condition_id must be between 0 and {MAX_CONDITION_ID}")
+        code = self._description_index.get(weather_data.description)
+        if code is None:
+            if len(self.descriptions) >= MAX_DESCRIPTIONS:
+                raise ValueError(f"A batch holds at most {MAX_DESCRIPTIONS} descriptions")
+            code = len(self.descriptions)
+            self.descriptions.append(weather_data.description)
+            self._description_index[weather_data.description] = code
+
+        self.temperatures.append(float(weather_data.temperature_celsius))
+        self.observed_at.append(_int_or_missing(weather_data.observed_at))
+        self.city_ids.append(_int_or_missing(weather_data.city_id))
+        self.condition_ids.append(NO_CONDITION if condition_id is None else condition_id)
+        self.latitudes.append(_float_or_nan(weather_data.latitude))
+        self.longitudes.append(_float_or_nan(weather_data.longitude))
+        self.description_codes.append(code)
+        if isinstance(weather_data, DerivedWeatherData):
+            self.derived[len(self.description_codes) - 1] = (
+                weather_data.confidence,
+                weather_data.age_seconds,
+            )
+        self._names += weather_data.city.encode("utf-8")
+        self._name_offsets.append(len(self._names))
+
+    def extend(self, rows: Iterable[WeatherData]) -> None:
+        """Add rows to the end of the batch.
+
+        Args:
+            rows: The weather data to store
+
+        Raises:
+            ValueError: If a row cannot be stored; see append
+        """
+        for weather_data in rows:
+            self.append(weather_data)
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.temperatures)
+
+    def __repr__(self) -> str:
+        """Return a short representation without dumping the columns."""
+        return f"WeatherBatch(rows={len(self)}, errors={len(self.errors)})"
+
+    @overload
+    def __getitem__(self, index: int) -> WeatherData: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[WeatherData]: ...
+
+    def __getitem__(self, index: Any) -> Any:
+        """Return a row, or a list of rows for a slice, as WeatherData.
+
+        The WeatherData objects are built on access and not kept.
+
+        Raises:
+            IndexError: If the index is out of range
+        """
+        if isinstance(index, slice):
+            return [self.row(position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("batch index out of range")
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[WeatherData]:
+        """Iterate over the rows as WeatherData, building one at a time."""
+        return map(self.row, range(len(self)))
+
+    def city(self, index: int) -> str:
+        """Return the city name of a row without building the whole row.
+
+        Args:
+            index: Position of the row
+
+        Returns:
+            The city name
+        """
+        start = self._name_offsets[index]
+        end = self._name_offsets[index + 1]
+        return self._names[start:end].decode("utf-8")
+
+    def description(self, index: int) -> str:
+        """Return the description of a row without building the whole row.
+
+        Args:
+            index: Position of the row
+
+        Returns:
+            The description
+        """
+        return self.descriptions[self.description_codes[index]]
+
+    def row(self, index: int) -> WeatherData:
+        """Build the WeatherData of a row.
+
+        Args:
+            index: Position of the row, between 0 and len(batch) - 1
+
+        Returns:
+            The weather data of the row; DerivedWeatherData if it was estimated
+        """
+        condition_id = self.condition_ids[index]
+        fields: Dict[str, Any] = dict(
+            city=self.city(index),
+            temperature_celsius=self.temperatures[index],
+            description=self.description(index),
+            observed_at=_optional_int(self.observed_at[index]),
+            city_id=_optional_int(self.city_ids[index]),
+            condition_id=None if condition_id == NO_CONDITION else condition_id,
+            latitude=_optional_float(self.latitudes[index]),
+            longitude=_optional_float(self.longitudes[index]),
+        )
+        derived = self.derived.get(index)
+        if derived is None:
+            return WeatherData(**fields)
+        confidence, age_seconds = derived
+        return DerivedWeatherData(**fields, confidence=confidence, age_seconds=age_seconds)
+
+    def to_columns(self) -> Dict[str, List[Any]]:
+        """Export the rows as one list per field, with None for missing values.
+
+        Returns:
+            A list of values for each name in COLUMNS, ready for JSON encoding
+        """
+        descriptions = self.descriptions
+        derived = [self.derived.get(index) for index in range(len(self))]
+        return {
+            "city": [self.city(index) for index in range(len(self))],
+            "temperature_celsius": self.temperatures.tolist(),
+            "description": [descriptions[code] for code in self.description_codes],
+            "observed_at": [_optional_int(value) for value in self.observed_at],
+            "city_id": [_optional_int(value) for value in self.city_ids],
+            "condition_id": [
+                None if value == NO_CONDITION else value for value in self.condition_ids
+            ],
+            "latitude": [_optional_float(value) for value in self.latitudes],
+            "longitude": [_optional_float(value) for value in self.longitudes],
+            "derived": [estimate is not None for estimate in derived],
+            "confidence": [None if estimate is None else estimate[0] for estimate in derived],
+            "age_seconds": [None if estimate is None else estimate[1] for estimate in derived],
+        }
+
+    def write_csv(self, file: TextIO, header: bool = True) -> int:
+        """Write the rows as CSV, leaving missing values empty.
+
+        Rows are written one at a time, so no per-row objects pile up.
+
+        Rows estimated from a forecast have derived set to True and carry their
+        confidence and forecast age; for other rows those cells are False and empty.
+
+        Args:
+            file: Text file opened with ``newline=""``
+            header: Whether to start with a line of COLUMNS; leave it out to
+                append to an existing file
+
+        Returns:
+            The number of rows written
+        """
+        writer = csv.writer(file)
+        if header:
+            writer.writerow(COLUMNS)
+        for index in range(len(self)):
+            condition_id = self.condition_ids[index]
+            derived = self.derived.get(index)
+            writer.writerow(
+                (
+                    self.city(index),
+                    self.temperatures[index],
+                    self.description(index),
+                    _optional_int(self.observed_at[index]),
+                    _optional_int(self.city_ids[index]),
+                    None if condition_id == NO_CONDITION else condition_id,
+                    _optional_float(self.latitudes[index]),
+                    _optional_float(self.longitudes[index]),
+                    derived is not None,
+                    None if derived is None else derived[0],
+                    None if derived is None else derived[1],
+                )
+            )
+        return len(self)
+
+
+def _int_or_missing(value: Optional[int]) -> int:
+    """Encode an optional integer for an integer column."""
+    return MISSING if value is None else value
+
+
+def _float_or_nan(value: Optional[float]) -> float:
+    """Encode an optional number for a float column."""
+    return math.nan if value is None else float(value)
+
+
+def _optional_int(value: int) -> Optional[int]:
+    """Decode a value of an integer column."""
+    return None if value == MISSING else value
+
+
+def _optional_float(value: float) -> Optional[float]:
+    """Decode a value of a float column."""
+    return None if math.isnan(value) else value
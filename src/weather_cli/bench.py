@@ -0,0 +1,249 @@
+"""Load generation for measuring throughput and tail latency of the full stack.
+
+run_benchmark sends a fixed number of lookups through a WeatherService from a
+number of worker threads, either as fast as they can (closed loop) or at a
+target request rate (open loop). With a target rate, each latency is measured
+from when the request was due rather than when a worker got to it, so a stalled
+service shows up in the tail instead of silently lowering the request rate.
+
+The result holds throughput, latency percentiles, errors grouped by message and
+the change in cache hits and misses, and converts to JSON so runs can be
+compared across releases.
+"""
+
+import contextvars
+import math
+import threading
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from .weather_service import WeatherService
+from .exceptions import WeatherApiException
+
+RESULT_FORMAT = "weather-cli-bench"
+RESULT_VERSION = 1
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+DEFAULT_CITIES = ("London", "Paris", "Tokyo", "New York", "Sydney")
+
+
+def percentile(samples: Sequence[float], percentile: float) -> Optional[float]:
+    """Return a percentile of sorted samples using the nearest-rank method.
+
+    Args:
+        samples: The samples, sorted in ascending order
+        percentile: The percentile to compute, between 0 and 100
+
+    Returns:
+        The sample at that percentile, or None if there are no samples
+    """
+    if not samples:
+        return None
+    # Rounding first keeps float error from bumping exact ranks, such as p99.9 of 1000
+    rank = max(1, math.ceil(round(percentile * len(samples) / 100.0, 9)))
+    return samples[min(rank, len(samples)) - 1]
+
+
+def percentile_label(value: float) -> str:
+    """Return the name of a percentile, such as "p50" or "p99.9"."""
+    return f"p{value:g}"
+
+
+@dataclass
+class BenchResult:
+    """Outcome of a benchmark run.
+
+    Attributes:
+        requests: Lookups sent
+        succeeded: Lookups that returned weather data
+        duration_seconds: Wall-clock time of the run
+        concurrency: Number of worker threads
+        target_rate: Requested lookups per second, None for a closed loop
+        latencies_ms: Latency percentiles, mean and maximum in milliseconds
+        errors: Number of failed lookups by error message
+        cache_hits: Lookups answered from the cache during the run, None without a cache
+        cache_misses: Lookups the cache could not answer, None without a cache
+        upstream_requests: Requests that reached the API, if known
+        transport: Name of the HTTP backend used, if known
+    """
+
+    requests: int
+    succeeded: int
+    duration_seconds: float
+    concurrency: int
+    target_rate: Optional[float] = None
+    latencies_ms: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    cache_hits: Optional[int] = None
+    cache_misses: Optional[int] = None
+    upstream_requests: Optional[int] = None
+    transport: Optional[str] = None
+
+    @property
+    def failed(self) -> int:
+        """Number of lookups that failed."""
+        return self.requests - self.succeeded
+
+    @property
+    def throughput(self) -> float:
+        """Completed lookups per second."""
+        if self.duration_seconds <= 0:
+            return 0.0
+        return self.requests / self.duration_seconds
+
+    @property
+    def cache_hit_ratio(self) -> Optional[float]:
+        """Fraction of cache lookups that were hits, None without a cache."""
+        if self.cache_hits is None or self.cache_misses is None:
+            return None
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the result as a JSON-serializable document.
+
+        Returns:
+            The result with its format name and version, for comparing runs
+        """
+        return {
+            "format": RESULT_FORMAT,
+            "version": RESULT_VERSION,
+            "requests": self.requests,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "duration_seconds": self.duration_seconds,
+            "throughput": self.throughput,
+            "concurrency": self.concurrency,
+            "target_rate": self.target_rate,
+            "latency_ms": self.latencies_ms,
+            "errors": self.errors,
+            "cache": {
+                "hits": self.cache_hits,
+                "misses": self.cache_misses,
+                "hit_ratio": self.cache_hit_ratio,
+            },
+            "upstream_requests": self.upstream_requests,
+            "transport": self.transport,
+        }
+
+    def format_report(self) -> str:
+        """Format the result as a short human-readable report.
+
+        Returns:
+            The report, one figure per line
+        """
+        rate = "unlimited" if self.target_rate is None else f"{self.target_rate:g}/s"
+        lines = [
+            f"Requests:    {self.requests} ({self.succeeded} ok, {self.failed} failed)",
+            f"Duration:    {self.duration_seconds:.2f} s",
+            f"Throughput:  {self.throughput:.1f} req/s "
+            f"(concurrency {self.concurrency}, target rate {rate})",
+            "Latency:     "
+            + ", ".join(f"{name} {value:.2f} ms" for name, value in self.latencies_ms.items()),
+        ]
+        if self.cache_hits is not None and self.cache_misses is not None:
+            lines.append(
+                f"Cache:       {self.cache_hits} hits, {self.cache_misses} misses "
+                f"({self.cache_hit_ratio or 0.0:.1%} hit ratio)"
+            )
+        if self.upstream_requests is not None:
+            lines.append(f"Upstream:    {self.upstream_requests} requests")
+        if self.transport is not None:
+            lines.append(f"Transport:   {self.transport}")
+        for message, count in sorted(self.errors.items(), key=lambda item: -item[1]):
+            lines.append(f"Error:       {count} x {message}")
+        return "\n".join(lines)
+
+
+def run_benchmark(
+    service: WeatherService,
+    cities: Sequence[str] = DEFAULT_CITIES,
+    requests: int = 1000,
+    concurrency: int = 16,
+    rate: Optional[float] = None,
+    clock: Callable[[], float] = time.perf_counter,
+    sleep: Callable[[float], None] = time.sleep,
+) -> BenchResult:
+    """Send lookups through a service and measure them.
+
+    Cities are looked up in turn, so with a cache the first lookup of each city
+    misses and later ones hit until their entries expire.
+
+    Args:
+        service: The service under test
+        cities: City names to look up, cycled through
+        requests: Total number of lookups
+        concurrency: Number of worker threads sending lookups
+        rate: Optional target lookups per second; as fast as possible if not given
+        clock: Function returning a monotonic time in seconds
+        sleep: Function waiting a number of seconds
+
+    Returns:
+        The measured result
+
+    Raises:
+        ValueError: If no cities are given or a count or the rate is not positive
+    """
+    if not cities:
+        raise ValueError("At least one city is required")
+    if requests <= 0 or concurrency <= 0:
+        raise ValueError("requests and concurrency must be positive")
+    if rate is not None and rate <= 0:
+        raise ValueError("rate must be positive")
+
+    latencies: "array[float]" = array("d", bytes(8 * requests))
+    errors: Counter[str] = Counter()
+    indexes: Iterator[int] = iter(range(requests))
+    lock = threading.Lock()
+    cache_stats = service.cache.stats if service.cache is not None else None
+    hits_before = cache_stats.hits if cache_stats is not None else 0
+    misses_before = cache_stats.misses if cache_stats is not None else 0
+
+    def worker() -> None:
+        while True:
+            with lock:
+                index = next(indexes, None)
+            if index is None:
+                return
+            started = clock()
+            if rate is not None:
+                due = start + index / rate
+                if due > started:
+                    sleep(due - started)
+                started = due
+            try:
+                service.get_weather(cities[index % len(cities)])
+            except WeatherApiException as e:
+                with lock:
+                    errors[str(e)] += 1
+            latencies[index] = clock() - started
+
+    start = clock()
+    threads: List[threading.Thread] = []
+    for number in range(min(concurrency, requests)):
+        thread = threading.Thread(
+            target=contextvars.copy_context().run, args=(worker,), name=f"weather-bench-{number}"
+        )
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    duration = clock() - start
+
+    samples = sorted(latencies)
+    summary = {percentile_label(p): 1000 * (percentile(samples, p) or 0.0) for p in PERCENTILES}
+    summary["mean"] = 1000 * sum(samples) / len(samples)
+    summary["max"] = 1000 * samples[-1]
+    return BenchResult(
+        requests=requests,
+        succeeded=requests - sum(errors.values()),
+        duration_seconds=duration,
+        concurrency=concurrency,
+        target_rate=rate,
+        latencies_ms=summary,
+        errors=dict(errors),
+        cache_hits=cache_stats.hits - hits_before if cache_stats is not None else None,
+        cache_misses=cache_stats.misses - misses_before if cache_stats is not None else None,
+    )
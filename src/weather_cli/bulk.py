@@ -0,0 +1,255 @@
+"""Resumable bulk lookups over very large city lists.
+
+A bulk job reads city names from a text file one chunk at a time, looks each
+chunk up as a batch, and appends the results to a CSV file. After every chunk it
+records its progress in a small JSON state file: how many input lines are done,
+how long the output is, and which cities failed. An interrupted job started
+again with ``resume=True`` truncates any output written after the last
+checkpoint, retries the failed cities and continues after the last finished line.
+
+Memory use depends on the chunk size and the number of failed cities, never on
+the size of the input.
+"""
+
+import csv
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, TypeVar, Union
+
+from .batch import COLUMNS
+from .scheduler import Priority, request_priority
+from .weather_service import WeatherService
+
+logger = logging.getLogger(__name__)
+
+STATE_FORMAT = "weather-cli-bulk-state"
+STATE_VERSION = 1
+DEFAULT_CHUNK_SIZE = 500
+
+T = TypeVar("T")
+
+
+@dataclass
+class BulkState:
+    """Progress of a bulk job, saved after every chunk.
+
+    Attributes:
+        input_path: Absolute path of the input file the job reads
+        lines_done: Number of input lines whose cities have been looked up
+        output_bytes: Length of the output file at the last checkpoint
+        succeeded: Number of result rows written
+        failed: Error message of each city whose last lookup failed
+    """
+
+    input_path: str
+    lines_done: int = 0
+    output_bytes: int = 0
+    succeeded: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+
+
+def read_cities(path: Union[str, Path], skip_lines: int = 0) -> Iterator[Tuple[int, str]]:
+    """Stream the city names of an input file, one per line.
+
+    Blank lines and lines starting with ``#`` are skipped.
+
+    Args:
+        path: The input file
+        skip_lines: Number of lines at the start of the file to pass over
+
+    Yields:
+        The number of lines read so far, and the city name on the last of them
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    with open(path, encoding="utf-8") as file:
+        for line_number, line in enumerate(file, start=1):
+            if line_number <= skip_lines:
+                continue
+            city = line.strip()
+            if city and not city.startswith("#"):
+                yield line_number, city
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Split an iterable into lists of at most size items, reading it lazily.
+
+    Args:
+        items: The items to split
+        size: Maximum number of items per list
+
+    Yields:
+        The next list of items
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def load_state(path: Union[str, Path]) -> BulkState:
+    """Read the state file of a bulk job.
+
+    Args:
+        path: The state file
+
+    Returns:
+        The saved progress
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a bulk job state file of a supported version
+    """
+    try:
+        document = json.loads(Path(path).read_text(encoding="utf-8"))
+        if document.get("format") != STATE_FORMAT:
+            raise ValueError("not a bulk job state file")
+        if document.get("version") != STATE_VERSION:
+            raise ValueError(f"unsupported state version {document.get('version')}")
+        return BulkState(**document["state"])
+    except (AttributeError, KeyError, TypeError, json.JSONDecodeError) as e:
+        raise ValueError(f"invalid bulk job state file: {e}")
+
+
+def save_state(state: BulkState, path: Union[str, Path]) -> None:
+    """Write the state file of a bulk job, replacing it atomically.
+
+    Args:
+        state: The progress to save
+        path: The state file
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    path = Path(path)
+    document = {"format": STATE_FORMAT, "version": STATE_VERSION, "state": asdict(state)}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as file:
+            json.dump(document, file, ensure_ascii=False)
+        os.replace(temporary, path)
+    except OSError:
+        os.unlink(temporary)
+        raise
+
+
+class BulkJob:
+    """Checkpointed lookup of every city in an input file."""
+
+    def __init__(
+        self,
+        service: WeatherService,
+        input_path: Union[str, Path],
+        output_path: Union[str, Path],
+        state_path: Optional[Union[str, Path]] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: Optional[int] = None,
+    ) -> None:
+        """Initialize the job.
+
+        Args:
+            service: The weather service used for every lookup
+            input_path: Text file with one city name per line
+            output_path: CSV file the results are written to
+            state_path: Optional state file; the output path with ``.state``
+                appended if not given
+            chunk_size: Number of cities looked up between checkpoints
+            max_workers: Maximum number of concurrent lookups; the service's
+                default for batches if not given
+
+        Raises:
+            ValueError: If chunk_size or max_workers is not positive
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if max_workers is not None and max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+
+        self.service = service
+        self.input_path = Path(input_path)
+        self.output_path = Path(output_path)
+        self.state_path = Path(state_path or f"{output_path}.state")
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+    def run(self, resume: bool = False) -> BulkState:
+        """Look up every city of the input, checkpointing after each chunk.
+
+        Lookups are made at bulk priority, so interactive requests sharing the
+        client are served first.
+
+        Args:
+            resume: Whether to continue from the state file instead of starting over
+
+        Returns:
+            The final progress, with the cities whose lookup failed
+
+        Raises:
+            OSError: If a file cannot be read or written
+            ValueError: If the state file is invalid or belongs to another input
+        """
+        input_path = str(self.input_path.resolve())
+        if resume:
+            state = load_state(self.state_path)
+            if state.input_path != input_path:
+                raise ValueError(
+                    f"State file {self.state_path} belongs to input {state.input_path}"
+                )
+            # Rows written after the last checkpoint are looked up again
+            os.truncate(self.output_path, state.output_bytes)
+            logger.info(
+                "Resuming bulk job after line %d with %d failed cities to retry",
+                state.lines_done,
+                len(state.failed),
+            )
+        else:
+            state = BulkState(input_path=input_path)
+            with open(self.output_path, "w", encoding="utf-8", newline="") as output:
+                csv.writer(output).writerow(COLUMNS)
+                state.output_bytes = output.tell()
+            save_state(state, self.state_path)
+
+        with request_priority(Priority.BULK):
+            with open(self.output_path, "a", encoding="utf-8", newline="") as output:
+                for retries in chunked(list(state.failed), self.chunk_size):
+                    for city in retries:
+                        del state.failed[city]
+                    self._run_chunk(state, retries, output)
+
+                lines = read_cities(self.input_path, skip_lines=state.lines_done)
+                for chunk in chunked(lines, self.chunk_size):
+                    state.lines_done = chunk[-1][0]
+                    self._run_chunk(state, [city for _, city in chunk], output)
+
+        logger.info(
+            "Bulk job finished: %d results, %d failed cities", state.succeeded, len(state.failed)
+        )
+        return state
+
+    def _run_chunk(self, state: BulkState, cities: List[str], output: TextIO) -> None:
+        """Look up a chunk of cities, append the results and save a checkpoint.
+
+        Args:
+            state: The progress, updated with the chunk's outcome
+            cities: The cities of the chunk
+            output: The output file, opened for appending
+        """
+        batch = self.service.get_weather_batch(cities, self.max_workers)
+        batch.write_csv(output, header=False)
+        output.flush()
+        os.fsync(output.fileno())
+
+        state.output_bytes = output.tell()
+        state.succeeded += len(batch)
+        state.failed.update(batch.errors)
+        save_state(state, self.state_path)
+        logger.debug("Checkpoint after %d input lines", state.lines_done)
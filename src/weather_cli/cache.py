@@ -0,0 +1,264 @@
+"""Weather data cache for the weather CLI application."""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .cache_backends import CacheBackend, CacheEntry, MemoryBackend
+from .weather_data import WeatherData
+from .exceptions import CacheBackendException
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness.
+
+    Attributes:
+        hits: Lookups answered by a fresh entry
+        misses: Lookups with no usable entry
+        revalidations: Expired entries checked against the upstream
+        not_modified: Revalidations where the upstream reported no new observation
+    """
+
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    not_modified: int = 0
+
+
+class WeatherCache:
+    """Thread-safe, bounded TTL cache of weather data keyed by city.
+
+    Expired entries are kept (up to ``max_entries``) so they can be revalidated
+    against the upstream instead of being downloaded and parsed again. Entries
+    are kept in memory unless another backend is given, such as one shared by
+    several hosts. A backend that cannot be reached is treated as empty.
+    """
+
+    DEFAULT_TTL_SECONDS = 600.0
+    DEFAULT_MAX_ENTRIES = 1024
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+        backend: Optional[CacheBackend] = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            ttl_seconds: How long an entry stays fresh after being stored or revalidated
+            max_entries: Maximum number of entries kept before evicting the least recently
+                used, when entries are kept in memory
+            clock: Function returning the current time in unix seconds
+            backend: Optional storage for the entries. If not provided, entries are kept
+                in memory.
+
+        Raises:
+            ValueError: If ttl_seconds or max_entries is not positive
+        """
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self.backend = backend if backend is not None else MemoryBackend(max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of entries currently held, fresh or expired."""
+        try:
+            return len(self.backend)
+        except CacheBackendException as e:
+            logger.warning("Cache backend unavailable: %s", e)
+            return 0
+
+    def now(self) -> float:
+        """Return the current time according to the cache clock."""
+        return self._clock()
+
+    def get_entry(self, key: str) -> Optional["CacheEntry[WeatherData]"]:
+        """Get the entry for a key regardless of freshness.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The cached entry, or None if the key is not cached
+        """
+        try:
+            return self.backend.get(key)
+        except CacheBackendException as e:
+            logger.warning("Cache backend unavailable: %s", e)
+            return None
+
+    def get(self, key: str) -> Optional[WeatherData]:
+        """Get fresh weather data for a key and record the hit or miss.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The cached weather data if a fresh entry exists, otherwise None
+        """
+        entry = self.get_entry(key)
+        now = self.now()
+        with self._lock:
+            if entry is not None and entry.is_fresh(now):
+                self.stats.hits += 1
+                logger.debug("Cache hit for %s", key)
+                return entry.data
+            self.stats.misses += 1
+
+        logger.debug("Cache miss for %s", key)
+        return None
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, WeatherData]:
+        """Get fresh weather data for several keys with one backend lookup.
+
+        Only hits are recorded: keys without fresh data are expected to be looked
+        up again individually, which records the miss.
+
+        Args:
+            keys: The cache keys
+
+        Returns:
+            The cached weather data of each key with a fresh entry
+        """
+        try:
+            entries = self.backend.get_many(keys)
+        except CacheBackendException as e:
+            logger.warning("Cache backend unavailable: %s", e)
+            return {}
+        now = self.now()
+        fresh = {key: entry.data for key, entry in entries.items() if entry.is_fresh(now)}
+        with self._lock:
+            self.stats.hits += len(fresh)
+        return fresh
+
+    def record_revalidation(self, not_modified: bool) -> None:
+        """Record the outcome of revalidating an expired entry.
+
+        Args:
+            not_modified: Whether the upstream reported the entry as unchanged
+        """
+        with self._lock:
+            self.stats.revalidations += 1
+            if not_modified:
+                self.stats.not_modified += 1
+
+    def put(
+        self,
+        key: str,
+        data: WeatherData,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> "CacheEntry[WeatherData]":
+        """Store weather data under a key with a full TTL.
+
+        Args:
+            key: The cache key
+            data: The weather data to store
+            etag: Optional ETag validator for later revalidation
+            last_modified: Optional Last-Modified validator for later revalidation
+
+        Returns:
+            The stored cache entry
+        """
+        now = self.now()
+        entry = CacheEntry(
+            data=data,
+            stored_at=now,
+            expires_at=now + self.ttl_seconds,
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self.restore(key, entry)
+        return entry
+
+    def refresh(
+        self,
+        key: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> Optional["CacheEntry[WeatherData]"]:
+        """Extend the TTL of an entry whose data the upstream reported as unchanged.
+
+        Validators that are not supplied keep their previous values.
+
+        Args:
+            key: The cache key
+            etag: Optional new ETag validator
+            last_modified: Optional new Last-Modified validator
+
+        Returns:
+            The refreshed entry, or None if the key is not cached
+        """
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        now = self.now()
+        refreshed = replace(
+            entry,
+            stored_at=now,
+            expires_at=now + self.ttl_seconds,
+            etag=etag or entry.etag,
+            last_modified=last_modified or entry.last_modified,
+        )
+        self.restore(key, refreshed)
+        logger.debug("Extended cache TTL for unchanged entry %s", key)
+        return refreshed
+
+    def entries(self) -> List[Tuple[str, "CacheEntry[WeatherData]"]]:
+        """Return every entry, fresh or expired, least recently used first.
+
+        Returns:
+            (key, entry) pairs in eviction order
+        """
+        try:
+            return self.backend.items()
+        except CacheBackendException as e:
+            logger.warning("Cache backend unavailable: %s", e)
+            return []
+
+    def restore(self, key: str, entry: "CacheEntry[WeatherData]") -> None:
+        """Store an entry as-is, keeping its original timestamps.
+
+        Used to warm the cache from a snapshot; an entry stored this way is as fresh
+        as it was when the snapshot was taken and expires at the same time.
+
+        Args:
+            key: The cache key
+            entry: The entry to store
+        """
+        try:
+            self.backend.set(key, entry)
+        except CacheBackendException as e:
+            logger.warning("Cache backend unavailable, not caching %s: %s", key, e)
+
+    def invalidate(self, key: str) -> None:
+        """Remove an entry from the cache.
+
+        Args:
+            key: The cache key
+        """
+        try:
+            self.backend.delete(key)
+        except CacheBackendException as e:
+            logger.warning("Cache backend unavailable: %s", e)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        try:
+            self.backend.clear()
+        except CacheBackendException as e:
+            logger.warning("Cache backend unavailable: %s", e)
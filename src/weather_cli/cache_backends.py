@@ -0,0 +1,799 @@
+"""Storage backends for the weather cache.
+
+WeatherCache decides what is fresh and what to evict; a backend only stores
+entries. The in-memory backend keeps them in the process, the disk backend in a
+directory shared by every process on the host, and the Redis backend in a server
+shared by every host, so a city fetched by one host is served to all of them.
+
+Backends that leave the process store entries as bytes produced by a serializer.
+Entries usually hold current weather; the forecast fallback stores forecasts in
+a backend of its own.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import socket
+import tempfile
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+from urllib.parse import unquote, urlparse
+
+from .forecast import ForecastSeries
+from .weather_data import WeatherData
+from .exceptions import CacheBackendException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CacheEntry(Generic[T]):
+    """Immutable cache entry holding weather data and its revalidation metadata.
+
+    Attributes:
+        data: The cached weather data, or a ForecastSeries in a forecast backend
+        stored_at: When the entry was stored or last revalidated (unix seconds)
+        expires_at: When the entry stops being fresh (unix seconds)
+        etag: Optional ETag validator sent by the upstream
+        last_modified: Optional Last-Modified validator sent by the upstream
+    """
+
+    data: T
+    stored_at: float
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, now: float) -> bool:
+        """Check whether the entry can be served without contacting the upstream.
+
+        Args:
+            now: The current time (unix seconds)
+
+        Returns:
+            True if the entry has not expired yet
+        """
+        return now < self.expires_at
+
+
+class EntrySerializer(ABC):
+    """Converts cache entries to and from bytes."""
+
+    @abstractmethod
+    def dumps(self, key: str, entry: CacheEntry) -> bytes:
+        """Serialize an entry together with its key.
+
+        Args:
+            key: The cache key
+            entry: The entry to serialize
+
+        Returns:
+            The serialized entry
+        """
+        pass
+
+    @abstractmethod
+    def loads(self, payload: bytes) -> Tuple[str, CacheEntry]:
+        """Deserialize an entry and its key.
+
+        Args:
+            payload: Bytes produced by dumps
+
+        Returns:
+            The cache key and entry
+
+        Raises:
+            ValueError: If the payload is not a valid entry
+        """
+        pass
+
+
+class JsonSerializer(EntrySerializer):
+    """Serializes entries as compact UTF-8 JSON objects.
+
+    Weather data is stored under "data" and forecasts under "forecast".
+    """
+
+    def dumps(self, key: str, entry: CacheEntry) -> bytes:
+        """Serialize an entry as JSON."""
+        document: Dict[str, Any] = {
+            "key": key,
+            "stored_at": entry.stored_at,
+            "expires_at": entry.expires_at,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+        }
+        if isinstance(entry.data, ForecastSeries):
+            document["forecast"] = entry.data.to_dict()
+        else:
+            document["data"] = asdict(entry.data)
+        return json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, payload: bytes) -> Tuple[str, CacheEntry]:
+        """Deserialize a JSON entry."""
+        try:
+            document = json.loads(payload.decode("utf-8"))
+            data: Union[WeatherData, ForecastSeries]
+            if "forecast" in document:
+                data = ForecastSeries.from_dict(document["forecast"])
+            else:
+                data = WeatherData(**document["data"])
+            entry = CacheEntry(
+                data=data,
+                stored_at=float(document["stored_at"]),
+                expires_at=float(document["expires_at"]),
+                etag=document.get("etag"),
+                last_modified=document.get("last_modified"),
+            )
+            return str(document["key"]), entry
+        except (KeyError, TypeError, UnicodeDecodeError) as e:
+            raise ValueError(f"Invalid cache entry: {e}") from e
+
+
+class CompressedJsonSerializer(JsonSerializer):
+    """Serializes entries as zlib-compressed JSON, trading CPU for network and disk."""
+
+    def __init__(self, level: int = 6) -> None:
+        """Initialize the serializer.
+
+        Args:
+            level: The zlib compression level, from 1 (fastest) to 9 (smallest)
+
+        Raises:
+            ValueError: If the level is out of range
+        """
+        if not 1 <= level <= 9:
+            raise ValueError("level must be between 1 and 9")
+        self.level = level
+
+    def dumps(self, key: str, entry: CacheEntry) -> bytes:
+        """Serialize an entry as compressed JSON."""
+        return zlib.compress(super().dumps(key, entry), self.level)
+
+    def loads(self, payload: bytes) -> Tuple[str, CacheEntry]:
+        """Deserialize a compressed JSON entry."""
+        try:
+            return super().loads(zlib.decompress(payload))
+        except zlib.error as e:
+            raise ValueError(f"Invalid cache entry: {e}") from e
+
+
+SERIALIZERS: Dict[str, Type[EntrySerializer]] = {
+    "json": JsonSerializer,
+    "zlib": CompressedJsonSerializer,
+}
+
+
+class CacheBackend(ABC):
+    """Key-value storage for cache entries.
+
+    Backends are thread-safe. Backends that leave the process raise
+    CacheBackendException when the storage cannot be reached.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get the entry stored under a key and mark it as recently used.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The entry, or None if the key is not stored
+        """
+        pass
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, CacheEntry]:
+        """Get the entries stored under several keys.
+
+        Backends that leave the process fetch all keys in one round trip.
+
+        Args:
+            keys: The cache keys
+
+        Returns:
+            The entry of each stored key; keys that are not stored are left out
+        """
+        entries: Dict[str, CacheEntry] = {}
+        for key in keys:
+            entry = self.get(key)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    @abstractmethod
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry under a key, replacing any previous one.
+
+        Args:
+            key: The cache key
+            entry: The entry to store
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the entry stored under a key, if any.
+
+        Args:
+            key: The cache key
+        """
+        pass
+
+    @abstractmethod
+    def items(self) -> List[Tuple[str, CacheEntry]]:
+        """Return every stored entry, least recently used first where known.
+
+        Returns:
+            (key, entry) pairs
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove every stored entry."""
+        pass
+
+    def __len__(self) -> int:
+        """Return the number of stored entries."""
+        return len(self.items())
+
+
+class MemoryBackend(CacheBackend):
+    """Bounded, least recently used store inside the process."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        """Initialize the backend.
+
+        Args:
+            max_entries: Maximum number of entries kept before evicting the least
+                recently used
+
+        Raises:
+            ValueError: If max_entries is not positive
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of stored entries."""
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used ones over the limit."""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                logger.debug("Evicted cache entry for %s", evicted)
+
+    def delete(self, key: str) -> None:
+        """Remove an entry."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def items(self) -> List[Tuple[str, CacheEntry]]:
+        """Return every entry, least recently used first."""
+        with self._lock:
+            return list(self._entries.items())
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskBackend(CacheBackend):
+    """Store of one file per entry in a directory, shared by processes on a host.
+
+    Files are replaced atomically, so concurrent readers never see a partial
+    entry. Reading an entry updates its modification time, which is used to evict
+    the least recently used files over the limit.
+    """
+
+    SUFFIX = ".entry"
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        serializer: Optional[EntrySerializer] = None,
+        max_entries: int = 4096,
+    ) -> None:
+        """Initialize the backend, creating the directory if needed.
+
+        Args:
+            directory: The directory entries are stored in
+            serializer: How entries are stored; JSON by default
+            max_entries: Maximum number of files kept before evicting the least
+                recently used
+
+        Raises:
+            ValueError: If max_entries is not positive
+            CacheBackendException: If the directory cannot be created
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.directory = Path(directory)
+        self.serializer = serializer or JsonSerializer()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            raise CacheBackendException(f"Cannot create cache directory {directory}: {e}") from e
+
+    def _path(self, key: str) -> Path:
+        """Return the file an entry is stored in; keys are hashed to safe names."""
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}{self.SUFFIX}"
+
+    def _files(self) -> List[Path]:
+        """Return every entry file."""
+        return [path for path in self.directory.iterdir() if path.name.endswith(self.SUFFIX)]
+
+    def _read(self, path: Path) -> Optional[Tuple[str, CacheEntry]]:
+        """Read an entry file, treating missing and corrupt files as absent."""
+        try:
+            return self.serializer.loads(path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except ValueError as e:
+            logger.warning("Ignoring corrupt cache file %s: %s", path, e)
+            return None
+        except OSError as e:
+            raise CacheBackendException(f"Cannot read cache file {path}: {e}") from e
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry and mark its file as recently used."""
+        path = self._path(key)
+        item = self._read(path)
+        if item is None or item[0] != key:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return item[1]
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used files over the limit."""
+        path = self._path(key)
+        payload = self.serializer.dumps(key, entry)
+        try:
+            handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(handle, "wb") as file:
+                    file.write(payload)
+                os.replace(temporary, path)
+            except OSError:
+                os.unlink(temporary)
+                raise
+        except OSError as e:
+            raise CacheBackendException(f"Cannot write cache file {path}: {e}") from e
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used files over the limit."""
+        with self._lock:
+            files = self._files()
+            if len(files) <= self.max_entries:
+                return
+            by_age = sorted(files, key=self._mtime)
+            for path in by_age[: len(files) - self.max_entries]:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _mtime(path: Path) -> float:
+        """Return the modification time of a file, or 0 if it is gone."""
+        try:
+            return path.stat().st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    def delete(self, key: str) -> None:
+        """Remove an entry file."""
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            raise CacheBackendException(f"Cannot remove cache file: {e}") from e
+
+    def items(self) -> List[Tuple[str, CacheEntry]]:
+        """Return every entry, least recently used first."""
+        items = []
+        for path in sorted(self._files(), key=self._mtime):
+            item = self._read(path)
+            if item is not None:
+                items.append(item)
+        return items
+
+    def clear(self) -> None:
+        """Remove every entry file."""
+        for path in self._files():
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __len__(self) -> int:
+        """Return the number of entry files."""
+        return len(self._files())
+
+
+class RespError(Exception):
+    """Error reply sent by a RESP server."""
+
+
+RespReply = Union[None, int, bytes, RespError, List[Any]]
+
+
+class RespClient:
+    """Minimal client for the Redis serialization protocol (RESP2).
+
+    One connection is kept open and shared under a lock. Commands can be
+    pipelined: a batch is written at once and its replies read back in order,
+    costing a single round trip. A broken connection is reopened on the next call.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        timeout: float = 2.0,
+    ) -> None:
+        """Initialize the client; the connection is opened on first use.
+
+        Args:
+            host: The server host name
+            port: The server port
+            db: The database number selected after connecting
+            password: Optional password sent with AUTH after connecting
+            timeout: Seconds to wait for connecting and for each reply
+        """
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.round_trips = 0
+        self._socket: Optional[socket.socket] = None
+        self._reader: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url: str, timeout: float = 2.0) -> "RespClient":
+        """Create a client from a URL such as ``redis://:password@host:6379/0``.
+
+        Args:
+            url: The server URL
+            timeout: Seconds to wait for connecting and for each reply
+
+        Returns:
+            A RespClient for the server
+
+        Raises:
+            ValueError: If the URL is not a redis:// URL
+        """
+        parsed = urlparse(url)
+        if parsed.scheme != "redis" or not parsed.hostname:
+            raise ValueError(f"Not a redis:// URL: {url}")
+        db = parsed.path.strip("/")
+        return cls(
+            host=parsed.hostname,
+            port=parsed.port or 6379,
+            db=int(db) if db else 0,
+            password=unquote(parsed.password) if parsed.password else None,
+            timeout=timeout,
+        )
+
+    def execute(self, *args: Union[str, bytes, int, float]) -> RespReply:
+        """Send one command and return its reply.
+
+        Args:
+            *args: The command name and arguments
+
+        Returns:
+            The reply
+
+        Raises:
+            CacheBackendException: If the server cannot be reached or returns an error
+        """
+        reply: RespReply = self.pipeline([args])[0]
+        if isinstance(reply, RespError):
+            raise CacheBackendException(f"Cache server error: {reply}")
+        return reply
+
+    def pipeline(self, commands: Sequence[Sequence[Union[str, bytes, int, float]]]) -> List[Any]:
+        """Send several commands in one round trip.
+
+        Args:
+            commands: The commands, each a sequence of name and arguments
+
+        Returns:
+            The reply of each command in order; error replies are returned as RespError
+
+        Raises:
+            CacheBackendException: If the server cannot be reached
+        """
+        payload = b"".join(self._encode(command) for command in commands)
+        with self._lock:
+            try:
+                sock, reader = self._connection()
+                sock.sendall(payload)
+                self.round_trips += 1
+                return [self._read_reply(reader) for _ in commands]
+            except (OSError, EOFError) as e:
+                self._close()
+                raise CacheBackendException(
+                    f"Cannot reach cache server {self.host}:{self.port}: {e}"
+                ) from e
+
+    def close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            self._close()
+
+    def _connection(self) -> Tuple[socket.socket, Any]:
+        """Return the socket and reader of the open connection, connecting first if needed."""
+        if self._socket is not None and self._reader is not None:
+            return self._socket, self._reader
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket = sock
+        self._reader = sock.makefile("rb")
+        setup: List[Sequence[Union[str, int]]] = []
+        if self.password is not None:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            sock.sendall(b"".join(self._encode(command) for command in setup))
+            for _ in setup:
+                reply = self._read_reply(self._reader)
+                if isinstance(reply, RespError):
+                    self._close()
+                    raise OSError(f"connection setup failed: {reply}")
+        return sock, self._reader
+
+    def _close(self) -> None:
+        """Close the connection without taking the lock."""
+        if self._reader is not None:
+            self._reader.close()
+        if self._socket is not None:
+            self._socket.close()
+        self._reader = None
+        self._socket = None
+
+    @staticmethod
+    def _encode(command: Sequence[Union[str, bytes, int, float]]) -> bytes:
+        """Encode a command as a RESP array of bulk strings."""
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            value = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(value), value))
+        return b"".join(parts)
+
+    @classmethod
+    def _read_reply(cls, reader: Any) -> RespReply:
+        """Read one reply from the connection."""
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise EOFError("connection closed by the cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return bytes(body)
+        if kind == b"-":
+            return RespError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise EOFError("connection closed by the cache server")
+            return bytes(data[:-2])
+        if kind == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [cls._read_reply(reader) for _ in range(count)]
+        raise OSError(f"unexpected reply from the cache server: {line!r}")
+
+
+class RedisBackend(CacheBackend):
+    """Store in a Redis-compatible server shared by every host.
+
+    Entries are kept on the server for ``retention_seconds`` after they are
+    stored, long past their freshness, so they can still be revalidated.
+    """
+
+    DEFAULT_PREFIX = "weather-cli:"
+    DEFAULT_RETENTION_SECONDS = 86400
+    SCAN_COUNT = 500
+
+    def __init__(
+        self,
+        client: RespClient,
+        serializer: Optional[EntrySerializer] = None,
+        prefix: str = DEFAULT_PREFIX,
+        retention_seconds: int = DEFAULT_RETENTION_SECONDS,
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            client: The connection to the server
+            serializer: How entries are stored; JSON by default
+            prefix: Prefix of every key, so several applications can share a server
+            retention_seconds: How long the server keeps an entry after it is stored
+
+        Raises:
+            ValueError: If retention_seconds is not positive
+        """
+        if retention_seconds <= 0:
+            raise ValueError("retention_seconds must be positive")
+        self.client = client
+        self.serializer = serializer or JsonSerializer()
+        self.prefix = prefix
+        self.retention_seconds = retention_seconds
+
+    def _decode(self, key: str, payload: Any) -> Optional[CacheEntry]:
+        """Deserialize a stored value, treating corrupt values as absent."""
+        if not isinstance(payload, bytes):
+            return None
+        try:
+            stored_key, entry = self.serializer.loads(payload)
+        except ValueError as e:
+            logger.warning("Ignoring corrupt cache entry for %s: %s", key, e)
+            return None
+        return entry if stored_key == key else None
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry with GET."""
+        return self._decode(key, self.client.execute("GET", self.prefix + key))
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, CacheEntry]:
+        """Get several entries with a single MGET."""
+        if not keys:
+            return {}
+        unique = list(dict.fromkeys(keys))
+        payloads = self.client.execute("MGET", *(self.prefix + key for key in unique))
+        entries: Dict[str, CacheEntry] = {}
+        for key, payload in zip(unique, payloads if isinstance(payloads, list) else []):
+            entry = self._decode(key, payload)
+            if entry is not None:
+                entries[key] = entry
+        return entries
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry with SET and an expiry."""
+        payload = self.serializer.dumps(key, entry)
+        self.client.execute("SET", self.prefix + key, payload, "EX", self.retention_seconds)
+
+    def delete(self, key: str) -> None:
+        """Remove an entry with DEL."""
+        self.client.execute("DEL", self.prefix + key)
+
+    def _keys(self) -> List[bytes]:
+        """Return every stored key, prefix included, using SCAN."""
+        keys: List[bytes] = []
+        cursor: Union[bytes, int] = b"0"
+        pattern = self._escape(self.prefix) + "*"
+        while True:
+            reply = self.client.execute("SCAN", cursor, "MATCH", pattern, "COUNT", self.SCAN_COUNT)
+            if not isinstance(reply, list) or len(reply) != 2:
+                raise CacheBackendException("Unexpected SCAN reply from the cache server")
+            cursor, batch = reply
+            keys.extend(batch)
+            if cursor in (b"0", 0):
+                return keys
+
+    @classmethod
+    def _batches(cls, raw_keys: List[bytes]) -> List[List[bytes]]:
+        """Split keys into batches small enough for one command each."""
+        batches = []
+        for start in range(0, len(raw_keys), cls.SCAN_COUNT):
+            end = start + cls.SCAN_COUNT
+            batches.append(raw_keys[start:end])
+        return batches
+
+    @staticmethod
+    def _escape(prefix: str) -> str:
+        """Escape glob characters of a key prefix for SCAN MATCH."""
+        return "".join("\\" + char if char in "*?[]\\" else char for char in prefix)
+
+    def items(self) -> List[Tuple[str, CacheEntry]]:
+        """Return every entry, fetched in MGET batches; the order is unspecified."""
+        raw_keys = self._keys()
+        items: List[Tuple[str, CacheEntry]] = []
+        offset = len(self.prefix)
+        for batch in self._batches(raw_keys):
+            chunk = [raw.decode("utf-8")[offset:] for raw in batch]
+            entries = self.get_many(chunk)
+            items.extend((key, entries[key]) for key in chunk if key in entries)
+        return items
+
+    def clear(self) -> None:
+        """Remove every entry under the prefix."""
+        raw_keys = self._keys()
+        for batch in self._batches(raw_keys):
+            self.client.execute("DEL", *batch)
+
+    def __len__(self) -> int:
+        """Return the number of stored entries."""
+        return len(self._keys())
+
+
+def create_backend(
+    kind: str,
+    location: Optional[str] = None,
+    serializer: str = "json",
+    max_entries: int = 1024,
+    namespace: Optional[str] = None,
+) -> CacheBackend:
+    """Create a cache backend by name.
+
+    Args:
+        kind: "memory", "disk" or "redis"
+        location: The directory of a disk backend or the redis:// URL of a Redis backend
+        serializer: The name of the serializer, one of SERIALIZERS
+        max_entries: Maximum number of entries of a memory or disk backend
+        namespace: Optional name of a keyspace kept apart from the weather entries:
+            a subdirectory of a disk backend, or a key prefix of a Redis backend
+
+    Returns:
+        The backend
+
+    Raises:
+        ValueError: If the kind or serializer is unknown or a location is missing
+    """
+    if serializer not in SERIALIZERS:
+        raise ValueError(f"Unknown serializer: {serializer}. Choose from: {', '.join(SERIALIZERS)}")
+    if kind == "memory":
+        return MemoryBackend(max_entries=max_entries)
+    if kind == "disk":
+        if not location:
+            raise ValueError("A disk cache backend requires a directory.")
+        directory = Path(location) / namespace if namespace else Path(location)
+        return DiskBackend(directory, serializer=SERIALIZERS[serializer](), max_entries=max_entries)
+    if kind == "redis":
+        if not location:
+            raise ValueError("A redis cache backend requires a redis:// URL.")
+        # A prefix outside "weather-cli:*", so weather scans never see the namespace
+        prefix = (
+            f"{RedisBackend.DEFAULT_PREFIX[:-1]}-{namespace}:"
+            if namespace
+            else RedisBackend.DEFAULT_PREFIX
+        )
+        return RedisBackend(
+            RespClient.from_url(location), serializer=SERIALIZERS[serializer](), prefix=prefix
+        )
+    raise ValueError(f"Unknown cache backend: {kind}")
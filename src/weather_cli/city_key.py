@@ -0,0 +1,64 @@
+"""Canonical city keys for caching and request deduplication.
+
+Users spell the same city in many ways: "paris", " Paris", "PARIS" and
+"Paris  , fr" all name one place. Every cache, in-flight and batch lookup is keyed
+by the canonical form instead, so those spellings share a single upstream call.
+The city name sent upstream is left as typed, apart from a default country
+qualifier that qualify_city may add.
+"""
+
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import Optional
+
+# Canonicalizing is cheap, but the same few names are looked up over and over
+_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _canonicalize(city: str) -> str:
+    """Return the interned canonical key of a city name.
+
+    Args:
+        city: The city name, optionally qualified as "City,CC" or "City,State,CC"
+
+    Returns:
+        The canonical key
+    """
+    # Casefolding can decompose characters, so normalize again afterwards
+    folded = unicodedata.normalize("NFC", unicodedata.normalize("NFC", city).casefold())
+    parts = (" ".join(part.split()) for part in folded.split(","))
+    return sys.intern(",".join(part for part in parts if part))
+
+
+def qualify_city(city: str, country: Optional[str]) -> str:
+    """Qualify an unqualified city name with a default country.
+
+    Args:
+        city: The city name, optionally qualified as "City,CC"
+        country: Optional ISO 3166 country code; blank or None leaves the name alone
+
+    Returns:
+        "City,CC" for an unqualified name, else the name unchanged
+    """
+    if country is None or not country.strip() or "," in city:
+        return city
+    return f"{city},{country.strip()}"
+
+
+def city_key(city: str) -> str:
+    """Return the canonical key of a city name.
+
+    The name is NFC-normalized, casefolded and has its whitespace collapsed.
+    Country qualifiers keep their position but lose surrounding spaces, so
+    "Paris , FR" and "paris,fr" share a key. Keys are interned, so equal keys are
+    usually the same object and compare by identity.
+
+    Args:
+        city: The city name, optionally qualified as "City,CC"
+
+    Returns:
+        The canonical key, such as "paris,fr"; empty for a blank name
+    """
+    return _canonicalize(city)
@@ -0,0 +1,155 @@
+"""Concurrent multi-city weather comparison for the weather CLI application."""
+
+import contextvars
+import logging
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .daemon_pool import DaemonThreadPool
+from .scheduler import current_request_class, request_priority
+from .units import Units
+from .weather_data import WeatherData
+from .weather_service import WeatherService
+from .exceptions import WeatherApiException
+
+logger = logging.getLogger(__name__)
+
+SORT_KEYS: Dict[str, Callable[[WeatherData], Any]] = {
+    "temperature": lambda data: data.temperature_celsius,
+    "city": lambda data: data.city.casefold(),
+    "description": lambda data: data.description.casefold(),
+}
+
+
+@dataclass(frozen=True)
+class ComparisonResult:
+    """Outcome of comparing several cities.
+
+    Attributes:
+        results: Weather data that arrived, ranked by the chosen field
+        errors: Error message for each city whose lookup failed
+        pending: Cities that had not answered before the deadline
+    """
+
+    results: List[WeatherData]
+    errors: Dict[str, str] = field(default_factory=dict)
+    pending: List[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        """Whether every city answered before the deadline."""
+        return not self.pending
+
+
+def compare_cities(
+    service: WeatherService,
+    cities: Iterable[str],
+    sort_by: str = "temperature",
+    descending: bool = True,
+    deadline: Optional[float] = None,
+    max_workers: Optional[int] = None,
+) -> ComparisonResult:
+    """Fetch weather for several cities concurrently and rank the results.
+
+    All lookups go through the same service, so they share its client, cache and
+    in-flight deduplication. Different spellings of the same city, including names
+    with and without the service's default country, are looked up once.
+
+    Args:
+        service: The weather service used for every lookup
+        cities: The city names to compare
+        sort_by: The field to rank by, one of SORT_KEYS
+        descending: Whether to rank the largest value first
+        deadline: Optional number of seconds to wait before returning partial results
+        max_workers: Optional maximum number of concurrent lookups
+
+    Returns:
+        ComparisonResult with ranked results, errors and cities still pending
+
+    Raises:
+        ValueError: If sort_by is unknown or no cities are given
+    """
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Unknown sort field: {sort_by}. Choose from: {', '.join(SORT_KEYS)}")
+
+    # Spellings of the same city share a canonical key; the first one is reported
+    unique_cities: Dict[str, str] = {}
+    for city in cities:
+        unique_cities.setdefault(service.canonical_key(city), city.strip())
+    if not unique_cities:
+        raise ValueError("At least one city is required for a comparison.")
+
+    # Cities already cached are answered by one batched cache lookup
+    cached = service.get_cached_weather(unique_cities.values())
+    uncached = [city for city in unique_cities.values() if city not in cached]
+    results: List[WeatherData] = list(cached.values())
+    if not uncached:
+        results.sort(key=SORT_KEYS[sort_by], reverse=descending)
+        return ComparisonResult(results=results)
+
+    workers = max_workers or len(uncached)
+    # Daemon workers, so lookups still running at the deadline do not delay exit
+    executor = DaemonThreadPool(max_workers=workers, thread_name_prefix="weather-compare")
+    # Lookups keep the caller's request priority; requests still queued when the
+    # deadline passes are dropped instead of being sent for results nobody waits for
+    with request_priority(current_request_class().priority, timeout=deadline):
+        futures: Dict["Future[WeatherData]", str] = {
+            executor.submit(contextvars.copy_context().run, service.get_weather, city): city
+            for city in uncached
+        }
+    logger.debug("Comparing %d cities with %d workers", len(futures), workers)
+
+    try:
+        done, not_done = wait(futures, timeout=deadline)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    errors: Dict[str, str] = {}
+    for future in done:
+        city = futures[future]
+        try:
+            results.append(future.result())
+        except WeatherApiException as e:
+            errors[city] = str(e)
+        except Exception as e:
+            logger.error("Unexpected error while comparing %s: %s", city, e)
+            errors[city] = f"Unexpected error: {str(e)}"
+
+    pending = sorted(futures[future] for future in not_done)
+    if pending:
+        logger.info("Deadline reached with %d cities still pending", len(pending))
+
+    results.sort(key=SORT_KEYS[sort_by], reverse=descending)
+    return ComparisonResult(results=results, errors=errors, pending=pending)
+
+
+def format_comparison_table(result: ComparisonResult, units: Units = Units.METRIC) -> str:
+    """Format a comparison as a ranked text table.
+
+    Args:
+        result: The comparison to format
+        units: The unit system to display temperatures in
+
+    Returns:
+        A user-friendly table followed by any failed or pending cities
+    """
+    headers = ("Rank", "City", "Temperature", "Conditions")
+    rows = [
+        (str(rank), data.city, units.format_temperature(data.temperature_celsius), data.description)
+        for rank, data in enumerate(result.results, start=1)
+    ]
+    widths = [max(len(row[i]) for row in [headers, *rows]) for i in range(len(headers))]
+
+    def format_row(row: Tuple[str, ...]) -> str:
+        return "  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+
+    lines = [format_row(headers), "  ".join("-" * width for width in widths)]
+    lines.extend(format_row(row) for row in rows)
+
+    for city, message in sorted(result.errors.items()):
+        lines.append(f"Failed: {city} - {message}")
+    for city in result.pending:
+        lines.append(f"No response before deadline: {city}")
+
+    return "\n".join(lines)
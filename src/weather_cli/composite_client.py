@@ -0,0 +1,307 @@
+"""Multi-provider weather API client with failover and hedged requests."""
+
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, Deque, Dict, List, Optional, Sequence, TypeVar
+
+from .daemon_pool import DaemonThreadPool
+from .forecast import ForecastSeries
+from .weather_client import WeatherApiClient
+from .weather_data import WeatherData
+from .exceptions import WeatherApiException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Errors that describe the request rather than the provider; another provider
+# would give the same answer, so they are not failed over.
+DEFINITIVE_STATUS_CODES = frozenset({400, 404})
+
+
+class LatencyTracker:
+    """Thread-safe sliding window of recent request latencies."""
+
+    def __init__(self, window: int = 100) -> None:
+        """Initialize the tracker.
+
+        Args:
+            window: Number of most recent samples kept
+
+        Raises:
+            ValueError: If window is not positive
+        """
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of samples currently held."""
+        with self._lock:
+            return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Record a latency sample.
+
+        Args:
+            seconds: The observed latency in seconds
+        """
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Return a latency percentile using the nearest-rank method.
+
+        Args:
+            percentile: The percentile to compute, between 0 and 100
+
+        Returns:
+            The latency in seconds, or None if no samples were recorded
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        rank = max(1, math.ceil(percentile / 100.0 * len(samples)))
+        return samples[min(rank, len(samples)) - 1]
+
+
+class FailoverClient(WeatherApiClient):
+    """Weather API client that spreads requests over an ordered set of providers.
+
+    Providers are tried in order. A provider that fails with a network error, an
+    authentication or rate-limit error, or a server error is failed over to the next
+    one. When hedging is enabled and the current request runs past the chosen latency
+    percentile of its provider, one hedged request is sent to the next provider and
+    the first good answer wins.
+    """
+
+    DEFAULT_MAX_WORKERS = 32
+
+    def __init__(
+        self,
+        providers: Sequence[WeatherApiClient],
+        hedge_percentile: Optional[float] = None,
+        hedge_min_samples: int = 20,
+        latency_window: int = 100,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        """Initialize the failover client.
+
+        Args:
+            providers: Weather API clients in order of preference
+            hedge_percentile: Optional latency percentile (0-100] after which a hedged
+                request is sent. If not provided, requests are never hedged.
+            hedge_min_samples: Number of latency samples a provider needs before its
+                requests are hedged
+            latency_window: Number of recent latency samples kept per provider
+            max_workers: Maximum number of provider requests running at once
+
+        Raises:
+            ValueError: If no providers are given or the percentile is out of range
+        """
+        if not providers:
+            raise ValueError("At least one weather provider is required.")
+        if hedge_percentile is not None and not 0 < hedge_percentile <= 100:
+            raise ValueError("hedge_percentile must be between 0 and 100")
+
+        self.providers: List[WeatherApiClient] = list(providers)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = [LatencyTracker(latency_window) for _ in self.providers]
+        self.hedged_requests = 0
+        self._stats_lock = threading.Lock()
+        # Daemon workers, so a hedged request that lost the race never delays exit
+        self._executor = DaemonThreadPool(
+            max_workers=max_workers, thread_name_prefix="weather-provider"
+        )
+
+    def get_weather_from_api(self, city: str) -> WeatherData:
+        """Get weather data for a city from the first provider that answers.
+
+        Args:
+            city: The name of the city to get weather for
+
+        Returns:
+            WeatherData object containing the weather information
+
+        Raises:
+            WeatherApiException: If no provider could return weather data
+        """
+        pending: Dict["Future[WeatherData]", int] = {}
+        errors: List[WeatherApiException] = []
+        next_index = 0
+        hedged = False
+
+        while True:
+            if not pending:
+                if next_index >= len(self.providers):
+                    break
+                pending[self._submit(next_index, city)] = next_index
+                next_index += 1
+
+            timeout = None
+            if not hedged and next_index < len(self.providers):
+                timeout = self._hedge_delay(next_index - 1)
+
+            done, _ = wait(set(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                logger.debug("Hedging request for %s to provider %d", city, next_index)
+                with self._stats_lock:
+                    self.hedged_requests += 1
+                pending[self._submit(next_index, city)] = next_index
+                next_index += 1
+                hedged = True
+                continue
+
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    return self._normalize(future.result(), index)
+                except WeatherApiException as e:
+                    if e.status_code in DEFINITIVE_STATUS_CODES:
+                        raise
+                    logger.warning("Weather provider %d failed for %s: %s", index, city, e)
+                    errors.append(e)
+
+        raise errors[-1]
+
+    def get_forecast_from_api(self, city: str) -> ForecastSeries:
+        """Get the forecast for a city from the first provider that supports it.
+
+        Args:
+            city: The name of the city to get the forecast for
+
+        Returns:
+            ForecastSeries holding the forecast slots as columns
+
+        Raises:
+            WeatherApiException: If no provider could return a forecast
+        """
+        return self._first_success(
+            lambda provider: provider.get_forecast_from_api(city), f"forecast for {city}"
+        )
+
+    def get_weather_by_coordinates(self, latitude: float, longitude: float) -> WeatherData:
+        """Get weather data for a location from the first provider that supports it.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Returns:
+            WeatherData object containing the weather information
+
+        Raises:
+            WeatherApiException: If no provider could return weather data
+        """
+        return self._first_success(
+            lambda provider: provider.get_weather_by_coordinates(latitude, longitude),
+            f"weather at {latitude}, {longitude}",
+        )
+
+    def _first_success(self, call: Callable[[WeatherApiClient], T], description: str) -> T:
+        """Call the providers one after another until one succeeds.
+
+        Args:
+            call: Function performing the request against one provider
+            description: What is being requested, for log messages
+
+        Returns:
+            The first successful result
+
+        Raises:
+            WeatherApiException: The definitive error, or the last error if every
+                provider failed
+        """
+        for index, provider in enumerate(self.providers[:-1]):
+            try:
+                return call(provider)
+            except WeatherApiException as e:
+                if e.status_code in DEFINITIVE_STATUS_CODES:
+                    raise
+                logger.warning("Weather provider %d failed %s: %s", index, description, e)
+        # The last provider's error is the one raised
+        return call(self.providers[-1])
+
+    def close(self) -> None:
+        """Stop the worker threads once outstanding requests finish."""
+        self._executor.shutdown(wait=False)
+
+    def _submit(self, index: int, city: str) -> "Future[WeatherData]":
+        """Start a request to one provider in the background.
+
+        Args:
+            index: The provider index
+            city: The name of the city to get weather for
+
+        Returns:
+            A future resolving to the provider's weather data
+        """
+        # Run in a copy of the caller's context so the request stays in its trace
+        return self._executor.submit(contextvars.copy_context().run, self._timed_call, index, city)
+
+    def _timed_call(self, index: int, city: str) -> WeatherData:
+        """Call one provider, recording its latency on success.
+
+        Args:
+            index: The provider index
+            city: The name of the city to get weather for
+
+        Returns:
+            The provider's weather data
+
+        Raises:
+            WeatherApiException: If the provider fails
+        """
+        start = time.monotonic()
+        try:
+            weather_data = self.providers[index].get_weather_from_api(city)
+        except WeatherApiException:
+            raise
+        except Exception as e:
+            raise WeatherApiException(f"Unexpected error: {str(e)}")
+        self.latencies[index].record(time.monotonic() - start)
+        return weather_data
+
+    def _hedge_delay(self, index: int) -> Optional[float]:
+        """Return how long to wait for a provider before hedging.
+
+        Args:
+            index: The provider index
+
+        Returns:
+            Seconds to wait, or None if the request should not be hedged
+        """
+        if self.hedge_percentile is None:
+            return None
+        if len(self.latencies[index]) < self.hedge_min_samples:
+            return None
+        return self.latencies[index].percentile(self.hedge_percentile)
+
+    def _normalize(self, weather_data: WeatherData, index: int) -> WeatherData:
+        """Check that a provider answered with the common weather data model.
+
+        Args:
+            weather_data: The provider's result
+            index: The provider index
+
+        Returns:
+            The weather data
+
+        Raises:
+            WeatherApiException: If the provider returned another type
+        """
+        if not isinstance(weather_data, WeatherData):
+            raise WeatherApiException(
+                f"Weather provider {index} returned {type(weather_data).__name__}, "
+                "expected WeatherData."
+            )
+        return weather_data
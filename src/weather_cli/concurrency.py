@@ -0,0 +1,246 @@
+"""Adaptive concurrency control for weather API clients.
+
+A fixed number of concurrent requests is either too timid for a healthy upstream
+or enough to trip its rate limiting. The limiter here uses additive increase,
+multiplicative decrease (AIMD), as TCP congestion control does: while requests
+succeed with flat latency, the limit grows by about one request per window of
+requests; when the upstream answers 429 or 5xx, or latency rises well above
+its baseline, the limit is cut by a constant factor. Large batches settle near
+the highest concurrency the upstream tolerates.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Optional, TypeVar
+
+from . import tracing
+from .forecast import ForecastSeries
+from .weather_client import FetchResult, Validators, WeatherApiClient
+from .weather_data import WeatherData
+from .exceptions import WeatherApiException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def is_overload(error: WeatherApiException) -> bool:
+    """Check whether an error means the upstream is overloaded.
+
+    Args:
+        error: The error raised by a request
+
+    Returns:
+        True for rate limiting (429) and server errors (5xx)
+    """
+    status_code = error.status_code
+    return status_code is not None and (status_code == 429 or 500 <= status_code < 600)
+
+
+@dataclass
+class LimiterStats:
+    """Counters describing how the limit adapted.
+
+    Attributes:
+        successes: Requests that completed without a sign of overload
+        overloads: Requests rejected by the upstream with 429 or 5xx
+        slow: Requests whose latency rose well above the baseline
+        decreases: Times the limit was cut
+    """
+
+    successes: int = 0
+    overloads: int = 0
+    slow: int = 0
+    decreases: int = 0
+
+
+class AimdLimiter:
+    """Thread-safe concurrency limit that adapts to upstream feedback.
+
+    Only one decrease is made per congestion event: requests that started before
+    the last decrease do not cut the limit again, since they were sent under the
+    old limit.
+    """
+
+    DEFAULT_INITIAL_LIMIT = 4
+    DEFAULT_MAX_LIMIT = 64
+
+    def __init__(
+        self,
+        initial_limit: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = 1,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_window: int = 100,
+        min_latency_samples: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            initial_limit: Concurrency allowed before any feedback
+            min_limit: The limit is never cut below this
+            max_limit: The limit never grows above this
+            backoff: Factor the limit is multiplied by on overload, between 0 and 1
+            latency_tolerance: How many times the baseline latency a request may take
+                before it counts as a sign of overload
+            latency_window: Number of recent latencies the baseline is the minimum of
+            min_latency_samples: Latencies needed before slow requests cut the limit
+            clock: Monotonic clock returning seconds
+
+        Raises:
+            ValueError: If the limits, backoff or tolerance are inconsistent
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        if latency_tolerance <= 1:
+            raise ValueError("latency_tolerance must be greater than 1")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.min_latency_samples = min_latency_samples
+        self.stats = LimiterStats()
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self._last_decrease = float("-inf")
+        self._clock = clock
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """The number of requests currently allowed to run at once."""
+        with self._condition:
+            return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests currently running."""
+        with self._condition:
+            return self._in_flight
+
+    def acquire(self) -> float:
+        """Wait until a request may start and claim a slot for it.
+
+        Returns:
+            The start time of the request, to be passed to release
+        """
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+            self._in_flight += 1
+            return self._clock()
+
+    def release(self, started: float, overloaded: bool = False) -> None:
+        """Free the slot of a finished request and adapt the limit to its outcome.
+
+        Args:
+            started: The start time returned by acquire
+            overloaded: Whether the upstream rejected the request as overloaded
+        """
+        now = self._clock()
+        latency = now - started
+        with self._condition:
+            slow = not overloaded and self._is_slow(latency)
+            if overloaded or slow:
+                if overloaded:
+                    self.stats.overloads += 1
+                else:
+                    self.stats.slow += 1
+                if started >= self._last_decrease:
+                    self._decrease(now)
+            else:
+                self.stats.successes += 1
+                # Only grow while at least half the limit is in use, so a mostly
+                # idle limiter does not build up a limit it has never tested
+                if self._in_flight * 2 >= self._limit:
+                    self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            if not overloaded:
+                self._latencies.append(latency)
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def _is_slow(self, latency: float) -> bool:
+        """Check whether a latency is well above the baseline; the lock must be held."""
+        if len(self._latencies) < self.min_latency_samples:
+            return False
+        return latency > min(self._latencies) * self.latency_tolerance
+
+    def _decrease(self, now: float) -> None:
+        """Cut the limit by the backoff factor; the lock must be held."""
+        previous = int(self._limit)
+        self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        self._last_decrease = now
+        self.stats.decreases += 1
+        logger.debug("Concurrency limit cut from %d to %d", previous, int(self._limit))
+
+
+class AdaptiveConcurrencyClient(WeatherApiClient):
+    """Weather API client that limits concurrent requests to another client adaptively.
+
+    Requests beyond the current limit wait for a slot; the limit adapts to the
+    latency and errors of the wrapped client's answers.
+    """
+
+    def __init__(self, client: WeatherApiClient, limiter: Optional[AimdLimiter] = None) -> None:
+        """Initialize the client.
+
+        Args:
+            client: The client whose requests are limited
+            limiter: Optional limiter. If not provided, an AimdLimiter with default
+                settings is used.
+        """
+        self.client = client
+        self.limiter = limiter or AimdLimiter()
+
+    @property
+    def limit(self) -> int:
+        """The number of requests currently allowed to run at once."""
+        return self.limiter.limit
+
+    def get_weather_from_api(self, city: str) -> WeatherData:
+        """Get weather data for a city once a slot is free."""
+        return self._limited(lambda: self.client.get_weather_from_api(city))
+
+    def fetch_weather(self, city: str, validators: Optional[Validators] = None) -> FetchResult:
+        """Fetch weather data for a city once a slot is free."""
+        return self._limited(lambda: self.client.fetch_weather(city, validators))
+
+    def get_forecast_from_api(self, city: str) -> ForecastSeries:
+        """Get the forecast for a city once a slot is free."""
+        return self._limited(lambda: self.client.get_forecast_from_api(city))
+
+    def get_weather_by_coordinates(self, latitude: float, longitude: float) -> WeatherData:
+        """Get weather data for a location once a slot is free."""
+        return self._limited(lambda: self.client.get_weather_by_coordinates(latitude, longitude))
+
+    def _limited(self, call: Callable[[], T]) -> T:
+        """Run a request within the concurrency limit and report its outcome.
+
+        Args:
+            call: Function performing the request
+
+        Returns:
+            The result of the request
+
+        Raises:
+            WeatherApiException: If the request fails
+        """
+        with tracing.span("limiter.wait"):
+            started = self.limiter.acquire()
+        overloaded = False
+        try:
+            return call()
+        except WeatherApiException as e:
+            overloaded = is_overload(e)
+            raise
+        finally:
+            self.limiter.release(started, overloaded)
@@ -2,6 +2,7 @@
 
 import os
 import logging
+from typing import List, Optional
 
 from dotenv import load_dotenv
 
@@ -14,6 +15,13 @@ class ConfigUtil:
     """Utility class for managing application configuration."""
 
     DEFAULT_API_BASE_URL = "https://api.openweathermap.org/data/2.5"
+    DEFAULT_NEARBY_RADIUS_KM = 5.0
+    DEFAULT_NEGATIVE_CACHE_TTL_SECONDS = 300.0
+    CASSETTE_MODES = ("record", "replay")
+    LOG_FORMATS = ("text", "json")
+    CACHE_BACKENDS = ("memory", "disk", "redis")
+    CACHE_SERIALIZERS = ("json", "zlib")
+    HTTP_TRANSPORTS = ("requests", "stdlib", "http2")
 
     @staticmethod
     def get_api_key() -> str:
@@ -38,7 +46,7 @@ class ConfigUtil:
         for key_name in possible_keys:
             api_key = os.getenv(key_name)
             if api_key and api_key.strip():
-                logger.debug(f"API key loaded successfully from {key_name}")
+                logger.debug("API key loaded successfully from %s", key_name)
                 return api_key.strip()
 
         logger.error("API key not found in environment variables or .env file")
@@ -48,6 +56,46 @@ class ConfigUtil:
             + " or add it to a .env file."
         )
 
+    @staticmethod
+    def get_api_keys() -> List[str]:
+        """Get a pool of OpenWeatherMap API keys from environment variables.
+
+        Returns:
+            The comma-separated keys from OPENWEATHERMAP_API_KEYS, in order, or an empty
+            list if no pool is configured
+        """
+        load_dotenv()
+
+        keys = os.getenv("OPENWEATHERMAP_API_KEYS", "")
+        api_keys = [key.strip() for key in keys.split(",") if key.strip()]
+        if api_keys:
+            logger.debug("Loaded a pool of %d API keys", len(api_keys))
+        return api_keys
+
+    @staticmethod
+    def get_api_key_quota() -> Optional[int]:
+        """Get the per-minute request quota of each pooled API key.
+
+        Returns:
+            The quota from OPENWEATHERMAP_API_KEY_QUOTA, or None if keys are not limited
+            locally
+
+        Raises:
+            ConfigException: If the value is not a positive integer
+        """
+        load_dotenv()
+
+        value = os.getenv("OPENWEATHERMAP_API_KEY_QUOTA")
+        if not value or not value.strip():
+            return None
+        try:
+            quota = int(value)
+        except ValueError:
+            raise ConfigException(f"OPENWEATHERMAP_API_KEY_QUOTA must be an integer, got: {value}")
+        if quota <= 0:
+            raise ConfigException("OPENWEATHERMAP_API_KEY_QUOTA must be positive.")
+        return quota
+
     @staticmethod
     def get_api_base_url() -> str:
         """Get the OpenWeatherMap API base URL from environment variables or use default.
@@ -62,8 +110,506 @@ class ConfigUtil:
 
         if api_url and api_url.strip():
             url = api_url.strip()
-            logger.debug(f"Using API base URL from environment: {url}")
+            logger.debug("Using API base URL from environment: %s", url)
             return url
         else:
-            logger.debug(f"Using default API base URL: {ConfigUtil.DEFAULT_API_BASE_URL}")
+            logger.debug("Using default API base URL: %s", ConfigUtil.DEFAULT_API_BASE_URL)
             return ConfigUtil.DEFAULT_API_BASE_URL
+
+    @staticmethod
+    def get_history_dir() -> Optional[str]:
+        """Get the observation history directory from environment variables.
+
+        Returns:
+            The directory to record observation history in, or None if recording is disabled
+        """
+        load_dotenv()
+
+        history_dir = os.getenv("WEATHER_HISTORY_DIR")
+
+        if history_dir and history_dir.strip():
+            directory = os.path.expanduser(history_dir.strip())
+            logger.debug("Recording observation history in: %s", directory)
+            return directory
+        return None
+
+    @staticmethod
+    def get_fallback_api_urls() -> List[str]:
+        """Get fallback API base URLs, such as replicas, from environment variables.
+
+        Returns:
+            The comma-separated URLs from OPENWEATHERMAP_FALLBACK_API_URLS, in order
+        """
+        load_dotenv()
+
+        urls = os.getenv("OPENWEATHERMAP_FALLBACK_API_URLS", "")
+        fallback_urls = [url.strip() for url in urls.split(",") if url.strip()]
+        if fallback_urls:
+            logger.debug("Using %d fallback API base URLs", len(fallback_urls))
+        return fallback_urls
+
+    @staticmethod
+    def get_hedge_percentile() -> Optional[float]:
+        """Get the latency percentile after which requests are hedged.
+
+        Returns:
+            The percentile from WEATHER_HEDGE_PERCENTILE, or None if hedging is disabled
+
+        Raises:
+            ConfigException: If the value is not a number between 0 and 100
+        """
+        load_dotenv()
+
+        value = os.getenv("WEATHER_HEDGE_PERCENTILE")
+        if not value or not value.strip():
+            return None
+        try:
+            percentile = float(value)
+        except ValueError:
+            raise ConfigException(f"WEATHER_HEDGE_PERCENTILE must be a number, got: {value}")
+        if not 0 < percentile <= 100:
+            raise ConfigException("WEATHER_HEDGE_PERCENTILE must be between 0 and 100.")
+        return percentile
+
+    @staticmethod
+    def get_nearby_radius_km() -> float:
+        """Get the radius within which a cached observation answers a coordinate lookup.
+
+        Returns:
+            The radius in kilometers from WEATHER_NEARBY_RADIUS_KM, or the default
+
+        Raises:
+            ConfigException: If the value is not a non-negative number
+        """
+        load_dotenv()
+
+        value = os.getenv("WEATHER_NEARBY_RADIUS_KM")
+        if not value or not value.strip():
+            return ConfigUtil.DEFAULT_NEARBY_RADIUS_KM
+        try:
+            radius = float(value)
+        except ValueError:
+            raise ConfigException(f"WEATHER_NEARBY_RADIUS_KM must be a number, got: {value}")
+        if radius < 0:
+            raise ConfigException("WEATHER_NEARBY_RADIUS_KM must not be negative.")
+        return radius
+
+    @staticmethod
+    def get_default_country() -> Optional[str]:
+        """Get the country that city names without a country are qualified with.
+
+        Returns:
+            The upper-cased ISO 3166 country code from WEATHER_DEFAULT_COUNTRY, or
+            None to leave names unqualified
+
+        Raises:
+            ConfigException: If the value is not a two-letter country code
+        """
+        load_dotenv()
+
+        country = (os.getenv("WEATHER_DEFAULT_COUNTRY") or "").strip()
+        if not country:
+            return None
+        if len(country) != 2 or not country.isascii() or not country.isalpha():
+            raise ConfigException(
+                f"WEATHER_DEFAULT_COUNTRY must be a two-letter country code, got: {country}"
+            )
+        return country.upper()
+
+    @staticmethod
+    def get_cassette_path() -> Optional[str]:
+        """Get the cassette file that HTTP traffic is recorded to or replayed from.
+
+        Returns:
+            The path from WEATHER_CASSETTE, or None if traffic goes to the network as usual
+        """
+        load_dotenv()
+
+        cassette = os.getenv("WEATHER_CASSETTE")
+        if cassette and cassette.strip():
+            return os.path.expanduser(cassette.strip())
+        return None
+
+    @staticmethod
+    def get_cassette_mode() -> str:
+        """Get whether the cassette is recorded or replayed.
+
+        Returns:
+            "record" or "replay" from WEATHER_CASSETTE_MODE, defaulting to "replay"
+
+        Raises:
+            ConfigException: If the mode is not supported
+        """
+        load_dotenv()
+
+        mode = (os.getenv("WEATHER_CASSETTE_MODE") or "replay").strip().lower()
+        if mode not in ConfigUtil.CASSETTE_MODES:
+            raise ConfigException(
+                f"WEATHER_CASSETTE_MODE must be one of: {', '.join(ConfigUtil.CASSETTE_MODES)}"
+            )
+        return mode
+
+    @staticmethod
+    def get_replay_speed() -> float:
+        """Get the cassette replay speed relative to the recording.
+
+        Returns:
+            The speed from WEATHER_REPLAY_SPEED (default 1.0); 0 replays without delays
+
+        Raises:
+            ConfigException: If the value is not a non-negative number
+        """
+        load_dotenv()
+
+        value = os.getenv("WEATHER_REPLAY_SPEED")
+        if not value or not value.strip():
+            return 1.0
+        try:
+            speed = float(value)
+        except ValueError:
+            raise ConfigException(f"WEATHER_REPLAY_SPEED must be a number, got: {value}")
+        if speed < 0:
+            raise ConfigException("WEATHER_REPLAY_SPEED must not be negative.")
+        return speed
+
+    @staticmethod
+    def get_log_format() -> str:
+        """Get the format of log records.
+
+        Returns:
+            "text" or "json" from WEATHER_LOG_FORMAT, defaulting to "text"
+
+        Raises:
+            ConfigException: If the format is not supported
+        """
+        load_dotenv()
+
+        log_format = (os.getenv("WEATHER_LOG_FORMAT") or "text").strip().lower()
+        if log_format not in ConfigUtil.LOG_FORMATS:
+            raise ConfigException(
+                f"WEATHER_LOG_FORMAT must be one of: {', '.join(ConfigUtil.LOG_FORMATS)}"
+            )
+        return log_format
+
+    @staticmethod
+    def get_log_sample_rate() -> float:
+        """Get the fraction of high-volume success log records to keep.
+
+        Returns:
+            The rate from WEATHER_LOG_SAMPLE_RATE (default 1.0, keep everything)
+
+        Raises:
+            ConfigException: If the value is not a number between 0 (exclusive) and 1
+        """
+        load_dotenv()
+
+        value = os.getenv("WEATHER_LOG_SAMPLE_RATE")
+        if not value or not value.strip():
+            return 1.0
+        try:
+            rate = float(value)
+        except ValueError:
+            raise ConfigException(f"WEATHER_LOG_SAMPLE_RATE must be a number, got: {value}")
+        if not 0 < rate <= 1:
+            raise ConfigException("WEATHER_LOG_SAMPLE_RATE must be greater than 0 and at most 1.")
+        return rate
+
+    @staticmethod
+    def get_negative_cache_ttl() -> float:
+        """Get how long failed lookups of unknown or invalid cities are remembered.
+
+        Returns:
+            The TTL in seconds from WEATHER_NEGATIVE_CACHE_TTL, or the default; 0
+            disables the negative cache
+
+        Raises:
+            ConfigException: If the value is not a non-negative number
+        """
+        load_dotenv()
+
+        value = os.getenv("WEATHER_NEGATIVE_CACHE_TTL")
+        if not value or not value.strip():
+            return ConfigUtil.DEFAULT_NEGATIVE_CACHE_TTL_SECONDS
+        try:
+            ttl = float(value)
+        except ValueError:
+            raise ConfigException(f"WEATHER_NEGATIVE_CACHE_TTL must be a number, got: {value}")
+        if ttl < 0:
+            raise ConfigException("WEATHER_NEGATIVE_CACHE_TTL must not be negative.")
+        return ttl
+
+    @staticmethod
+    def get_negative_cache_path() -> Optional[str]:
+        """Get the file failed lookups are persisted to between runs.
+
+        Returns:
+            The path from WEATHER_NEGATIVE_CACHE_FILE, or None to keep them in memory only
+        """
+        load_dotenv()
+
+        path = os.getenv("WEATHER_NEGATIVE_CACHE_FILE")
+        if path and path.strip():
+            return os.path.expanduser(path.strip())
+        return None
+
+    @staticmethod
+    def get_forecast_fallback_max_age() -> float:
+        """Get how long fetched forecasts may stand in for unavailable current weather.
+
+        Returns:
+            The maximum forecast age in seconds from WEATHER_FORECAST_FALLBACK_MAX_AGE,
+            or 0 if the forecast fallback is disabled (the default)
+
+        Raises:
+            ConfigException: If the value is not a non-negative number
+        """
+        load_dotenv()
+
+        value = os.getenv("WEATHER_FORECAST_FALLBACK_MAX_AGE")
+        if not value or not value.strip():
+            return 0.0
+        try:
+            max_age = float(value)
+        except ValueError:
+            raise ConfigException(
+                f"WEATHER_FORECAST_FALLBACK_MAX_AGE must be a number, got: {value}"
+            )
+        if max_age < 0:
+            raise ConfigException("WEATHER_FORECAST_FALLBACK_MAX_AGE must not be negative.")
+        return max_age
+
+    @staticmethod
+    def get_cache_backend() -> str:
+        """Get where cached weather data is stored.
+
+        Returns:
+            "memory", "disk" or "redis" from WEATHER_CACHE_BACKEND, defaulting to "memory"
+
+        Raises:
+            ConfigException: If the backend is not supported
+        """
+        load_dotenv()
+
+        backend = (os.getenv("WEATHER_CACHE_BACKEND") or "memory").strip().lower()
+        if backend not in ConfigUtil.CACHE_BACKENDS:
+            raise ConfigException(
+                f"WEATHER_CACHE_BACKEND must be one of: {', '.join(ConfigUtil.CACHE_BACKENDS)}"
+            )
+        return backend
+
+    @staticmethod
+    def get_cache_dir() -> Optional[str]:
+        """Get the directory of the disk cache backend.
+
+        Returns:
+            The path from WEATHER_CACHE_DIR, or None if not set
+        """
+        load_dotenv()
+
+        directory = os.getenv("WEATHER_CACHE_DIR")
+        if directory and directory.strip():
+            return os.path.expanduser(directory.strip())
+        return None
+
+    @staticmethod
+    def get_cache_url() -> Optional[str]:
+        """Get the server of the redis cache backend.
+
+        Returns:
+            The redis:// URL from WEATHER_CACHE_URL, or None if not set
+        """
+        load_dotenv()
+
+        url = os.getenv("WEATHER_CACHE_URL")
+        if url and url.strip():
+            return url.strip()
+        return None
+
+    @staticmethod
+    def get_cache_serializer() -> str:
+        """Get how cache entries are stored by the disk and redis backends.
+
+        Returns:
+            "json" or "zlib" (compressed JSON) from WEATHER_CACHE_SERIALIZER,
+            defaulting to "json"
+
+        Raises:
+            ConfigException: If the serializer is not supported
+        """
+        load_dotenv()
+
+        serializer = (os.getenv("WEATHER_CACHE_SERIALIZER") or "json").strip().lower()
+        if serializer not in ConfigUtil.CACHE_SERIALIZERS:
+            raise ConfigException(
+                "WEATHER_CACHE_SERIALIZER must be one of: "
+                f"{', '.join(ConfigUtil.CACHE_SERIALIZERS)}"
+            )
+        return serializer
+
+    @staticmethod
+    def get_max_concurrency() -> Optional[int]:
+        """Get the most concurrent requests the adaptive limiter may allow per provider.
+
+        Returns:
+            The limit from WEATHER_MAX_CONCURRENCY, or None if requests are not limited
+
+        Raises:
+            ConfigException: If the value is not a positive integer
+        """
+        load_dotenv()
+
+        value = os.getenv("WEATHER_MAX_CONCURRENCY")
+        if not value or not value.strip():
+            return None
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ConfigException(f"WEATHER_MAX_CONCURRENCY must be an integer, got: {value}")
+        if limit <= 0:
+            raise ConfigException("WEATHER_MAX_CONCURRENCY must be positive.")
+        return limit
+
+    @staticmethod
+    def get_scheduler_concurrency() -> Optional[int]:
+        """Get how many requests the priority scheduler sends at once.
+
+        Returns:
+            The limit from WEATHER_SCHEDULER_CONCURRENCY, or None if requests are not
+            scheduled
+
+        Raises:
+            ConfigException: If the value is not a positive integer
+        """
+        load_dotenv()
+
+        value = os.getenv("WEATHER_SCHEDULER_CONCURRENCY")
+        if not value or not value.strip():
+            return None
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ConfigException(f"WEATHER_SCHEDULER_CONCURRENCY must be an integer, got: {value}")
+        if limit <= 0:
+            raise ConfigException("WEATHER_SCHEDULER_CONCURRENCY must be positive.")
+        return limit
+
+    @staticmethod
+    def get_trace_file() -> Optional[str]:
+        """Get the JSON Lines file request spans are written to.
+
+        Returns:
+            The path from WEATHER_TRACE_FILE, or None if spans are not written locally
+        """
+        load_dotenv()
+
+        path = os.getenv("WEATHER_TRACE_FILE")
+        if path and path.strip():
+            return os.path.expanduser(path.strip())
+        return None
+
+    @staticmethod
+    def get_trace_otlp_url() -> Optional[str]:
+        """Get the OTLP/HTTP collector endpoint request spans are sent to.
+
+        Returns:
+            The traces URL from WEATHER_TRACE_OTLP_URL, or None if spans are not sent
+
+        Raises:
+            ConfigException: If the value is not an http or https URL
+        """
+        load_dotenv()
+
+        url = os.getenv("WEATHER_TRACE_OTLP_URL")
+        if not url or not url.strip():
+            return None
+        url = url.strip()
+        if not url.startswith(("http://", "https://")):
+            raise ConfigException(f"WEATHER_TRACE_OTLP_URL must be an http(s) URL, got: {url}")
+        return url
+
+    @staticmethod
+    def get_prewarm() -> bool:
+        """Get whether connections to the API are opened before the first request.
+
+        Returns:
+            True if WEATHER_PREWARM is "1", "true", "yes" or "on"
+
+        Raises:
+            ConfigException: If the value is not a recognized boolean
+        """
+        load_dotenv()
+
+        value = (os.getenv("WEATHER_PREWARM") or "").strip().lower()
+        if value in ("", "0", "false", "no", "off"):
+            return False
+        if value in ("1", "true", "yes", "on"):
+            return True
+        raise ConfigException(f"WEATHER_PREWARM must be true or false, got: {value}")
+
+    @staticmethod
+    def get_dns_cache_ttl() -> float:
+        """Get how long resolved API host addresses are reused by pooled connections.
+
+        Returns:
+            The TTL in seconds from WEATHER_DNS_CACHE_TTL (default 300); 0 disables
+            the cache
+
+        Raises:
+            ConfigException: If the value is not a non-negative number
+        """
+        load_dotenv()
+
+        value = os.getenv("WEATHER_DNS_CACHE_TTL")
+        if not value or not value.strip():
+            return 300.0
+        try:
+            ttl = float(value)
+        except ValueError:
+            raise ConfigException(f"WEATHER_DNS_CACHE_TTL must be a number, got: {value}")
+        if ttl < 0:
+            raise ConfigException("WEATHER_DNS_CACHE_TTL must not be negative.")
+        return ttl
+
+    @staticmethod
+    def get_keepalive_interval() -> Optional[float]:
+        """Get the idle time after which pooled API connections are kept alive.
+
+        Returns:
+            The interval in seconds from WEATHER_KEEPALIVE_INTERVAL, or None if idle
+            connections are left to expire
+
+        Raises:
+            ConfigException: If the value is not a positive number
+        """
+        load_dotenv()
+
+        value = os.getenv("WEATHER_KEEPALIVE_INTERVAL")
+        if not value or not value.strip():
+            return None
+        try:
+            interval = float(value)
+        except ValueError:
+            raise ConfigException(f"WEATHER_KEEPALIVE_INTERVAL must be a number, got: {value}")
+        if interval <= 0:
+            raise ConfigException("WEATHER_KEEPALIVE_INTERVAL must be positive.")
+        return interval
+
+    @staticmethod
+    def get_http_transport() -> str:
+        """Get the HTTP backend requests to the API are sent with.
+
+        Returns:
+            "requests", "stdlib" or "http2" from WEATHER_HTTP_TRANSPORT, defaulting
+            to "requests"
+
+        Raises:
+            ConfigException: If the backend is not supported
+        """
+        load_dotenv()
+
+        transport = (os.getenv("WEATHER_HTTP_TRANSPORT") or "requests").strip().lower()
+        if transport not in ConfigUtil.HTTP_TRANSPORTS:
+            raise ConfigException(
+                f"WEATHER_HTTP_TRANSPORT must be one of: {', '.join(ConfigUtil.HTTP_TRANSPORTS)}"
+            )
+        return transport
@@ -0,0 +1,317 @@
+"""Warm, long-lived connections to the API host.
+
+The plain requests transport opens a new connection for every request, so each
+one pays for DNS resolution, the TCP handshake and, for HTTPS, a TLS handshake.
+PooledTransport keeps connections open in a requests session instead, and adds
+three things so that the first request of a run is as fast as the later ones:
+
+- DnsCache resolves each host once per TTL instead of once per connection.
+- prewarm() resolves the API host and opens a connection in the background,
+  while the command is still parsing its input or reading the cache.
+- An optional keep-alive thread sends a cheap HEAD request whenever the pool has
+  been idle for a while, so servers and middleboxes do not drop the connection
+  between the polls of a long-running command. Sockets also have TCP keep-alive
+  enabled.
+"""
+
+import logging
+import socket
+import threading
+import time
+import urllib.parse
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util.connection import create_connection
+
+from .transport import RequestsTransport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DNS_TTL_SECONDS = 300.0
+KEEPALIVE_IDLE_SECONDS = 30
+
+Resolver = Callable[..., Sequence[Tuple[Any, ...]]]
+
+
+class DnsCache:
+    """Thread-safe cache of resolved host addresses with a fixed TTL.
+
+    getaddrinfo does not report the TTL of DNS records, so every answer is kept
+    for the configured time.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_DNS_TTL_SECONDS,
+        resolver: Resolver = socket.getaddrinfo,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a resolved address list is used; 0 disables caching
+            resolver: Function with the signature of socket.getaddrinfo
+            clock: Function returning a monotonic time in seconds
+
+        Raises:
+            ValueError: If ttl_seconds is negative
+        """
+        if ttl_seconds < 0:
+            raise ValueError("ttl_seconds must not be negative")
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._resolver = resolver
+        self._clock = clock
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached hosts, including expired ones."""
+        with self._lock:
+            return len(self._entries)
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """Return the addresses of a host, resolving it if the cached answer expired.
+
+        Args:
+            host: The host name or address literal
+            port: The port to connect to
+
+        Returns:
+            The distinct addresses in the order the resolver returned them
+
+        Raises:
+            socket.gaierror: If the host cannot be resolved
+        """
+        key = (host, port)
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        infos = self._resolver(host, port, 0, socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(str(info[4][0]) for info in infos))
+        if self.ttl_seconds > 0:
+            with self._lock:
+                self._entries[key] = (now + self.ttl_seconds, addresses)
+        return addresses
+
+    def clear(self) -> None:
+        """Forget every cached answer."""
+        with self._lock:
+            self._entries.clear()
+
+
+class _CachedDnsConnection(HTTPConnection):
+    """HTTP connection resolving its host through a DnsCache."""
+
+    dns_cache: DnsCache
+
+    def _new_conn(self) -> socket.socket:
+        """Connect to the first reachable cached address of the host."""
+        try:
+            addresses = self.dns_cache.resolve(self._dns_host, self.port)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+
+        error: Optional[OSError] = None
+        for address in addresses:
+            try:
+                return create_connection(
+                    (address, self.port),
+                    self.timeout,
+                    source_address=self.source_address,
+                    socket_options=self.socket_options,
+                )
+            except socket.timeout as e:
+                raise ConnectTimeoutError(
+                    self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+                ) from e
+            except OSError as e:
+                error = e
+        raise NewConnectionError(self, f"Failed to establish a new connection: {error}")
+
+
+class _CachedDnsHTTPSConnection(_CachedDnsConnection, HTTPSConnection):
+    """HTTPS connection resolving its host through a DnsCache; TLS still uses the name."""
+
+
+class _WarmAdapter(HTTPAdapter):
+    """Adapter whose pools resolve through a DnsCache and enable TCP keep-alive."""
+
+    def __init__(self, dns_cache: DnsCache, pool_size: int) -> None:
+        """Initialize the adapter.
+
+        Args:
+            dns_cache: The cache the connections resolve host names through
+            pool_size: Connections kept open per host
+        """
+        self.dns_cache = dns_cache
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        """Create the pool manager with DNS caching connection classes."""
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + keepalive_options()
+        super().init_poolmanager(*args, **kwargs)
+        attributes = {"dns_cache": self.dns_cache}
+        http: Type[HTTPConnection] = type(
+            "CachedDnsConnection", (_CachedDnsConnection,), attributes
+        )
+        https: Type[HTTPConnection] = type(
+            "CachedDnsHTTPSConnection", (_CachedDnsHTTPSConnection,), attributes
+        )
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": type("CachedDnsPool", (HTTPConnectionPool,), {"ConnectionCls": http}),
+            "https": type("CachedDnsHTTPSPool", (HTTPSConnectionPool,), {"ConnectionCls": https}),
+        }
+
+
+def keepalive_options() -> List[Tuple[int, int, int]]:
+    """Return socket options enabling TCP keep-alive probes on idle connections.
+
+    Returns:
+        Options for urllib3; the probe timing is set where the platform supports it
+    """
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    for name, value in (("TCP_KEEPIDLE", KEEPALIVE_IDLE_SECONDS), ("TCP_KEEPINTVL", 10)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
+
+
+def origin(url: str) -> str:
+    """Return the scheme, host and port of a URL as a URL of its root.
+
+    Args:
+        url: Any URL
+
+    Returns:
+        The root URL of the same server, such as "https://api.example.com/"
+    """
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+class PooledTransport(RequestsTransport):
+    """Transport reusing warm connections, with cached DNS and optional keep-alive."""
+
+    def __init__(
+        self,
+        dns_ttl_seconds: float = DEFAULT_DNS_TTL_SECONDS,
+        keepalive_interval: Optional[float] = None,
+        pool_size: int = 10,
+        resolver: Resolver = socket.getaddrinfo,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the transport.
+
+        Args:
+            dns_ttl_seconds: How long resolved addresses are used; 0 disables caching
+            keepalive_interval: Optional idle time in seconds after which a HEAD
+                request is sent to keep pooled connections open
+            pool_size: Connections kept open per host
+            resolver: Function with the signature of socket.getaddrinfo
+            clock: Function returning a monotonic time in seconds
+
+        Raises:
+            ValueError: If a setting is out of range
+        """
+        if keepalive_interval is not None and keepalive_interval <= 0:
+            raise ValueError("keepalive_interval must be positive")
+        if pool_size <= 0:
+            raise ValueError("pool_size must be positive")
+        self.dns_cache = DnsCache(dns_ttl_seconds, resolver=resolver, clock=clock)
+        self.keepalive_interval = keepalive_interval
+        self.session = requests.Session()
+        adapter = _WarmAdapter(self.dns_cache, pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._clock = clock
+        self._last_used = clock()
+        self._origins: List[str] = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._keepalive_thread: Optional[threading.Thread] = None
+        if keepalive_interval is not None:
+            self._keepalive_thread = threading.Thread(
+                target=self._keepalive_loop,
+                args=(keepalive_interval,),
+                name="weather-keepalive",
+                daemon=True,
+            )
+            self._keepalive_thread.start()
+
+    def prewarm(self, url: str, timeout: float = 10.0) -> threading.Thread:
+        """Resolve a server's host and open a pooled connection to it in the background.
+
+        Failures are logged and otherwise ignored; the first real request then
+        simply connects as usual.
+
+        Args:
+            url: Any URL of the server, such as the API base URL
+            timeout: Timeout in seconds of the warm-up request
+
+        Returns:
+            The started background thread
+        """
+        root = origin(url)
+        with self._lock:
+            if root not in self._origins:
+                self._origins.append(root)
+        thread = threading.Thread(
+            target=self._ping, args=(root, timeout), name="weather-prewarm", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        """Stop the keep-alive thread and close the pooled connections."""
+        self._stop.set()
+        if self._keepalive_thread is not None:
+            self._keepalive_thread.join()
+        self.session.close()
+
+    def _get(
+        self, url: str, timeout: float, headers: Optional[Dict[str, str]]
+    ) -> requests.Response:
+        """Send the request over a pooled connection."""
+        self._last_used = self._clock()
+        with self._lock:
+            if not self._origins:
+                self._origins.append(origin(url))
+        return self.session.get(url, timeout=timeout, headers=headers)
+
+    def _ping(self, url: str, timeout: float) -> None:
+        """Send a HEAD request, opening or refreshing a pooled connection."""
+        started = time.perf_counter()
+        try:
+            self.session.head(url, timeout=timeout)
+            logger.debug(
+                "Connection to %s ready after %.1f ms", url, (time.perf_counter() - started) * 1000
+            )
+        except requests.exceptions.RequestException as e:
+            logger.debug("Cannot warm up connection to %s: %s", url, e)
+
+    def _keepalive_loop(self, interval: float) -> None:
+        """Ping known servers whenever the pool has been idle for the keep-alive interval.
+
+        Args:
+            interval: The keep-alive interval in seconds
+        """
+        while not self._stop.wait(interval):
+            if self._clock() - self._last_used < interval:
+                continue
+            with self._lock:
+                origins = list(self._origins)
+            for root in origins:
+                self._ping(root, interval)
+            self._last_used = self._clock()
@@ -0,0 +1,115 @@
+"""Thread pool whose workers never delay interpreter exit.
+
+ThreadPoolExecutor joins its worker threads when the interpreter exits, so a
+lookup abandoned at a deadline, or a hedged request that lost the race, still
+holds the process open until it finishes or times out. DaemonThreadPool runs
+work on daemon threads instead: once the caller has its answer, the process can
+exit while abandoned requests are still in flight.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_WorkItem = Tuple["Future[Any]", Callable[..., Any], Tuple[Any, ...]]
+
+
+class DaemonThreadPool:
+    """Minimal executor with the submit and shutdown methods of ThreadPoolExecutor.
+
+    Worker threads are started as work is submitted, up to max_workers.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str = "weather-daemon") -> None:
+        """Initialize the pool.
+
+        Args:
+            max_workers: Maximum number of worker threads
+            thread_name_prefix: Prefix of the worker thread names
+
+        Raises:
+            ValueError: If max_workers is not positive
+        """
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._queue: "queue.SimpleQueue[Optional[_WorkItem]]" = queue.SimpleQueue()
+        self._threads: List[threading.Thread] = []
+        self._idle = 0
+        self._shutdown = False
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> "Future[T]":
+        """Schedule a call on a worker thread.
+
+        Args:
+            fn: The function to call
+            *args: Its positional arguments
+
+        Returns:
+            A future of the call's result
+
+        Raises:
+            RuntimeError: If the pool was shut down
+        """
+        future: "Future[T]" = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new work after shutdown")
+            self._queue.put((future, fn, args))
+            if self._idle == 0 and len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._work,
+                    name=f"{self.thread_name_prefix}-{len(self._threads)}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+            else:
+                self._idle = max(0, self._idle - 1)
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        """Stop accepting work and let the workers exit once the queue is empty.
+
+        Args:
+            wait: Whether to wait for the workers to finish
+            cancel_futures: Whether to cancel work that has not started
+        """
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+        if cancel_futures:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[0].cancel()
+        for _ in threads:
+            self._queue.put(None)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _work(self) -> None:
+        """Run queued calls until shut down."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, fn, args = item
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            with self._lock:
+                self._idle += 1
@@ -27,3 +27,27 @@ class ConfigException(Exception):
             message: The error message
         """
         super().__init__(message)
+
+
+class InvalidCityNameException(WeatherApiException):
+    """Exception for city names rejected before any request is made."""
+
+    def __init__(self, message: str) -> None:
+        """Initialize the InvalidCityNameException.
+
+        Args:
+            message: The error message
+        """
+        super().__init__(message, 400)
+
+
+class CacheBackendException(Exception):
+    """Exception for cache storage that cannot be read or written."""
+
+    def __init__(self, message: str) -> None:
+        """Initialize the CacheBackendException.
+
+        Args:
+            message: The error message
+        """
+        super().__init__(message)
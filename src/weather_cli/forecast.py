@@ -0,0 +1,427 @@
+"""Forecast time series model for the weather CLI application."""
+
+import operator
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .units import Units
+
+SECONDS_PER_DAY = 86400
+MAX_DESCRIPTIONS = 2**16
+
+
+def encode_descriptions(descriptions: Iterable[str]) -> Tuple["array[int]", Tuple[str, ...]]:
+    """Dictionary-encode per-slot descriptions.
+
+    Args:
+        descriptions: The description of each slot
+
+    Returns:
+        The code of each slot, and the distinct descriptions the codes index
+
+    Raises:
+        ValueError: If there are more distinct descriptions than codes
+    """
+    index: Dict[str, int] = {}
+    codes: "array[int]" = array("H")
+    for description in descriptions:
+        code = index.get(description)
+        if code is None:
+            if len(index) >= MAX_DESCRIPTIONS:
+                raise ValueError(f"A forecast holds at most {MAX_DESCRIPTIONS} descriptions")
+            code = index[description] = len(index)
+        codes.append(code)
+    return codes, tuple(index)
+
+
+@dataclass(frozen=True)
+class DailySummary:
+    """Per-day temperature aggregates of a forecast series, stored as columns.
+
+    Attributes:
+        days: Start of each day (unix, UTC, shifted by the series timezone)
+        minimum: Minimum temperature in Celsius for each day
+        maximum: Maximum temperature in Celsius for each day
+        mean: Mean temperature in Celsius for each day
+    """
+
+    days: "array[int]"
+    minimum: "array[float]"
+    maximum: "array[float]"
+    mean: "array[float]"
+
+    def __len__(self) -> int:
+        """Return the number of days summarized."""
+        return len(self.days)
+
+
+@dataclass(frozen=True)
+class ForecastPoint:
+    """Forecast values at a point in time, interpolated between slots.
+
+    Attributes:
+        timestamp: The time of the point (unix, UTC)
+        temperature_celsius: Temperature in Celsius, linearly interpolated
+        description: Conditions of the nearest slot, if the series has them
+        slot_distance_seconds: Distance to the nearest forecast slot
+    """
+
+    timestamp: int
+    temperature_celsius: float
+    description: Optional[str]
+    slot_distance_seconds: int
+
+
+class ForecastSeries:
+    """Forecast for one city, stored as compact columnar arrays.
+
+    Each column holds one value per forecast slot, ordered by time. No per-slot
+    Python objects are created; aggregations run over whole columns using
+    builtins implemented in C. Descriptions are dictionary-encoded as small
+    integer codes into a table of the distinct descriptions.
+
+    Attributes:
+        city: The name of the city
+        timezone_offset: Shift in seconds from UTC for the city
+        timestamps: Slot times (unix, UTC)
+        temperatures: Slot temperatures in Celsius
+        humidity: Slot relative humidity in percent
+        wind_speeds: Slot wind speeds in meters per second
+        description_codes: Index into description_table of each slot, or None if
+            descriptions are not known
+        description_table: The distinct descriptions, indexed by description_codes
+    """
+
+    __slots__ = (
+        "city",
+        "timezone_offset",
+        "timestamps",
+        "temperatures",
+        "humidity",
+        "wind_speeds",
+        "description_codes",
+        "description_table",
+    )
+
+    def __init__(
+        self,
+        city: str,
+        timestamps: "array[int]",
+        temperatures: "array[float]",
+        humidity: "array[int]",
+        wind_speeds: "array[float]",
+        timezone_offset: int = 0,
+        descriptions: Optional[Sequence[str]] = None,
+        description_codes: Optional["array[int]"] = None,
+        description_table: Sequence[str] = (),
+    ) -> None:
+        """Initialize the forecast series.
+
+        Args:
+            city: The name of the city
+            timestamps: Slot times (unix, UTC) in ascending order
+            temperatures: Slot temperatures in Celsius
+            humidity: Slot relative humidity in percent
+            wind_speeds: Slot wind speeds in meters per second
+            timezone_offset: Shift in seconds from UTC for the city
+            descriptions: Optional slot weather descriptions, encoded on the way in
+            description_codes: Optional already encoded slot descriptions, instead
+                of descriptions
+            description_table: The distinct descriptions description_codes index
+
+        Raises:
+            TypeError: If city is not a string
+            ValueError: If the city is empty, the columns differ in length or a
+                description code is out of range
+        """
+        if not isinstance(city, str):
+            raise TypeError("city must be a string")
+        if not city.strip():
+            raise ValueError("city cannot be empty")
+        size = len(timestamps)
+        if not len(temperatures) == len(humidity) == len(wind_speeds) == size:
+            raise ValueError("forecast columns must have the same length")
+        if descriptions is not None:
+            if description_codes is not None:
+                raise ValueError("give either descriptions or description_codes")
+            description_codes, description_table = encode_descriptions(descriptions)
+        if description_codes is not None:
+            if len(description_codes) != size:
+                raise ValueError("forecast columns must have the same length")
+            if description_codes and max(description_codes) >= len(description_table):
+                raise ValueError("description code out of range")
+
+        self.city = city
+        self.timezone_offset = timezone_offset
+        self.timestamps = timestamps
+        self.temperatures = temperatures
+        self.humidity = humidity
+        self.wind_speeds = wind_speeds
+        self.description_codes = description_codes
+        self.description_table = tuple(description_table)
+
+    @classmethod
+    def from_response(cls, response_data: Dict[str, Any]) -> "ForecastSeries":
+        """Build a series from a ``/forecast`` API response.
+
+        Args:
+            response_data: The decoded JSON response
+
+        Returns:
+            The forecast series, sorted by slot time
+
+        Raises:
+            KeyError: If a required field is missing
+            ValueError: If a field has an invalid value
+            TypeError: If a field has an invalid type
+        """
+        slots: List[Dict[str, Any]] = sorted(response_data["list"], key=operator.itemgetter("dt"))
+        city_data = response_data["city"]
+        codes, table = encode_descriptions(
+            str((slot.get("weather") or [{}])[0].get("description") or "") for slot in slots
+        )
+        return cls(
+            city=city_data["name"],
+            timestamps=array("q", [int(slot["dt"]) for slot in slots]),
+            temperatures=array("d", [float(slot["main"]["temp"]) for slot in slots]),
+            humidity=array("B", [int(slot["main"].get("humidity", 0)) for slot in slots]),
+            wind_speeds=array(
+                "d", [float(slot.get("wind", {}).get("speed", 0.0)) for slot in slots]
+            ),
+            timezone_offset=int(city_data.get("timezone", 0)),
+            description_codes=codes,
+            description_table=table,
+        )
+
+    @classmethod
+    def from_dict(cls, document: Dict[str, Any]) -> "ForecastSeries":
+        """Rebuild a series from the output of to_dict.
+
+        Args:
+            document: The dictionary produced by to_dict
+
+        Returns:
+            The forecast series
+
+        Raises:
+            KeyError: If a required field is missing
+            ValueError: If a field has an invalid value
+            TypeError: If a field has an invalid type
+        """
+        return cls(
+            city=document["city"],
+            timestamps=array("q", document["timestamps"]),
+            temperatures=array("d", document["temperatures"]),
+            humidity=array("B", document["humidity"]),
+            wind_speeds=array("d", document["wind_speeds"]),
+            timezone_offset=int(document.get("timezone_offset", 0)),
+            description_codes=(
+                array("H", document["description_codes"])
+                if document.get("description_codes") is not None
+                else None
+            ),
+            description_table=document.get("description_table", ()),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export the series as one list per column, ready for JSON encoding.
+
+        Returns:
+            A dictionary from_dict turns back into an equal series
+        """
+        return {
+            "city": self.city,
+            "timezone_offset": self.timezone_offset,
+            "timestamps": self.timestamps.tolist(),
+            "temperatures": self.temperatures.tolist(),
+            "humidity": self.humidity.tolist(),
+            "wind_speeds": self.wind_speeds.tolist(),
+            "description_codes": (
+                self.description_codes.tolist() if self.description_codes is not None else None
+            ),
+            "description_table": list(self.description_table),
+        }
+
+    def __len__(self) -> int:
+        """Return the number of forecast slots."""
+        return len(self.timestamps)
+
+    def __repr__(self) -> str:
+        """Return a short representation without dumping the columns."""
+        return f"ForecastSeries(city={self.city!r}, slots={len(self)})"
+
+    def format(self, units: Units = Units.METRIC) -> str:
+        """Return the daily temperature range of the forecast in the given unit system.
+
+        Args:
+            units: The unit system to display temperatures in
+
+        Returns:
+            A user-friendly string with one line per local calendar day
+        """
+        summary = self.daily_summary()
+        lines = [f"Forecast for {self.city}:"]
+        for day, low, high, mean in zip(
+            summary.days, summary.minimum, summary.maximum, summary.mean
+        ):
+            date = datetime.fromtimestamp(day + self.timezone_offset, timezone.utc).date()
+            lines.append(
+                f"{date.isoformat()}: {units.format_temperature(low)} to "
+                f"{units.format_temperature(high)}, mean {units.format_temperature(mean)}"
+            )
+        if len(lines) == 1:
+            lines.append("No forecast slots available")
+        return "\n".join(lines)
+
+    def window(self, start: int, end: int) -> "ForecastSeries":
+        """Return the slots with ``start <= timestamp < end``.
+
+        Args:
+            start: Window start (unix, UTC), inclusive
+            end: Window end (unix, UTC), exclusive
+
+        Returns:
+            A new series whose columns share no storage with this one
+        """
+        lo = bisect_left(self.timestamps, start)
+        hi = bisect_left(self.timestamps, end)
+        return ForecastSeries(
+            city=self.city,
+            timestamps=self.timestamps[lo:hi],
+            temperatures=self.temperatures[lo:hi],
+            humidity=self.humidity[lo:hi],
+            wind_speeds=self.wind_speeds[lo:hi],
+            timezone_offset=self.timezone_offset,
+            description_codes=(
+                self.description_codes[lo:hi] if self.description_codes is not None else None
+            ),
+            description_table=self.description_table,
+        )
+
+    @property
+    def step_seconds(self) -> Optional[int]:
+        """Spacing of the first two slots in seconds, or None with fewer than two slots."""
+        if len(self.timestamps) < 2:
+            return None
+        return self.timestamps[1] - self.timestamps[0]
+
+    def interpolate(self, at: int, max_extrapolation: int = 0) -> Optional[ForecastPoint]:
+        """Estimate the forecast values at a time.
+
+        Between two slots the temperature is interpolated linearly. Before the
+        first or after the last slot, that slot's values are held for up to
+        max_extrapolation seconds.
+
+        Args:
+            at: The time (unix, UTC)
+            max_extrapolation: How far outside the series a slot's values are held
+
+        Returns:
+            The estimated values, or None if the time is not covered
+        """
+        if not self.timestamps:
+            return None
+        index = bisect_left(self.timestamps, at)
+        if index == len(self.timestamps) or (index == 0 and self.timestamps[0] != at):
+            edge = 0 if index == 0 else index - 1
+            distance = abs(at - self.timestamps[edge])
+            if distance > max_extrapolation:
+                return None
+            return ForecastPoint(at, self.temperatures[edge], self.description(edge), distance)
+        if self.timestamps[index] == at:
+            return ForecastPoint(at, self.temperatures[index], self.description(index), 0)
+
+        before, after = self.timestamps[index - 1], self.timestamps[index]
+        weight = (at - before) / (after - before)
+        temperature = self.temperatures[index - 1] + weight * (
+            self.temperatures[index] - self.temperatures[index - 1]
+        )
+        nearest = index - 1 if at - before <= after - at else index
+        distance = min(at - before, after - at)
+        return ForecastPoint(at, temperature, self.description(nearest), distance)
+
+    def daily_summary(self) -> DailySummary:
+        """Aggregate temperatures per local calendar day.
+
+        Returns:
+            Daily minimum, maximum and mean temperatures as columns
+        """
+        days: "array[int]" = array("q")
+        minimum: "array[float]" = array("d")
+        maximum: "array[float]" = array("d")
+        mean: "array[float]" = array("d")
+        if not self.timestamps:
+            return DailySummary(days, minimum, maximum, mean)
+
+        offset = self.timezone_offset
+        first_day = (self.timestamps[0] + offset) // SECONDS_PER_DAY
+        last_day = (self.timestamps[-1] + offset) // SECONDS_PER_DAY
+        for day in range(first_day, last_day + 1):
+            day_start = day * SECONDS_PER_DAY - offset
+            lo = bisect_left(self.timestamps, day_start)
+            hi = bisect_left(self.timestamps, day_start + SECONDS_PER_DAY)
+            if lo == hi:
+                continue
+            temps = self.temperatures[lo:hi]
+            days.append(day_start)
+            minimum.append(min(temps))
+            maximum.append(max(temps))
+            mean.append(sum(temps) / len(temps))
+        return DailySummary(days, minimum, maximum, mean)
+
+    def threshold_crossings(self, threshold: float) -> "array[int]":
+        """Find the slots where the temperature crosses a threshold.
+
+        A crossing is reported at the first slot on the new side of the threshold,
+        in either direction.
+
+        Args:
+            threshold: The temperature threshold in Celsius
+
+        Returns:
+            The timestamps of the crossing slots
+        """
+        above = bytes(map(float(threshold).__lt__, self.temperatures))
+        changed = bytes(map(operator.ne, above, above[1:]))
+        crossings: "array[int]" = array("q")
+        index = changed.find(1)
+        while index != -1:
+            crossings.append(self.timestamps[index + 1])
+            index = changed.find(1, index + 1)
+        return crossings
+
+    def hours_above(self, threshold: float) -> float:
+        """Sum the forecast hours whose slot temperature is above a threshold.
+
+        Each slot counts for the interval until the next slot; the last slot counts
+        for the same length as the one before it.
+
+        Args:
+            threshold: The temperature threshold in Celsius
+
+        Returns:
+            The number of hours above the threshold
+        """
+        if len(self.timestamps) < 2:
+            return 0.0
+        steps = array("q", map(operator.sub, self.timestamps[1:], self.timestamps))
+        steps.append(steps[-1])
+        above = map(float(threshold).__lt__, self.temperatures)
+        seconds: int = sum(map(operator.mul, steps, above))
+        return seconds / 3600.0
+
+    def description(self, index: int) -> Optional[str]:
+        """Return the description of a slot.
+
+        Args:
+            index: The slot index
+
+        Returns:
+            The description, or None if unknown
+        """
+        if self.description_codes is None:
+            return None
+        return self.description_table[self.description_codes[index]] or None
@@ -0,0 +1,249 @@
+"""Current conditions estimated from cached forecasts.
+
+When a city's current weather is not cached and the upstream is rate limited or
+unavailable, a lookup would otherwise fail. ForecastFallback keeps the recently
+fetched forecast of each city and answers such lookups with the forecast
+interpolated to the current time, returned as DerivedWeatherData carrying its
+confidence and the age of the forecast.
+
+After a rate limit answer, lookups are estimated from the forecast without
+calling the API at all for a short while, so the remaining quota is spent on
+cities that have no forecast.
+
+Forecasts are kept in a cache backend: in the process by default, or in a disk
+or Redis backend shared with later runs, so a forecast fetched by one command
+can stand in for current conditions in the next.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from .cache_backends import CacheBackend, CacheEntry, MemoryBackend
+from .exceptions import CacheBackendException, WeatherApiException
+from .forecast import ForecastSeries
+from .weather_data import DerivedWeatherData
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED_STATUS_CODE = 429
+# Used when a series has a single slot and its spacing is unknown
+DEFAULT_STEP_SECONDS = 3 * 3600
+DEFAULT_DESCRIPTION = "estimated from forecast"
+# Keyspace of a shared cache backend that forecasts are kept in
+FORECAST_BACKEND_NAMESPACE = "forecasts"
+
+
+@dataclass
+class ForecastFallbackStats:
+    """Counters describing how often forecasts stood in for current conditions.
+
+    Attributes:
+        stores: Forecasts kept for later estimates
+        estimates: Lookups answered with an estimate
+        misses: Estimates wanted but not possible, for lack of a recent forecast
+            covering the current time with enough confidence
+        requests_saved: Estimates served while rate limited, without an API call
+    """
+
+    stores: int = 0
+    estimates: int = 0
+    misses: int = 0
+    requests_saved: int = 0
+
+
+class ForecastFallback:
+    """Thread-safe store of recent forecasts keyed by canonical city key.
+
+    The confidence of an estimate falls linearly from 1 to 0 over max_age_seconds
+    as the forecast ages, and by up to half again as the current time moves away
+    from the nearest forecast slot, reaching half at one slot spacing away.
+    """
+
+    DEFAULT_MAX_AGE_SECONDS = 3 * 3600.0
+    DEFAULT_MIN_CONFIDENCE = 0.5
+    DEFAULT_RATE_LIMIT_SECONDS = 60.0
+    DEFAULT_MAX_ENTRIES = 1024
+
+    def __init__(
+        self,
+        max_age_seconds: float = DEFAULT_MAX_AGE_SECONDS,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+        rate_limit_seconds: float = DEFAULT_RATE_LIMIT_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.time,
+        backend: Optional[CacheBackend] = None,
+    ) -> None:
+        """Initialize the fallback.
+
+        Args:
+            max_age_seconds: How long a fetched forecast is used for estimates
+            min_confidence: Lowest confidence an estimate is served with
+            rate_limit_seconds: How long after a rate limit answer lookups are
+                estimated without calling the API; 0 always calls it first
+            max_entries: Maximum number of forecasts kept before evicting the least
+                recently used, when no backend is given
+            clock: Function returning the current time in unix seconds
+            backend: Optional storage for the forecasts; a bounded in-memory
+                backend if not given
+
+        Raises:
+            ValueError: If a setting is out of range
+        """
+        if max_age_seconds <= 0:
+            raise ValueError("max_age_seconds must be positive")
+        if not 0 <= min_confidence <= 1:
+            raise ValueError("min_confidence must be between 0 and 1")
+        if rate_limit_seconds < 0:
+            raise ValueError("rate_limit_seconds must not be negative")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self.max_age_seconds = max_age_seconds
+        self.min_confidence = min_confidence
+        self.rate_limit_seconds = rate_limit_seconds
+        self.max_entries = max_entries
+        self.backend = backend if backend is not None else MemoryBackend(max_entries)
+        self.stats = ForecastFallbackStats()
+        self._clock = clock
+        self._rate_limited_until = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of forecasts currently held, including expired ones."""
+        try:
+            return len(self.backend)
+        except CacheBackendException as e:
+            logger.warning("Forecast backend unavailable: %s", e)
+            return 0
+
+    @property
+    def rate_limited(self) -> bool:
+        """Whether a rate limit answer was received within the last rate_limit_seconds."""
+        return self._clock() < self._rate_limited_until
+
+    @staticmethod
+    def can_stand_in_for(error: WeatherApiException) -> bool:
+        """Check whether an error means current conditions are temporarily unavailable.
+
+        Args:
+            error: The error raised by a lookup
+
+        Returns:
+            True for rate limiting, server errors and failures without a response;
+            False for errors about the request itself, such as an unknown city
+        """
+        status_code = error.status_code
+        return status_code is None or status_code == RATE_LIMITED_STATUS_CODE or status_code >= 500
+
+    def put(self, key: str, forecast: ForecastSeries) -> None:
+        """Keep a newly fetched forecast for later estimates.
+
+        Args:
+            key: The canonical city key
+            forecast: The forecast series
+        """
+        if not len(forecast):
+            return
+        now = self._clock()
+        entry = CacheEntry(data=forecast, stored_at=now, expires_at=now + self.max_age_seconds)
+        try:
+            self.backend.set(key, entry)
+        except CacheBackendException as e:
+            logger.warning("Forecast backend unavailable, not keeping %s: %s", key, e)
+            return
+        with self._lock:
+            self.stats.stores += 1
+
+    def record_error(self, error: WeatherApiException) -> None:
+        """Note a failed lookup; a rate limit answer starts estimating without API calls.
+
+        Args:
+            error: The error raised by the lookup
+        """
+        if error.status_code == RATE_LIMITED_STATUS_CODE and self.rate_limit_seconds > 0:
+            self._rate_limited_until = self._clock() + self.rate_limit_seconds
+            logger.info(
+                "Rate limited; estimating from forecasts for %.0f seconds", self.rate_limit_seconds
+            )
+
+    def estimate(self, key: str, saves_request: bool = False) -> Optional[DerivedWeatherData]:
+        """Estimate the current weather of a city from its recent forecast.
+
+        Args:
+            key: The canonical city key
+            saves_request: Whether the estimate replaces an API call, for the stats
+
+        Returns:
+            The estimate, or None if there is no recent forecast covering the
+            current time with at least min_confidence
+        """
+        now = self._clock()
+        entry = self._get(key, now)
+        estimate = self._derive(entry, now) if entry is not None else None
+        with self._lock:
+            if estimate is None:
+                self.stats.misses += 1
+                return None
+            self.stats.estimates += 1
+            if saves_request:
+                self.stats.requests_saved += 1
+        logger.debug("Estimated weather for %s from a forecast", key)
+        return estimate
+
+    def _get(self, key: str, now: float) -> Optional[Tuple[float, ForecastSeries]]:
+        """Get a forecast younger than max_age_seconds, dropping an older one.
+
+        Args:
+            key: The canonical city key
+            now: The current time in unix seconds
+
+        Returns:
+            When the forecast was fetched, and the forecast; or None
+        """
+        try:
+            entry = self.backend.get(key)
+            if entry is None or not isinstance(entry.data, ForecastSeries):
+                return None
+            if now - entry.stored_at >= self.max_age_seconds:
+                self.backend.delete(key)
+                return None
+        except CacheBackendException as e:
+            logger.warning("Forecast backend unavailable: %s", e)
+            return None
+        return entry.stored_at, entry.data
+
+    def _derive(
+        self, entry: Tuple[float, ForecastSeries], now: float
+    ) -> Optional[DerivedWeatherData]:
+        """Interpolate a forecast to the current time and score the result.
+
+        Args:
+            entry: When the forecast was fetched, and the forecast
+            now: The current time in unix seconds
+
+        Returns:
+            The estimate, or None if the forecast does not cover the current time
+            or the confidence is too low
+        """
+        fetched_at, forecast = entry
+        step = forecast.step_seconds or DEFAULT_STEP_SECONDS
+        point = forecast.interpolate(int(now), max_extrapolation=step)
+        if point is None:
+            return None
+
+        age = max(0.0, now - fetched_at)
+        freshness = 1.0 - age / self.max_age_seconds
+        closeness = 1.0 - 0.5 * min(1.0, point.slot_distance_seconds / step)
+        confidence = round(freshness * closeness, 3)
+        if confidence < self.min_confidence:
+            return None
+        return DerivedWeatherData(
+            city=forecast.city,
+            temperature_celsius=round(point.temperature_celsius, 2),
+            description=point.description or DEFAULT_DESCRIPTION,
+            confidence=confidence,
+            age_seconds=age,
+        )
@@ -0,0 +1,381 @@
+"""Append-only observation history for the weather CLI application.
+
+Observations are stored as fixed-width little-endian records in one file per
+shard. Each file starts with a short magic header followed by records of:
+
+    city_id (int32) | observed_at (int64) | temperature_celsius (float32) | condition_id (uint16)
+
+Queries memory-map the shard files and stream over the records, so the history
+is never loaded into memory as a whole.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .weather_data import WeatherData
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"WXHIST01"
+RECORD = struct.Struct("<iqfH")
+NO_CONDITION = 0
+
+
+def shard_file_name(city_id: int, shards: int) -> str:
+    """Return the name of the shard file holding a city's observations.
+
+    Args:
+        city_id: Upstream identifier of the city
+        shards: Number of shard files that cities are spread across
+
+    Returns:
+        The shard file name
+    """
+    return f"shard-{city_id % shards:03d}.wxh"
+
+
+@dataclass(frozen=True)
+class Observation:
+    """A single recorded observation.
+
+    Attributes:
+        city_id: Upstream identifier of the city
+        observed_at: Time of the observation (unix, UTC)
+        temperature_celsius: Temperature in Celsius (stored as float32)
+        condition_id: Upstream weather condition code, 0 if unknown
+    """
+
+    city_id: int
+    observed_at: int
+    temperature_celsius: float
+    condition_id: int
+
+
+@dataclass(frozen=True)
+class CityAggregate:
+    """Aggregate of a city's observations within a time range.
+
+    Attributes:
+        city_id: Upstream identifier of the city
+        count: Number of observations
+        minimum: Lowest temperature in Celsius
+        maximum: Highest temperature in Celsius
+        mean: Mean temperature in Celsius
+        first_observed_at: Earliest observation time (unix, UTC)
+        last_observed_at: Latest observation time (unix, UTC)
+    """
+
+    city_id: int
+    count: int
+    minimum: float
+    maximum: float
+    mean: float
+    first_observed_at: int
+    last_observed_at: int
+
+
+class ObservationRecorder:
+    """Appends observations to sharded fixed-width history files.
+
+    Each record is written with a single ``O_APPEND`` write, and new shard files
+    appear with their header already written, so several processes can safely
+    append to the same history directory.
+    """
+
+    DEFAULT_SHARDS = 16
+
+    def __init__(self, directory: Union[str, Path], shards: int = DEFAULT_SHARDS) -> None:
+        """Initialize the recorder.
+
+        Args:
+            directory: Directory holding the shard files; created if missing
+            shards: Number of shard files that cities are spread across
+
+        Raises:
+            ValueError: If shards is not positive
+        """
+        if shards <= 0:
+            raise ValueError("shards must be positive")
+
+        self.directory = Path(directory)
+        self.shards = shards
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._descriptors: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def shard_path(self, city_id: int) -> Path:
+        """Return the path of the shard file holding a city's observations.
+
+        Args:
+            city_id: Upstream identifier of the city
+
+        Returns:
+            The shard file path
+        """
+        return self.directory / shard_file_name(city_id, self.shards)
+
+    def record(self, weather_data: WeatherData) -> bool:
+        """Append an observation to the history.
+
+        Observations without a city ID or observation time cannot be indexed and
+        are skipped.
+
+        Args:
+            weather_data: The fetched weather data
+
+        Returns:
+            True if the observation was written, False if it was skipped
+
+        Raises:
+            OSError: If the shard file cannot be written
+            struct.error: If a value does not fit its record field, such as a
+                city ID beyond 32 bits
+        """
+        if weather_data.city_id is None or weather_data.observed_at is None:
+            logger.debug("Skipping history record for %s: no city ID or time", weather_data.city)
+            return False
+
+        record = RECORD.pack(
+            weather_data.city_id,
+            weather_data.observed_at,
+            weather_data.temperature_celsius,
+            weather_data.condition_id or NO_CONDITION,
+        )
+        shard = weather_data.city_id % self.shards
+        with self._lock:
+            descriptor = self._descriptors.get(shard)
+            if descriptor is None:
+                descriptor = self._open_shard(self.shard_path(weather_data.city_id))
+                self._descriptors[shard] = descriptor
+            os.write(descriptor, record)
+
+        logger.debug("Recorded observation for %s in shard %s", weather_data.city, shard)
+        return True
+
+    def close(self) -> None:
+        """Close all open shard files."""
+        with self._lock:
+            for descriptor in self._descriptors.values():
+                os.close(descriptor)
+            self._descriptors.clear()
+
+    def _open_shard(self, path: Path) -> int:
+        """Open a shard file for appending, creating it with its header if missing.
+
+        A trailing partial record, left by a write interrupted by a crash, is cut
+        off so the records appended after it stay aligned.
+
+        Args:
+            path: The shard file path
+
+        Returns:
+            The open file descriptor
+        """
+        if not path.exists():
+            self._create_shard(path)
+        descriptor = os.open(path, os.O_RDWR | os.O_APPEND)
+        try:
+            size = os.fstat(descriptor).st_size
+            if size < len(MAGIC):
+                # Left empty or cut short by an older version
+                os.ftruncate(descriptor, 0)
+                os.write(descriptor, MAGIC)
+            elif os.pread(descriptor, len(MAGIC), 0) == MAGIC:
+                partial = (size - len(MAGIC)) % RECORD.size
+                if partial:
+                    logger.warning("Dropping a partial history record at the end of %s", path)
+                    os.ftruncate(descriptor, size - partial)
+        except OSError:
+            os.close(descriptor)
+            raise
+        return descriptor
+
+    def _create_shard(self, path: Path) -> None:
+        """Create a shard file holding only the header, unless it already exists.
+
+        The header is written to a temporary file that is then linked into place,
+        so no process ever sees the shard without its header, and of several
+        processes creating the same shard only one succeeds.
+
+        Args:
+            path: The shard file path
+        """
+        descriptor, temporary = tempfile.mkstemp(
+            dir=self.directory, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        try:
+            try:
+                os.write(descriptor, MAGIC)
+                os.fchmod(descriptor, 0o644)
+            finally:
+                os.close(descriptor)
+            try:
+                os.link(temporary, path)
+            except FileExistsError:
+                pass
+        finally:
+            os.unlink(temporary)
+
+
+class ObservationLog:
+    """Read-only query interface over a history directory."""
+
+    def __init__(
+        self, directory: Union[str, Path], shards: int = ObservationRecorder.DEFAULT_SHARDS
+    ) -> None:
+        """Initialize the log reader.
+
+        Args:
+            directory: Directory holding the shard files
+            shards: Number of shards the history was written with
+        """
+        self.directory = Path(directory)
+        self.shards = shards
+
+    def observations(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        city_id: Optional[int] = None,
+    ) -> Iterator[Observation]:
+        """Stream observations within a time range, in file order.
+
+        Args:
+            start: Optional range start (unix, UTC), inclusive
+            end: Optional range end (unix, UTC), exclusive
+            city_id: Optional city to restrict the query to; only its shard is read
+
+        Yields:
+            Matching observations
+        """
+        for record in self._matching_records(start, end, city_id):
+            yield Observation(*record)
+
+    def aggregate(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        city_id: Optional[int] = None,
+    ) -> Dict[int, CityAggregate]:
+        """Compute per-city temperature aggregates within a time range.
+
+        Only one running total per city is held in memory.
+
+        Args:
+            start: Optional range start (unix, UTC), inclusive
+            end: Optional range end (unix, UTC), exclusive
+            city_id: Optional city to restrict the query to
+
+        Returns:
+            Aggregates keyed by city ID
+        """
+        # city_id -> [count, total, minimum, maximum, first, last]
+        totals: Dict[int, List[float]] = {}
+        for record_city, observed_at, temperature, _ in self._matching_records(start, end, city_id):
+            current = totals.get(record_city)
+            if current is None:
+                totals[record_city] = [
+                    1,
+                    temperature,
+                    temperature,
+                    temperature,
+                    observed_at,
+                    observed_at,
+                ]
+                continue
+            current[0] += 1
+            current[1] += temperature
+            current[2] = min(current[2], temperature)
+            current[3] = max(current[3], temperature)
+            current[4] = min(current[4], observed_at)
+            current[5] = max(current[5], observed_at)
+
+        return {
+            key: CityAggregate(
+                city_id=key,
+                count=int(count),
+                minimum=minimum,
+                maximum=maximum,
+                mean=total / count,
+                first_observed_at=int(first),
+                last_observed_at=int(last),
+            )
+            for key, (count, total, minimum, maximum, first, last) in totals.items()
+        }
+
+    def _matching_records(
+        self, start: Optional[int], end: Optional[int], city_id: Optional[int]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """Stream raw records matching a time range and optional city.
+
+        Args:
+            start: Optional range start (unix, UTC), inclusive
+            end: Optional range end (unix, UTC), exclusive
+            city_id: Optional city to restrict the query to; only its shard is read
+
+        Yields:
+            Raw record tuples
+        """
+        for path in self._shard_paths(city_id):
+            for record in self._iter_records(path):
+                if city_id is not None and record[0] != city_id:
+                    continue
+                if start is not None and record[1] < start:
+                    continue
+                if end is not None and record[1] >= end:
+                    continue
+                yield record
+
+    def _shard_paths(self, city_id: Optional[int]) -> List[Path]:
+        """Return the shard files relevant to a query.
+
+        Args:
+            city_id: Optional city the query is restricted to
+
+        Returns:
+            Existing shard file paths
+        """
+        if city_id is not None:
+            paths = [self.directory / shard_file_name(city_id, self.shards)]
+        else:
+            paths = sorted(self.directory.glob("shard-*.wxh"))
+        return [path for path in paths if path.is_file()]
+
+    def _iter_records(self, path: Path) -> Iterator[Tuple[Any, ...]]:
+        """Memory-map a shard file and stream its raw records.
+
+        A trailing partial record, left by an interrupted write, is ignored.
+
+        Args:
+            path: The shard file path
+
+        Yields:
+            Raw record tuples
+
+        Raises:
+            ValueError: If the file is not a history shard
+        """
+        header = len(MAGIC)
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            if size <= header:
+                return
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if mapped[:header] != MAGIC:
+                    raise ValueError(f"Not an observation history file: {path}")
+                end = header + (size - header) // RECORD.size * RECORD.size
+                view = memoryview(mapped)[header:end]
+                records = RECORD.iter_unpack(view)
+                try:
+                    yield from records
+                finally:
+                    # Drop every export of the mapping before it is closed
+                    del records
+                    view.release()
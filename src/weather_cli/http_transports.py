@@ -0,0 +1,301 @@
+"""Alternative HTTP backends for the weather API client.
+
+The default transport sends every request through the requests library. Two
+other backends implement the same Transport interface:
+
+- HttpClientTransport uses only the standard library's http.client. It skips
+  the session, adapter and urllib3 pool layers of requests and keeps a small,
+  bounded pool of idle connections to each server between requests.
+- Http2Transport uses httpx, an optional dependency
+  (``pip install 'httpx[http2]'``). Over HTTPS it negotiates HTTP/2, so many
+  concurrent requests share a single multiplexed connection.
+
+Both return requests Response objects and raise requests exceptions, so the
+client handles their answers and failures exactly as before.
+"""
+
+import gzip
+import http.client
+import importlib
+import socket
+import ssl
+import threading
+import time
+import urllib.parse
+import zlib
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from . import tracing
+from .transport import Transport, build_response, record_exchange_spans
+
+USER_AGENT = "weather-cli"
+HTTPX_MISSING = "The http2 transport requires httpx: pip install 'httpx[http2]'"
+
+# Errors showing that the server closed a kept-alive connection before the request
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+def _decode_body(headers: Dict[str, str], body: bytes) -> bytes:
+    """Undo a gzip or deflate content encoding, dropping its header.
+
+    Args:
+        headers: The response headers; Content-Encoding is removed once decoded
+        body: The raw response body
+
+    Returns:
+        The decoded body
+    """
+    for name in list(headers):
+        if name.lower() != "content-encoding":
+            continue
+        encoding = headers[name].strip().lower()
+        if encoding == "gzip":
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+        else:
+            continue
+        del headers[name]
+    return body
+
+
+class HttpClientTransport(Transport):
+    """Transport built on the standard library's http.client.
+
+    http.client connections cannot be used by two requests at once, so each
+    request checks a connection out of the pool of idle connections to its
+    server, or opens a new one, and returns it once the response is read. At
+    most max_idle_per_host idle connections are kept per server; the rest are
+    closed, so short-lived worker threads do not leave sockets behind.
+    Redirects are not followed.
+    """
+
+    DEFAULT_MAX_IDLE_PER_HOST = 10
+
+    def __init__(
+        self,
+        context: Optional[ssl.SSLContext] = None,
+        max_idle_per_host: int = DEFAULT_MAX_IDLE_PER_HOST,
+    ) -> None:
+        """Initialize the transport.
+
+        Args:
+            context: Optional TLS settings for HTTPS servers; the system defaults
+                if not given
+            max_idle_per_host: Maximum number of idle connections kept open to
+                each server
+
+        Raises:
+            ValueError: If max_idle_per_host is negative
+        """
+        if max_idle_per_host < 0:
+            raise ValueError("max_idle_per_host must not be negative")
+        self.max_idle_per_host = max_idle_per_host
+        self._context = context
+        # Idle connections by (scheme, netloc), the most recently returned last
+        self._idle: Dict[Tuple[str, str], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Send a GET request over a kept-alive connection from the pool.
+
+        Args:
+            url: The complete request URL
+            timeout: Timeout in seconds of connecting and of each read
+            headers: Optional request headers
+
+        Returns:
+            The HTTP response, whatever its status code
+
+        Raises:
+            requests.exceptions.RequestException: If the request could not be completed
+        """
+        if tracing.get_tracer() is None:
+            return self._send(url, timeout, headers)
+
+        start = time.time_ns()
+        response = self._send(url, timeout, headers)
+        record_exchange_spans(start, time.time_ns(), response)
+        return response
+
+    def close(self) -> None:
+        """Close the idle connections to every server."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+    def _send(
+        self, url: str, timeout: float, headers: Optional[Dict[str, str]]
+    ) -> requests.Response:
+        """Send the request, retrying once if a reused connection was closed by the server."""
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise requests.exceptions.InvalidURL(f"Unsupported URL: {url}")
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request_headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"}
+        request_headers.update(headers or {})
+
+        key = (parts.scheme, parts.netloc)
+        retried = False
+        while True:
+            connection, reused = self._checkout(key, timeout)
+            started = time.perf_counter()
+            try:
+                connection.request("GET", target, headers=request_headers)
+                raw = connection.getresponse()
+                headers_at = time.perf_counter()
+                body = raw.read()
+            except socket.timeout as e:
+                connection.close()
+                raise requests.exceptions.Timeout(f"Request to {parts.netloc} timed out") from e
+            except _STALE_CONNECTION_ERRORS as e:
+                connection.close()
+                if reused and not retried:
+                    retried = True
+                    continue
+                raise requests.exceptions.ConnectionError(str(e)) from e
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                raise requests.exceptions.ConnectionError(str(e)) from e
+
+            if raw.will_close:
+                connection.close()
+            else:
+                self._checkin(key, connection)
+            response_headers = dict(raw.getheaders())
+            response = build_response(
+                url, raw.status, response_headers, _decode_body(response_headers, body)
+            )
+            response.reason = raw.reason
+            response.elapsed = timedelta(seconds=headers_at - started)
+            return response
+
+    def _checkout(
+        self, key: Tuple[str, str], timeout: float
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        """Take an idle connection to a server from the pool, or open a new one.
+
+        Args:
+            key: The (scheme, netloc) of the server
+            timeout: Timeout in seconds of connecting and of each read
+
+        Returns:
+            The connection, and whether it was used before
+        """
+        with self._lock:
+            idle = self._idle.get(key)
+            connection = idle.pop() if idle else None
+            if idle is not None and not idle:
+                del self._idle[key]
+        if connection is not None:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            return connection, True
+
+        scheme, netloc = key
+        if scheme == "https":
+            if self._context is None:
+                self._context = ssl.create_default_context()
+            connection = http.client.HTTPSConnection(netloc, timeout=timeout, context=self._context)
+        else:
+            connection = http.client.HTTPConnection(netloc, timeout=timeout)
+        return connection, False
+
+    def _checkin(self, key: Tuple[str, str], connection: http.client.HTTPConnection) -> None:
+        """Return a connection whose response was read to the pool, or close it if full.
+
+        Args:
+            key: The (scheme, netloc) of the server
+            connection: The connection
+        """
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(connection)
+                return
+            if not idle:
+                del self._idle[key]
+        connection.close()
+
+
+class Http2Transport(Transport):
+    """Transport built on httpx, multiplexing concurrent requests over HTTP/2.
+
+    HTTP/2 is negotiated during the TLS handshake; plain http:// servers, such
+    as the local stub, are spoken to over HTTP/1.1. The client is thread-safe.
+    """
+
+    def __init__(self, http2: bool = True, max_connections: int = 100) -> None:
+        """Initialize the transport.
+
+        Args:
+            http2: Whether to offer HTTP/2 to HTTPS servers
+            max_connections: Maximum number of open connections
+
+        Raises:
+            ImportError: If httpx, or h2 for HTTP/2, is not installed
+        """
+        try:
+            self._httpx: Any = importlib.import_module("httpx")
+        except ImportError as e:
+            raise ImportError(HTTPX_MISSING) from e
+        limits = self._httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._client = self._httpx.Client(
+            http2=http2, limits=limits, headers={"User-Agent": USER_AGENT}
+        )
+
+    def get(
+        self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Send a GET request over a shared, possibly multiplexed connection.
+
+        Args:
+            url: The complete request URL
+            timeout: Timeout in seconds
+            headers: Optional request headers
+
+        Returns:
+            The HTTP response, whatever its status code
+
+        Raises:
+            requests.exceptions.RequestException: If the request could not be completed
+        """
+        start = time.time_ns()
+        try:
+            raw = self._client.get(url, timeout=timeout, headers=headers)
+        except self._httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except self._httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+        # httpx has already decoded the body
+        response_headers = {
+            name: value for name, value in raw.headers.items() if name.lower() != "content-encoding"
+        }
+        response = build_response(url, raw.status_code, response_headers, raw.content)
+        response.reason = raw.reason_phrase
+        response.elapsed = raw.elapsed
+        if tracing.get_tracer() is not None:
+            tracing.record_span(
+                "http.exchange", start, time.time_ns(), http_version=raw.http_version
+            )
+        return response
+
+    def close(self) -> None:
+        """Close the connections."""
+        self._client.close()
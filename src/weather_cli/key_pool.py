@@ -0,0 +1,208 @@
+"""API key pool with quota-aware rotation for the weather CLI application."""
+
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+from .exceptions import WeatherApiException
+
+logger = logging.getLogger(__name__)
+
+REDACTED = "REDACTED"
+
+
+@dataclass
+class _KeyState:
+    """Usage and quarantine state of one API key.
+
+    Attributes:
+        key: The API key
+        label: Log-safe label of the key
+        requests: Times of the requests made in the current quota window
+        quarantined_until: Time until which the key is set aside
+        last_used: Time of the most recent request
+    """
+
+    key: str
+    label: str
+    requests: Deque[float] = field(default_factory=deque)
+    quarantined_until: float = 0.0
+    last_used: float = float("-inf")
+
+
+class ApiKeyPool:
+    """Thread-safe pool of API keys, each tracked against its own per-minute quota.
+
+    Every request goes to the available key with the most remaining headroom in the
+    current minute. A key that is rejected (401) or rate limited (429) is quarantined
+    for a while. Keys are only ever referred to by label in logs and messages.
+    """
+
+    QUOTA_WINDOW_SECONDS = 60.0
+    DEFAULT_QUARANTINE_SECONDS = 60.0
+    DEFAULT_INVALID_KEY_QUARANTINE_SECONDS = 3600.0
+    QUARANTINE_STATUS_CODES = frozenset({401, 429})
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        quota_per_minute: Optional[int] = None,
+        quarantine_seconds: float = DEFAULT_QUARANTINE_SECONDS,
+        invalid_key_quarantine_seconds: float = DEFAULT_INVALID_KEY_QUARANTINE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            keys: The API keys; blank and duplicate keys are ignored
+            quota_per_minute: Optional number of requests each key may make per minute.
+                If not provided, keys are used in turn without a local limit.
+            quarantine_seconds: How long a rate-limited key is set aside
+            invalid_key_quarantine_seconds: How long a rejected key is set aside
+            clock: Function returning a monotonic time in seconds
+
+        Raises:
+            ValueError: If no keys are given or the quota is not positive
+        """
+        unique_keys = list(dict.fromkeys(key.strip() for key in keys if key and key.strip()))
+        if not unique_keys:
+            raise ValueError("At least one API key is required.")
+        if quota_per_minute is not None and quota_per_minute <= 0:
+            raise ValueError("quota_per_minute must be positive")
+
+        self.quota_per_minute = quota_per_minute
+        self.quarantine_seconds = quarantine_seconds
+        self.invalid_key_quarantine_seconds = invalid_key_quarantine_seconds
+        self._clock = clock
+        self._states: Dict[str, _KeyState] = {
+            key: _KeyState(key, f"#{index + 1}") for index, key in enumerate(unique_keys)
+        }
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of keys in the pool."""
+        return len(self._states)
+
+    @property
+    def keys(self) -> List[str]:
+        """The keys in the pool, in configuration order."""
+        return list(self._states)
+
+    def acquire(self) -> str:
+        """Reserve one request on the key with the most remaining headroom.
+
+        Returns:
+            The API key to use for the request
+
+        Raises:
+            WeatherApiException: If every key is quarantined or out of quota
+        """
+        with self._lock:
+            now = self._clock()
+            best: Optional[_KeyState] = None
+            best_headroom = 0.0
+            for state in self._states.values():
+                if state.quarantined_until > now:
+                    continue
+                headroom = self._headroom(state, now)
+                if headroom <= 0:
+                    continue
+                if (
+                    best is None
+                    or headroom > best_headroom
+                    or (headroom == best_headroom and state.last_used < best.last_used)
+                ):
+                    best, best_headroom = state, headroom
+
+            if best is None:
+                logger.warning("No API key available: all keys are quarantined or out of quota")
+                raise WeatherApiException(
+                    "All API keys are rate limited. Please try again later.", 429
+                )
+
+            best.requests.append(now)
+            best.last_used = now
+            logger.debug("Using API key %s (%g requests of headroom)", best.label, best_headroom)
+            return best.key
+
+    def quarantine(self, key: str, status_code: int) -> None:
+        """Set a key aside after the upstream rejected or rate limited it.
+
+        Args:
+            key: The API key
+            status_code: The HTTP status code the key received
+        """
+        seconds = (
+            self.invalid_key_quarantine_seconds if status_code == 401 else self.quarantine_seconds
+        )
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                return
+            state.quarantined_until = self._clock() + seconds
+        logger.warning(
+            "API key %s quarantined for %gs after HTTP status %s", state.label, seconds, status_code
+        )
+
+    def headroom(self, key: str) -> float:
+        """Return how many more requests a key may make in the current minute.
+
+        Args:
+            key: The API key
+
+        Returns:
+            The remaining requests, infinity without a quota, or 0 while quarantined
+        """
+        with self._lock:
+            state = self._states[key]
+            now = self._clock()
+            if state.quarantined_until > now:
+                return 0.0
+            return self._headroom(state, now)
+
+    def label(self, key: str) -> str:
+        """Return the log-safe label of a key.
+
+        Args:
+            key: The API key
+
+        Returns:
+            A label such as "#2", or "unknown" if the key is not in the pool
+        """
+        state = self._states.get(key)
+        return state.label if state is not None else "unknown"
+
+    def redact(self, text: str) -> str:
+        """Redact every key in the pool from a text for safe logging.
+
+        Args:
+            text: Text that may contain API keys, such as a URL or error message
+
+        Returns:
+            The text with every API key redacted
+        """
+        for key in self._states:
+            text = text.replace(key, REDACTED)
+        return text
+
+    def _headroom(self, state: _KeyState, now: float) -> float:
+        """Return a key's remaining requests in the sliding quota window.
+
+        Must be called with the lock held.
+
+        Args:
+            state: The key state
+            now: The current time
+
+        Returns:
+            The remaining requests, or infinity without a quota
+        """
+        window_start = now - self.QUOTA_WINDOW_SECONDS
+        while state.requests and state.requests[0] <= window_start:
+            state.requests.popleft()
+        if self.quota_per_minute is None:
+            return float("inf")
+        return float(self.quota_per_minute - len(state.requests))
@@ -0,0 +1,162 @@
+"""Logging setup for the weather CLI application.
+
+Modules log with %-style arguments so messages are only formatted when a
+handler actually emits them. The handler installed here can write plain text or
+one JSON object per line, and can sample high-volume success events: records
+logged with ``extra=SAMPLED`` are kept at the configured rate, every other
+record is always kept.
+"""
+
+import json
+import logging
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, TextIO, Tuple
+
+TEXT_FORMAT = "[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+HANDLER_NAME = "weather_cli"
+
+# Pass as ``extra`` to mark a record as a high-volume event that may be sampled
+SAMPLED: Dict[str, Any] = {"sampled": True}
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None)).keys()
+) | {"message", "asctime", "taskName"}
+
+
+class _StderrHandler(logging.StreamHandler):
+    """Stream handler writing to whatever ``sys.stderr`` is when a record is emitted."""
+
+    def __init__(self) -> None:
+        """Initialize the handler."""
+        super().__init__(sys.stderr)
+
+    @property
+    def stream(self) -> TextIO:
+        """The current standard error stream."""
+        return sys.stderr
+
+    @stream.setter
+    def stream(self, value: TextIO) -> None:
+        """Ignore the stream set by the base class."""
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line.
+
+    Values passed through ``extra`` are included as additional fields, so callers
+    can log structured data without embedding it in the message.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format a record as JSON.
+
+        Args:
+            record: The log record
+
+        Returns:
+            The JSON line, without a trailing newline
+        """
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_ATTRIBUTES and name != "sampled":
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the records marked as sampled.
+
+    Sampling is deterministic: with a rate of 0.1, the first of every ten records
+    of the same message template is kept. Templates are counted separately so a
+    rare event is never crowded out by a frequent one.
+    """
+
+    def __init__(self, rate: float = 1.0) -> None:
+        """Initialize the filter.
+
+        Args:
+            rate: Fraction of sampled records to keep, greater than 0 and at most 1
+
+        Raises:
+            ValueError: If the rate is out of range
+        """
+        super().__init__()
+        if not 0 < rate <= 1:
+            raise ValueError("rate must be greater than 0 and at most 1")
+        self.rate = rate
+        self._every = round(1 / rate)
+        self._counts: Dict[Tuple[str, Any], int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """Decide whether a record is emitted.
+
+        Args:
+            record: The log record
+
+        Returns:
+            False for sampled records that are dropped, True otherwise
+        """
+        if self._every == 1 or not getattr(record, "sampled", False):
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+        return count % self._every == 0
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    log_format: str = "text",
+    sample_rate: float = 1.0,
+    stream: Optional[TextIO] = None,
+) -> logging.Handler:
+    """Configure the root logger; repeated calls only update the settings.
+
+    Args:
+        level: The root logger level
+        log_format: "text" or "json"
+        sample_rate: Fraction of sampled records to keep
+        stream: Stream to write to. Defaults to the current sys.stderr.
+
+    Returns:
+        The application's log handler
+
+    Raises:
+        ValueError: If the format or sample rate is not supported
+    """
+    if log_format not in ("text", "json"):
+        raise ValueError(f"Unsupported log format: {log_format}")
+
+    root = logging.getLogger()
+    handler = next((h for h in root.handlers if h.get_name() == HANDLER_NAME), None)
+    if handler is None:
+        handler = logging.StreamHandler(stream) if stream is not None else _StderrHandler()
+        handler.set_name(HANDLER_NAME)
+        root.addHandler(handler)
+
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT, datefmt=DATE_FORMAT))
+    for old_filter in list(handler.filters):
+        if isinstance(old_filter, SamplingFilter):
+            handler.removeFilter(old_filter)
+    if sample_rate < 1:
+        handler.addFilter(SamplingFilter(sample_rate))
+    root.setLevel(level)
+    return handler
@@ -1,24 +1,408 @@
-"""Main entry point for the weather CLI application."""
+"""Main entry point for the weather CLI application.
+
+Modules used only by a subcommand or an optional feature are imported where
+they are used, so a plain lookup does not pay for loading them.
+"""
 
 import argparse
+import atexit
+import json
 import logging
 import sys
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
+from .cache import WeatherCache
+from .cache_backends import CacheBackend, create_backend
+from .composite_client import FailoverClient
+from .concurrency import AdaptiveConcurrencyClient, AimdLimiter
+from .config_util import ConfigUtil
+from .forecast_fallback import FORECAST_BACKEND_NAMESPACE, ForecastFallback
+from .history import ObservationRecorder
+from .key_pool import ApiKeyPool
+from .logging_util import configure_logging
+from .negative_cache import NegativeCache
+from .scheduler import RequestScheduler, SchedulingClient
+from .tracing import Tracer, get_tracer, set_tracer
+from .transport import RecordingTransport, ReplayTransport, Transport
+from .units import Units
+from .weather_client import OpenWeatherMapClient, WeatherApiClient
 from .weather_service import WeatherService
-from .exceptions import WeatherApiException, ConfigException
+from .exceptions import CacheBackendException, WeatherApiException, ConfigException
+
+if TYPE_CHECKING:
+    from .connections import PooledTransport
 
 
 def setup_logging(debug: bool = False) -> None:
     """Set up logging configuration.
 
+    Safe to call repeatedly: the handler is installed once and later calls only
+    update the level, format and sampling.
+
     Args:
         debug: Whether to enable debug logging
     """
     log_level = logging.DEBUG if debug else logging.INFO
-    logging.basicConfig(
-        level=log_level,
-        format="[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
+    try:
+        log_format = ConfigUtil.get_log_format()
+        sample_rate = ConfigUtil.get_log_sample_rate()
+    except ConfigException as e:
+        configure_logging(log_level)
+        logging.getLogger(__name__).warning("Ignoring logging configuration: %s", e)
+        return
+    configure_logging(log_level, log_format, sample_rate)
+
+
+def create_key_pool() -> Optional[ApiKeyPool]:
+    """Create the API key pool if several keys are configured.
+
+    Returns:
+        An ApiKeyPool shared by every provider, or None if no pool is configured
+    """
+    api_keys = ConfigUtil.get_api_keys()
+    if not api_keys:
+        return None
+    return ApiKeyPool(api_keys, quota_per_minute=ConfigUtil.get_api_key_quota())
+
+
+def create_pooled_transport() -> Optional["PooledTransport"]:
+    """Create a transport keeping warm connections if pre-warming or keep-alive is enabled.
+
+    Returns:
+        A PooledTransport, or None to open a connection per request as usual
+
+    Raises:
+        ConfigException: If the connection settings are invalid
+    """
+    keepalive_interval = ConfigUtil.get_keepalive_interval()
+    if not ConfigUtil.get_prewarm() and keepalive_interval is None:
+        return None
+    from .connections import PooledTransport
+
+    return PooledTransport(
+        dns_ttl_seconds=ConfigUtil.get_dns_cache_ttl(), keepalive_interval=keepalive_interval
+    )
+
+
+def create_network_transport(backend: Optional[str] = None) -> Optional[Transport]:
+    """Create the transport sending requests over the network.
+
+    Args:
+        backend: Optional HTTP backend overriding the configured one
+
+    The warm connection settings only apply to the requests backend; with the
+    other backends they are ignored with a warning.
+
+    Returns:
+        The stdlib or http2 transport if selected; for the requests backend a
+        PooledTransport if enabled, or None to use the network as usual
+
+    Raises:
+        ConfigException: If the settings are invalid or the backend is not installed
+    """
+    backend = backend or ConfigUtil.get_http_transport()
+    if backend != "requests" and (
+        ConfigUtil.get_prewarm() or ConfigUtil.get_keepalive_interval() is not None
+    ):
+        logging.getLogger(__name__).warning(
+            "WEATHER_PREWARM, WEATHER_KEEPALIVE_INTERVAL and WEATHER_DNS_CACHE_TTL only apply "
+            "to the requests HTTP backend; ignoring them for %s",
+            backend,
+        )
+    if backend == "stdlib":
+        from .http_transports import HttpClientTransport
+
+        return HttpClientTransport()
+    if backend == "http2":
+        from .http_transports import Http2Transport
+
+        try:
+            return Http2Transport()
+        except ImportError as e:
+            raise ConfigException(str(e))
+    return create_pooled_transport()
+
+
+def create_transport(backend: Optional[str] = None) -> Optional[Transport]:
+    """Create the transport selected by configuration.
+
+    Args:
+        backend: Optional HTTP backend overriding the configured one
+
+    Returns:
+        A RecordingTransport or ReplayTransport if a cassette is configured, else
+        the network transport, or None to use the network as usual
+
+    Raises:
+        ConfigException: If the cassette or connection settings are invalid or the
+            cassette cannot be read
+    """
+    cassette = ConfigUtil.get_cassette_path()
+    if cassette is None:
+        return create_network_transport(backend)
+    if ConfigUtil.get_cassette_mode() == "record":
+        return RecordingTransport(cassette, transport=create_network_transport(backend))
+    try:
+        return ReplayTransport(cassette, speed=ConfigUtil.get_replay_speed())
+    except (OSError, ValueError) as e:
+        raise ConfigException(f"Cannot replay cassette {cassette}: {e}")
+
+
+def create_negative_cache() -> Optional[NegativeCache]:
+    """Create the cache of failed lookups unless it is disabled.
+
+    Returns:
+        A NegativeCache, persisted if a file is configured and flushed at exit, or
+        None if disabled
+    """
+    ttl_seconds = ConfigUtil.get_negative_cache_ttl()
+    if ttl_seconds == 0:
+        return None
+    negative_cache = NegativeCache(
+        ttl_seconds=ttl_seconds, path=ConfigUtil.get_negative_cache_path()
+    )
+    if negative_cache.path is not None:
+        atexit.register(negative_cache.flush)
+    return negative_cache
+
+
+def create_forecast_fallback() -> Optional[ForecastFallback]:
+    """Create the store of forecasts standing in for unavailable current weather.
+
+    Forecasts are kept in the shared cache backend, if one is configured, so the
+    forecasts fetched by one command are used by the next.
+
+    Returns:
+        A ForecastFallback, or None if disabled
+
+    Raises:
+        ConfigException: If the cache backend settings are invalid
+    """
+    max_age_seconds = ConfigUtil.get_forecast_fallback_max_age()
+    if max_age_seconds == 0:
+        return None
+    return ForecastFallback(
+        max_age_seconds=max_age_seconds,
+        backend=create_cache_backend(namespace=FORECAST_BACKEND_NAMESPACE),
+    )
+
+
+def create_cache_backend(namespace: Optional[str] = None) -> Optional[CacheBackend]:
+    """Create the configured cache backend if entries are stored outside the process.
+
+    Args:
+        namespace: Optional keyspace kept apart from the weather entries
+
+    Returns:
+        A disk or redis backend, or None to keep entries in memory
+
+    Raises:
+        ConfigException: If the backend settings are invalid or it cannot be set up
+    """
+    kind = ConfigUtil.get_cache_backend()
+    if kind == "memory":
+        return None
+    location = ConfigUtil.get_cache_dir() if kind == "disk" else ConfigUtil.get_cache_url()
+    try:
+        return create_backend(
+            kind, location, serializer=ConfigUtil.get_cache_serializer(), namespace=namespace
+        )
+    except (ValueError, CacheBackendException) as e:
+        raise ConfigException(f"Cannot set up the {kind} cache backend: {e}")
+
+
+def limit_concurrency(client: WeatherApiClient, max_concurrency: int) -> WeatherApiClient:
+    """Wrap a provider in an adaptive concurrency limiter.
+
+    Args:
+        client: The provider's client
+        max_concurrency: The most concurrent requests the limiter may allow
+
+    Returns:
+        The limited client
+    """
+    limiter = AimdLimiter(
+        initial_limit=min(AimdLimiter.DEFAULT_INITIAL_LIMIT, max_concurrency),
+        max_limit=max_concurrency,
+    )
+    return AdaptiveConcurrencyClient(client, limiter)
+
+
+def setup_tracing() -> Optional[Tracer]:
+    """Install a tracer if a trace file or collector is configured.
+
+    Safe to call repeatedly: the tracer is installed once and closed at exit, so
+    spans still queued for the collector are sent.
+
+    Returns:
+        The installed tracer, or None if tracing is off
+
+    Raises:
+        ConfigException: If the tracing settings are invalid or the trace file
+            cannot be opened
+    """
+    tracer = get_tracer()
+    if tracer is not None:
+        return tracer
+
+    from .tracing import CompositeExporter, JsonlExporter, OtlpHttpExporter, SpanExporter
+
+    exporters: List[SpanExporter] = []
+    trace_file = ConfigUtil.get_trace_file()
+    if trace_file is not None:
+        try:
+            exporters.append(JsonlExporter(trace_file))
+        except OSError as e:
+            raise ConfigException(f"Cannot open trace file {trace_file}: {e}")
+    otlp_url = ConfigUtil.get_trace_otlp_url()
+    if otlp_url is not None:
+        exporters.append(OtlpHttpExporter(otlp_url))
+    if not exporters:
+        return None
+
+    tracer = Tracer(exporters[0] if len(exporters) == 1 else CompositeExporter(exporters))
+    set_tracer(tracer)
+    atexit.register(tracer.close)
+    return tracer
+
+
+def create_weather_service(
+    cache: Optional[WeatherCache] = None,
+    base_url: Optional[str] = None,
+    api_key: Optional[str] = None,
+    http_transport: Optional[str] = None,
+    isolated: bool = False,
+) -> WeatherService:
+    """Create the weather service with the optional features enabled by configuration.
+
+    A shared cache backend, if configured, gives every command a cache.
+
+    Args:
+        cache: Optional weather cache for long-running commands
+        base_url: Optional API base URL overriding the configured one, such as a stub
+        api_key: Optional API key overriding the configured one
+        http_transport: Optional HTTP backend overriding the configured one
+        isolated: Whether to leave out everything that keeps state beyond the
+            service or carries real credentials: the shared cache backend, the
+            history recorder, the negative cache, the forecast fallback, the
+            cassette and the API key pool. Used by benchmarks, whose results must
+            neither come from nor end up in that state, and whose requests may go
+            to a stub.
+
+    Returns:
+        A configured WeatherService
+    """
+    setup_tracing()
+    client: Optional[WeatherApiClient] = None
+    key_pool = None if isolated else create_key_pool()
+    transport = (
+        create_network_transport(http_transport) if isolated else create_transport(http_transport)
+    )
+    # Replayed traffic never reaches the API, so no real key is needed
+    if api_key is None and isinstance(transport, ReplayTransport):
+        api_key = ReplayTransport.PLACEHOLDER_API_KEY
+    max_concurrency = ConfigUtil.get_max_concurrency()
+    scheduler_concurrency = ConfigUtil.get_scheduler_concurrency()
+    fallback_urls = ConfigUtil.get_fallback_api_urls()
+    if fallback_urls:
+        providers: List[WeatherApiClient] = [
+            OpenWeatherMapClient(
+                api_key=api_key, base_url=base_url, key_pool=key_pool, transport=transport
+            )
+        ]
+        providers.extend(
+            OpenWeatherMapClient(
+                api_key=api_key, base_url=url, key_pool=key_pool, transport=transport
+            )
+            for url in fallback_urls
+        )
+        if max_concurrency is not None:
+            providers = [limit_concurrency(provider, max_concurrency) for provider in providers]
+        client = FailoverClient(
+            providers,
+            hedge_percentile=ConfigUtil.get_hedge_percentile(),
+            # Room for every provider to reach the limiter's ceiling
+            max_workers=max(
+                FailoverClient.DEFAULT_MAX_WORKERS, (max_concurrency or 0) * len(providers)
+            ),
+        )
+    elif (
+        key_pool is not None
+        or transport is not None
+        or max_concurrency is not None
+        or scheduler_concurrency is not None
+        or base_url is not None
+        or api_key is not None
+    ):
+        client = OpenWeatherMapClient(
+            api_key=api_key, base_url=base_url, key_pool=key_pool, transport=transport
+        )
+        if max_concurrency is not None:
+            client = limit_concurrency(client, max_concurrency)
+    if client is not None and scheduler_concurrency is not None:
+        client = SchedulingClient(client, RequestScheduler(max_concurrency=scheduler_concurrency))
+    if transport is not None and ConfigUtil.get_prewarm():
+        from .connections import PooledTransport
+
+        if isinstance(transport, PooledTransport):
+            # Connect while the command parses its input and reads the cache
+            for url in [base_url or ConfigUtil.get_api_base_url(), *fallback_urls]:
+                transport.prewarm(url)
+
+    from .spatial import SpatialIndex
+
+    default_country = ConfigUtil.get_default_country()
+    if isolated:
+        return WeatherService(
+            client=client,
+            cache=cache,
+            spatial_index=SpatialIndex() if cache is not None else None,
+            nearby_radius_km=ConfigUtil.get_nearby_radius_km(),
+            default_country=default_country,
+            max_concurrency=max_concurrency,
+        )
+    history_dir = ConfigUtil.get_history_dir()
+    recorder = ObservationRecorder(history_dir) if history_dir else None
+    negative_cache = create_negative_cache()
+    forecast_fallback = create_forecast_fallback()
+    if cache is None:
+        backend = create_cache_backend()
+        if backend is not None:
+            cache = WeatherCache(backend=backend)
+    if cache is None:
+        return WeatherService(
+            client=client,
+            recorder=recorder,
+            negative_cache=negative_cache,
+            forecast_fallback=forecast_fallback,
+            default_country=default_country,
+            max_concurrency=max_concurrency,
+        )
+    return WeatherService(
+        client=client,
+        cache=cache,
+        recorder=recorder,
+        spatial_index=SpatialIndex(),
+        nearby_radius_km=ConfigUtil.get_nearby_radius_km(),
+        negative_cache=negative_cache,
+        forecast_fallback=forecast_fallback,
+        default_country=default_country,
+        max_concurrency=max_concurrency,
+    )
+
+
+def add_units_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the --units option to an argument parser.
+
+    Args:
+        parser: The parser to extend
+    """
+    parser.add_argument(
+        "--units",
+        choices=[units.value for units in Units],
+        default=Units.METRIC.value,
+        help="Units to display temperatures in: metric (°C), imperial (°F) "
+        "or standard (K) (default: metric)",
     )
 
 
@@ -32,19 +416,345 @@ def parse_arguments() -> argparse.Namespace:
         description="Get current weather information for a city", prog="weather-cli"
     )
 
-    parser.add_argument("city", help="Name of the city to get weather for")
+    parser.add_argument("city", nargs="?", help="Name of the city to get weather for")
+
+    parser.add_argument(
+        "--coordinates",
+        nargs=2,
+        type=float,
+        metavar=("LAT", "LON"),
+        help="Get weather for a latitude and longitude instead of a city",
+    )
+
+    add_units_argument(parser)
+
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+
+    args = parser.parse_args()
+    if (args.city is None) == (args.coordinates is None):
+        parser.error("give either a city or --coordinates LAT LON")
+    return args
+
+
+def parse_compare_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments for the compare command.
+
+    Args:
+        argv: Arguments following the command name. Defaults to sys.argv[2:].
+
+    Returns:
+        Parsed arguments namespace
+    """
+    from .comparison import SORT_KEYS
+
+    parser = argparse.ArgumentParser(
+        description="Compare current weather across several cities", prog="weather-cli compare"
+    )
+
+    parser.add_argument("cities", nargs="+", metavar="city", help="Names of the cities to compare")
+
+    parser.add_argument(
+        "--sort-by",
+        choices=sorted(SORT_KEYS),
+        default="temperature",
+        help="Field to rank the cities by (default: temperature)",
+    )
+
+    parser.add_argument("--ascending", action="store_true", help="Rank the smallest value first")
+
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Show the results that arrived within this many seconds",
+    )
+
+    add_units_argument(parser)
+
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+    if args.deadline is not None and args.deadline <= 0:
+        parser.error("--deadline must be positive")
+    return args
+
+
+def parse_bulk_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments for the bulk command.
+
+    Args:
+        argv: Arguments following the command name. Defaults to sys.argv[2:].
+
+    Returns:
+        Parsed arguments namespace
+    """
+    from .bulk import DEFAULT_CHUNK_SIZE
+
+    parser = argparse.ArgumentParser(
+        description="Look up every city in a file, one per line, and write the results as CSV",
+        prog="weather-cli bulk",
+    )
+
+    parser.add_argument("input", help="File with one city name per line")
+
+    parser.add_argument(
+        "-o", "--output", required=True, metavar="FILE", help="CSV file to write the results to"
+    )
+
+    parser.add_argument(
+        "--state",
+        metavar="FILE",
+        help="File to record progress in (default: the output file with .state appended)",
+    )
+
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted job, retrying the cities that failed",
+    )
+
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        metavar="N",
+        help=f"Cities looked up between checkpoints (default: {DEFAULT_CHUNK_SIZE})",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Maximum number of concurrent lookups (default: WEATHER_MAX_CONCURRENCY "
+        "if set, else 8)",
+    )
+
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+    if args.chunk_size <= 0:
+        parser.error("--chunk-size must be positive")
+    if args.workers is not None and args.workers <= 0:
+        parser.error("--workers must be positive")
+    return args
+
+
+def parse_bench_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments for the bench command.
+
+    Args:
+        argv: Arguments following the command name. Defaults to sys.argv[2:].
+
+    Returns:
+        Parsed arguments namespace
+    """
+    from .bench import DEFAULT_CITIES
+
+    parser = argparse.ArgumentParser(
+        description="Measure throughput and latency of weather lookups under load",
+        prog="weather-cli bench",
+    )
+
+    parser.add_argument(
+        "cities",
+        nargs="*",
+        default=list(DEFAULT_CITIES),
+        help=f"City names to look up in turn (default: {', '.join(DEFAULT_CITIES)})",
+    )
+
+    parser.add_argument(
+        "-n",
+        "--requests",
+        type=int,
+        default=1000,
+        metavar="N",
+        help="Total number of lookups (default: 1000)",
+    )
+
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=16,
+        metavar="N",
+        help="Number of concurrent workers (default: 16)",
+    )
+
+    parser.add_argument(
+        "--rate",
+        type=float,
+        metavar="RPS",
+        help="Target lookups per second (default: as fast as possible)",
+    )
+
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument(
+        "--base-url", metavar="URL", help="API base URL to send requests to, such as a stub"
+    )
+    target.add_argument(
+        "--stub", action="store_true", help="Start a local stub server and benchmark against it"
+    )
+
+    parser.add_argument(
+        "--stub-latency-ms",
+        type=float,
+        default=0.0,
+        metavar="MS",
+        help="Latency the stub server adds to each response (default: 0)",
+    )
+
+    parser.add_argument(
+        "--cache", action="store_true", help="Serve repeated lookups from an in-memory cache"
+    )
+
+    parser.add_argument(
+        "--transport",
+        choices=ConfigUtil.HTTP_TRANSPORTS,
+        help="HTTP backend to send requests with (default: WEATHER_HTTP_TRANSPORT or requests)",
+    )
+
+    parser.add_argument(
+        "--json",
+        metavar="FILE",
+        help="Write the result as JSON to FILE, or to standard output instead of the report if -",
+    )
+
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+
+    args = parser.parse_args(sys.argv[2:] if argv is None else argv)
+    if args.requests <= 0:
+        parser.error("--requests must be positive")
+    if args.concurrency <= 0:
+        parser.error("--concurrency must be positive")
+    if args.rate is not None and args.rate <= 0:
+        parser.error("--rate must be positive")
+    if args.stub_latency_ms < 0:
+        parser.error("--stub-latency-ms must not be negative")
+    return args
+
+
+def parse_snapshot_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments for the snapshot command.
+
+    Args:
+        argv: Arguments following the command name. Defaults to sys.argv[2:].
+
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Save the shared cache to a snapshot file, or load one into it",
+        prog="weather-cli snapshot",
+    )
+
+    parser.add_argument(
+        "action",
+        choices=["save", "load"],
+        help="save writes the shared cache to FILE; load restores FILE into it",
+    )
+
+    parser.add_argument("file", help="The snapshot file")
+
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+
+def parse_forecast_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments for the forecast command.
+
+    Args:
+        argv: Arguments following the command name. Defaults to sys.argv[2:].
+
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Get the multi-day forecast for a city",
+        prog="weather-cli forecast",
+    )
+
+    parser.add_argument("city", help="Name of the city to get the forecast for")
+
+    add_units_argument(parser)
+
+    parser.add_argument("--debug", action="store_true", help="Enable debug logging")
+
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+
+def parse_watch_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments for watch mode.
+
+    Args:
+        argv: Arguments following the program name. Defaults to sys.argv[1:].
+
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Watch the weather in several cities and print what changes",
+        prog="weather-cli --watch",
+    )
+
+    parser.add_argument("--watch", action="store_true", required=True, help=argparse.SUPPRESS)
+
+    parser.add_argument("cities", nargs="+", metavar="city", help="Names of the cities to watch")
+
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=60.0,
+        metavar="SECONDS",
+        help="Seconds between polls while conditions are changing (default: 60)",
+    )
+
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=900.0,
+        metavar="SECONDS",
+        help="Longest wait between polls while conditions stay the same (default: 900)",
+    )
+
+    parser.add_argument(
+        "--load-snapshot",
+        metavar="FILE",
+        help="Warm the cache from a snapshot file before the first poll",
+    )
+
+    parser.add_argument(
+        "--save-snapshot",
+        metavar="FILE",
+        help="Write the cache to a snapshot file when the watch stops",
+    )
+
+    add_units_argument(parser)
 
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
 
-    return parser.parse_args()
+    args = parser.parse_intermixed_args(sys.argv[1:] if argv is None else argv)
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
+    if args.max_interval < args.interval:
+        parser.error("--max-interval must not be smaller than --interval")
+    return args
 
 
-def run_weather_cli(city: str, debug: bool = False) -> int:
+def run_weather_cli(
+    city: Optional[str],
+    debug: bool = False,
+    units: Units = Units.METRIC,
+    coordinates: Optional[Tuple[float, float]] = None,
+) -> int:
     """Run the weather CLI application.
 
     Args:
-        city: The city name to get weather for
+        city: The city name to get weather for, or None to look up coordinates
         debug: Whether to enable debug logging
+        units: The unit system to display the weather in
+        coordinates: Optional (latitude, longitude) to get weather for instead of a city
 
     Returns:
         Exit code (0 for success, 1 for error)
@@ -53,23 +763,72 @@ def run_weather_cli(city: str, debug: bool = False) -> int:
     logger = logging.getLogger(__name__)
 
     try:
-        logger.debug(f"Starting weather CLI for city: {city}")
-
-        weather_service = WeatherService()
-        weather_data = weather_service.get_weather(city)
+        weather_service = create_weather_service()
+        if city is None and coordinates is not None:
+            logger.debug("Starting weather CLI for coordinates: %s", coordinates)
+            weather_data = weather_service.get_weather_at(*coordinates)
+        else:
+            logger.debug("Starting weather CLI for city: %s", city)
+            weather_data = weather_service.get_weather(city or "")
 
-        print(weather_data)
+        print(weather_data.format(units))
         logger.debug("Weather data displayed successfully")
 
         return 0
 
     except ConfigException as e:
-        logger.error(f"Configuration error: {e}")
+        logger.error("Configuration error: %s", e)
+        print(f"Configuration Error: {e}", file=sys.stderr)
+        return 1
+
+    except WeatherApiException as e:
+        logger.error("Weather API error: %s", e)
+        print(f"Weather Error: {e}", file=sys.stderr)
+        return 1
+
+    except KeyboardInterrupt:
+        logger.info("Application interrupted by user")
+        print("\nOperation cancelled by user.", file=sys.stderr)
+        return 1
+
+    except Exception as e:
+        logger.error("Unexpected error: %s", e)
+        print(f"Unexpected Error: {e}", file=sys.stderr)
+        return 1
+
+
+def run_forecast_cli(city: str, debug: bool = False, units: Units = Units.METRIC) -> int:
+    """Run the forecast command.
+
+    With the forecast fallback enabled, the fetched forecast is also kept for
+    estimating the city's current weather while the API is unavailable.
+
+    Args:
+        city: The city name to get the forecast for
+        debug: Whether to enable debug logging
+        units: The unit system to display the forecast in
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    setup_logging(debug)
+    logger = logging.getLogger(__name__)
+
+    try:
+        weather_service = create_weather_service()
+        logger.debug("Starting forecast CLI for city: %s", city)
+        forecast = weather_service.get_forecast(city)
+
+        print(forecast.format(units))
+        return 0
+
+    except ConfigException as e:
+        logger.error("Configuration error: %s", e)
         print(f"Configuration Error: {e}", file=sys.stderr)
         return 1
 
     except WeatherApiException as e:
-        logger.error(f"Weather API error: {e}")
+        logger.error("Weather API error: %s", e)
         print(f"Weather Error: {e}", file=sys.stderr)
         return 1
 
@@ -79,15 +838,453 @@ def run_weather_cli(city: str, debug: bool = False) -> int:
         return 1
 
     except Exception as e:
-        logger.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         print(f"Unexpected Error: {e}", file=sys.stderr)
         return 1
 
 
+def run_compare_cli(
+    cities: List[str],
+    sort_by: str = "temperature",
+    descending: bool = True,
+    deadline: Optional[float] = None,
+    debug: bool = False,
+    units: Units = Units.METRIC,
+) -> int:
+    """Run the compare command.
+
+    Args:
+        cities: The city names to compare
+        sort_by: The field to rank the cities by
+        descending: Whether to rank the largest value first
+        deadline: Optional number of seconds to wait before showing partial results
+        debug: Whether to enable debug logging
+        units: The unit system to display temperatures in
+
+    Returns:
+        Exit code (0 if any city could be compared, 1 otherwise)
+    """
+    from .comparison import compare_cities, format_comparison_table
+
+    setup_logging(debug)
+    logger = logging.getLogger(__name__)
+
+    try:
+        logger.debug("Starting weather comparison for cities: %s", ", ".join(cities))
+
+        weather_service = create_weather_service()
+        result = compare_cities(
+            weather_service, cities, sort_by=sort_by, descending=descending, deadline=deadline
+        )
+
+        print(format_comparison_table(result, units))
+        logger.debug("Weather comparison displayed successfully")
+
+        return 0 if result.results else 1
+
+    except ConfigException as e:
+        logger.error("Configuration error: %s", e)
+        print(f"Configuration Error: {e}", file=sys.stderr)
+        return 1
+
+    except KeyboardInterrupt:
+        logger.info("Application interrupted by user")
+        print("\nOperation cancelled by user.", file=sys.stderr)
+        return 1
+
+    except Exception as e:
+        logger.error("Unexpected error: %s", e)
+        print(f"Unexpected Error: {e}", file=sys.stderr)
+        return 1
+
+
+def run_bulk_cli(
+    input_path: str,
+    output_path: str,
+    state_path: Optional[str] = None,
+    resume: bool = False,
+    chunk_size: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    debug: bool = False,
+) -> int:
+    """Run the bulk command.
+
+    Args:
+        input_path: File with one city name per line
+        output_path: CSV file to write the results to
+        state_path: Optional file to record progress in
+        resume: Whether to continue an interrupted job
+        chunk_size: Number of cities looked up between checkpoints; the job's
+            default if not given
+        max_workers: Maximum number of concurrent lookups; the adaptive limiter's
+            ceiling if one is configured, else the service default
+        debug: Whether to enable debug logging
+
+    Returns:
+        Exit code (0 if every city was looked up, 1 otherwise)
+    """
+    from .bulk import DEFAULT_CHUNK_SIZE, BulkJob
+
+    setup_logging(debug)
+    logger = logging.getLogger(__name__)
+
+    try:
+        logger.debug("Starting bulk job for %s", input_path)
+
+        job = BulkJob(
+            create_weather_service(),
+            input_path,
+            output_path,
+            state_path=state_path,
+            chunk_size=DEFAULT_CHUNK_SIZE if chunk_size is None else chunk_size,
+            max_workers=max_workers,
+        )
+        state = job.run(resume=resume)
+
+        print(f"Wrote {state.succeeded} results to {output_path}.")
+        if state.failed:
+            print(
+                f"{len(state.failed)} cities failed; run again with --resume to retry them.",
+                file=sys.stderr,
+            )
+            return 1
+        return 0
+
+    except ConfigException as e:
+        logger.error("Configuration error: %s", e)
+        print(f"Configuration Error: {e}", file=sys.stderr)
+        return 1
+
+    except (OSError, ValueError) as e:
+        logger.error("Bulk job error: %s", e)
+        print(f"Bulk Job Error: {e}", file=sys.stderr)
+        return 1
+
+    except KeyboardInterrupt:
+        logger.info("Bulk job interrupted by user")
+        print("\nBulk job interrupted; run again with --resume to continue.", file=sys.stderr)
+        return 1
+
+    except Exception as e:
+        logger.error("Unexpected error: %s", e)
+        print(f"Unexpected Error: {e}", file=sys.stderr)
+        return 1
+
+
+def run_bench_cli(
+    cities: List[str],
+    requests: int = 1000,
+    concurrency: int = 16,
+    rate: Optional[float] = None,
+    base_url: Optional[str] = None,
+    stub: bool = False,
+    stub_latency_ms: float = 0.0,
+    cache: bool = False,
+    transport: Optional[str] = None,
+    json_path: Optional[str] = None,
+    debug: bool = False,
+) -> int:
+    """Run the bench command.
+
+    Args:
+        cities: City names to look up in turn
+        requests: Total number of lookups
+        concurrency: Number of concurrent workers
+        rate: Optional target lookups per second
+        base_url: Optional API base URL to send requests to
+        stub: Whether to start a local stub server and send requests to it
+        stub_latency_ms: Latency the stub server adds to each response
+        cache: Whether to serve repeated lookups from an in-memory cache; the
+            shared cache backend and other persistent state are never used
+        transport: Optional HTTP backend overriding the configured one
+        json_path: Optional file to write the result to as JSON; "-" for stdout
+        debug: Whether to enable debug logging
+
+    Returns:
+        Exit code (0 if every lookup succeeded, 1 otherwise)
+    """
+    from .bench import run_benchmark
+    from .stub_server import FaultProfile, StubServer
+
+    setup_logging(debug)
+    if not debug:
+        # Writing a message per lookup would dominate what is being measured
+        logging.getLogger().setLevel(logging.WARNING)
+    logger = logging.getLogger(__name__)
+
+    try:
+        logger.debug("Starting benchmark of %d lookups", requests)
+
+        weather_cache = WeatherCache() if cache else None
+        transport = transport or ConfigUtil.get_http_transport()
+        if stub:
+            with StubServer(FaultProfile(latency_ms=stub_latency_ms)) as server:
+                service = create_weather_service(
+                    weather_cache,
+                    base_url=server.base_url,
+                    api_key="bench",
+                    http_transport=transport,
+                    isolated=True,
+                )
+                result = run_benchmark(service, cities, requests, concurrency, rate)
+                result.upstream_requests = server.stats.requests
+        else:
+            service = create_weather_service(
+                weather_cache,
+                base_url=base_url,
+                # Real keys are only sent to the configured API
+                api_key="bench" if base_url else None,
+                http_transport=transport,
+                isolated=True,
+            )
+            result = run_benchmark(service, cities, requests, concurrency, rate)
+        result.transport = transport
+
+        document = json.dumps(result.to_dict(), indent=2)
+        if json_path == "-":
+            print(document)
+        else:
+            print(result.format_report())
+            if json_path is not None:
+                with open(json_path, "w", encoding="utf-8") as file:
+                    file.write(document + "\n")
+
+        return 0 if result.failed == 0 else 1
+
+    except ConfigException as e:
+        logger.error("Configuration error: %s", e)
+        print(f"Configuration Error: {e}", file=sys.stderr)
+        return 1
+
+    except OSError as e:
+        logger.error("Benchmark error: %s", e)
+        print(f"Benchmark Error: {e}", file=sys.stderr)
+        return 1
+
+    except KeyboardInterrupt:
+        logger.info("Benchmark interrupted by user")
+        print("\nBenchmark cancelled by user.", file=sys.stderr)
+        return 1
+
+    except Exception as e:
+        logger.error("Unexpected error: %s", e)
+        print(f"Unexpected Error: {e}", file=sys.stderr)
+        return 1
+
+
+def run_watch_cli(
+    cities: List[str],
+    interval: float = 60.0,
+    max_interval: float = 900.0,
+    debug: bool = False,
+    units: Units = Units.METRIC,
+    load_snapshot: Optional[str] = None,
+    save_snapshot: Optional[str] = None,
+) -> int:
+    """Run watch mode until interrupted.
+
+    Args:
+        cities: The city names to watch
+        interval: Seconds between polls while conditions are changing
+        max_interval: Longest wait between polls while conditions stay the same
+        debug: Whether to enable debug logging
+        units: The unit system to display temperatures in
+        load_snapshot: Optional cache snapshot file to warm-start from
+        save_snapshot: Optional file to write a cache snapshot to on exit
+
+    Returns:
+        Exit code (0 when stopped by the user, 1 on error)
+    """
+    from .watch import WeatherWatcher
+
+    setup_logging(debug)
+    logger = logging.getLogger(__name__)
+    weather_service: Optional[WeatherService] = None
+
+    try:
+        logger.debug("Starting weather watch for cities: %s", ", ".join(cities))
+
+        # Every scheduled poll is at least `interval` apart, so entries are always
+        # stale by the next poll and only serve as revalidation state.
+        weather_service = create_weather_service(
+            cache=WeatherCache(ttl_seconds=interval / 2, backend=create_cache_backend())
+        )
+        if load_snapshot:
+            import_cache_snapshot(weather_service, load_snapshot)
+        watcher = WeatherWatcher(
+            weather_service, cities, interval=interval, max_interval=max_interval, units=units
+        )
+        watcher.run()
+        return 0
+
+    except ConfigException as e:
+        logger.error("Configuration error: %s", e)
+        print(f"Configuration Error: {e}", file=sys.stderr)
+        return 1
+
+    except KeyboardInterrupt:
+        logger.info("Watch stopped by user")
+        return 0
+
+    except Exception as e:
+        logger.error("Unexpected error: %s", e)
+        print(f"Unexpected Error: {e}", file=sys.stderr)
+        return 1
+
+    finally:
+        if save_snapshot and weather_service is not None:
+            export_cache_snapshot(weather_service, save_snapshot)
+
+
+def run_snapshot_cli(action: str, path: str, debug: bool = False) -> int:
+    """Run the snapshot command against the configured shared cache backend.
+
+    Args:
+        action: "save" to write the shared cache to the file, "load" to restore it
+        path: The snapshot file
+        debug: Whether to enable debug logging
+
+    Returns:
+        Exit code (0 for success, 1 for error)
+    """
+    from .snapshot import load_snapshot, write_snapshot
+
+    setup_logging(debug)
+    logger = logging.getLogger(__name__)
+
+    try:
+        backend = create_cache_backend()
+        if backend is None:
+            raise ConfigException(
+                "Cache snapshots need a shared cache backend; "
+                "set WEATHER_CACHE_BACKEND to disk or redis."
+            )
+        cache = WeatherCache(backend=backend)
+        if action == "save":
+            count = write_snapshot(cache, path)
+            print(f"Saved {count} cache entries to {path}.")
+        else:
+            count = len(load_snapshot(cache, path))
+            print(f"Loaded {count} cache entries from {path}.")
+        return 0
+
+    except ConfigException as e:
+        logger.error("Configuration error: %s", e)
+        print(f"Configuration Error: {e}", file=sys.stderr)
+        return 1
+
+    except (OSError, ValueError) as e:
+        logger.error("Snapshot error: %s", e)
+        print(f"Snapshot Error: {e}", file=sys.stderr)
+        return 1
+
+    except Exception as e:
+        logger.error("Unexpected error: %s", e)
+        print(f"Unexpected Error: {e}", file=sys.stderr)
+        return 1
+
+
+def import_cache_snapshot(weather_service: WeatherService, path: str) -> None:
+    """Warm a service's cache from a snapshot file.
+
+    A missing or unreadable snapshot only means a cold start, so failures are
+    logged and otherwise ignored.
+
+    Args:
+        weather_service: The service to warm
+        path: The snapshot file
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        weather_service.import_snapshot(path)
+    except (OSError, ValueError) as e:
+        logger.warning("Starting with an empty cache, cannot load snapshot %s: %s", path, e)
+
+
+def export_cache_snapshot(weather_service: WeatherService, path: str) -> None:
+    """Write a service's cache to a snapshot file, reporting failures.
+
+    Args:
+        weather_service: The service whose cache is written
+        path: The snapshot file
+    """
+    logger = logging.getLogger(__name__)
+    try:
+        count = weather_service.export_snapshot(path)
+        logger.info("Saved %d cache entries to snapshot %s", count, path)
+    except (OSError, ValueError) as e:
+        logger.error("Cannot save snapshot %s: %s", path, e)
+        print(f"Cannot save cache snapshot: {e}", file=sys.stderr)
+
+
 def main() -> None:
     """Main entry point for the application."""
-    args = parse_arguments()
-    exit_code = run_weather_cli(args.city, args.debug)
+    if sys.argv[1:2] == ["compare"]:
+        compare_args = parse_compare_arguments()
+        exit_code = run_compare_cli(
+            compare_args.cities,
+            sort_by=compare_args.sort_by,
+            descending=not compare_args.ascending,
+            deadline=compare_args.deadline,
+            debug=compare_args.debug,
+            units=Units(compare_args.units),
+        )
+    elif sys.argv[1:2] == ["bulk"]:
+        bulk_args = parse_bulk_arguments()
+        exit_code = run_bulk_cli(
+            bulk_args.input,
+            bulk_args.output,
+            state_path=bulk_args.state,
+            resume=bulk_args.resume,
+            chunk_size=bulk_args.chunk_size,
+            max_workers=bulk_args.workers,
+            debug=bulk_args.debug,
+        )
+    elif sys.argv[1:2] == ["bench"]:
+        bench_args = parse_bench_arguments()
+        exit_code = run_bench_cli(
+            bench_args.cities,
+            requests=bench_args.requests,
+            concurrency=bench_args.concurrency,
+            rate=bench_args.rate,
+            base_url=bench_args.base_url,
+            stub=bench_args.stub,
+            stub_latency_ms=bench_args.stub_latency_ms,
+            cache=bench_args.cache,
+            transport=bench_args.transport,
+            json_path=bench_args.json,
+            debug=bench_args.debug,
+        )
+    elif sys.argv[1:2] == ["forecast"]:
+        forecast_args = parse_forecast_arguments()
+        exit_code = run_forecast_cli(
+            forecast_args.city, debug=forecast_args.debug, units=Units(forecast_args.units)
+        )
+    elif sys.argv[1:2] == ["snapshot"]:
+        snapshot_args = parse_snapshot_arguments()
+        exit_code = run_snapshot_cli(
+            snapshot_args.action, snapshot_args.file, debug=snapshot_args.debug
+        )
+    elif "--watch" in sys.argv[1:]:
+        watch_args = parse_watch_arguments()
+        exit_code = run_watch_cli(
+            watch_args.cities,
+            interval=watch_args.interval,
+            max_interval=watch_args.max_interval,
+            debug=watch_args.debug,
+            units=Units(watch_args.units),
+            load_snapshot=watch_args.load_snapshot,
+            save_snapshot=watch_args.save_snapshot,
+        )
+    else:
+        args = parse_arguments()
+        if args.city is not None:
+            exit_code = run_weather_cli(args.city, args.debug, units=Units(args.units))
+        else:
+            latitude, longitude = args.coordinates
+            exit_code = run_weather_cli(
+                None, args.debug, units=Units(args.units), coordinates=(latitude, longitude)
+            )
     sys.exit(exit_code)
 
 
@@ -0,0 +1,310 @@
+"""Negative cache of failed city lookups for the weather CLI application.
+
+Lookups that can never succeed on a retry, because the upstream does not know the
+city (404) or the name was rejected before any request was made, are remembered
+for a short while. Repeated lookups of the same bad name are then answered
+locally with the original error instead of costing a round trip and quota.
+Entries can optionally be persisted, so bad names in recurring batch inputs are
+remembered across runs. Writes are batched: a burst of failures rewrites the
+file at most once per save interval, and flush() writes whatever is left.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from .exceptions import InvalidCityNameException, WeatherApiException
+
+logger = logging.getLogger(__name__)
+
+NEGATIVE_CACHE_FORMAT = "weather-cli-negative-cache"
+NEGATIVE_CACHE_VERSION = 1
+
+# Upstream answers that will not change on a retry
+CACHEABLE_STATUS_CODES = frozenset({404})
+
+
+@dataclass(frozen=True)
+class NegativeEntry:
+    """A remembered failed lookup.
+
+    Attributes:
+        message: The original error message
+        status_code: The original HTTP status code, if any
+        expires_at: When the entry is forgotten (unix seconds)
+        invalid_name: Whether the name was rejected locally rather than by the upstream
+    """
+
+    message: str
+    status_code: Optional[int]
+    expires_at: float
+    invalid_name: bool = False
+
+    def to_exception(self) -> WeatherApiException:
+        """Recreate the original error.
+
+        Returns:
+            A new exception equal to the one originally raised
+        """
+        if self.invalid_name:
+            return InvalidCityNameException(self.message)
+        return WeatherApiException(self.message, self.status_code)
+
+
+@dataclass
+class NegativeCacheStats:
+    """Counters describing negative cache effectiveness.
+
+    Attributes:
+        hits: Lookups answered with a remembered error
+        misses: Lookups with no remembered error
+        stores: Errors remembered
+        requests_saved: Hits that would otherwise have made an upstream request
+    """
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    requests_saved: int = 0
+
+
+class NegativeCache:
+    """Thread-safe, bounded TTL cache of errors keyed by canonical city key."""
+
+    DEFAULT_TTL_SECONDS = 300.0
+    DEFAULT_MAX_ENTRIES = 1024
+    DEFAULT_SAVE_INTERVAL_SECONDS = 5.0
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        path: Optional[Union[str, Path]] = None,
+        clock: Callable[[], float] = time.time,
+        save_interval_seconds: float = DEFAULT_SAVE_INTERVAL_SECONDS,
+    ) -> None:
+        """Initialize the cache, loading persisted entries if a path is given.
+
+        Args:
+            ttl_seconds: How long a failed lookup is remembered
+            max_entries: Maximum number of entries kept before evicting the least
+                recently used
+            path: Optional file the entries are persisted to. A missing or unreadable
+                file starts an empty cache.
+            clock: Function returning the current time in unix seconds
+            save_interval_seconds: Minimum time between two writes of the file by
+                put(); stores in between are written by a later put() or by flush()
+
+        Raises:
+            ValueError: If ttl_seconds or max_entries is not positive, or the save
+                interval is negative
+        """
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        if save_interval_seconds < 0:
+            raise ValueError("save_interval_seconds must not be negative")
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.path = Path(path) if path is not None else None
+        self.save_interval_seconds = save_interval_seconds
+        self.stats = NegativeCacheStats()
+        self._clock = clock
+        self._entries: "OrderedDict[str, NegativeEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Serializes writes of the file; never held together with _lock
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_save: Optional[float] = None
+        if self.path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        """Return the number of entries currently held, including expired ones."""
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def is_cacheable(error: WeatherApiException) -> bool:
+        """Check whether an error is certain to happen again for the same city.
+
+        Args:
+            error: The error raised by a lookup
+
+        Returns:
+            True for invalid names and upstream "not found" answers
+        """
+        return (
+            isinstance(error, InvalidCityNameException)
+            or error.status_code in CACHEABLE_STATUS_CODES
+        )
+
+    def get(self, key: str) -> Optional[WeatherApiException]:
+        """Get the remembered error for a key and record the hit or miss.
+
+        Args:
+            key: The canonical city key
+
+        Returns:
+            A new exception equal to the remembered one, or None
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now >= entry.expires_at:
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            if not entry.invalid_name:
+                self.stats.requests_saved += 1
+        logger.debug("Negative cache hit for %s", key)
+        return entry.to_exception()
+
+    def put(self, key: str, error: WeatherApiException) -> bool:
+        """Remember an error for a key if it is cacheable.
+
+        Args:
+            key: The canonical city key
+            error: The error raised by the lookup
+
+        Returns:
+            True if the error was remembered
+        """
+        if not self.is_cacheable(error):
+            return False
+
+        entry = NegativeEntry(
+            message=str(error),
+            status_code=error.status_code,
+            expires_at=self._clock() + self.ttl_seconds,
+            invalid_name=isinstance(error, InvalidCityNameException),
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stats.stores += 1
+            self._dirty = True
+            save_due = self.path is not None and (
+                self._last_save is None
+                or self._clock() - self._last_save >= self.save_interval_seconds
+            )
+        if save_due:
+            self.save()
+        return True
+
+    def invalidate(self, key: str) -> None:
+        """Forget the error remembered for a key, if any.
+
+        Args:
+            key: The canonical city key
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def flush(self) -> None:
+        """Write entries stored since the last write, if any."""
+        with self._lock:
+            dirty = self._dirty
+        if dirty:
+            self.save()
+
+    def save(self) -> None:
+        """Write the unexpired entries to the persistence file atomically.
+
+        Failures are logged and otherwise ignored; the cache is best effort.
+        """
+        if self.path is None:
+            return
+        with self._save_lock:
+            self._save(self.path)
+
+    def _save(self, path: Path) -> None:
+        """Write a snapshot of the unexpired entries; called with the save lock held.
+
+        Args:
+            path: The persistence file
+        """
+        now = self._clock()
+        with self._lock:
+            self._dirty = False
+            self._last_save = now
+            entries = {
+                key: {
+                    "message": entry.message,
+                    "status_code": entry.status_code,
+                    "expires_at": entry.expires_at,
+                    "invalid_name": entry.invalid_name,
+                }
+                for key, entry in self._entries.items()
+                if entry.expires_at > now
+            }
+        document = {
+            "format": NEGATIVE_CACHE_FORMAT,
+            "version": NEGATIVE_CACHE_VERSION,
+            "entries": entries,
+        }
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            handle, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(handle, "w", encoding="utf-8") as file:
+                    json.dump(document, file)
+                os.replace(temporary, path)
+            except OSError:
+                os.unlink(temporary)
+                raise
+        except OSError as e:
+            logger.warning("Failed to save negative cache to %s: %s", path, e)
+
+    def _load(self) -> None:
+        """Read unexpired entries from the persistence file, if it exists."""
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                document = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable negative cache %s: %s", self.path, e)
+            return
+
+        if (
+            not isinstance(document, dict)
+            or document.get("format") != NEGATIVE_CACHE_FORMAT
+            or document.get("version") != NEGATIVE_CACHE_VERSION
+        ):
+            logger.warning("Ignoring negative cache %s with unsupported format", self.path)
+            return
+
+        now = self._clock()
+        for key, values in document.get("entries", {}).items():
+            try:
+                entry = NegativeEntry(
+                    message=str(values["message"]),
+                    status_code=values.get("status_code"),
+                    expires_at=float(values["expires_at"]),
+                    invalid_name=bool(values.get("invalid_name", False)),
+                )
+            except (KeyError, TypeError, ValueError):
+                continue
+            if entry.expires_at > now:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        logger.debug("Loaded %d negative cache entries from %s", len(self._entries), self.path)
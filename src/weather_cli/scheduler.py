@@ -0,0 +1,333 @@
+"""Priority-aware scheduling of upstream requests.
+
+When interactive lookups and bulk jobs share one service, a plain queue makes an
+interactive lookup wait behind every bulk request sent before it. The scheduler
+here bounds concurrent requests and, when they are all taken, hands freed slots
+out by weighted fair queuing between priority classes: with the default weights
+interactive requests get sixteen slots for every bulk one while both are
+waiting, and bulk requests get all capacity that interactive traffic leaves
+unused.
+
+The priority and deadline of a request are taken from the calling context, so
+code deep inside a batch job does not have to pass them along::
+
+    with request_priority(Priority.BULK, timeout=300):
+        run_batch(service)
+"""
+
+import contextvars
+import enum
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Iterator, Mapping, Optional, TypeVar
+
+from . import tracing
+from .forecast import ForecastSeries
+from .weather_client import FetchResult, Validators, WeatherApiClient
+from .weather_data import WeatherData
+from .exceptions import WeatherApiException
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Priority(enum.Enum):
+    """Priority classes of upstream requests."""
+
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
+
+
+DEFAULT_WEIGHTS: Mapping[Priority, float] = {Priority.INTERACTIVE: 16.0, Priority.BULK: 1.0}
+
+
+@dataclass(frozen=True)
+class RequestClass:
+    """How requests made in a context are scheduled.
+
+    Attributes:
+        priority: The priority class of the requests
+        deadline: Optional monotonic time after which queued requests are dropped
+    """
+
+    priority: Priority = Priority.INTERACTIVE
+    deadline: Optional[float] = None
+
+
+_request_class: contextvars.ContextVar[RequestClass] = contextvars.ContextVar(
+    "weather_cli_request_class", default=RequestClass()
+)
+
+
+def current_request_class() -> RequestClass:
+    """Return how requests made in the current context are scheduled."""
+    return _request_class.get()
+
+
+@contextmanager
+def request_priority(priority: Priority, timeout: Optional[float] = None) -> Iterator[None]:
+    """Schedule the requests made inside the block with a priority and deadline.
+
+    The setting follows the context, so it also applies to work started with
+    ``contextvars.copy_context().run`` from inside the block.
+
+    Args:
+        priority: The priority class of the requests
+        timeout: Optional number of seconds from now after which requests that are
+            still queued fail instead of being sent. An enclosing deadline that is
+            sooner is kept.
+
+    Yields:
+        Nothing
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    outer = _request_class.get().deadline
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+    token = _request_class.set(RequestClass(priority=priority, deadline=deadline))
+    try:
+        yield
+    finally:
+        _request_class.reset(token)
+
+
+@dataclass
+class SchedulerStats:
+    """Counters describing how requests were scheduled.
+
+    Attributes:
+        dispatched: Requests sent, by priority class
+        expired: Requests dropped because their deadline passed while queued
+        queued: Requests that had to wait for a slot, by priority class
+    """
+
+    dispatched: Dict[Priority, int] = field(default_factory=lambda: dict.fromkeys(Priority, 0))
+    expired: Dict[Priority, int] = field(default_factory=lambda: dict.fromkeys(Priority, 0))
+    queued: Dict[Priority, int] = field(default_factory=lambda: dict.fromkeys(Priority, 0))
+
+
+class _Ticket:
+    """A request waiting for a slot."""
+
+    __slots__ = ("priority", "deadline", "finish", "sequence", "granted")
+
+    def __init__(
+        self, priority: Priority, deadline: Optional[float], finish: float, sequence: int
+    ) -> None:
+        self.priority = priority
+        self.deadline = deadline
+        self.finish = finish
+        self.sequence = sequence
+        self.granted = False
+
+
+class RequestScheduler:
+    """Thread-safe scheduler bounding concurrent requests with weighted fair queuing.
+
+    Waiting requests are tagged with a virtual finish time, as in self-clocked fair
+    queuing: a class's requests are spaced 1/weight apart, starting no earlier than
+    the tag of the request last sent. A freed slot goes to the waiting request with
+    the earliest tag, so classes share slots in proportion to their weights while
+    they all wait, and an idle class leaves its share to the others.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        weights: Optional[Mapping[Priority, float]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Maximum number of requests sent at once
+            weights: Optional share of each priority class; DEFAULT_WEIGHTS if not given
+            clock: Monotonic clock that deadlines are measured with
+
+        Raises:
+            ValueError: If max_concurrency or a weight is not positive
+        """
+        weights = dict(weights or DEFAULT_WEIGHTS)
+        if max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+        if set(weights) != set(Priority) or any(weight <= 0 for weight in weights.values()):
+            raise ValueError("Every priority class needs a positive weight")
+
+        self.max_concurrency = max_concurrency
+        self.weights = weights
+        self.stats = SchedulerStats()
+        self._clock = clock
+        self._in_flight = 0
+        self._virtual_time = 0.0
+        self._last_finish: Dict[Priority, float] = dict.fromkeys(Priority, 0.0)
+        self._queues: Dict[Priority, Deque[_Ticket]] = {p: deque() for p in Priority}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        """The number of requests currently sent."""
+        with self._condition:
+            return self._in_flight
+
+    def queued(self, priority: Optional[Priority] = None) -> int:
+        """Return the number of waiting requests.
+
+        Args:
+            priority: Optional class to count; all classes if not given
+
+        Returns:
+            The number of requests waiting for a slot
+        """
+        with self._condition:
+            if priority is not None:
+                return len(self._queues[priority])
+            return sum(len(queue) for queue in self._queues.values())
+
+    def acquire(self, request_class: Optional[RequestClass] = None) -> None:
+        """Wait for a slot according to the request's priority and deadline.
+
+        Args:
+            request_class: How the request is scheduled; the current context's if
+                not given
+
+        Raises:
+            WeatherApiException: If the deadline passes before a slot is free
+        """
+        request_class = request_class or current_request_class()
+        priority = request_class.priority
+        with self._condition:
+            if self._in_flight < self.max_concurrency and not self._has_waiting():
+                self._in_flight += 1
+                self.stats.dispatched[priority] += 1
+                return
+
+            start = max(self._virtual_time, self._last_finish[priority])
+            finish = start + 1.0 / self.weights[priority]
+            self._last_finish[priority] = finish
+            ticket = _Ticket(priority, request_class.deadline, finish, next(self._sequence))
+            self._queues[priority].append(ticket)
+            self.stats.queued[priority] += 1
+
+            while not ticket.granted:
+                timeout = None
+                if ticket.deadline is not None:
+                    timeout = ticket.deadline - self._clock()
+                    if timeout <= 0:
+                        self._expire(ticket)
+                        raise WeatherApiException(
+                            "Request deadline passed before it could be sent."
+                        )
+                self._condition.wait(timeout)
+
+    def release(self) -> None:
+        """Free the slot of a finished request and hand it to the next waiting one."""
+        with self._condition:
+            self._in_flight -= 1
+            self._dispatch()
+
+    def _has_waiting(self) -> bool:
+        """Check whether any request is waiting; the lock must be held."""
+        return any(self._queues.values())
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting requests by earliest tag; the lock must be held."""
+        now = self._clock()
+        granted = False
+        while self._in_flight < self.max_concurrency:
+            ticket = self._next_ticket(now)
+            if ticket is None:
+                break
+            self._queues[ticket.priority].popleft()
+            self._virtual_time = ticket.finish
+            ticket.granted = True
+            granted = True
+            self._in_flight += 1
+            self.stats.dispatched[ticket.priority] += 1
+        if not self._has_waiting():
+            # Nothing is owed to anyone once every queue is empty
+            self._last_finish = dict.fromkeys(Priority, self._virtual_time)
+        if granted:
+            self._condition.notify_all()
+
+    def _next_ticket(self, now: float) -> Optional[_Ticket]:
+        """Return the waiting request with the earliest tag, dropping expired heads."""
+        heads = []
+        for queue in self._queues.values():
+            while queue and queue[0].deadline is not None and queue[0].deadline <= now:
+                self._expire(queue[0])
+            if queue:
+                heads.append(queue[0])
+        return min(heads, key=lambda ticket: (ticket.finish, ticket.sequence), default=None)
+
+    def _expire(self, ticket: _Ticket) -> None:
+        """Remove a request whose deadline passed; the lock must be held."""
+        queue = self._queues[ticket.priority]
+        if ticket in queue:
+            queue.remove(ticket)
+            self.stats.expired[ticket.priority] += 1
+            logger.debug("Dropped queued %s request past its deadline", ticket.priority.value)
+            # The waiting thread notices on its next wakeup
+            self._condition.notify_all()
+
+
+class SchedulingClient(WeatherApiClient):
+    """Weather API client that sends requests to another client through a scheduler.
+
+    Each request is scheduled with the priority and deadline of the context it is
+    made in; see request_priority.
+    """
+
+    def __init__(
+        self, client: WeatherApiClient, scheduler: Optional[RequestScheduler] = None
+    ) -> None:
+        """Initialize the client.
+
+        Args:
+            client: The client requests are sent to
+            scheduler: Optional scheduler. If not provided, a RequestScheduler with
+                default settings is used.
+        """
+        self.client = client
+        self.scheduler = scheduler or RequestScheduler()
+
+    def get_weather_from_api(self, city: str) -> WeatherData:
+        """Get weather data for a city once the scheduler allows it."""
+        return self._scheduled(lambda: self.client.get_weather_from_api(city))
+
+    def fetch_weather(self, city: str, validators: Optional[Validators] = None) -> FetchResult:
+        """Fetch weather data for a city once the scheduler allows it."""
+        return self._scheduled(lambda: self.client.fetch_weather(city, validators))
+
+    def get_forecast_from_api(self, city: str) -> ForecastSeries:
+        """Get the forecast for a city once the scheduler allows it."""
+        return self._scheduled(lambda: self.client.get_forecast_from_api(city))
+
+    def get_weather_by_coordinates(self, latitude: float, longitude: float) -> WeatherData:
+        """Get weather data for a location once the scheduler allows it."""
+        return self._scheduled(lambda: self.client.get_weather_by_coordinates(latitude, longitude))
+
+    def _scheduled(self, call: Callable[[], T]) -> T:
+        """Run a request in a scheduler slot.
+
+        Args:
+            call: Function performing the request
+
+        Returns:
+            The result of the request
+
+        Raises:
+            WeatherApiException: If the request fails or its deadline passes while queued
+        """
+        with tracing.span("scheduler.wait", priority=current_request_class().priority.name):
+            self.scheduler.acquire()
+        try:
+            return call()
+        finally:
+            self.scheduler.release()
@@ -0,0 +1,157 @@
+"""Cache snapshots for warm-starting the weather CLI application.
+
+A snapshot is a gzip-compressed JSON document holding every cache entry with its
+timestamps and revalidation metadata. Entries are stored as rows under a list of
+field names, which keeps the file compact and lets newer versions add fields.
+Loading a snapshot restores each entry with its original expiry, so it is fresh
+for exactly the TTL it had left; expired entries still carry their validators
+and are revalidated instead of downloaded again.
+"""
+
+import gzip
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Dict, List, Tuple, Union
+
+from .cache import CacheEntry, WeatherCache
+from .weather_data import WeatherData
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "weather-cli-cache-snapshot"
+SNAPSHOT_VERSION = 1
+
+ENTRY_FIELDS = ("key", "stored_at", "expires_at", "etag", "last_modified")
+DATA_FIELDS = tuple(field.name for field in fields(WeatherData))
+
+
+def write_snapshot(cache: WeatherCache, path: Union[str, Path]) -> int:
+    """Write every cache entry to a snapshot file, replacing it atomically.
+
+    Args:
+        cache: The cache to export
+        path: The snapshot file to write
+
+    Returns:
+        The number of entries written
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    path = Path(path)
+    rows: List[List[Any]] = []
+    for key, entry in cache.entries():
+        row: List[Any] = [key, entry.stored_at, entry.expires_at, entry.etag, entry.last_modified]
+        row.extend(getattr(entry.data, name) for name in DATA_FIELDS)
+        rows.append(row)
+
+    document = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "created_at": time.time(),
+        "ttl_seconds": cache.ttl_seconds,
+        "fields": [*ENTRY_FIELDS, *DATA_FIELDS],
+        "entries": rows,
+    }
+    encoded = json.dumps(document, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(gzip.compress(encoded))
+        os.replace(temporary, path)
+    except OSError:
+        os.unlink(temporary)
+        raise
+    logger.debug("Wrote %d cache entries to snapshot %s", len(rows), path)
+    return len(rows)
+
+
+def read_snapshot(path: Union[str, Path]) -> List[Tuple[str, CacheEntry]]:
+    """Read the entries of a snapshot file.
+
+    Rows that cannot be turned into valid entries are skipped.
+
+    Args:
+        path: The snapshot file to read
+
+    Returns:
+        (key, entry) pairs, least recently used first
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a supported snapshot
+    """
+    try:
+        with gzip.open(path, "rb") as file:
+            document = json.loads(file.read().decode("utf-8"))
+    except (gzip.BadGzipFile, EOFError, UnicodeDecodeError) as e:
+        raise ValueError(f"Not a cache snapshot file: {path}") from e
+
+    if not isinstance(document, dict) or document.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Not a cache snapshot file: {path}")
+    if document.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported cache snapshot version: {document.get('version')}")
+
+    names = document.get("fields", [])
+    entries: List[Tuple[str, CacheEntry]] = []
+    for row in document.get("entries", []):
+        try:
+            entries.append(_entry_from_row(dict(zip(names, row))))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug("Skipping invalid snapshot entry: %s", e)
+    return entries
+
+
+def load_snapshot(cache: WeatherCache, path: Union[str, Path]) -> List[Tuple[str, CacheEntry]]:
+    """Restore the entries of a snapshot file into a cache.
+
+    Args:
+        cache: The cache to warm
+        path: The snapshot file to read
+
+    Returns:
+        The restored (key, entry) pairs
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a supported snapshot
+    """
+    entries = read_snapshot(path)
+    for key, entry in entries:
+        cache.restore(key, entry)
+    now = cache.now()
+    fresh = sum(1 for _, entry in entries if entry.is_fresh(now))
+    logger.info("Loaded %d cache entries (%d fresh) from snapshot %s", len(entries), fresh, path)
+    return entries
+
+
+def _entry_from_row(values: Dict[str, Any]) -> Tuple[str, CacheEntry]:
+    """Build a cache entry from the named values of a snapshot row.
+
+    Args:
+        values: The row values keyed by field name
+
+    Returns:
+        The cache key and entry
+
+    Raises:
+        KeyError: If a required field is missing
+        TypeError: If a field has an invalid type
+        ValueError: If a field has an invalid value
+    """
+    data = WeatherData(**{name: values[name] for name in DATA_FIELDS if name in values})
+    entry = CacheEntry(
+        data=data,
+        stored_at=float(values["stored_at"]),
+        expires_at=float(values["expires_at"]),
+        etag=values.get("etag"),
+        last_modified=values.get("last_modified"),
+    )
+    return str(values["key"]), entry
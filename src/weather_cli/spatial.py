@@ -0,0 +1,213 @@
+"""In-memory spatial index for nearest-location weather lookups.
+
+Points are bucketed into a fixed grid of latitude/longitude cells (similar to a
+geohash prefix). A radius query only visits the cells that can hold a point
+within the radius, and candidates are ranked by great-circle distance.
+"""
+
+import math
+import threading
+from typing import Dict, Iterator, List, Set, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LATITUDE = math.pi * EARTH_RADIUS_KM / 180.0
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """Return the great-circle distance between two points.
+
+    Args:
+        latitude1: Latitude of the first point in degrees
+        longitude1: Longitude of the first point in degrees
+        latitude2: Latitude of the second point in degrees
+        longitude2: Longitude of the second point in degrees
+
+    Returns:
+        The distance in kilometers
+    """
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    delta_phi = phi2 - phi1
+    delta_lambda = math.radians(longitude2 - longitude1)
+    a = (
+        math.sin(delta_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def validate_coordinates(latitude: float, longitude: float) -> None:
+    """Check that coordinates are in range.
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees
+
+    Raises:
+        ValueError: If either coordinate is out of range
+    """
+    if not -90 <= latitude <= 90:
+        raise ValueError("latitude must be between -90 and 90")
+    if not -180 <= longitude <= 180:
+        raise ValueError("longitude must be between -180 and 180")
+
+
+class SpatialIndex:
+    """Thread-safe grid index mapping keys to locations."""
+
+    DEFAULT_CELL_DEGREES = 0.25
+
+    def __init__(self, cell_degrees: float = DEFAULT_CELL_DEGREES) -> None:
+        """Initialize the index.
+
+        Args:
+            cell_degrees: Size of a grid cell in degrees; roughly the expected query radius
+
+        Raises:
+            ValueError: If cell_degrees is not positive
+        """
+        if cell_degrees <= 0:
+            raise ValueError("cell_degrees must be positive")
+
+        self.cell_degrees = cell_degrees
+        self._longitude_cells = math.ceil(360.0 / cell_degrees)
+        self._cells: Dict[Cell, Set[str]] = {}
+        self._points: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of indexed keys."""
+        with self._lock:
+            return len(self._points)
+
+    def __contains__(self, key: object) -> bool:
+        """Return whether a key is indexed."""
+        with self._lock:
+            return key in self._points
+
+    def insert(self, key: str, latitude: float, longitude: float) -> None:
+        """Index a key at a location, replacing its previous location.
+
+        Args:
+            key: The key, such as a cache key
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Raises:
+            ValueError: If the coordinates are out of range
+        """
+        validate_coordinates(latitude, longitude)
+        with self._lock:
+            self._remove(key)
+            self._points[key] = (latitude, longitude)
+            self._cells.setdefault(self._cell(latitude, longitude), set()).add(key)
+
+    def remove(self, key: str) -> None:
+        """Remove a key from the index, if present.
+
+        Args:
+            key: The key to remove
+        """
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every key from the index."""
+        with self._lock:
+            self._cells.clear()
+            self._points.clear()
+
+    def within(
+        self, latitude: float, longitude: float, radius_km: float
+    ) -> List[Tuple[str, float]]:
+        """Find the keys within a radius of a location, nearest first.
+
+        Args:
+            latitude: Latitude of the query point in degrees
+            longitude: Longitude of the query point in degrees
+            radius_km: Search radius in kilometers
+
+        Returns:
+            (key, distance in kilometers) pairs sorted by distance
+
+        Raises:
+            ValueError: If the coordinates are out of range
+        """
+        validate_coordinates(latitude, longitude)
+        matches: List[Tuple[str, float]] = []
+        with self._lock:
+            for cell in self._cells_near(latitude, longitude, radius_km):
+                for key in self._cells.get(cell, ()):
+                    point_latitude, point_longitude = self._points[key]
+                    distance = haversine_km(latitude, longitude, point_latitude, point_longitude)
+                    if distance <= radius_km:
+                        matches.append((key, distance))
+        matches.sort(key=lambda match: match[1])
+        return matches
+
+    def _remove(self, key: str) -> None:
+        """Remove a key from the index. Must be called with the lock held.
+
+        Args:
+            key: The key to remove
+        """
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        keys = self._cells[cell]
+        keys.discard(key)
+        if not keys:
+            del self._cells[cell]
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        """Return the grid cell holding a location.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Returns:
+            The (row, column) of the cell
+        """
+        row = math.floor((latitude + 90.0) / self.cell_degrees)
+        column = math.floor((longitude + 180.0) / self.cell_degrees) % self._longitude_cells
+        return row, column
+
+    def _cells_near(self, latitude: float, longitude: float, radius_km: float) -> Iterator[Cell]:
+        """Yield every grid cell that may hold a point within a radius.
+
+        Args:
+            latitude: Latitude of the query point in degrees
+            longitude: Longitude of the query point in degrees
+            radius_km: Search radius in kilometers
+
+        Yields:
+            Candidate cells, each once
+        """
+        latitude_span = radius_km / KM_PER_DEGREE_LATITUDE
+        south = max(-90.0, latitude - latitude_span)
+        north = min(90.0, latitude + latitude_span)
+
+        # Meridians converge towards the poles, so a radius spans more longitude there
+        widest_latitude = max(abs(south), abs(north))
+        cos_latitude = math.cos(math.radians(widest_latitude))
+        if cos_latitude <= 1e-9 or north >= 90.0 or south <= -90.0:
+            longitude_cells = self._longitude_cells
+        else:
+            longitude_span = latitude_span / cos_latitude
+            longitude_cells = 2 * math.ceil(longitude_span / self.cell_degrees) + 1
+
+        first_row, center_column = self._cell(south, longitude)
+        last_row = self._cell(north, longitude)[0]
+        if longitude_cells >= self._longitude_cells:
+            columns = range(self._longitude_cells)
+        else:
+            half = longitude_cells // 2
+            columns = range(center_column - half, center_column + half + 1)
+
+        for row in range(first_row, last_row + 1):
+            for column in columns:
+                yield row, column % self._longitude_cells
@@ -0,0 +1,778 @@
+"""Local OpenWeatherMap stub server with latency and fault injection.
+
+Serves ``/weather``, ``/group`` and ``/forecast`` with synthetic payloads shaped
+like the real API (see ``docs/OpenWeatherAPI.md``), so the client and its
+performance features can be measured without network access. Point the client
+at it with ``OPENWEATHERMAP_API_URL``.
+
+Run it with::
+
+    python -m weather_cli.stub_server --port 8080 --latency-ms 80 --jitter-ms 40 \\
+        --error-rate 429=0.02 --error-rate 503=0.01 --reset-rate 0.005
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "exponential")
+INJECTABLE_STATUS_CODES = frozenset({401, 404, 429, 500, 502, 503, 504})
+KELVIN_OFFSET = 273.15
+FORECAST_SLOTS = 40
+FORECAST_STEP_SECONDS = 3 * 3600
+
+_CONDITIONS: Tuple[Tuple[int, str, str], ...] = (
+    (800, "Clear", "clear sky"),
+    (801, "Clouds", "few clouds"),
+    (803, "Clouds", "broken clouds"),
+    (500, "Rain", "light rain"),
+    (501, "Rain", "moderate rain"),
+    (300, "Drizzle", "light intensity drizzle"),
+    (600, "Snow", "light snow"),
+    (741, "Fog", "fog"),
+)
+
+_ERROR_MESSAGES = {
+    401: "Invalid API key. Please see https://openweathermap.org/faq#error401 for more info.",
+    404: "city not found",
+    429: "Your account is temporary blocked due to exceeding of requests limitation.",
+}
+
+
+@dataclass(frozen=True)
+class FaultProfile:
+    """Latency and fault injection settings of the stub server.
+
+    Attributes:
+        latency_ms: Mean response latency in milliseconds
+        jitter_ms: Spread of the latency; its meaning depends on the distribution
+        distribution: One of LATENCY_DISTRIBUTIONS
+        error_rates: Probability of answering with each injected HTTP status code
+        reset_rate: Probability of resetting the connection instead of answering
+        slow_body_rate: Probability of trickling the body out in small chunks
+        slow_body_chunk_delay_ms: Pause between chunks of a slow body
+        update_seconds: How often the synthetic observations change
+        send_validators: Whether ETag headers are sent and If-None-Match is honoured
+        seed: Optional random seed for reproducible fault sequences
+    """
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    distribution: str = "constant"
+    error_rates: Dict[int, float] = field(default_factory=dict)
+    reset_rate: float = 0.0
+    slow_body_rate: float = 0.0
+    slow_body_chunk_delay_ms: float = 50.0
+    update_seconds: int = 600
+    send_validators: bool = True
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        """Validate the settings after initialization."""
+        if self.distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of: {', '.join(LATENCY_DISTRIBUTIONS)}")
+        if self.latency_ms < 0 or self.jitter_ms < 0 or self.slow_body_chunk_delay_ms < 0:
+            raise ValueError("latencies must not be negative")
+        if self.update_seconds <= 0:
+            raise ValueError("update_seconds must be positive")
+        for status_code in self.error_rates:
+            if status_code not in INJECTABLE_STATUS_CODES:
+                raise ValueError(f"Cannot inject HTTP status {status_code}")
+        rates = [*self.error_rates.values(), self.reset_rate, self.slow_body_rate]
+        if any(not 0 <= rate <= 1 for rate in rates):
+            raise ValueError("rates must be between 0 and 1")
+        if sum(self.error_rates.values()) + self.reset_rate > 1:
+            raise ValueError("error and reset rates must not add up to more than 1")
+
+    def sample_latency(self, rng: random.Random) -> float:
+        """Draw one response latency.
+
+        Args:
+            rng: The random number generator
+
+        Returns:
+            The latency in seconds, never negative
+        """
+        mean = self.latency_ms
+        if self.distribution == "uniform":
+            latency = rng.uniform(mean - self.jitter_ms, mean + self.jitter_ms)
+        elif self.distribution == "normal":
+            latency = rng.gauss(mean, self.jitter_ms)
+        elif self.distribution == "exponential":
+            latency = rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+        else:
+            latency = mean
+        return max(0.0, latency) / 1000.0
+
+
+@dataclass
+class StubStats:
+    """Counters describing the traffic the stub server handled.
+
+    Attributes:
+        requests: Requests received
+        responses: Responses sent, keyed by HTTP status code
+        resets: Connections reset on purpose
+        slow_bodies: Bodies trickled out slowly
+        bytes_sent: Response body bytes sent
+        traced: Requests carrying a valid W3C ``traceparent`` header
+        connections: Client connections accepted
+    """
+
+    requests: int = 0
+    responses: Dict[int, int] = field(default_factory=dict)
+    resets: int = 0
+    slow_bodies: int = 0
+    bytes_sent: int = 0
+    traced: int = 0
+    connections: int = 0
+
+    @property
+    def not_modified(self) -> int:
+        """Number of 304 Not Modified responses."""
+        return self.responses.get(304, 0)
+
+
+def city_seed(name: str) -> int:
+    """Return a stable seed for a city name.
+
+    Args:
+        name: The city name
+
+    Returns:
+        A seed that is the same for every spelling differing only in case or spacing
+    """
+    return zlib.crc32(" ".join(name.split()).casefold().encode("utf-8"))
+
+
+class SyntheticWeather:
+    """Deterministic synthetic observations and forecasts keyed by city."""
+
+    def __init__(self, update_seconds: int = 600, clock: Callable[[], float] = time.time) -> None:
+        """Initialize the generator.
+
+        Args:
+            update_seconds: How often observations change
+            clock: Function returning the current unix time
+        """
+        self.update_seconds = update_seconds
+        self._clock = clock
+
+    def observation_time(self) -> int:
+        """Return the time of the current synthetic observation (unix, UTC)."""
+        now = int(self._clock())
+        return now - now % self.update_seconds
+
+    def current(
+        self, name: str, units: str = "standard", coordinates: Optional[Tuple[float, float]] = None
+    ) -> Dict[str, Any]:
+        """Build a ``/weather`` payload.
+
+        Args:
+            name: The city name
+            units: The requested unit system
+            coordinates: Optional (latitude, longitude) the lookup was made for
+
+        Returns:
+            The JSON-serializable payload
+        """
+        seed = city_seed(name)
+        observed_at = self.observation_time()
+        if coordinates is None:
+            latitude = round((seed % 15000) / 100.0 - 75.0, 4)
+            longitude = round((seed // 15000 % 36000) / 100.0 - 180.0, 4)
+        else:
+            latitude, longitude = coordinates
+        condition_id, group, description = _CONDITIONS[(seed + observed_at // 3600) % 8]
+        celsius = self._temperature(seed, latitude, observed_at)
+        return {
+            "coord": {"lon": longitude, "lat": latitude},
+            "weather": [
+                {"id": condition_id, "main": group, "description": description, "icon": "01d"}
+            ],
+            "base": "stations",
+            "main": {
+                "temp": _convert(celsius, units),
+                "feels_like": _convert(celsius - 1.5, units),
+                "temp_min": _convert(celsius - 2.0, units),
+                "temp_max": _convert(celsius + 2.0, units),
+                "pressure": 1000 + seed % 30,
+                "humidity": 40 + seed % 55,
+            },
+            "visibility": 10000,
+            "wind": {"speed": round(1 + seed % 90 / 10.0, 2), "deg": seed % 360},
+            "clouds": {"all": seed % 101},
+            "dt": observed_at,
+            "sys": {"country": "ZZ", "sunrise": observed_at - 21600, "sunset": observed_at + 21600},
+            "timezone": 0,
+            "id": 1000000 + seed % 9000000,
+            "name": name,
+            "cod": 200,
+        }
+
+    def forecast(self, name: str, units: str = "standard") -> Dict[str, Any]:
+        """Build a ``/forecast`` payload with 5 days of 3-hour slots.
+
+        Args:
+            name: The city name
+            units: The requested unit system
+
+        Returns:
+            The JSON-serializable payload
+        """
+        seed = city_seed(name)
+        current = self.current(name, units)
+        start = current["dt"] - current["dt"] % FORECAST_STEP_SECONDS + FORECAST_STEP_SECONDS
+        slots = []
+        for index in range(FORECAST_SLOTS):
+            slot_time = start + index * FORECAST_STEP_SECONDS
+            celsius = self._temperature(seed, current["coord"]["lat"], slot_time)
+            condition_id, group, description = _CONDITIONS[(seed + slot_time // 3600) % 8]
+            slots.append(
+                {
+                    "dt": slot_time,
+                    "main": {
+                        "temp": _convert(celsius, units),
+                        "humidity": 40 + (seed + index) % 55,
+                    },
+                    "weather": [{"id": condition_id, "main": group, "description": description}],
+                    "wind": {"speed": round(1 + (seed + index) % 90 / 10.0, 2)},
+                }
+            )
+        return {
+            "cod": "200",
+            "cnt": len(slots),
+            "list": slots,
+            "city": {
+                "id": current["id"],
+                "name": name,
+                "coord": current["coord"],
+                "timezone": current["timezone"],
+            },
+        }
+
+    def _temperature(self, seed: int, latitude: float, at: int) -> float:
+        """Return a plausible temperature in Celsius with a daily cycle.
+
+        Args:
+            seed: The city seed
+            latitude: The city latitude, colder towards the poles
+            at: The time (unix, UTC)
+
+        Returns:
+            The temperature in Celsius
+        """
+        base = 28.0 - abs(latitude) * 0.5 + (seed % 70) / 10.0 - 3.5
+        daily = 5.0 * math.sin(2 * math.pi * ((at % 86400) / 86400.0 - 0.375))
+        return round(base + daily, 2)
+
+
+def _convert(celsius: float, units: str) -> float:
+    """Convert a Celsius temperature to the requested unit system.
+
+    Args:
+        celsius: Temperature in Celsius
+        units: "metric", "imperial" or "standard"
+
+    Returns:
+        The converted temperature
+    """
+    if units == "metric":
+        return celsius
+    if units == "imperial":
+        return round(celsius * 9.0 / 5.0 + 32.0, 2)
+    return round(celsius + KELVIN_OFFSET, 2)
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Request handler of the stub server; configuration lives on the server."""
+
+    server: "StubHTTPServer"
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, kept-alive
+    # connections wait for the client's delayed ACK before the body is sent
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        """Count the accepted connection."""
+        super().setup()
+        self.server.count_connection()
+
+    def do_HEAD(self) -> None:  # noqa: N802 - http.server naming
+        """Answer a HEAD request, as sent to open or keep alive a connection."""
+        self.server.count_request()
+        self._send(200, b"", {})
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        """Serve one GET request, joining the caller's trace if it sent one."""
+        traceparent = self.headers.get(tracing.TRACEPARENT_HEADER)
+        with tracing.continue_trace(traceparent) as remote:
+            self.server.count_request(traced=remote is not None)
+            with tracing.span("stub.handle", path=self.path.split("?", 1)[0]):
+                self._handle_get()
+
+    def _handle_get(self) -> None:
+        """Serve one GET request, injecting latency and faults."""
+        stub = self.server
+
+        status_code, fault = stub.draw_outcome()
+        time.sleep(stub.draw_latency())
+
+        if fault == "reset":
+            self._reset_connection()
+            return
+
+        url = urllib.parse.urlsplit(self.path)
+        endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+        query = dict(urllib.parse.parse_qsl(url.query))
+
+        if status_code is None and not query.get("appid"):
+            status_code = 401
+        if status_code is not None:
+            self._send_error(status_code)
+            return
+
+        try:
+            payload = self._build_payload(endpoint, query)
+        except LookupError:
+            self._send_error(404)
+            return
+        except ValueError as e:
+            self._send_json(400, {"cod": "400", "message": str(e)})
+            return
+
+        body = json.dumps(payload).encode("utf-8")
+        etag = f'"{zlib.crc32(body):08x}"'
+        headers = {"ETag": etag} if stub.profile.send_validators else {}
+        if stub.profile.send_validators and self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", headers)
+            return
+        self._send(200, body, headers, slow=fault == "slow")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Send access logs to the module logger instead of stderr."""
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _build_payload(self, endpoint: str, query: Dict[str, str]) -> Dict[str, Any]:
+        """Build the payload of a successful response.
+
+        Args:
+            endpoint: The last path segment, such as "weather"
+            query: The decoded query parameters
+
+        Returns:
+            The JSON-serializable payload
+
+        Raises:
+            LookupError: If the endpoint or city does not exist
+            ValueError: If the query parameters are invalid
+        """
+        stub = self.server
+        units = query.get("units", "standard")
+        if endpoint == "weather":
+            if "lat" in query and "lon" in query:
+                coordinates = (float(query["lat"]), float(query["lon"]))
+                name = f"Place {coordinates[0]:.1f},{coordinates[1]:.1f}"
+                return stub.weather.current(name, units, coordinates)
+            return stub.weather.current(stub.lookup_city(query.get("q", "")), units)
+        if endpoint == "forecast":
+            return stub.weather.forecast(stub.lookup_city(query.get("q", "")), units)
+        if endpoint == "group":
+            ids = [value for value in query.get("id", "").split(",") if value.strip()]
+            if not ids:
+                raise ValueError("id is required")
+            cities = [stub.weather.current(f"City {int(value)}", units) for value in ids]
+            for city, value in zip(cities, ids):
+                city["id"] = int(value)
+            return {"cnt": len(cities), "list": cities}
+        raise LookupError(endpoint)
+
+    def _send_error(self, status_code: int) -> None:
+        """Send an error response shaped like the real API's.
+
+        Args:
+            status_code: The HTTP status code
+        """
+        message = _ERROR_MESSAGES.get(status_code, "Internal error")
+        self._send_json(status_code, {"cod": status_code, "message": message})
+
+    def _send_json(self, status_code: int, payload: Dict[str, Any]) -> None:
+        """Send a JSON response.
+
+        Args:
+            status_code: The HTTP status code
+            payload: The JSON-serializable payload
+        """
+        self._send(status_code, json.dumps(payload).encode("utf-8"), {})
+
+    def _send(
+        self, status_code: int, body: bytes, headers: Dict[str, str], slow: bool = False
+    ) -> None:
+        """Send a response, optionally trickling the body out in small chunks.
+
+        Args:
+            status_code: The HTTP status code
+            body: The response body
+            headers: Extra response headers
+            slow: Whether to send the body slowly
+        """
+        stub = self.server
+        # Count first, so a client that has read the response sees it counted
+        stub.count_response(status_code, len(body))
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        if slow and body:
+            stub.count_slow_body()
+            chunk_size = max(1, len(body) // 8)
+            delay = stub.profile.slow_body_chunk_delay_ms / 1000.0
+            for offset in range(0, len(body), chunk_size):
+                chunk_end = offset + chunk_size
+                self.wfile.write(body[offset:chunk_end])
+                self.wfile.flush()
+                time.sleep(delay)
+        else:
+            self.wfile.write(body)
+
+    def _reset_connection(self) -> None:
+        """Abort the connection with a TCP reset instead of answering."""
+        self.server.count_reset()
+        self.close_connection = True
+        # A zero linger timeout makes close() send RST instead of FIN
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        self.connection.close()
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    """Threading HTTP server holding the stub configuration and statistics."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        profile: FaultProfile,
+        known_cities: Optional[FrozenSet[str]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the server.
+
+        Args:
+            address: The (host, port) to listen on; port 0 picks a free port
+            profile: Latency and fault injection settings
+            known_cities: Optional set of city names that exist; other cities get a
+                404. If not provided, every city exists.
+            clock: Function returning the current unix time of the synthetic data
+        """
+        super().__init__(address, StubRequestHandler)
+        self.profile = profile
+        self.known_cities = (
+            frozenset(" ".join(city.split()).casefold() for city in known_cities)
+            if known_cities is not None
+            else None
+        )
+        self.weather = SyntheticWeather(profile.update_seconds, clock)
+        self.stats = StubStats()
+        self._rng = random.Random(profile.seed)
+        self._lock = threading.Lock()
+
+    def lookup_city(self, name: str) -> str:
+        """Return the display name of a known city.
+
+        Args:
+            name: The requested city name
+
+        Returns:
+            The city name with normalized spacing
+
+        Raises:
+            LookupError: If the city does not exist
+            ValueError: If no city name was given
+        """
+        display = " ".join(name.split())
+        if not display:
+            raise ValueError("Nothing to geocode")
+        if self.known_cities is not None and display.casefold() not in self.known_cities:
+            raise LookupError(name)
+        return display
+
+    def draw_outcome(self) -> Tuple[Optional[int], Optional[str]]:
+        """Decide whether the next request fails and how.
+
+        Returns:
+            An injected status code or None, and "reset", "slow" or None
+        """
+        profile = self.profile
+        with self._lock:
+            roll = self._rng.random()
+            slow = self._rng.random() < profile.slow_body_rate
+        if roll < profile.reset_rate:
+            return None, "reset"
+        threshold = profile.reset_rate
+        for status_code, rate in sorted(profile.error_rates.items()):
+            threshold += rate
+            if roll < threshold:
+                return status_code, None
+        return None, "slow" if slow else None
+
+    def draw_latency(self) -> float:
+        """Draw the latency of the next response in seconds."""
+        with self._lock:
+            return self.profile.sample_latency(self._rng)
+
+    def count_request(self, traced: bool = False) -> None:
+        """Count a received request.
+
+        Args:
+            traced: Whether the request carried a valid trace context
+        """
+        with self._lock:
+            self.stats.requests += 1
+            self.stats.traced += traced
+
+    def count_connection(self) -> None:
+        """Count an accepted connection."""
+        with self._lock:
+            self.stats.connections += 1
+
+    def count_response(self, status_code: int, body_bytes: int) -> None:
+        """Count a sent response.
+
+        Args:
+            status_code: The HTTP status code
+            body_bytes: Size of the body sent
+        """
+        with self._lock:
+            self.stats.responses[status_code] = self.stats.responses.get(status_code, 0) + 1
+            self.stats.bytes_sent += body_bytes
+
+    def count_reset(self) -> None:
+        """Count a connection reset."""
+        with self._lock:
+            self.stats.resets += 1
+
+    def count_slow_body(self) -> None:
+        """Count a slowly sent body."""
+        with self._lock:
+            self.stats.slow_bodies += 1
+
+
+class StubServer:
+    """Stub server running in a background thread, for tests and benchmarks."""
+
+    def __init__(
+        self,
+        profile: Optional[FaultProfile] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        known_cities: Optional[FrozenSet[str]] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """Initialize the server; it starts listening immediately.
+
+        Args:
+            profile: Optional latency and fault injection settings. Defaults to a
+                fast, fault-free profile.
+            host: The interface to listen on
+            port: The port to listen on; 0 picks a free port
+            known_cities: Optional set of city names that exist
+            clock: Function returning the current unix time of the synthetic data
+        """
+        self.httpd = StubHTTPServer((host, port), profile or FaultProfile(), known_cities, clock)
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "StubServer":
+        """Start serving when used as a context manager."""
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop serving when leaving the context."""
+        self.stop()
+
+    @property
+    def base_url(self) -> str:
+        """The API base URL to point the client at."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host!s}:{port}/data/2.5"
+
+    @property
+    def stats(self) -> StubStats:
+        """The traffic counters."""
+        return self.httpd.stats
+
+    @property
+    def profile(self) -> FaultProfile:
+        """The active latency and fault injection settings."""
+        return self.httpd.profile
+
+    @profile.setter
+    def profile(self, profile: FaultProfile) -> None:
+        """Replace the latency and fault injection settings."""
+        self.httpd.profile = profile
+
+    def start(self) -> "StubServer":
+        """Start serving in a background thread.
+
+        Returns:
+            This server
+        """
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="weather-stub-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and close the listening socket."""
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+
+def parse_error_rate(value: str) -> Tuple[int, float]:
+    """Parse a STATUS=RATE command line value.
+
+    Args:
+        value: The value, such as "429=0.05"
+
+    Returns:
+        The status code and rate
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is malformed
+    """
+    try:
+        status, rate = value.split("=", 1)
+        return int(status), float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected STATUS=RATE, got: {value}")
+
+
+def parse_arguments(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Args:
+        argv: Optional arguments. Defaults to sys.argv[1:].
+
+    Returns:
+        Parsed arguments namespace
+    """
+    parser = argparse.ArgumentParser(
+        description="Local OpenWeatherMap stub server with latency and fault injection",
+        prog="python -m weather_cli.stub_server",
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Mean response latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Spread of the latency")
+    parser.add_argument(
+        "--distribution",
+        choices=LATENCY_DISTRIBUTIONS,
+        default="constant",
+        help="Latency distribution (default: constant)",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=parse_error_rate,
+        action="append",
+        default=[],
+        metavar="STATUS=RATE",
+        help="Answer this fraction of requests with an HTTP error; repeatable",
+    )
+    parser.add_argument(
+        "--reset-rate", type=float, default=0.0, help="Fraction of connections to reset"
+    )
+    parser.add_argument(
+        "--slow-body-rate", type=float, default=0.0, help="Fraction of bodies to send slowly"
+    )
+    parser.add_argument(
+        "--slow-body-delay-ms",
+        type=float,
+        default=50.0,
+        help="Pause between chunks of a slow body (default: 50)",
+    )
+    parser.add_argument(
+        "--no-validators", action="store_true", help="Do not send ETag headers or honour them"
+    )
+    parser.add_argument(
+        "--city",
+        action="append",
+        dest="cities",
+        metavar="NAME",
+        help="Only this city exists; repeatable. By default every city exists.",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducibility")
+    parser.add_argument("--debug", action="store_true", help="Log every request")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the stub server until interrupted.
+
+    Args:
+        argv: Optional command line arguments
+
+    Returns:
+        Exit code (0 when stopped by the user, 1 on invalid settings)
+    """
+    args = parse_arguments(argv)
+    logging.basicConfig(
+        level=logging.DEBUG if args.debug else logging.INFO,
+        format="[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    try:
+        profile = FaultProfile(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            distribution=args.distribution,
+            error_rates=dict(args.error_rate),
+            reset_rate=args.reset_rate,
+            slow_body_rate=args.slow_body_rate,
+            slow_body_chunk_delay_ms=args.slow_body_delay_ms,
+            send_validators=not args.no_validators,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        print(f"Invalid settings: {e}", file=sys.stderr)
+        return 1
+
+    known_cities = frozenset(args.cities) if args.cities else None
+    httpd = StubHTTPServer((args.host, args.port), profile, known_cities)
+    host, port = httpd.server_address[:2]
+    print(f"Serving OpenWeatherMap stub at http://{host!s}:{port}/data/2.5", flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        print(f"Handled {httpd.stats.requests} requests", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,591 @@
+"""Request-level tracing for the weather CLI application.
+
+Aggregate metrics say that lookups are slow, not why one of them was. Spans
+record how long each phase of a lookup took: validation, the cache lookup,
+waiting for a scheduler or concurrency slot, the HTTP exchange (upstream wait
+and body read), JSON parsing and model construction. Spans nest through a
+context variable, so phases run on worker threads started with
+``contextvars.copy_context().run`` stay in the caller's trace.
+
+Tracing is off until a Tracer is installed with set_tracer; until then span()
+returns a shared no-op span and costs one global lookup. Finished traces are
+handed to an exporter: JsonlExporter writes one span per line to a local file,
+OtlpHttpExporter posts them as OTLP/HTTP JSON to a collector. Outgoing requests
+carry a W3C ``traceparent`` header, and continue_trace() lets a server join the
+trace of the request it is handling.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Sequence, Union
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+TRACEPARENT_HEADER = "traceparent"
+DEFAULT_OTLP_ENDPOINT = "http://localhost:4318/v1/traces"
+SERVICE_NAME = "weather-cli"
+
+_TRACEPARENT_PATTERN = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+
+
+@dataclass(frozen=True)
+class SpanContext:
+    """Identity of a span, as propagated in a ``traceparent`` header.
+
+    Attributes:
+        trace_id: 32 lowercase hex digits identifying the trace
+        span_id: 16 lowercase hex digits identifying the span
+        sampled: Whether the trace is being recorded
+    """
+
+    trace_id: str
+    span_id: str
+    sampled: bool = True
+
+    @classmethod
+    def generate(cls, trace_id: Optional[str] = None) -> "SpanContext":
+        """Create a context with a new random span ID.
+
+        Args:
+            trace_id: The trace the span belongs to; a new trace if not given
+
+        Returns:
+            The new span context
+        """
+        return cls(trace_id=trace_id or os.urandom(16).hex(), span_id=os.urandom(8).hex())
+
+    @classmethod
+    def from_traceparent(cls, value: Optional[str]) -> Optional["SpanContext"]:
+        """Parse a W3C ``traceparent`` header.
+
+        Args:
+            value: The header value
+
+        Returns:
+            The remote span context, or None if the header is missing or invalid
+        """
+        match = _TRACEPARENT_PATTERN.match((value or "").strip().lower())
+        if match is None:
+            return None
+        version, trace_id, span_id, flags = match.groups()
+        if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+            return None
+        return cls(trace_id=trace_id, span_id=span_id, sampled=bool(int(flags, 16) & 1))
+
+    @property
+    def traceparent(self) -> str:
+        """The context as a W3C ``traceparent`` header value."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+class Span:
+    """A timed phase of a request.
+
+    Attributes:
+        name: What the span measures, such as "cache.lookup"
+        context: The identity of the span
+        parent_id: Span ID of the enclosing span, None for the root of a trace
+        start_ns: Start time in nanoseconds since the epoch
+        end_ns: End time in nanoseconds since the epoch, None while running
+        attributes: Details of the phase, such as the city or status code
+        error: Description of the exception that ended the span, if any
+    """
+
+    __slots__ = ("name", "context", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(
+        self,
+        name: str,
+        context: SpanContext,
+        parent_id: Optional[str],
+        start_ns: int,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Initialize a running span.
+
+        Args:
+            name: What the span measures
+            context: The identity of the span
+            parent_id: Span ID of the enclosing span, if any
+            start_ns: Start time in nanoseconds since the epoch
+            attributes: Optional initial attributes
+        """
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.start_ns = start_ns
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = attributes or {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach a detail to the span.
+
+        Args:
+            key: The attribute name
+            value: A string, number or boolean
+        """
+        self.attributes[key] = value
+
+    @property
+    def duration_ms(self) -> float:
+        """The duration in milliseconds, 0 while running."""
+        if self.end_ns is None:
+            return 0.0
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the span as a JSON-serializable record."""
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def __repr__(self) -> str:
+        """Return a short representation of the span."""
+        return f"Span(name={self.name!r}, duration_ms={self.duration_ms:.3f})"
+
+
+class _NoopSpan(Span):
+    """Span handed out while tracing is off; it records nothing."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ignore the attribute."""
+
+
+_NOOP_SPAN = _NoopSpan("noop", SpanContext("0" * 32, "0" * 16, sampled=False), None, 0)
+
+
+class _NoopScope:
+    """Reusable context manager yielding the no-op span."""
+
+    def __enter__(self) -> Span:
+        return _NOOP_SPAN
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NOOP_SCOPE = _NoopScope()
+
+
+class SpanExporter(ABC):
+    """Receives the spans of finished traces."""
+
+    @abstractmethod
+    def export(self, spans: Sequence[Span]) -> None:
+        """Export finished spans.
+
+        Exporters must not raise; tracing never fails a request.
+
+        Args:
+            spans: The spans of one trace, or late spans of a trace already exported
+        """
+
+    def close(self) -> None:
+        """Flush pending spans and release resources."""
+
+
+class InMemoryExporter(SpanExporter):
+    """Exporter keeping spans in a list, for tests and interactive analysis."""
+
+    def __init__(self) -> None:
+        """Initialize the exporter."""
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Keep the spans."""
+        with self._lock:
+            self.spans.extend(spans)
+
+
+class JsonlExporter(SpanExporter):
+    """Exporter appending one JSON object per span to a local file."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """Open the trace file for appending.
+
+        Args:
+            path: The JSON Lines file; created with its directory if missing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Append the spans to the file."""
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        with self._lock:
+            try:
+                self._file.write(lines)
+                self._file.flush()
+            except (OSError, ValueError) as e:
+                logger.warning("Cannot write spans to %s: %s", self.path, e)
+
+    def close(self) -> None:
+        """Close the trace file."""
+        with self._lock:
+            self._file.close()
+
+
+class CompositeExporter(SpanExporter):
+    """Exporter handing spans to several exporters in turn."""
+
+    def __init__(self, exporters: Sequence[SpanExporter]) -> None:
+        """Initialize the exporter.
+
+        Args:
+            exporters: The exporters to hand every span to
+        """
+        self.exporters = list(exporters)
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Hand the spans to every exporter."""
+        for exporter in self.exporters:
+            exporter.export(spans)
+
+    def close(self) -> None:
+        """Close every exporter."""
+        for exporter in self.exporters:
+            exporter.close()
+
+
+def otlp_document(spans: Sequence[Span], service_name: str = SERVICE_NAME) -> Dict[str, Any]:
+    """Encode spans as an OTLP/HTTP JSON ``ExportTraceServiceRequest``.
+
+    Args:
+        spans: The spans to encode
+        service_name: The ``service.name`` resource attribute
+
+    Returns:
+        The JSON-serializable request body
+    """
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+                "scopeSpans": [
+                    {"scope": {"name": "weather_cli"}, "spans": [_otlp_span(s) for s in spans]}
+                ],
+            }
+        ]
+    }
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    """Encode one span in OTLP JSON form."""
+    encoded: Dict[str, Any] = {
+        "traceId": span.context.trace_id,
+        "spanId": span.context.span_id,
+        "name": span.name,
+        "kind": 3 if span.name.startswith("http.") else 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns if span.end_ns is not None else span.start_ns),
+        "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id is not None:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Encode one attribute as an OTLP key/value pair."""
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class OtlpHttpExporter(SpanExporter):
+    """Exporter posting spans to an OTLP/HTTP collector from a background thread.
+
+    Requests never wait for the collector: spans are queued and sent in batches.
+    If the queue is full, spans are dropped and counted in ``dropped``.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = DEFAULT_OTLP_ENDPOINT,
+        service_name: str = SERVICE_NAME,
+        timeout: float = 5.0,
+        max_queue: int = 2048,
+        batch_size: int = 512,
+    ) -> None:
+        """Start the export thread.
+
+        Args:
+            endpoint: URL of the collector's traces endpoint
+            service_name: The ``service.name`` resource attribute
+            timeout: Timeout in seconds of each post
+            max_queue: Maximum number of spans waiting to be sent
+            batch_size: Maximum number of spans per post
+        """
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.exported = 0
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._run, name="weather-otlp", daemon=True)
+        self._thread.start()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        """Queue the spans for sending."""
+        for span in spans:
+            try:
+                self._queue.put_nowait(span)
+            except queue.Full:
+                self.dropped += 1
+
+    def close(self) -> None:
+        """Send every queued span and stop the export thread."""
+        self._queue.put(None)
+        self._thread.join(self.timeout * 2)
+
+    def _run(self) -> None:
+        """Send queued spans in batches until closed."""
+        stopping = False
+        while not stopping:
+            batch: List[Span] = []
+            item = self._queue.get()
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            stopping = item is None
+            if batch:
+                self._post(batch)
+
+    def _post(self, batch: List[Span]) -> None:
+        """Send one batch, logging failures."""
+        try:
+            response = requests.post(
+                self.endpoint,
+                json=otlp_document(batch, self.service_name),
+                timeout=self.timeout,
+            )
+            if response.status_code >= 300:
+                logger.warning("Trace collector answered HTTP %d", response.status_code)
+                return
+            self.exported += len(batch)
+        except requests.exceptions.RequestException as e:
+            logger.warning("Cannot send %d spans to %s: %s", len(batch), self.endpoint, e)
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "weather_cli_current_span", default=None
+)
+_remote_parent: contextvars.ContextVar[Optional[SpanContext]] = contextvars.ContextVar(
+    "weather_cli_remote_parent", default=None
+)
+
+
+class Tracer:
+    """Creates spans and hands each finished trace to an exporter.
+
+    The spans of a trace are exported together once every span of it that was
+    started through this tracer has ended.
+    """
+
+    def __init__(self, exporter: SpanExporter) -> None:
+        """Initialize the tracer.
+
+        Args:
+            exporter: Where finished traces are sent
+        """
+        self.exporter = exporter
+        self._open: Dict[str, int] = {}
+        self._finished: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time the enclosed block as a child of the current span.
+
+        An exception leaving the block is recorded on the span and re-raised.
+
+        Args:
+            name: What the span measures
+            **attributes: Initial attributes
+
+        Yields:
+            The running span
+        """
+        span = self._start(name, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self._end(span)
+
+    def record(self, name: str, start_ns: int, end_ns: int, **attributes: Any) -> Span:
+        """Add a span measured elsewhere as a child of the current span.
+
+        Args:
+            name: What the span measures
+            start_ns: Start time in nanoseconds since the epoch
+            end_ns: End time in nanoseconds since the epoch
+            **attributes: Attributes of the span
+
+        Returns:
+            The finished span
+        """
+        span = self._start(name, attributes, start_ns)
+        span.end_ns = end_ns
+        self._end(span)
+        return span
+
+    def close(self) -> None:
+        """Export the spans of unfinished traces and close the exporter."""
+        with self._lock:
+            pending = [span for spans in self._finished.values() for span in spans]
+            self._finished.clear()
+            self._open.clear()
+        if pending:
+            self.exporter.export(pending)
+        self.exporter.close()
+
+    def _start(self, name: str, attributes: Dict[str, Any], start_ns: Optional[int] = None) -> Span:
+        """Create a span under the current or remote parent and count it as open."""
+        parent = _current_span.get()
+        parent_context = parent.context if parent is not None else _remote_parent.get()
+        if parent_context is None:
+            context = SpanContext.generate()
+            parent_id = None
+        else:
+            context = SpanContext.generate(parent_context.trace_id)
+            parent_id = parent_context.span_id
+        span = Span(name, context, parent_id, start_ns or time.time_ns(), attributes)
+        with self._lock:
+            self._open[context.trace_id] = self._open.get(context.trace_id, 0) + 1
+        return span
+
+    def _end(self, span: Span) -> None:
+        """Count a span as finished and export its trace once nothing is open."""
+        trace_id = span.context.trace_id
+        with self._lock:
+            self._finished.setdefault(trace_id, []).append(span)
+            self._open[trace_id] -= 1
+            if self._open[trace_id]:
+                return
+            del self._open[trace_id]
+            spans = self._finished.pop(trace_id)
+        self.exporter.export(spans)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def set_tracer(tracer: Optional[Tracer]) -> Optional[Tracer]:
+    """Install the tracer used by span() and record_span(), or None to turn tracing off.
+
+    Args:
+        tracer: The tracer to install
+
+    Returns:
+        The previously installed tracer
+    """
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    return previous
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Return the installed tracer, None while tracing is off."""
+    return _tracer
+
+
+def span(name: str, **attributes: Any) -> ContextManager[Span]:
+    """Time the enclosed block with the installed tracer.
+
+    Args:
+        name: What the span measures
+        **attributes: Initial attributes
+
+    Returns:
+        A context manager yielding the running span; a no-op span if tracing is off
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_SCOPE
+    return tracer.span(name, **attributes)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes: Any) -> None:
+    """Add a span measured elsewhere with the installed tracer, if any.
+
+    Args:
+        name: What the span measures
+        start_ns: Start time in nanoseconds since the epoch
+        end_ns: End time in nanoseconds since the epoch
+        **attributes: Attributes of the span
+    """
+    tracer = _tracer
+    if tracer is not None:
+        tracer.record(name, start_ns, end_ns, **attributes)
+
+
+def current_traceparent() -> Optional[str]:
+    """Return the ``traceparent`` header value for a request made now.
+
+    Returns:
+        The current span as a traceparent, or None if no span is running
+    """
+    current = _current_span.get()
+    if current is None or _tracer is None:
+        return None
+    return current.context.traceparent
+
+
+@contextmanager
+def continue_trace(traceparent: Optional[str]) -> Iterator[Optional[SpanContext]]:
+    """Make spans started in the block join a trace begun by a remote caller.
+
+    Args:
+        traceparent: The ``traceparent`` header of the incoming request; a missing
+            or invalid header starts a new trace as usual
+
+    Yields:
+        The remote span context, or None if the header was missing or invalid
+    """
+    remote = SpanContext.from_traceparent(traceparent)
+    token = _remote_parent.set(remote)
+    try:
+        yield remote
+    finally:
+        _remote_parent.reset(token)
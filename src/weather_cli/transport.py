@@ -0,0 +1,345 @@
+"""Pluggable HTTP transports for the weather API client.
+
+The client sends every request through a Transport. Besides the default
+requests-based transport, a recording transport writes each request/response
+pair with its timing to a cassette file, and a replay transport serves those
+responses back, at recorded or accelerated speed, without any network access.
+
+Cassettes are JSON Lines files: a header line followed by one interaction per
+line. API keys are never written; the ``appid`` query parameter is dropped
+from recorded URLs and ignored when matching requests.
+"""
+
+import base64
+import json
+import logging
+import threading
+import time
+import urllib.parse
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_FORMAT = "weather-cli-cassette"
+CASSETTE_VERSION = 1
+SECRET_QUERY_PARAMETERS = frozenset({"appid"})
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """Raised when a replayed request has no recorded response."""
+
+
+def normalize_url(url: str) -> str:
+    """Return a URL without secret query parameters and with sorted parameters.
+
+    Args:
+        url: The request URL
+
+    Returns:
+        The URL used to store and match recorded requests
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = [
+        (name, value)
+        for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if name not in SECRET_QUERY_PARAMETERS
+    ]
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(sorted(query))))
+
+
+def build_response(
+    url: str, status_code: int, headers: Dict[str, str], content: bytes
+) -> requests.Response:
+    """Build a requests Response from recorded parts.
+
+    Args:
+        url: The request URL
+        status_code: The HTTP status code
+        headers: The response headers
+        content: The raw response body
+
+    Returns:
+        A Response that behaves like one received over the network
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = content
+    response.url = url
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+    return response
+
+
+def record_exchange_spans(start_ns: int, end_ns: int, response: requests.Response) -> None:
+    """Record the upstream wait and body read of an HTTP exchange as tracing spans.
+
+    The exchange is split where ``response.elapsed`` ends. requests times the
+    exchange up to the response headers, so the rest of the call is the body
+    read; connecting is part of the upstream wait.
+
+    Args:
+        start_ns: When the request was started, in nanoseconds since the epoch
+        end_ns: When the body had been read, in nanoseconds since the epoch
+        response: The response, with ``elapsed`` set to the time to its headers
+    """
+    elapsed = getattr(response, "elapsed", None)
+    if isinstance(elapsed, timedelta):
+        headers_at = min(end_ns, start_ns + int(elapsed.total_seconds() * 1e9))
+        tracing.record_span("http.wait", start_ns, headers_at)
+        tracing.record_span("http.body", headers_at, end_ns)
+
+
+class Transport(ABC):
+    """Sends HTTP GET requests on behalf of a weather API client."""
+
+    @abstractmethod
+    def get(
+        self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Send a GET request.
+
+        Args:
+            url: The complete request URL
+            timeout: Timeout in seconds
+            headers: Optional request headers
+
+        Returns:
+            The HTTP response, whatever its status code
+
+        Raises:
+            requests.exceptions.RequestException: If the request could not be completed
+        """
+
+    def close(self) -> None:
+        """Release any resources held by the transport."""
+
+
+class RequestsTransport(Transport):
+    """Transport sending requests over the network with the requests library."""
+
+    def get(
+        self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Send a GET request over the network.
+
+        Args:
+            url: The complete request URL
+            timeout: Timeout in seconds
+            headers: Optional request headers
+
+        Returns:
+            The HTTP response, whatever its status code
+        """
+        if tracing.get_tracer() is None:
+            return self._get(url, timeout, headers)
+
+        start = time.time_ns()
+        response = self._get(url, timeout, headers)
+        record_exchange_spans(start, time.time_ns(), response)
+        return response
+
+    def _get(
+        self, url: str, timeout: float, headers: Optional[Dict[str, str]]
+    ) -> requests.Response:
+        """Send the request with the requests library."""
+        if headers:
+            return requests.get(url, timeout=timeout, headers=headers)
+        return requests.get(url, timeout=timeout)
+
+
+class RecordingTransport(Transport):
+    """Transport that records every interaction of another transport to a cassette."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        transport: Optional[Transport] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        """Initialize the recording transport, starting a new cassette.
+
+        Args:
+            path: The cassette file to write; an existing file is replaced
+            transport: Optional transport performing the requests. Defaults to
+                RequestsTransport.
+            clock: Function returning a monotonic time in seconds
+        """
+        self.path = Path(path)
+        self.transport = transport if transport is not None else RequestsTransport()
+        self.recorded = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._write({"format": CASSETTE_FORMAT, "version": CASSETTE_VERSION})
+
+    def get(
+        self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Send a GET request through the wrapped transport and record it.
+
+        Failed requests are not recorded.
+
+        Args:
+            url: The complete request URL
+            timeout: Timeout in seconds
+            headers: Optional request headers
+
+        Returns:
+            The HTTP response, whatever its status code
+        """
+        start = self._clock()
+        response = self.transport.get(url, timeout=timeout, headers=headers)
+        elapsed = self._clock() - start
+
+        interaction: Dict[str, Any] = {
+            "request": {"method": "GET", "url": normalize_url(url), "headers": headers or {}},
+            "response": {
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "body": base64.b64encode(response.content).decode("ascii"),
+            },
+            "elapsed": elapsed,
+        }
+        self._write(interaction)
+        with self._lock:
+            self.recorded += 1
+        return response
+
+    def close(self) -> None:
+        """Close the cassette file and the wrapped transport."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.transport.close()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        """Append one line to the cassette and flush it.
+
+        Args:
+            record: The JSON-serializable record
+        """
+        line = json.dumps(record, sort_keys=True)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+
+class ReplayTransport(Transport):
+    """Transport serving recorded responses from a cassette without network access.
+
+    Requests are matched by normalized URL. Repeated requests to the same URL are
+    served the recorded responses in order; once they run out, the last one is
+    served again.
+    """
+
+    # API key to use when replaying; recorded URLs never contain the real key
+    PLACEHOLDER_API_KEY = "replay"
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        speed: Optional[float] = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Load a cassette for replay.
+
+        Args:
+            path: The cassette file to read
+            speed: Replay speed relative to the recording, such as 10 for ten times
+                faster. None or 0 serves responses without any delay.
+            sleep: Function used to reproduce the recorded latency
+
+        Raises:
+            ValueError: If the file is not a supported cassette or speed is negative
+        """
+        if speed is not None and speed < 0:
+            raise ValueError("speed must not be negative")
+
+        self.path = Path(path)
+        self.speed = speed
+        self.replayed = 0
+        self._sleep = sleep
+        self._interactions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._positions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        """Return the number of recorded interactions."""
+        return sum(len(interactions) for interactions in self._interactions.values())
+
+    def get(
+        self, url: str, timeout: float, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Serve the recorded response for a request.
+
+        Args:
+            url: The complete request URL
+            timeout: Timeout in seconds; a recorded latency above it is replayed as
+                a timeout
+            headers: Optional request headers (not used for matching)
+
+        Returns:
+            The recorded HTTP response
+
+        Raises:
+            CassetteMissError: If the request was not recorded
+            requests.exceptions.Timeout: If the recorded latency exceeds the timeout
+        """
+        key = normalize_url(url)
+        with self._lock:
+            interactions = self._interactions.get(key)
+            if not interactions:
+                raise CassetteMissError(f"No recorded response for {key} in {self.path}")
+            position = self._positions[key]
+            interaction = interactions[min(position, len(interactions) - 1)]
+            self._positions[key] = position + 1
+            self.replayed += 1
+
+        elapsed = float(interaction.get("elapsed", 0.0))
+        if elapsed > timeout:
+            raise requests.exceptions.Timeout(f"Recorded response for {key} timed out")
+        if self.speed:
+            self._sleep(elapsed / self.speed)
+
+        recorded = interaction["response"]
+        return build_response(
+            url,
+            int(recorded["status_code"]),
+            dict(recorded.get("headers", {})),
+            base64.b64decode(recorded.get("body", "")),
+        )
+
+    def rewind(self) -> None:
+        """Start serving every URL's recorded responses from the beginning again."""
+        with self._lock:
+            self._positions.clear()
+
+    def _load(self) -> None:
+        """Read the cassette file into memory.
+
+        Raises:
+            ValueError: If the file is not a supported cassette
+        """
+        with open(self.path, "r", encoding="utf-8") as handle:
+            header = json.loads(handle.readline() or "{}")
+            if header.get("format") != CASSETTE_FORMAT:
+                raise ValueError(f"Not a weather cassette file: {self.path}")
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version: {header.get('version')}")
+            for line in handle:
+                if not line.strip():
+                    continue
+                interaction = json.loads(line)
+                self._interactions[interaction["request"]["url"]].append(interaction)
+        logger.debug("Loaded %d recorded interactions from %s", len(self), self.path)
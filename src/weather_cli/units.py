@@ -0,0 +1,58 @@
+"""Unit systems and local unit conversion for the weather CLI application.
+
+Observations are always fetched, cached and recorded in the canonical metric
+system. Other unit systems are derived locally at display time, so callers with
+different preferences share the same upstream calls and cache entries.
+"""
+
+from enum import Enum
+
+KELVIN_OFFSET = 273.15
+
+
+class Units(Enum):
+    """Unit systems supported for display, named after the OpenWeatherMap ``units`` values."""
+
+    METRIC = "metric"
+    IMPERIAL = "imperial"
+    STANDARD = "standard"
+
+    @property
+    def temperature_symbol(self) -> str:
+        """Return the symbol of the temperature unit."""
+        return _TEMPERATURE_SYMBOLS[self]
+
+    def convert_temperature(self, celsius: float) -> float:
+        """Convert a canonical Celsius temperature to this unit system.
+
+        Args:
+            celsius: Temperature in Celsius
+
+        Returns:
+            The temperature in this unit system
+        """
+        if self is Units.IMPERIAL:
+            return celsius * 9.0 / 5.0 + 32.0
+        if self is Units.STANDARD:
+            return celsius + KELVIN_OFFSET
+        return celsius
+
+    def format_temperature(self, celsius: float) -> str:
+        """Format a canonical Celsius temperature in this unit system.
+
+        Args:
+            celsius: Temperature in Celsius
+
+        Returns:
+            The converted temperature with one decimal and its unit symbol
+        """
+        return f"{self.convert_temperature(celsius):.1f}{self.temperature_symbol}"
+
+
+_TEMPERATURE_SYMBOLS = {
+    Units.METRIC: "°C",
+    Units.IMPERIAL: "°F",
+    Units.STANDARD: "K",
+}
+
+CANONICAL_UNITS = Units.METRIC
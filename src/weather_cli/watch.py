@@ -0,0 +1,243 @@
+"""Watch mode for the weather CLI application.
+
+A single warm WeatherService polls each watched city. Polls are aligned with the
+upstream observation time, so no request is made before a new observation can
+exist, and the poll interval backs off while conditions stay the same. Only the
+fields that changed since the previous poll are printed.
+"""
+
+import heapq
+import logging
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from .units import Units
+from .weather_data import WeatherData
+from .weather_service import WeatherService
+from .exceptions import WeatherApiException
+
+logger = logging.getLogger(__name__)
+
+# OpenWeatherMap refreshes current observations roughly every ten minutes.
+UPSTREAM_UPDATE_SECONDS = 600.0
+
+# Fields compared between polls, with the label they are printed under.
+WATCHED_FIELDS: Dict[str, str] = {
+    "temperature_celsius": "Temperature",
+    "description": "Conditions",
+}
+
+
+def changed_fields(previous: WeatherData, current: WeatherData) -> Dict[str, Tuple[Any, Any]]:
+    """Return the watched fields whose value differs between two observations.
+
+    Args:
+        previous: The observation from the previous poll
+        current: The observation from the current poll
+
+    Returns:
+        The (previous, current) values keyed by field name
+    """
+    changes: Dict[str, Tuple[Any, Any]] = {}
+    for name in WATCHED_FIELDS:
+        before = getattr(previous, name)
+        after = getattr(current, name)
+        if before != after:
+            changes[name] = (before, after)
+    return changes
+
+
+def format_changes(
+    city: str, changes: Dict[str, Tuple[Any, Any]], units: Units = Units.METRIC
+) -> str:
+    """Format the changed fields of a city on one line.
+
+    Args:
+        city: The city name
+        changes: The (previous, current) values keyed by field name
+        units: The unit system to display temperatures in
+
+    Returns:
+        A line such as "London: Temperature 15.0°C -> 16.5°C"
+    """
+    parts = []
+    for name, (before, after) in changes.items():
+        if name == "temperature_celsius":
+            before = units.format_temperature(before)
+            after = units.format_temperature(after)
+        parts.append(f"{WATCHED_FIELDS[name]} {before} -> {after}")
+    return f"{city}: {', '.join(parts)}"
+
+
+class PollSchedule:
+    """Adaptive poll interval for one city.
+
+    The interval starts at ``interval`` and is multiplied by ``backoff`` after
+    every poll that saw no change, up to ``max_interval``. A change resets it.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        max_interval: float,
+        backoff: float = 2.0,
+        update_seconds: float = UPSTREAM_UPDATE_SECONDS,
+    ) -> None:
+        """Initialize the schedule.
+
+        Args:
+            interval: Seconds between polls while conditions are changing
+            max_interval: Upper bound for the backed-off interval
+            backoff: Factor the interval grows by after an unchanged poll
+            update_seconds: How often the upstream publishes a new observation
+
+        Raises:
+            ValueError: If the intervals or backoff factor are out of range
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if max_interval < interval:
+            raise ValueError("max_interval must not be smaller than interval")
+        if backoff < 1:
+            raise ValueError("backoff must be at least 1")
+
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.update_seconds = update_seconds
+        self.current_interval = interval
+
+    def next_poll(self, now: float, changed: bool, observed_at: Optional[int] = None) -> float:
+        """Compute when the city should be polled next.
+
+        Args:
+            now: The current time (unix seconds)
+            changed: Whether the last poll saw a change
+            observed_at: Optional time of the last upstream observation (unix, UTC)
+
+        Returns:
+            The time of the next poll (unix seconds)
+        """
+        if changed:
+            self.current_interval = self.interval
+        else:
+            self.current_interval = min(self.current_interval * self.backoff, self.max_interval)
+
+        due = now + self.current_interval
+        if observed_at is not None:
+            # No new observation can exist before the next upstream update
+            next_update = observed_at + self.update_seconds
+            if next_update > due:
+                due = min(next_update, now + self.max_interval)
+        return due
+
+
+class WeatherWatcher:
+    """Polls several cities through one weather service and reports changes."""
+
+    def __init__(
+        self,
+        service: WeatherService,
+        cities: Iterable[str],
+        interval: float = 60.0,
+        max_interval: float = 900.0,
+        backoff: float = 2.0,
+        units: Units = Units.METRIC,
+        output: Optional[TextIO] = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialize the watcher.
+
+        Args:
+            service: The weather service used for every poll
+            cities: The city names to watch; spellings of the same city are watched once
+            interval: Seconds between polls while conditions are changing
+            max_interval: Upper bound for the backed-off interval
+            backoff: Factor the interval grows by after an unchanged poll
+            units: The unit system to display temperatures in
+            output: Stream the updates are written to. Defaults to sys.stdout.
+            clock: Function returning the current time in unix seconds
+            sleep: Function used to wait between polls
+
+        Raises:
+            ValueError: If no cities are given or the intervals are out of range
+        """
+        unique_cities: Dict[str, str] = {}
+        for city in cities:
+            unique_cities.setdefault(service.canonical_key(city), city.strip())
+        self.cities: List[str] = list(unique_cities.values())
+        if not self.cities:
+            raise ValueError("At least one city is required to watch.")
+
+        self.service = service
+        self.units = units
+        self.output = output
+        self.polls = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._schedules = {
+            city: PollSchedule(interval, max_interval, backoff) for city in self.cities
+        }
+        self._latest: Dict[str, WeatherData] = {}
+
+    def poll(self, city: str) -> float:
+        """Poll one city, print what changed and return when to poll it next.
+
+        Args:
+            city: The stripped city name
+
+        Returns:
+            The time of the next poll (unix seconds)
+        """
+        self.polls += 1
+        schedule = self._schedules[city]
+        previous = self._latest.get(city)
+
+        try:
+            current = self.service.get_weather(city)
+        except WeatherApiException as e:
+            logger.warning("Failed to poll weather for %s: %s", city, e)
+            self._write(f"{city}: error: {e}")
+            return schedule.next_poll(self._clock(), changed=False)
+
+        self._latest[city] = current
+        if previous is None:
+            self._write(current.format(self.units))
+            changed = True
+        else:
+            changes = changed_fields(previous, current)
+            changed = bool(changes)
+            if changed:
+                self._write(format_changes(city, changes, self.units))
+            else:
+                logger.debug("No change for %s", city)
+
+        return schedule.next_poll(self._clock(), changed, current.observed_at)
+
+    def run(self, max_polls: Optional[int] = None) -> None:
+        """Poll the cities until interrupted, earliest due city first.
+
+        Args:
+            max_polls: Optional number of polls after which to stop
+        """
+        now = self._clock()
+        queue = [(now, index, city) for index, city in enumerate(self.cities)]
+        heapq.heapify(queue)
+
+        while max_polls is None or self.polls < max_polls:
+            due, index, city = heapq.heappop(queue)
+            delay = due - self._clock()
+            if delay > 0:
+                self._sleep(delay)
+            heapq.heappush(queue, (self.poll(city), index, city))
+
+    def _write(self, line: str) -> None:
+        """Write one update to the output stream.
+
+        Args:
+            line: The text to write
+        """
+        output = self.output or sys.stdout
+        print(line, file=output, flush=True)
@@ -4,17 +4,58 @@ import logging
 import re
 import urllib.parse
 from abc import ABC, abstractmethod
-from typing import Dict, Any, NoReturn
+from dataclasses import dataclass
+from typing import Dict, Any, NoReturn, Optional
 
 import requests
 
+from . import tracing
+from .forecast import ForecastSeries
+from .key_pool import REDACTED, ApiKeyPool
+from .transport import RequestsTransport, Transport
+from .units import CANONICAL_UNITS
 from .weather_data import WeatherData
 from .config_util import ConfigUtil
-from .exceptions import WeatherApiException
+from .exceptions import InvalidCityNameException, WeatherApiException
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class Validators:
+    """Validators describing a previously fetched observation.
+
+    Attributes:
+        etag: ETag header from the previous response, if any
+        last_modified: Last-Modified header from the previous response, if any
+        observed_at: Observation time (``dt``) of the previous response, if known
+    """
+
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    observed_at: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    """Result of a possibly conditional weather fetch.
+
+    Attributes:
+        data: The freshly parsed weather data, or None if nothing changed upstream
+        etag: ETag header from the response, if any
+        last_modified: Last-Modified header from the response, if any
+    """
+
+    data: Optional[WeatherData]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        """Whether the upstream reported no new observation."""
+        return self.data is None
+
+
 class WeatherApiClient(ABC):
     """Abstract base class for weather API clients."""
 
@@ -33,18 +74,95 @@ class WeatherApiClient(ABC):
         """
         pass
 
+    def fetch_weather(self, city: str, validators: Optional[Validators] = None) -> FetchResult:
+        """Fetch weather data for a city, skipping unchanged observations when possible.
+
+        Clients that cannot issue conditional requests still compare the observation
+        time of the new data with the validators, so callers can tell "nothing new"
+        apart from fresh data.
+
+        Args:
+            city: The name of the city to get weather for
+            validators: Optional validators of the previously fetched observation
+
+        Returns:
+            FetchResult with the new data, or with no data if nothing changed
+
+        Raises:
+            WeatherApiException: If there's an error fetching weather data
+        """
+        weather_data = self.get_weather_from_api(city)
+        if (
+            validators is not None
+            and validators.observed_at is not None
+            and weather_data.observed_at == validators.observed_at
+        ):
+            return FetchResult(data=None)
+        return FetchResult(data=weather_data)
+
+    def get_forecast_from_api(self, city: str) -> ForecastSeries:
+        """Get the multi-day forecast for a city from the API.
+
+        Args:
+            city: The name of the city to get the forecast for
+
+        Returns:
+            ForecastSeries holding the forecast slots as columns
+
+        Raises:
+            WeatherApiException: If the client does not support forecasts or the fetch fails
+        """
+        raise WeatherApiException("Forecasts are not supported by this weather provider.")
+
+    def get_weather_by_coordinates(self, latitude: float, longitude: float) -> WeatherData:
+        """Get weather data for a location from the API.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Returns:
+            WeatherData object containing the weather information
+
+        Raises:
+            WeatherApiException: If the client does not support coordinates or the fetch fails
+        """
+        raise WeatherApiException("Coordinate lookups are not supported by this weather provider.")
+
 
 class OpenWeatherMapClient(WeatherApiClient):
     """OpenWeatherMap API client implementation."""
 
     # Regex pattern for valid city names (letters, numbers, spaces, hyphens, periods)
     CITY_NAME_PATTERN = re.compile(r"^[\w\s\-\.]+$", re.UNICODE)
+    # Locates the observation time without decoding the whole JSON body
+    OBSERVED_AT_PATTERN = re.compile(rb'"dt"\s*:\s*(\d+)')
     REQUEST_TIMEOUT = 30
 
-    def __init__(self) -> None:
-        """Initialize the OpenWeatherMap client."""
-        self.api_key = ConfigUtil.get_api_key()
-        self.base_url = ConfigUtil.get_api_base_url()
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        key_pool: Optional[ApiKeyPool] = None,
+        transport: Optional[Transport] = None,
+    ) -> None:
+        """Initialize the OpenWeatherMap client.
+
+        Args:
+            api_key: Optional API key. If not provided, it is read from the configuration.
+            base_url: Optional API base URL, for example of a replica. If not provided, it
+                is read from the configuration.
+            key_pool: Optional pool of API keys to rotate through. If provided, every
+                request uses the pool key with the most quota headroom instead of api_key.
+            transport: Optional transport sending the HTTP requests. If not provided,
+                requests are sent over the network with the requests library.
+        """
+        self.key_pool = key_pool
+        if key_pool is not None and api_key is None:
+            api_key = key_pool.keys[0]
+        self.api_key = api_key or ConfigUtil.get_api_key()
+        self.base_url = base_url or ConfigUtil.get_api_base_url()
+        self.transport = transport if transport is not None else RequestsTransport()
 
     def get_weather_from_api(self, city: str) -> WeatherData:
         """Get weather data for a city from the OpenWeatherMap API.
@@ -58,21 +176,186 @@ class OpenWeatherMapClient(WeatherApiClient):
         Raises:
             WeatherApiException: If there's an error fetching weather data
         """
+        result = self.fetch_weather(city)
+        if result.data is None:
+            # Only conditional fetches can be not modified
+            raise WeatherApiException("Upstream reported no change for an unconditional request.")
+        return result.data
+
+    def fetch_weather(self, city: str, validators: Optional[Validators] = None) -> FetchResult:
+        """Fetch weather data for a city, revalidating a previous observation if given.
+
+        ETag and Last-Modified validators are sent as conditional request headers, and
+        a 304 response is reported as not modified. Servers that ignore the headers are
+        still checked cheaply: if the ``dt`` field of the body matches the previous
+        observation time, the body is not decoded or parsed.
+
+        Args:
+            city: The name of the city to get weather for
+            validators: Optional validators of the previously fetched observation
+
+        Returns:
+            FetchResult with the new data, or with no data if nothing changed
+
+        Raises:
+            WeatherApiException: If there's an error fetching weather data
+        """
+        with tracing.span("client.fetch_weather", city=city):
+            with tracing.span("validate"):
+                self._validate_city_name(city)
+
+            headers = self._build_conditional_headers(validators)
+            response = self._send_api_request(self._city_query(city), headers=headers)
+
+            try:
+                if response.status_code == 304 and validators is not None:
+                    logger.debug("Weather data for %s not modified", city)
+                    return FetchResult(
+                        data=None,
+                        etag=self._get_header(response, "ETag"),
+                        last_modified=self._get_header(response, "Last-Modified"),
+                    )
+                elif response.status_code == 200:
+                    etag = self._get_header(response, "ETag")
+                    last_modified = self._get_header(response, "Last-Modified")
+                    if validators is not None and validators.observed_at is not None:
+                        if self._peek_observed_at(response.content) == validators.observed_at:
+                            logger.debug("Observation for %s unchanged, skipping parse", city)
+                            return FetchResult(data=None, etag=etag, last_modified=last_modified)
+                    with tracing.span("parse"):
+                        response_data = response.json()
+                    with tracing.span("model"):
+                        data = self._parse_weather_response(response_data)
+                    return FetchResult(data=data, etag=etag, last_modified=last_modified)
+                else:
+                    self._handle_api_error(response.status_code, response.text)
+
+            except WeatherApiException:
+                raise
+            except Exception as e:
+                logger.error("Unexpected error occurred: %s", e)
+                raise WeatherApiException(f"Unexpected error: {str(e)}")
+
+    def get_forecast_from_api(self, city: str) -> ForecastSeries:
+        """Get the 5-day/3-hour forecast for a city from the OpenWeatherMap API.
+
+        Args:
+            city: The name of the city to get the forecast for
+
+        Returns:
+            ForecastSeries holding the forecast slots as columns
+
+        Raises:
+            WeatherApiException: If there's an error fetching the forecast
+        """
         self._validate_city_name(city)
 
-        url = self._build_api_url(city)
+        response = self._send_api_request(self._city_query(city), endpoint="forecast")
 
         try:
-            logger.debug(f"Making API request to: {self._redact_api_key(url)}")
-            response = requests.get(url, timeout=self.REQUEST_TIMEOUT)
+            if response.status_code == 200:
+                return self._parse_forecast_response(response.json())
+            else:
+                self._handle_api_error(response.status_code, response.text)
+
+        except WeatherApiException:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error occurred: %s", e)
+            raise WeatherApiException(f"Unexpected error: {str(e)}")
+
+    def get_weather_by_coordinates(self, latitude: float, longitude: float) -> WeatherData:
+        """Get weather data for a location from the OpenWeatherMap API.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
 
-            logger.debug(f"API response status code: {response.status_code}")
+        Returns:
+            WeatherData object containing the weather information
 
+        Raises:
+            WeatherApiException: If the coordinates are invalid or the fetch fails
+        """
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise WeatherApiException("Coordinates are out of range.")
+
+        response = self._send_api_request(f"lat={latitude:.6f}&lon={longitude:.6f}")
+
+        try:
             if response.status_code == 200:
                 return self._parse_weather_response(response.json())
             else:
                 self._handle_api_error(response.status_code, response.text)
 
+        except WeatherApiException:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error occurred: %s", e)
+            raise WeatherApiException(f"Unexpected error: {str(e)}")
+
+    def _send_api_request(
+        self, query: str, endpoint: str = "weather", headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Send an API request, rotating through the key pool if one is configured.
+
+        A pooled key that is rejected or rate limited is quarantined and the request
+        is retried once with each other available key.
+
+        Args:
+            query: The encoded location query, such as "q=London"
+            endpoint: The API endpoint, such as "weather" or "forecast"
+            headers: Optional request headers
+
+        Returns:
+            The HTTP response, whatever its status code
+
+        Raises:
+            WeatherApiException: If the request could not be completed or no pooled key
+                is available
+        """
+        if self.key_pool is None:
+            return self._send_request(self._build_query_url(query, endpoint), headers)
+
+        for _ in range(len(self.key_pool)):
+            api_key = self.key_pool.acquire()
+            response = self._send_request(self._build_query_url(query, endpoint, api_key), headers)
+            if response.status_code not in ApiKeyPool.QUARANTINE_STATUS_CODES:
+                break
+            self.key_pool.quarantine(api_key, response.status_code)
+        return response
+
+    def _send_request(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> requests.Response:
+        """Send a GET request to the API, mapping transport failures to API errors.
+
+        Args:
+            url: The complete API URL
+            headers: Optional request headers
+
+        Returns:
+            The HTTP response, whatever its status code
+
+        Raises:
+            WeatherApiException: If the request could not be completed
+        """
+        try:
+            # Redacting the URL costs a string scan per key; skip it unless it is logged
+            debug = logger.isEnabledFor(logging.DEBUG)
+            if debug:
+                logger.debug("Making API request to: %s", self._redact_api_key(url))
+            with tracing.span("http.request") as request_span:
+                traceparent = tracing.current_traceparent()
+                if traceparent is not None:
+                    headers = {**(headers or {}), tracing.TRACEPARENT_HEADER: traceparent}
+                response = self.transport.get(url, timeout=self.REQUEST_TIMEOUT, headers=headers)
+                request_span.set_attribute("status_code", response.status_code)
+
+            if debug:
+                logger.debug("API response status code: %d", response.status_code)
+            return response
+
         except requests.exceptions.Timeout:
             logger.error("Request timeout occurred")
             raise WeatherApiException("Request timeout. Please try again later.")
@@ -82,11 +365,14 @@ class OpenWeatherMapClient(WeatherApiClient):
                 "Unable to connect to the weather service. Please check your internet connection."
             )
         except requests.exceptions.RequestException as e:
-            logger.error(f"Request error occurred: {e}")
-            raise WeatherApiException(f"Network error: {str(e)}")
+            # Transport errors often quote the request URL, which holds the API key
+            message = self._redact_api_key(str(e))
+            logger.error("Request error occurred: %s", message)
+            raise WeatherApiException(f"Network error: {message}")
         except Exception as e:
-            logger.error(f"Unexpected error occurred: {e}")
-            raise WeatherApiException(f"Unexpected error: {str(e)}")
+            message = self._redact_api_key(str(e))
+            logger.error("Unexpected error occurred: %s", message)
+            raise WeatherApiException(f"Unexpected error: {message}")
 
     def _validate_city_name(self, city: str) -> None:
         """Validate the city name format.
@@ -95,38 +381,113 @@ class OpenWeatherMapClient(WeatherApiClient):
             city: The city name to validate
 
         Raises:
-            WeatherApiException: If the city name is invalid
+            InvalidCityNameException: If the city name is invalid
         """
         if not city or not city.strip():
-            raise WeatherApiException("City name cannot be empty.")
+            raise InvalidCityNameException("City name cannot be empty.")
 
         city = city.strip()
 
         if len(city) > 100:  # Reasonable limit for city names
-            raise WeatherApiException("City name is too long.")
+            raise InvalidCityNameException("City name is too long.")
 
         if not self.CITY_NAME_PATTERN.match(city):
-            raise WeatherApiException("City name contains invalid characters.")
+            raise InvalidCityNameException("City name contains invalid characters.")
 
-    def _build_api_url(self, city: str) -> str:
+    def _build_api_url(
+        self, city: str, endpoint: str = "weather", api_key: Optional[str] = None
+    ) -> str:
         """Build the API URL for the weather request.
 
+        Data is always requested in the canonical unit system; conversion to other
+        units happens locally so one upstream call serves every unit preference.
+
         Args:
             city: The city name
+            endpoint: The API endpoint, such as "weather" or "forecast"
+            api_key: Optional API key to use instead of the client's own key
+
+        Returns:
+            The complete API URL
+        """
+        return self._build_query_url(self._city_query(city), endpoint, api_key)
+
+    def _build_query_url(
+        self, query: str, endpoint: str = "weather", api_key: Optional[str] = None
+    ) -> str:
+        """Build the API URL for an encoded location query.
+
+        Args:
+            query: The encoded location query, such as "q=London" or "lat=1&lon=2"
+            endpoint: The API endpoint, such as "weather" or "forecast"
+            api_key: Optional API key to use instead of the client's own key
 
         Returns:
             The complete API URL
         """
-        encoded_city = urllib.parse.quote(city.strip())
         return (
-            f"{self.base_url}/weather"
-            f"?q={encoded_city}"
-            f"&appid={self.api_key}"
-            f"&units=metric"
+            f"{self.base_url}/{endpoint}"
+            f"?{query}"
+            f"&appid={api_key or self.api_key}"
+            f"&units={CANONICAL_UNITS.value}"
         )
 
+    def _city_query(self, city: str) -> str:
+        """Build the encoded location query for a city name.
+
+        Args:
+            city: The city name
+
+        Returns:
+            The query, such as "q=New%20York"
+        """
+        return f"q={urllib.parse.quote(city.strip())}"
+
+    def _build_conditional_headers(self, validators: Optional[Validators]) -> Dict[str, str]:
+        """Build conditional request headers from previous response validators.
+
+        Args:
+            validators: Optional validators of the previously fetched observation
+
+        Returns:
+            A dictionary of conditional headers, empty if there is nothing to send
+        """
+        headers: Dict[str, str] = {}
+        if validators is None:
+            return headers
+        if validators.etag:
+            headers["If-None-Match"] = validators.etag
+        if validators.last_modified:
+            headers["If-Modified-Since"] = validators.last_modified
+        return headers
+
+    def _get_header(self, response: requests.Response, name: str) -> Optional[str]:
+        """Get a response header as a string.
+
+        Args:
+            response: The HTTP response
+            name: The header name (case-insensitive)
+
+        Returns:
+            The header value, or None if it is missing or not a string
+        """
+        value = response.headers.get(name)
+        return value if isinstance(value, str) else None
+
+    def _peek_observed_at(self, body: bytes) -> Optional[int]:
+        """Extract the observation time from a raw response body without parsing it.
+
+        Args:
+            body: The raw response body
+
+        Returns:
+            The ``dt`` value, or None if it cannot be found
+        """
+        match = self.OBSERVED_AT_PATTERN.search(body)
+        return int(match.group(1)) if match else None
+
     def _redact_api_key(self, url: str) -> str:
-        """Redact the API key from a URL for safe logging.
+        """Redact the API key, and every pooled key, from a URL for safe logging.
 
         Args:
             url: The URL containing the API key
@@ -134,7 +495,9 @@ class OpenWeatherMapClient(WeatherApiClient):
         Returns:
             The URL with the API key redacted
         """
-        return url.replace(self.api_key, "REDACTED")
+        if self.key_pool is not None:
+            url = self.key_pool.redact(url)
+        return url.replace(self.api_key, REDACTED)
 
     def _parse_weather_response(self, response_data: Dict[str, Any]) -> WeatherData:
         """Parse the weather API response into a WeatherData object.
@@ -152,25 +515,60 @@ class OpenWeatherMapClient(WeatherApiClient):
             city = response_data["name"]
             temperature = float(response_data["main"]["temp"])
             description = response_data["weather"][0]["description"]
+            observed_at = response_data.get("dt")
+            city_id = response_data.get("id")
+            condition_id = response_data["weather"][0].get("id")
+            coordinates = response_data.get("coord") or {}
+            latitude = coordinates.get("lat")
+            longitude = coordinates.get("lon")
 
-            logger.debug(f"Successfully parsed weather data for {city}")
+            logger.debug("Successfully parsed weather data for %s", city)
 
             return WeatherData(
                 city=city,
                 temperature_celsius=temperature,
                 description=description.title(),
+                observed_at=int(observed_at) if observed_at is not None else None,
+                city_id=int(city_id) if city_id is not None else None,
+                condition_id=int(condition_id) if condition_id is not None else None,
+                latitude=float(latitude) if latitude is not None else None,
+                longitude=float(longitude) if longitude is not None else None,
             )
 
         except KeyError as e:
-            logger.error(f"Missing required field in API response: {e}")
+            logger.error("Missing required field in API response: %s", e)
             raise WeatherApiException(f"Invalid API response format: missing field {e}")
         except (ValueError, TypeError) as e:
-            logger.error(f"Invalid data type in API response: {e}")
+            logger.error("Invalid data type in API response: %s", e)
             raise WeatherApiException(f"Invalid API response format: {e}")
         except Exception as e:
-            logger.error(f"Error parsing API response: {e}")
+            logger.error("Error parsing API response: %s", e)
             raise WeatherApiException(f"Error parsing weather data: {e}")
 
+    def _parse_forecast_response(self, response_data: Dict[str, Any]) -> ForecastSeries:
+        """Parse the forecast API response into a ForecastSeries.
+
+        Args:
+            response_data: The JSON response from the API
+
+        Returns:
+            ForecastSeries holding the forecast slots as columns
+
+        Raises:
+            WeatherApiException: If the response format is invalid
+        """
+        try:
+            series = ForecastSeries.from_response(response_data)
+            logger.debug("Successfully parsed %d forecast slots for %s", len(series), series.city)
+            return series
+
+        except KeyError as e:
+            logger.error("Missing required field in forecast response: %s", e)
+            raise WeatherApiException(f"Invalid API response format: missing field {e}")
+        except (ValueError, TypeError, OverflowError) as e:
+            logger.error("Invalid data type in forecast response: %s", e)
+            raise WeatherApiException(f"Invalid API response format: {e}")
+
     def _handle_api_error(self, status_code: int, response_text: str) -> NoReturn:
         """Handle API error responses.
 
@@ -181,17 +579,24 @@ class OpenWeatherMapClient(WeatherApiClient):
         Raises:
             WeatherApiException: With an appropriate error message
         """
-        logger.error(f"API error - Status code: {status_code}, Response: {response_text}")
+        logger.error("API error - Status code: %s, Response: %s", status_code, response_text)
 
         if status_code == 401:
-            raise WeatherApiException("Invalid API key. Please check your API key configuration.")
+            raise WeatherApiException(
+                "Invalid API key. Please check your API key configuration.", status_code
+            )
         elif status_code == 404:
-            raise WeatherApiException("City not found. Please check the city name and try again.")
+            raise WeatherApiException(
+                "City not found. Please check the city name and try again.", status_code
+            )
         elif status_code == 429:
-            raise WeatherApiException("Rate limit exceeded. Please try again later.")
+            raise WeatherApiException("Rate limit exceeded. Please try again later.", status_code)
         elif 500 <= status_code < 600:
             raise WeatherApiException(
-                f"Weather service is temporarily unavailable. HTTP status: {status_code}"
+                f"Weather service is temporarily unavailable. HTTP status: {status_code}",
+                status_code,
             )
         else:
-            raise WeatherApiException(f"API error: Received HTTP status code {status_code}")
+            raise WeatherApiException(
+                f"API error: Received HTTP status code {status_code}", status_code
+            )
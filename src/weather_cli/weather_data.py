@@ -1,6 +1,9 @@
 """Weather data model for the weather CLI application."""
 
 from dataclasses import dataclass
+from typing import ClassVar, Optional
+
+from .units import Units
 
 
 @dataclass(frozen=True)
@@ -11,11 +14,24 @@ class WeatherData:
         city: The name of the city
         temperature_celsius: The current temperature in Celsius
         description: A description of the current weather conditions
+        observed_at: Optional time of the upstream observation (unix, UTC)
+        city_id: Optional upstream identifier of the city
+        condition_id: Optional upstream weather condition code
+        latitude: Optional latitude of the observation in degrees
+        longitude: Optional longitude of the observation in degrees
     """
 
+    # Whether the data was estimated rather than observed; see DerivedWeatherData
+    derived: ClassVar[bool] = False
+
     city: str
     temperature_celsius: float
     description: str
+    observed_at: Optional[int] = None
+    city_id: Optional[int] = None
+    condition_id: Optional[int] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
 
     def __post_init__(self) -> None:
         """Validate the data types after initialization."""
@@ -25,20 +41,91 @@ class WeatherData:
             raise TypeError("temperature_celsius must be a number")
         if not isinstance(self.description, str):
             raise TypeError("description must be a string")
+        if self.observed_at is not None and not isinstance(self.observed_at, int):
+            raise TypeError("observed_at must be an integer timestamp")
+        if self.city_id is not None and not isinstance(self.city_id, int):
+            raise TypeError("city_id must be an integer")
+        if self.condition_id is not None and not isinstance(self.condition_id, int):
+            raise TypeError("condition_id must be an integer")
+        if self.latitude is not None and not isinstance(self.latitude, (int, float)):
+            raise TypeError("latitude must be a number")
+        if self.longitude is not None and not isinstance(self.longitude, (int, float)):
+            raise TypeError("longitude must be a number")
 
         if not self.city.strip():
             raise ValueError("city cannot be empty")
         if not self.description.strip():
             raise ValueError("description cannot be empty")
+        if self.latitude is not None and not -90 <= self.latitude <= 90:
+            raise ValueError("latitude must be between -90 and 90")
+        if self.longitude is not None and not -180 <= self.longitude <= 180:
+            raise ValueError("longitude must be between -180 and 180")
 
     def __str__(self) -> str:
         """Return a formatted string representation of the weather data.
 
+        Returns:
+            A user-friendly string showing the weather information
+        """
+        return self.format()
+
+    def format(self, units: Units = Units.METRIC) -> str:
+        """Return a formatted string representation in the given unit system.
+
+        Args:
+            units: The unit system to display the temperature in
+
         Returns:
             A user-friendly string showing the weather information
         """
         return (
             f"Weather for {self.city}:\n"
-            f"Temperature: {self.temperature_celsius:.1f}°C\n"
+            f"Temperature: {units.format_temperature(self.temperature_celsius)}\n"
             f"Conditions: {self.description}"
         )
+
+
+@dataclass(frozen=True)
+class DerivedWeatherData(WeatherData):
+    """Weather estimated from a cached forecast instead of observed upstream.
+
+    Returned when current conditions are unavailable; never cached or recorded
+    as an observation.
+
+    Attributes:
+        confidence: How much the estimate can be trusted, from 0 to 1
+        age_seconds: Time since the forecast it was derived from was fetched
+    """
+
+    derived: ClassVar[bool] = True
+
+    confidence: float = 1.0
+    age_seconds: float = 0.0
+
+    def __post_init__(self) -> None:
+        """Validate the data types after initialization."""
+        super().__post_init__()
+        if not isinstance(self.confidence, (int, float)):
+            raise TypeError("confidence must be a number")
+        if not isinstance(self.age_seconds, (int, float)):
+            raise TypeError("age_seconds must be a number")
+        if not 0 <= self.confidence <= 1:
+            raise ValueError("confidence must be between 0 and 1")
+        if self.age_seconds < 0:
+            raise ValueError("age_seconds must not be negative")
+
+    def format(self, units: Units = Units.METRIC) -> str:
+        """Return a formatted string representation, flagged as an estimate.
+
+        Args:
+            units: The unit system to display the temperature in
+
+        Returns:
+            A user-friendly string showing the weather information
+        """
+        minutes = round(self.age_seconds / 60)
+        return (
+            f"{super().format(units)}\n"
+            f"Estimated from a forecast fetched {minutes} min ago "
+            f"({self.confidence:.0%} confidence)"
+        )
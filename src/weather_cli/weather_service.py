@@ -1,30 +1,111 @@
 """Weather service layer for the weather CLI application."""
 
+import contextvars
 import logging
-from typing import Optional
+import struct
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple, Union
 
-from .weather_data import WeatherData
-from .weather_client import WeatherApiClient, OpenWeatherMapClient
+from . import tracing
+from .batch import WeatherBatch
+from .cache import WeatherCache
+from .city_key import city_key, qualify_city
+from .config_util import ConfigUtil
+from .forecast import ForecastSeries
+from .forecast_fallback import ForecastFallback
+from .history import ObservationRecorder
+from .negative_cache import NegativeCache
+from .snapshot import load_snapshot, write_snapshot
+from .spatial import SpatialIndex, validate_coordinates
+from .weather_data import DerivedWeatherData, WeatherData
+from .weather_client import WeatherApiClient, OpenWeatherMapClient, Validators
 from .exceptions import WeatherApiException
+from .logging_util import SAMPLED
 
 logger = logging.getLogger(__name__)
 
+# Forecast failures are remembered apart from current weather failures, since one
+# endpoint can fail for a city the other still answers
+FORECAST_NEGATIVE_KEY_PREFIX = "forecast:"
+
 
 class WeatherService:
     """Service layer for weather operations."""
 
-    def __init__(self, client: Optional[WeatherApiClient] = None) -> None:
+    DEFAULT_BATCH_WORKERS = 8
+
+    def __init__(
+        self,
+        client: Optional[WeatherApiClient] = None,
+        cache: Optional[WeatherCache] = None,
+        recorder: Optional[ObservationRecorder] = None,
+        spatial_index: Optional[SpatialIndex] = None,
+        nearby_radius_km: float = ConfigUtil.DEFAULT_NEARBY_RADIUS_KM,
+        negative_cache: Optional[NegativeCache] = None,
+        forecast_fallback: Optional[ForecastFallback] = None,
+        default_country: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> None:
         """Initialize the weather service.
 
         Args:
             client: Optional weather API client. If not provided, uses OpenWeatherMapClient.
+            cache: Optional weather cache. If not provided, every lookup goes upstream.
+            recorder: Optional history recorder that every newly fetched observation is
+                appended to.
+            spatial_index: Optional index of where cached observations were made. Requires
+                a cache; coordinate lookups near a fresh cached observation are then
+                answered locally. Fresh observations already in the cache, such as
+                those of a shared cache backend, are indexed at once.
+            nearby_radius_km: How close a cached observation must be to answer a
+                coordinate lookup
+            negative_cache: Optional cache of failed lookups. Repeated lookups of a
+                city that was not found, or whose name is invalid, then fail locally.
+            forecast_fallback: Optional store of recent forecasts. Fetched forecasts
+                are kept in it, and city lookups that cannot reach the API are
+                answered with an estimate derived from them.
+            default_country: Optional ISO 3166 country code that city names without a
+                country are qualified with, both for caching and upstream
+            max_concurrency: Optional ceiling of the adaptive concurrency limiter in
+                the client chain. Batch lookups then run that many workers by default
+                and leave the throttling to the limiter.
+
+        Raises:
+            ValueError: If a spatial index is given without a cache, the radius is
+                negative or max_concurrency is not positive
         """
+        if spatial_index is not None and cache is None:
+            raise ValueError("A spatial index requires a cache.")
+        if nearby_radius_km < 0:
+            raise ValueError("nearby_radius_km must not be negative")
+        if max_concurrency is not None and max_concurrency <= 0:
+            raise ValueError("max_concurrency must be positive")
+
         self.client = client or OpenWeatherMapClient()
+        self.cache = cache
+        self.recorder = recorder
+        self.spatial_index = spatial_index
+        self.nearby_radius_km = nearby_radius_km
+        self.negative_cache = negative_cache
+        self.forecast_fallback = forecast_fallback
+        self.default_country = default_country
+        self.max_concurrency = max_concurrency
+        self._in_flight: Dict[str, "Future[WeatherData]"] = {}
+        self._in_flight_lock = threading.Lock()
+        if spatial_index is not None and cache is not None:
+            self._index_cached(cache)
         logger.debug("WeatherService initialized")
 
     def get_weather(self, city: str) -> WeatherData:
         """Get weather information for a city.
 
+        If the API is rate limited or unavailable and a forecast fallback is
+        configured, a recent forecast of the city may answer instead, as
+        DerivedWeatherData.
+
         Args:
             city: The name of the city to get weather for
 
@@ -34,21 +115,510 @@ class WeatherService:
         Raises:
             WeatherApiException: If there's an error fetching weather data
         """
+        with tracing.span("weather.get_weather", city=city) as root:
+            with tracing.span("validate"):
+                if not city or not city.strip():
+                    logger.error("Empty city name provided")
+                    raise WeatherApiException("City name cannot be null or empty.")
+
+                city = qualify_city(city.strip(), self.default_country)
+                key = city_key(city)
+                self._raise_if_known_bad(key)
+
+            if self.cache is not None:
+                with tracing.span("cache.lookup") as lookup:
+                    cached = self.cache.get(key)
+                    lookup.set_attribute("hit", cached is not None)
+                if cached is not None:
+                    root.set_attribute("cache_hit", True)
+                    logger.info("Serving cached weather data for city: %s", city, extra=SAMPLED)
+                    return cached
+
+            root.set_attribute("cache_hit", False)
+            estimated = False
+            if self.forecast_fallback is not None and self.forecast_fallback.rate_limited:
+                estimated = True
+                derived = self.forecast_fallback.estimate(key, saves_request=True)
+                if derived is not None:
+                    root.set_attribute("derived", True)
+                    logger.info(
+                        "Serving weather for %s estimated from a forecast while rate limited",
+                        city,
+                        extra=SAMPLED,
+                    )
+                    return derived
+
+            logger.info("Fetching weather data for city: %s", city, extra=SAMPLED)
+
+            try:
+                weather_data = self._fetch_once(city, key)
+                logger.info(
+                    "Successfully retrieved weather data for %s", weather_data.city, extra=SAMPLED
+                )
+                return weather_data
+
+            except WeatherApiException as e:
+                logger.error("Failed to fetch weather data for city: %s", city)
+                self._remember_if_bad(key, e)
+                derived = self._estimate_from_forecast(key, e, estimated)
+                if derived is None:
+                    raise
+                root.set_attribute("derived", True)
+                logger.warning(
+                    "Serving weather for %s estimated from a forecast (%.0f%% confidence)",
+                    city,
+                    derived.confidence * 100,
+                )
+                return derived
+            except Exception as e:
+                logger.error("Unexpected error while fetching weather data for %s: %s", city, e)
+                raise WeatherApiException(f"Unexpected error: {str(e)}")
+
+    def canonical_key(self, city: str) -> str:
+        """Return the key a city is cached and deduplicated under by this service.
+
+        Args:
+            city: The city name, optionally qualified as "City,CC"
+
+        Returns:
+            The canonical key of the name qualified with the default country;
+            empty for a blank name
+        """
         if not city or not city.strip():
-            logger.error("Empty city name provided")
-            raise WeatherApiException("City name cannot be null or empty.")
+            return ""
+        return city_key(qualify_city(city.strip(), self.default_country))
+
+    def get_cached_weather(self, cities: Iterable[str]) -> Dict[str, WeatherData]:
+        """Get the fresh cached weather of several cities with one cache lookup.
+
+        Nothing is fetched; cities without fresh cached data are left out, so the
+        caller can look them up individually.
+
+        Args:
+            cities: The city names
+
+        Returns:
+            The cached weather data of each city that has some, keyed by the name given
+        """
+        if self.cache is None:
+            return {}
+        keys = {city: self.canonical_key(city) for city in cities if city and city.strip()}
+        cached = self.cache.get_many(list(dict.fromkeys(keys.values())))
+        return {city: cached[key] for city, key in keys.items() if key in cached}
+
+    def get_weather_batch(
+        self, cities: Iterable[str], max_workers: Optional[int] = None
+    ) -> WeatherBatch:
+        """Get weather information for many cities into a columnar batch.
+
+        Cities are read from the iterable as lookups finish, so it can be a lazy
+        stream; at most twice max_workers lookups are outstanding at once. Each
+        lookup goes through get_weather and keeps the caller's request priority.
 
-        city = city.strip()
-        logger.info(f"Fetching weather data for city: {city}")
+        Args:
+            cities: The city names to look up
+            max_workers: Maximum number of concurrent lookups; max_concurrency if
+                the service has one, else DEFAULT_BATCH_WORKERS
+
+        Returns:
+            WeatherBatch with the results in input order and the error of each
+            city whose lookup failed
+
+        Raises:
+            ValueError: If max_workers is not positive
+        """
+        if max_workers is None:
+            max_workers = self.max_concurrency or self.DEFAULT_BATCH_WORKERS
+        if max_workers <= 0:
+            raise ValueError("max_workers must be positive")
 
+        batch = WeatherBatch()
+        pending: Deque[Tuple[str, "Future[WeatherData]"]] = deque()
+        with ThreadPoolExecutor(max_workers, thread_name_prefix="weather-batch") as executor:
+            for city in cities:
+                context = contextvars.copy_context()
+                pending.append((city, executor.submit(context.run, self.get_weather, city)))
+                if len(pending) >= 2 * max_workers:
+                    self._collect(batch, *pending.popleft())
+            while pending:
+                self._collect(batch, *pending.popleft())
+        logger.info("Batch lookup finished: %d results, %d errors", len(batch), len(batch.errors))
+        return batch
+
+    def get_weather_at(self, latitude: float, longitude: float) -> WeatherData:
+        """Get weather information for a location.
+
+        If a fresh cached observation was made within the nearby radius, it is
+        returned without an upstream call.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Returns:
+            WeatherData object containing the weather information
+
+        Raises:
+            WeatherApiException: If the coordinates are invalid or there's an error
+                fetching weather data
+        """
         try:
-            weather_data = self.client.get_weather_from_api(city)
-            logger.info(f"Successfully retrieved weather data for {weather_data.city}")
+            validate_coordinates(latitude, longitude)
+        except ValueError as e:
+            logger.error("Invalid coordinates provided: %s, %s", latitude, longitude)
+            raise WeatherApiException(f"Invalid coordinates: {e}")
+
+        nearby = self._find_nearby(latitude, longitude)
+        if nearby is not None:
+            return nearby
+
+        key = f"@{latitude:.4f},{longitude:.4f}"
+        logger.info(
+            "Fetching weather data for coordinates: %s, %s", latitude, longitude, extra=SAMPLED
+        )
+
+        try:
+            weather_data = self._single_flight(
+                key, lambda: self._fetch_coordinates(key, latitude, longitude)
+            )
+            logger.info(
+                "Successfully retrieved weather data for %s", weather_data.city, extra=SAMPLED
+            )
             return weather_data
 
         except WeatherApiException:
-            logger.error(f"Failed to fetch weather data for city: {city}")
+            logger.error(
+                "Failed to fetch weather data for coordinates: %s, %s", latitude, longitude
+            )
+            raise
+        except Exception as e:
+            logger.error("Unexpected error while fetching weather data for %s: %s", key, e)
+            raise WeatherApiException(f"Unexpected error: {str(e)}")
+
+    def get_forecast(self, city: str) -> ForecastSeries:
+        """Get the multi-day forecast for a city.
+
+        With a forecast fallback, the forecast is also kept for estimating the
+        city's current weather while the API is unavailable.
+
+        Args:
+            city: The name of the city to get the forecast for
+
+        Returns:
+            ForecastSeries holding the forecast slots as columns
+
+        Raises:
+            WeatherApiException: If there's an error fetching the forecast
+        """
+        if not city or not city.strip():
+            logger.error("Empty city name provided")
+            raise WeatherApiException("City name cannot be null or empty.")
+
+        city = qualify_city(city.strip(), self.default_country)
+        key = city_key(city)
+        negative_key = FORECAST_NEGATIVE_KEY_PREFIX + key
+        self._raise_if_known_bad(negative_key)
+        logger.info("Fetching forecast for city: %s", city)
+
+        try:
+            forecast = self.client.get_forecast_from_api(city)
+            if self.forecast_fallback is not None:
+                self.forecast_fallback.put(key, forecast)
+            logger.info(
+                "Successfully retrieved %d forecast slots for %s", len(forecast), forecast.city
+            )
+            return forecast
+
+        except WeatherApiException as e:
+            logger.error("Failed to fetch forecast for city: %s", city)
+            self._remember_if_bad(negative_key, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error while fetching weather data for {city}: {e}")
+            logger.error("Unexpected error while fetching forecast for %s: %s", city, e)
             raise WeatherApiException(f"Unexpected error: {str(e)}")
+
+    def export_snapshot(self, path: Union[str, Path]) -> int:
+        """Write the cache to a snapshot file another service can warm-start from.
+
+        Args:
+            path: The snapshot file to write
+
+        Returns:
+            The number of entries written
+
+        Raises:
+            ValueError: If the service has no cache
+            OSError: If the file cannot be written
+        """
+        if self.cache is None:
+            raise ValueError("A snapshot requires a cache.")
+        return write_snapshot(self.cache, path)
+
+    def import_snapshot(self, path: Union[str, Path]) -> int:
+        """Warm the cache from a snapshot file, keeping each entry's remaining TTL.
+
+        Args:
+            path: The snapshot file to read
+
+        Returns:
+            The number of entries restored
+
+        Raises:
+            ValueError: If the service has no cache or the file is not a snapshot
+            OSError: If the file cannot be read
+        """
+        if self.cache is None:
+            raise ValueError("A snapshot requires a cache.")
+        entries = load_snapshot(self.cache, path)
+        for key, entry in entries:
+            self._index(key, entry.data)
+        return len(entries)
+
+    def _fetch_once(self, city: str, key: str) -> WeatherData:
+        """Fetch weather data, sharing one upstream call between concurrent callers.
+
+        Args:
+            city: The stripped city name, as sent upstream
+            key: The canonical city key, shared by every spelling of the city
+
+        Returns:
+            WeatherData object containing the weather information
+
+        Raises:
+            WeatherApiException: If there's an error fetching weather data
+        """
+        return self._single_flight(key, lambda: self._fetch(city, key))
+
+    def _single_flight(self, key: str, fetch: Callable[[], WeatherData]) -> WeatherData:
+        """Run a fetch, sharing it between concurrent callers with the same key.
+
+        The first caller for a key performs the fetch; callers arriving while it is
+        in flight wait for and receive the same result or exception.
+
+        Args:
+            key: The lookup key
+            fetch: Function performing the upstream fetch
+
+        Returns:
+            WeatherData object containing the weather information
+
+        Raises:
+            WeatherApiException: If there's an error fetching weather data
+        """
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if future is None:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not is_leader:
+            logger.debug("Joining in-flight request for %s", key)
+            return future.result()
+
+        try:
+            weather_data = fetch()
+            future.set_result(weather_data)
+            return weather_data
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+
+    def _fetch(self, city: str, key: str) -> WeatherData:
+        """Fetch weather data upstream, revalidating an expired cache entry if present.
+
+        Args:
+            city: The stripped city name, as sent upstream
+            key: The canonical city key, used as the cache key
+
+        Returns:
+            WeatherData object containing the weather information
+
+        Raises:
+            WeatherApiException: If there's an error fetching weather data
+        """
+        if self.cache is None:
+            weather_data = self.client.get_weather_from_api(city)
+            self._record(weather_data)
+            return weather_data
+
+        entry = self.cache.get_entry(key)
+        validators = None
+        if entry is not None:
+            validators = Validators(
+                etag=entry.etag,
+                last_modified=entry.last_modified,
+                observed_at=entry.data.observed_at,
+            )
+
+        result = self.client.fetch_weather(city, validators)
+
+        if entry is not None:
+            self.cache.record_revalidation(result.not_modified)
+
+        if result.data is None:
+            if entry is None:
+                raise WeatherApiException("Upstream reported no change for an uncached city.")
+            logger.debug("Weather data for %s unchanged, extending cache TTL", city)
+            self.cache.refresh(key, etag=result.etag, last_modified=result.last_modified)
+            return entry.data
+
+        self.cache.put(key, result.data, etag=result.etag, last_modified=result.last_modified)
+        self._index(key, result.data)
+        self._record(result.data)
+        return result.data
+
+    def _fetch_coordinates(self, key: str, latitude: float, longitude: float) -> WeatherData:
+        """Fetch weather data for a location upstream and cache it.
+
+        Args:
+            key: The cache key of the location
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Returns:
+            WeatherData object containing the weather information
+
+        Raises:
+            WeatherApiException: If there's an error fetching weather data
+        """
+        weather_data = self.client.get_weather_by_coordinates(latitude, longitude)
+        if self.cache is not None:
+            self.cache.put(key, weather_data)
+            self._index(key, weather_data)
+        self._record(weather_data)
+        return weather_data
+
+    def _find_nearby(self, latitude: float, longitude: float) -> Optional[WeatherData]:
+        """Find a fresh cached observation within the nearby radius of a location.
+
+        Index entries whose cache entry expired or was evicted are dropped on the way.
+
+        Args:
+            latitude: Latitude in degrees
+            longitude: Longitude in degrees
+
+        Returns:
+            The nearest fresh cached observation, or None if there is none
+        """
+        if self.spatial_index is None or self.cache is None:
+            return None
+
+        now = self.cache.now()
+        for key, distance in self.spatial_index.within(latitude, longitude, self.nearby_radius_km):
+            entry = self.cache.get_entry(key)
+            if entry is None:
+                self.spatial_index.remove(key)
+                continue
+            if entry.is_fresh(now):
+                logger.info(
+                    "Serving cached weather data for %s, %.1f km away",
+                    entry.data.city,
+                    distance,
+                    extra=SAMPLED,
+                )
+                return entry.data
+        return None
+
+    def _estimate_from_forecast(
+        self, key: str, error: WeatherApiException, estimated: bool = False
+    ) -> Optional[DerivedWeatherData]:
+        """Estimate a city's weather from its forecast after a failed upstream lookup.
+
+        Args:
+            key: The canonical city key
+            error: The error raised by the lookup
+            estimated: Whether an estimate was already tried before the lookup
+
+        Returns:
+            The estimate, or None if there is no fallback, the error is not about
+            availability, or no usable forecast is kept
+        """
+        if self.forecast_fallback is None:
+            return None
+        self.forecast_fallback.record_error(error)
+        if estimated or not self.forecast_fallback.can_stand_in_for(error):
+            return None
+        return self.forecast_fallback.estimate(key)
+
+    def _raise_if_known_bad(self, key: str) -> None:
+        """Fail a lookup locally if the city recently failed in a way that will repeat.
+
+        Args:
+            key: The canonical city key, prefixed for endpoints other than current weather
+
+        Raises:
+            WeatherApiException: The error remembered for the city
+        """
+        if self.negative_cache is None:
+            return
+        error = self.negative_cache.get(key)
+        if error is not None:
+            logger.info("Serving cached error for city: %s", key, extra=SAMPLED)
+            raise error
+
+    def _remember_if_bad(self, key: str, error: WeatherApiException) -> None:
+        """Remember a failed lookup if retrying it cannot succeed.
+
+        Args:
+            key: The canonical city key, prefixed for endpoints other than current weather
+            error: The error raised by the lookup
+        """
+        if self.negative_cache is not None:
+            self.negative_cache.put(key, error)
+
+    def _index_cached(self, cache: WeatherCache) -> None:
+        """Index the fresh observations already in the cache.
+
+        Args:
+            cache: The cache to index
+        """
+        now = cache.now()
+        for key, entry in cache.entries():
+            if entry.is_fresh(now):
+                self._index(key, entry.data)
+
+    def _index(self, key: str, weather_data: WeatherData) -> None:
+        """Add a cached observation to the spatial index, if one is configured.
+
+        Args:
+            key: The cache key of the observation
+            weather_data: The cached weather data
+        """
+        if self.spatial_index is None:
+            return
+        if weather_data.latitude is None or weather_data.longitude is None:
+            return
+        self.spatial_index.insert(key, weather_data.latitude, weather_data.longitude)
+
+    def _record(self, weather_data: WeatherData) -> None:
+        """Append a newly fetched observation to the history, if recording is enabled.
+
+        History is best effort: a failed write is logged and never fails the lookup.
+
+        Args:
+            weather_data: The newly fetched weather data
+        """
+        if self.recorder is None:
+            return
+        try:
+            self.recorder.record(weather_data)
+        except (OSError, struct.error) as e:
+            logger.warning("Failed to record observation for %s: %s", weather_data.city, e)
+
+    @staticmethod
+    def _collect(batch: WeatherBatch, city: str, future: "Future[WeatherData]") -> None:
+        """Add the outcome of a batch lookup to the batch.
+
+        Args:
+            batch: The batch being filled
+            city: The city name as given
+            future: The lookup of the city
+        """
+        try:
+            batch.append(future.result())
+        except WeatherApiException as e:
+            batch.errors[city] = str(e)
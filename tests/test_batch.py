@@ -0,0 +1,154 @@
+"""Tests for the columnar weather batch."""
+
+import csv
+import gc
+import io
+import json
+import tracemalloc
+
+import pytest
+from weather_cli.batch import COLUMNS, MISSING, WeatherBatch
+from weather_cli.weather_data import DerivedWeatherData, WeatherData
+
+DESCRIPTIONS = ["clear sky", "light rain", "overcast clouds", "scattered clouds"]
+
+
+def full_row(index):
+    """Build weather data with every field set."""
+    return WeatherData(
+        city=f"City {index}",
+        temperature_celsius=-5.25 + index % 40,
+        description=DESCRIPTIONS[index % 4],
+        observed_at=1700000000 + index,
+        city_id=2600000 + index,
+        condition_id=800 + index % 4,
+        latitude=40 + (index % 500) / 10,
+        longitude=-3 + (index % 700) / 10,
+    )
+
+
+def parsed_row(index):
+    """Build weather data from a freshly decoded response, as the client does."""
+    data = json.loads(json.dumps(full_row(index).__dict__))
+    return WeatherData(**data)
+
+
+def traced_size(build):
+    """Return the memory still allocated by what build returns."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+class TestWeatherBatch:
+    """Test cases for the WeatherBatch class."""
+
+    def setup_method(self, method):
+        """Set up test fixtures."""
+        self.rows = [
+            full_row(0),
+            WeatherData(city="Zürich", temperature_celsius=3, description="light rain"),
+            full_row(5),
+        ]
+        self.batch = WeatherBatch.from_weather(self.rows)
+
+    def test_rows_round_trip(self):
+        """Test that every row reads back equal to what was stored, including missing fields."""
+        assert len(self.batch) == 3
+        assert list(self.batch) == self.rows
+        assert self.batch[-1] == self.rows[2]
+        assert self.batch[1:] == self.rows[1:]
+        assert self.batch.city(1) == "Zürich"
+
+    def test_columns(self):
+        """Test that values are stored in packed columns with dictionary-encoded descriptions."""
+        assert self.batch.descriptions == ["clear sky", "light rain"]
+        assert self.batch.description_codes.tolist() == [0, 1, 1]
+        assert self.batch.city_ids.tolist() == [2600000, MISSING, 2600005]
+        assert self.batch.condition_ids.tolist() == [800, 0, 801]
+        assert self.batch.temperatures.typecode == "d"
+
+    def test_index_out_of_range(self):
+        """Test that reading past the end raises IndexError."""
+        with pytest.raises(IndexError):
+            self.batch[3]
+        with pytest.raises(IndexError):
+            self.batch[-4]
+
+    def test_unstorable_row_leaves_batch_unchanged(self):
+        """Test that a row whose condition code does not fit is rejected before storing."""
+        row = WeatherData(city="Oslo", temperature_celsius=1.0, description="fog", condition_id=-1)
+
+        with pytest.raises(ValueError, match="condition_id"):
+            self.batch.append(row)
+
+        assert len(self.batch) == 3
+        assert self.batch.descriptions == ["clear sky", "light rain"]
+
+    def test_to_columns(self):
+        """Test exporting the rows as JSON-ready lists per field."""
+        columns = self.batch.to_columns()
+
+        assert tuple(columns) == COLUMNS
+        assert columns["city"] == ["City 0", "Zürich", "City 5"]
+        assert columns["description"] == ["clear sky", "light rain", "light rain"]
+        assert columns["latitude"][1] is None
+        assert columns["observed_at"] == [1700000000, None, 1700000005]
+        json.dumps(columns)
+
+    def test_write_csv(self):
+        """Test exporting the rows as CSV with empty cells for missing values."""
+        output = io.StringIO(newline="")
+
+        assert self.batch.write_csv(output) == 3
+
+        lines = list(csv.reader(io.StringIO(output.getvalue())))
+        assert tuple(lines[0]) == COLUMNS
+        assert lines[2] == ["Zürich", "3.0", "light rain", "", "", "", "", "", "False", "", ""]
+        assert lines[3][0] == "City 5"
+
+        appended = io.StringIO(newline="")
+        self.batch.write_csv(appended, header=False)
+        assert appended.getvalue() == output.getvalue().split("\r\n", 1)[1]
+
+    def test_derived_rows_keep_their_flag(self):
+        """Test that rows estimated from a forecast read back and export as estimates."""
+        estimate = DerivedWeatherData(
+            city="Oslo",
+            temperature_celsius=1.5,
+            description="light rain",
+            confidence=0.75,
+            age_seconds=600.0,
+        )
+        self.batch.append(estimate)
+
+        assert self.batch[3] == estimate
+        assert self.batch[3].derived
+        assert not self.batch[0].derived
+        columns = self.batch.to_columns()
+        assert columns["derived"] == [False, False, False, True]
+        assert columns["confidence"] == [None, None, None, 0.75]
+        assert columns["age_seconds"][3] == 600.0
+
+        output = io.StringIO(newline="")
+        self.batch.write_csv(output)
+        assert list(csv.reader(io.StringIO(output.getvalue())))[4][-3:] == [
+            "True",
+            "0.75",
+            "600.0",
+        ]
+
+    def test_uses_far_less_memory_than_objects(self):
+        """Test that a large batch takes a fraction of the memory of a list of WeatherData."""
+        count = 5000
+
+        objects = traced_size(lambda: [parsed_row(index) for index in range(count)])
+        batch = traced_size(lambda: WeatherBatch.from_weather(map(parsed_row, range(count))))
+
+        assert batch * 6 < objects
@@ -0,0 +1,153 @@
+"""Tests for the load generator."""
+
+import json
+import threading
+
+import pytest
+from weather_cli.bench import PERCENTILES, BenchResult, percentile, run_benchmark
+from weather_cli.cache import WeatherCache
+from weather_cli.weather_client import WeatherApiClient
+from weather_cli.weather_data import WeatherData
+from weather_cli.weather_service import WeatherService
+from weather_cli.exceptions import WeatherApiException
+
+
+class FakeClient(WeatherApiClient):
+    """Client that knows every city except those listed as missing."""
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get_weather_from_api(self, city: str) -> WeatherData:
+        with self.lock:
+            self.calls += 1
+        if city in self.missing:
+            raise WeatherApiException("City not found.", 404)
+        return WeatherData(city=city, temperature_celsius=10.0, description="Clear")
+
+
+class FakeClock:
+    """Clock that only advances when slept on, shared by every worker."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+class TestPercentile:
+    """Test cases for the nearest-rank percentile."""
+
+    def test_nearest_rank(self):
+        """Test percentiles of a known distribution."""
+        samples = list(range(1, 1001))
+
+        assert [percentile(samples, p) for p in PERCENTILES] == [500, 900, 990, 999]
+        assert percentile(samples, 100) == 1000
+        assert percentile([7.0], 99.9) == 7.0
+
+    def test_no_samples(self):
+        """Test that an empty sample has no percentiles."""
+        assert percentile([], 50) is None
+
+
+class TestRunBenchmark:
+    """Test cases for the run_benchmark function."""
+
+    def test_counts_successes_and_errors(self):
+        """Test that every lookup is sent and failures are grouped by message."""
+        client = FakeClient(missing={"Atlantis"})
+        service = WeatherService(client=client)
+
+        result = run_benchmark(service, ["Oslo", "Atlantis"], requests=40, concurrency=4)
+
+        assert (result.requests, result.succeeded, result.failed) == (40, 20, 20)
+        assert result.errors == {"City not found.": 20}
+        assert client.calls == 40
+        assert list(result.latencies_ms) == ["p50", "p90", "p99", "p99.9", "mean", "max"]
+        assert result.latencies_ms["p50"] <= result.latencies_ms["p99.9"]
+        assert result.latencies_ms["p99.9"] <= result.latencies_ms["max"]
+        assert result.cache_hits is None
+
+    def test_cache_effects(self):
+        """Test that cache hits and misses during the run are reported."""
+        client = FakeClient()
+        service = WeatherService(client=client, cache=WeatherCache())
+        service.get_weather("Oslo")
+
+        result = run_benchmark(service, ["Oslo", "Rome", "Lima"], requests=30, concurrency=1)
+
+        assert (result.cache_hits, result.cache_misses) == (28, 2)
+        assert result.cache_hit_ratio == pytest.approx(28 / 30)
+        assert client.calls == 3
+
+    def test_target_rate(self):
+        """Test that lookups are spread over time and latency counts from when they were due."""
+        clock = FakeClock()
+        service = WeatherService(client=FakeClient())
+
+        result = run_benchmark(
+            service, ["Oslo"], requests=10, concurrency=1, rate=5.0, clock=clock, sleep=clock.sleep
+        )
+
+        assert clock.sleeps == pytest.approx([0.2] * 9)
+        assert result.duration_seconds == pytest.approx(1.8)
+        assert result.throughput == pytest.approx(10 / 1.8)
+        assert result.target_rate == 5.0
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"cities": []}, {"requests": 0}, {"concurrency": 0}, {"rate": -1.0}],
+    )
+    def test_invalid_arguments(self, kwargs):
+        """Test that empty city lists and non-positive settings are rejected."""
+        with pytest.raises(ValueError):
+            run_benchmark(WeatherService(client=FakeClient()), **kwargs)
+
+
+class TestBenchResult:
+    """Test cases for the BenchResult class."""
+
+    def setup_method(self, method):
+        """Set up test fixtures."""
+        self.result = BenchResult(
+            requests=100,
+            succeeded=98,
+            duration_seconds=2.0,
+            concurrency=8,
+            latencies_ms={"p50": 1.5, "p99": 9.25},
+            errors={"Request timeout. Please try again later.": 2},
+            cache_hits=60,
+            cache_misses=40,
+            upstream_requests=40,
+        )
+
+    def test_to_dict(self):
+        """Test the JSON document used to compare runs."""
+        document = json.loads(json.dumps(self.result.to_dict()))
+
+        assert (document["format"], document["version"]) == ("weather-cli-bench", 1)
+        assert document["throughput"] == 50.0
+        assert document["failed"] == 2
+        assert document["cache"] == {"hits": 60, "misses": 40, "hit_ratio": 0.6}
+        assert document["latency_ms"] == {"p50": 1.5, "p99": 9.25}
+
+    def test_format_report(self):
+        """Test the human-readable report."""
+        report = self.result.format_report()
+
+        assert "Throughput:  50.0 req/s (concurrency 8, target rate unlimited)" in report
+        assert "Latency:     p50 1.50 ms, p99 9.25 ms" in report
+        assert "Cache:       60 hits, 40 misses (60.0% hit ratio)" in report
+        assert "Upstream:    40 requests" in report
+        assert "Error:       2 x Request timeout." in report
@@ -0,0 +1,202 @@
+"""Tests for resumable bulk jobs."""
+
+import csv
+import gc
+import json
+import threading
+import tracemalloc
+
+import pytest
+from weather_cli.batch import COLUMNS
+from weather_cli.bulk import BulkJob, BulkState, chunked, load_state, read_cities, save_state
+from weather_cli.scheduler import Priority, current_request_class
+from weather_cli.weather_client import WeatherApiClient
+from weather_cli.weather_data import WeatherData
+from weather_cli.weather_service import WeatherService
+from weather_cli.exceptions import WeatherApiException
+
+
+class FakeClient(WeatherApiClient):
+    """Client that knows every city except those listed as missing."""
+
+    def __init__(self, missing=(), interrupt_at=None):
+        self.missing = set(missing)
+        self.interrupt_at = interrupt_at
+        self.calls = []
+        self.priorities = set()
+        self.lock = threading.Lock()
+
+    def get_weather_from_api(self, city: str) -> WeatherData:
+        with self.lock:
+            self.calls.append(city)
+            self.priorities.add(current_request_class().priority)
+            if len(self.calls) == self.interrupt_at:
+                raise KeyboardInterrupt
+        if city in self.missing:
+            raise WeatherApiException("City not found.", 404)
+        return WeatherData(city=city, temperature_celsius=10.0, description="Clear")
+
+
+def read_output(path):
+    """Return the header and the city column of a bulk job's output."""
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    return tuple(rows[0]), [row[0] for row in rows[1:]]
+
+
+class TestHelpers:
+    """Test cases for the input and state helpers."""
+
+    def test_read_cities(self, tmp_path):
+        """Test that blank and comment lines are skipped and line numbers kept."""
+        path = tmp_path / "cities.txt"
+        path.write_text("# capitals\nOslo\n\n  Rome \nLima\n", encoding="utf-8")
+
+        assert list(read_cities(path)) == [(2, "Oslo"), (4, "Rome"), (5, "Lima")]
+        assert list(read_cities(path, skip_lines=4)) == [(5, "Lima")]
+
+    def test_chunked(self):
+        """Test splitting an iterable into lists of bounded size."""
+        assert list(chunked(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(chunked([], 3)) == []
+
+    def test_state_round_trip(self, tmp_path):
+        """Test that saved state is read back unchanged."""
+        path = tmp_path / "job.state"
+        state = BulkState(input_path="/in.txt", lines_done=7, output_bytes=99, failed={"X": "e"})
+
+        save_state(state, path)
+
+        assert load_state(path) == state
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            "not json",
+            json.dumps({"format": "something-else", "version": 1}),
+            json.dumps({"format": "weather-cli-bulk-state", "version": 99}),
+            json.dumps({"format": "weather-cli-bulk-state", "version": 1, "state": {"x": 1}}),
+        ],
+    )
+    def test_invalid_state(self, tmp_path, content):
+        """Test that unreadable state files are rejected with ValueError."""
+        path = tmp_path / "job.state"
+        path.write_text(content, encoding="utf-8")
+
+        with pytest.raises(ValueError):
+            load_state(path)
+
+
+class TestBulkJob:
+    """Test cases for the BulkJob class."""
+
+    def setup_method(self, method):
+        """Set up test fixtures."""
+        self.cities = [f"City{index}" for index in range(25)]
+
+    def make_job(self, tmp_path, client, **kwargs):
+        """Create a job over the test cities with a small chunk size."""
+        input_path = tmp_path / "cities.txt"
+        input_path.write_text("\n".join(self.cities) + "\n", encoding="utf-8")
+        kwargs.setdefault("chunk_size", 10)
+        return BulkJob(WeatherService(client=client), input_path, tmp_path / "out.csv", **kwargs)
+
+    def test_run(self, tmp_path):
+        """Test that results are written as CSV and failures recorded in the state."""
+        client = FakeClient(missing={"City3"})
+        job = self.make_job(tmp_path, client)
+
+        state = job.run()
+
+        header, cities = read_output(job.output_path)
+        assert header == COLUMNS
+        assert cities == [city for city in self.cities if city != "City3"]
+        assert state.succeeded == 24
+        assert state.failed == {"City3": "City not found."}
+        assert load_state(tmp_path / "out.csv.state") == state
+        assert client.priorities == {Priority.BULK}
+
+    def test_resume_after_interrupt(self, tmp_path):
+        """Test that an interrupted job resumes after its last checkpoint without duplicates."""
+        job = self.make_job(tmp_path, FakeClient(interrupt_at=15))
+        with pytest.raises(KeyboardInterrupt):
+            job.run()
+        assert load_state(job.state_path).lines_done == 10
+
+        client = FakeClient()
+        job.service = WeatherService(client=client)
+        state = job.run(resume=True)
+
+        assert read_output(job.output_path)[1] == self.cities
+        assert client.calls[0] == "City10"
+        assert len(client.calls) == 15
+        assert state.lines_done == 25
+
+    def test_resume_discards_output_after_checkpoint(self, tmp_path):
+        """Test that rows written after the last checkpoint are not kept twice."""
+        job = self.make_job(tmp_path, FakeClient())
+        job.run()
+        with open(job.output_path, "a", encoding="utf-8") as output:
+            output.write("City24,10.0,Clear,,,,,\r\n")
+
+        job.run(resume=True)
+
+        assert read_output(job.output_path)[1] == self.cities
+
+    def test_resume_retries_only_failures(self, tmp_path):
+        """Test that resuming a finished job looks up just the cities that failed."""
+        job = self.make_job(tmp_path, FakeClient(missing={"City3", "City20"}))
+        job.run()
+
+        client = FakeClient(missing={"City20"})
+        job.service = WeatherService(client=client)
+        state = job.run(resume=True)
+
+        assert sorted(client.calls) == ["City20", "City3"]
+        assert state.failed == {"City20": "City not found."}
+        assert state.succeeded == 24
+        assert read_output(job.output_path)[1][-1] == "City3"
+
+    def test_resume_rejects_other_input(self, tmp_path):
+        """Test that a state file is only resumed with the input it was made for."""
+        job = self.make_job(tmp_path, FakeClient())
+        job.run()
+        other = tmp_path / "other.txt"
+        other.write_text("Oslo\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="belongs to input"):
+            BulkJob(job.service, other, job.output_path).run(resume=True)
+
+    def test_resume_without_state(self, tmp_path):
+        """Test that resuming a job that never started fails."""
+        with pytest.raises(OSError):
+            self.make_job(tmp_path, FakeClient()).run(resume=True)
+
+    def test_memory_does_not_grow_with_input(self, tmp_path):
+        """Test that peak memory is the same for a small and a ten times larger input."""
+
+        class CountingClient(FakeClient):
+            def get_weather_from_api(self, city: str) -> WeatherData:
+                return WeatherData(city=city, temperature_celsius=10.0, description="Clear")
+
+        def peak(count):
+            # Few distinct names, so caches of canonical city keys stay the same size
+            self.cities = [f"City{index % 50}" for index in range(count)]
+            job = self.make_job(tmp_path, CountingClient(), chunk_size=100, max_workers=2)
+            gc.collect()
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            job.run()
+            return tracemalloc.get_traced_memory()[1] - baseline
+
+        tracemalloc.start()
+        try:
+            assert peak(5000) < 1.5 * peak(500)
+        finally:
+            tracemalloc.stop()
+
+    @pytest.mark.parametrize("kwargs", [{"chunk_size": 0}, {"max_workers": 0}])
+    def test_invalid_configuration(self, tmp_path, kwargs):
+        """Test that chunk size and workers must be positive."""
+        with pytest.raises(ValueError):
+            self.make_job(tmp_path, FakeClient(), **kwargs)
@@ -0,0 +1,128 @@
+"""Tests for the weather cache."""
+
+import pytest
+from weather_cli.cache import WeatherCache, CacheEntry
+from weather_cli.weather_data import WeatherData
+
+
+class FakeClock:
+    """Manually advanced clock for deterministic TTL tests."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestWeatherCache:
+    """Test cases for the WeatherCache class."""
+
+    def setup_method(self, method):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        self.cache = WeatherCache(ttl_seconds=60, max_entries=3, clock=self.clock)
+        self.weather = WeatherData(
+            city="London", temperature_celsius=15.5, description="Cloudy", observed_at=900
+        )
+
+    def test_invalid_configuration(self):
+        """Test that non-positive TTL and size limits are rejected."""
+        with pytest.raises(ValueError, match="ttl_seconds must be positive"):
+            WeatherCache(ttl_seconds=0)
+        with pytest.raises(ValueError, match="max_entries must be positive"):
+            WeatherCache(max_entries=0)
+
+    def test_get_fresh_entry_is_hit(self):
+        """Test that a fresh entry is served and counted as a hit."""
+        self.cache.put("London", self.weather)
+
+        assert self.cache.get("London") == self.weather
+        assert self.cache.stats.hits == 1
+        assert self.cache.stats.misses == 0
+
+    def test_get_missing_entry_is_miss(self):
+        """Test that an unknown key is counted as a miss."""
+        assert self.cache.get("Paris") is None
+        assert self.cache.stats.misses == 1
+
+    def test_expired_entry_is_miss_but_retained(self):
+        """Test that expired entries are not served but kept for revalidation."""
+        self.cache.put("London", self.weather, etag='"abc"', last_modified="Mon")
+        self.clock.now += 61
+
+        assert self.cache.get("London") is None
+        entry = self.cache.get_entry("London")
+        assert isinstance(entry, CacheEntry)
+        assert entry.etag == '"abc"'
+        assert entry.last_modified == "Mon"
+        assert not entry.is_fresh(self.clock.now)
+
+    def test_refresh_extends_ttl_and_keeps_validators(self):
+        """Test that refreshing an unchanged entry restarts its TTL."""
+        self.cache.put("London", self.weather, etag='"abc"')
+        self.clock.now += 61
+
+        refreshed = self.cache.refresh("London", last_modified="Tue")
+
+        assert refreshed is not None
+        assert refreshed.expires_at == self.clock.now + 60
+        assert refreshed.etag == '"abc"'
+        assert refreshed.last_modified == "Tue"
+        assert self.cache.get("London") == self.weather
+
+    def test_refresh_missing_entry(self):
+        """Test that refreshing an unknown key does nothing."""
+        assert self.cache.refresh("Nowhere") is None
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted when full."""
+        for city in ("A", "B", "C"):
+            self.cache.put(city, self.weather)
+        self.cache.get("A")
+        self.cache.put("D", self.weather)
+
+        assert len(self.cache) == 3
+        assert self.cache.get_entry("B") is None
+        assert self.cache.get_entry("A") is not None
+
+    def test_record_revalidation(self):
+        """Test revalidation counters."""
+        self.cache.record_revalidation(not_modified=True)
+        self.cache.record_revalidation(not_modified=False)
+
+        assert self.cache.stats.revalidations == 2
+        assert self.cache.stats.not_modified == 1
+
+    def test_invalidate_and_clear(self):
+        """Test removing entries."""
+        self.cache.put("London", self.weather)
+        self.cache.put("Paris", self.weather)
+
+        self.cache.invalidate("London")
+        assert self.cache.get_entry("London") is None
+
+        self.cache.clear()
+        assert len(self.cache) == 0
+
+    def test_entries_in_eviction_order(self):
+        """Test that entries are listed least recently used first, expired ones included."""
+        self.cache.put("A", self.weather)
+        self.cache.put("B", self.weather)
+        self.cache.get("A")
+        self.clock.now += 61
+
+        assert [key for key, _ in self.cache.entries()] == ["B", "A"]
+
+    def test_restore_keeps_timestamps(self):
+        """Test that a restored entry keeps its expiry and respects the size limit."""
+        entry = CacheEntry(data=self.weather, stored_at=990.0, expires_at=1010.0, etag='"v1"')
+        for key in ("A", "B", "C"):
+            self.cache.put(key, self.weather)
+
+        self.cache.restore("London", entry)
+
+        assert self.cache.get_entry("London") == entry
+        assert self.cache.get_entry("A") is None
+        self.clock.now = 1010.0
+        assert self.cache.get("London") is None
@@ -0,0 +1,423 @@
+"""Tests for the cache storage backends."""
+
+import fnmatch
+import os
+import socketserver
+import threading
+from collections import Counter
+
+import pytest
+from weather_cli.cache import WeatherCache
+from weather_cli.cache_backends import (
+    CacheEntry,
+    CompressedJsonSerializer,
+    DiskBackend,
+    JsonSerializer,
+    MemoryBackend,
+    RedisBackend,
+    RespClient,
+    create_backend,
+)
+from weather_cli.forecast import ForecastSeries
+from weather_cli.weather_data import WeatherData
+from weather_cli.exceptions import CacheBackendException
+
+
+class FakeRespHandler(socketserver.StreamRequestHandler):
+    """Answers RESP commands from the fake server's in-memory store."""
+
+    def handle(self):
+        server = self.server
+        while True:
+            command = self.read_command()
+            if command is None:
+                return
+            name = command[0].decode().upper()
+            server.commands[name] += 1
+            self.wfile.write(server.execute(name, command[1:]))
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line.startswith(b"*"):
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+
+class FakeRespServer(socketserver.ThreadingTCPServer):
+    """In-process server speaking enough of the Redis protocol for the backend."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password=None):
+        super().__init__(("127.0.0.1", 0), FakeRespHandler)
+        self.password = password
+        self.store = {}
+        self.expiries = {}
+        self.commands = Counter()
+
+    def execute(self, name, args):
+        if name == "AUTH":
+            return b"+OK\r\n" if args[0].decode() == self.password else b"-ERR invalid password\r\n"
+        if name in ("PING", "SELECT"):
+            return b"+OK\r\n"
+        if name == "GET":
+            return self.bulk(self.store.get(args[0]))
+        if name == "MGET":
+            return b"*%d\r\n" % len(args) + b"".join(self.bulk(self.store.get(k)) for k in args)
+        if name == "SET":
+            self.store[args[0]] = args[1]
+            if len(args) == 4 and args[2].upper() == b"EX":
+                self.expiries[args[0]] = int(args[3])
+            return b"+OK\r\n"
+        if name == "DEL":
+            removed = sum(self.store.pop(key, None) is not None for key in args)
+            return b":%d\r\n" % removed
+        if name == "SCAN":
+            cursor, pattern, count = int(args[0]), args[2].decode(), int(args[4])
+            keys = sorted(k for k in self.store if fnmatch.fnmatchcase(k.decode(), pattern))
+            end = cursor + count
+            page = keys[cursor:end]
+            following = end if end < len(keys) else 0
+            return (
+                b"*2\r\n"
+                + self.bulk(str(following).encode())
+                + b"*%d\r\n" % len(page)
+                + b"".join(self.bulk(key) for key in page)
+            )
+        return b"-ERR unknown command\r\n"
+
+    @staticmethod
+    def bulk(value):
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+@pytest.fixture
+def resp_server():
+    """Run a fake RESP server for the duration of a test."""
+    server = FakeRespServer()
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_entry(city="London", temperature=15.5, stored_at=1000.0, etag=None):
+    """Create a cache entry."""
+    data = WeatherData(city=city, temperature_celsius=temperature, description="Cloudy")
+    return CacheEntry(data=data, stored_at=stored_at, expires_at=stored_at + 60, etag=etag)
+
+
+class TestSerializers:
+    """Test cases for the entry serializers."""
+
+    @pytest.mark.parametrize("serializer", [JsonSerializer(), CompressedJsonSerializer(level=9)])
+    def test_round_trip(self, serializer):
+        """Test that an entry and its key survive a round trip."""
+        entry = make_entry(city="Zürich", etag='"v1"')
+
+        assert serializer.loads(serializer.dumps("zürich", entry)) == ("zürich", entry)
+
+    def test_forecast_round_trip(self):
+        """Test that an entry holding a forecast series survives a round trip."""
+        forecast = ForecastSeries.from_dict(
+            {
+                "city": "Oslo",
+                "timezone_offset": 3600,
+                "timestamps": [0, 10800],
+                "temperatures": [1.5, 2.5],
+                "humidity": [80, 82],
+                "wind_speeds": [3.0, 4.0],
+                "description_codes": [0, 1],
+                "description_table": ["snow", "fog"],
+            }
+        )
+        entry = CacheEntry(data=forecast, stored_at=1.0, expires_at=2.0)
+
+        key, loaded = JsonSerializer().loads(JsonSerializer().dumps("oslo", entry))
+
+        assert key == "oslo"
+        assert loaded.data.to_dict() == forecast.to_dict()
+        assert (loaded.stored_at, loaded.expires_at) == (1.0, 2.0)
+
+    @pytest.mark.parametrize("payload", [b"not json", b'{"key": "x"}', b"\xff"])
+    def test_invalid_json(self, payload):
+        """Test that invalid payloads raise ValueError."""
+        with pytest.raises(ValueError):
+            JsonSerializer().loads(payload)
+
+    def test_invalid_compressed(self):
+        """Test that uncompressed payloads raise ValueError."""
+        with pytest.raises(ValueError):
+            CompressedJsonSerializer().loads(b'{"key": "x"}')
+
+    def test_invalid_level(self):
+        """Test that compression levels outside 1-9 are rejected."""
+        with pytest.raises(ValueError):
+            CompressedJsonSerializer(level=0)
+
+
+class TestMemoryBackend:
+    """Test cases for the in-memory backend."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that reading an entry protects it from eviction."""
+        backend = MemoryBackend(max_entries=2)
+        backend.set("a", make_entry("A"))
+        backend.set("b", make_entry("B"))
+        backend.get("a")
+        backend.set("c", make_entry("C"))
+
+        assert [key for key, _ in backend.items()] == ["a", "c"]
+        assert backend.get_many(["a", "b", "c"]).keys() == {"a", "c"}
+
+    def test_delete_and_clear(self):
+        """Test removing entries."""
+        backend = MemoryBackend()
+        backend.set("a", make_entry())
+        backend.set("b", make_entry())
+
+        backend.delete("a")
+        backend.delete("missing")
+        assert len(backend) == 1
+
+        backend.clear()
+        assert len(backend) == 0
+
+
+class TestDiskBackend:
+    """Test cases for the on-disk backend."""
+
+    def test_shared_between_instances(self, tmp_path):
+        """Test that entries written by one process are read by another."""
+        DiskBackend(tmp_path, serializer=CompressedJsonSerializer()).set("london", make_entry())
+
+        other = DiskBackend(tmp_path, serializer=CompressedJsonSerializer())
+        assert other.get("london") == make_entry()
+        assert other.get("paris") is None
+        assert len(other) == 1
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the oldest files beyond the limit are removed."""
+        backend = DiskBackend(tmp_path, max_entries=2)
+        for age, key in enumerate(["a", "b"]):
+            backend.set(key, make_entry(key))
+            os.utime(backend._path(key), (age, age))
+
+        backend.set("c", make_entry("c"))
+
+        assert backend.get("a") is None
+        assert {key for key, _ in backend.items()} == {"b", "c"}
+
+    def test_corrupt_files_are_misses(self, tmp_path):
+        """Test that unreadable files are treated as absent."""
+        backend = DiskBackend(tmp_path)
+        backend.set("london", make_entry())
+        backend._path("london").write_bytes(b"garbage")
+
+        assert backend.get("london") is None
+        assert backend.items() == []
+
+    def test_delete_and_clear(self, tmp_path):
+        """Test removing entry files."""
+        backend = DiskBackend(tmp_path)
+        backend.set("a", make_entry())
+        backend.set("b", make_entry())
+
+        backend.delete("a")
+        backend.delete("missing")
+        assert len(backend) == 1
+
+        backend.clear()
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestRedisBackend:
+    """Test cases for the Redis backend against a fake server."""
+
+    def make_backend(self, server, **kwargs):
+        """Create a backend connected to the fake server."""
+        host, port = server.server_address
+        return RedisBackend(RespClient(host=host, port=port), **kwargs)
+
+    def test_set_and_get(self, resp_server):
+        """Test that entries are stored under the prefix with a retention time."""
+        backend = self.make_backend(resp_server, retention_seconds=3600)
+
+        backend.set("london", make_entry(etag='"v1"'))
+
+        assert backend.get("london") == make_entry(etag='"v1"')
+        assert backend.get("paris") is None
+        assert resp_server.expiries == {b"weather-cli:london": 3600}
+
+    def test_get_many_is_one_round_trip(self, resp_server):
+        """Test that a multi-get costs a single command and round trip."""
+        backend = self.make_backend(resp_server)
+        for city in ("London", "Paris", "Oslo"):
+            backend.set(city.lower(), make_entry(city))
+        round_trips = backend.client.round_trips
+
+        entries = backend.get_many(["london", "oslo", "cairo", "london"])
+
+        assert backend.client.round_trips == round_trips + 1
+        assert resp_server.commands["MGET"] == 1
+        assert {key: entry.data.city for key, entry in entries.items()} == {
+            "london": "London",
+            "oslo": "Oslo",
+        }
+
+    def test_pipeline_sends_commands_together(self, resp_server):
+        """Test that pipelined commands return replies in order in one round trip."""
+        backend = self.make_backend(resp_server)
+
+        replies = backend.client.pipeline([("SET", "a", "1"), ("GET", "a"), ("BOGUS",)])
+
+        assert replies[:2] == [b"OK", b"1"]
+        assert "unknown command" in str(replies[2])
+        assert backend.client.round_trips == 1
+
+    def test_items_clear_and_len_scan_the_prefix(self, resp_server):
+        """Test that listing and clearing only touch keys under the prefix."""
+        backend = self.make_backend(resp_server)
+        backend.SCAN_COUNT = 2
+        for index in range(5):
+            backend.set(f"city{index}", make_entry(f"City{index}"))
+        resp_server.store[b"other-app:key"] = b"keep"
+
+        assert len(backend) == 5
+        assert sorted(key for key, _ in backend.items()) == [f"city{i}" for i in range(5)]
+
+        backend.clear()
+        assert list(resp_server.store) == [b"other-app:key"]
+
+    def test_corrupt_values_are_misses(self, resp_server):
+        """Test that values written by something else are ignored."""
+        backend = self.make_backend(resp_server)
+        resp_server.store[b"weather-cli:london"] = b"garbage"
+
+        assert backend.get("london") is None
+
+    def test_authenticates(self):
+        """Test that the password from the URL is sent with AUTH."""
+        server = FakeRespServer(password="s3cret")
+        threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+        try:
+            host, port = server.server_address
+            good = RedisBackend(RespClient.from_url(f"redis://:s3cret@{host}:{port}/2"))
+            bad = RedisBackend(RespClient.from_url(f"redis://:wrong@{host}:{port}"))
+
+            good.set("london", make_entry())
+            with pytest.raises(CacheBackendException):
+                bad.get("london")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_unreachable_server(self):
+        """Test that connection failures raise CacheBackendException."""
+        server = FakeRespServer()
+        host, port = server.server_address
+        server.server_close()
+        backend = RedisBackend(RespClient(host=host, port=port, timeout=0.5))
+
+        with pytest.raises(CacheBackendException, match="Cannot reach cache server"):
+            backend.get("london")
+
+    def test_invalid_url(self):
+        """Test that only redis:// URLs are accepted."""
+        with pytest.raises(ValueError):
+            RespClient.from_url("http://localhost:6379")
+
+
+class TestWeatherCacheWithBackends:
+    """Test cases for WeatherCache on top of shared backends."""
+
+    def test_hosts_share_a_redis_cache(self, resp_server):
+        """Test that an entry stored by one host is a hit for another."""
+        host, port = resp_server.server_address
+        url = f"redis://{host}:{port}"
+        first = WeatherCache(ttl_seconds=60, backend=create_backend("redis", url), clock=lambda: 0)
+        second = WeatherCache(ttl_seconds=60, backend=create_backend("redis", url), clock=lambda: 1)
+        london = make_entry().data
+
+        first.put("london", london, etag='"v1"')
+
+        assert second.get("london") == london
+        assert second.get_many(["london", "paris"]) == {"london": london}
+        assert second.stats.hits == 2
+
+    def test_refresh_writes_through(self, tmp_path):
+        """Test that refreshed entries are stored in the backend."""
+        clock = iter([0.0, 100.0, 100.0]).__next__
+        cache = WeatherCache(ttl_seconds=60, backend=DiskBackend(tmp_path), clock=clock)
+        cache.put("london", make_entry().data, etag='"v1"')
+
+        cache.refresh("london")
+
+        entry = DiskBackend(tmp_path).get("london")
+        assert entry.expires_at == 160.0
+        assert entry.etag == '"v1"'
+
+    def test_unreachable_backend_is_a_miss(self):
+        """Test that a backend outage degrades to uncached lookups."""
+        server = FakeRespServer()
+        host, port = server.server_address
+        server.server_close()
+        backend = RedisBackend(RespClient(host=host, port=port, timeout=0.5))
+        cache = WeatherCache(backend=backend)
+
+        cache.put("london", make_entry().data)
+
+        assert cache.get("london") is None
+        assert cache.get_many(["london"]) == {}
+        assert cache.entries() == []
+        assert len(cache) == 0
+        assert cache.stats.misses == 1
+
+
+class TestCreateBackend:
+    """Test cases for create_backend."""
+
+    def test_creates_each_kind(self, tmp_path):
+        """Test that each backend kind is created with its serializer."""
+        assert isinstance(create_backend("memory"), MemoryBackend)
+        disk = create_backend("disk", str(tmp_path), serializer="zlib")
+        assert isinstance(disk, DiskBackend)
+        assert isinstance(disk.serializer, CompressedJsonSerializer)
+        redis = create_backend("redis", "redis://cache.internal:6380/1")
+        assert isinstance(redis, RedisBackend)
+        assert (redis.client.host, redis.client.port, redis.client.db) == (
+            "cache.internal",
+            6380,
+            1,
+        )
+
+    def test_namespace(self, tmp_path):
+        """Test that a namespace is kept apart from the weather entries."""
+        disk = create_backend("disk", str(tmp_path), namespace="forecasts")
+        redis = create_backend("redis", "redis://cache.internal:6380/1", namespace="forecasts")
+
+        assert disk.directory == tmp_path / "forecasts"
+        assert redis.prefix == "weather-cli-forecasts:"
+        assert not redis.prefix.startswith(RedisBackend.DEFAULT_PREFIX)
+
+    @pytest.mark.parametrize(
+        "kind, location, serializer",
+        [
+            ("memcached", None, "json"),
+            ("disk", None, "json"),
+            ("redis", None, "json"),
+            ("memory", None, "pickle"),
+        ],
+    )
+    def test_invalid_settings(self, kind, location, serializer):
+        """Test that unknown kinds, missing locations and unknown serializers fail."""
+        with pytest.raises(ValueError):
+            create_backend(kind, location, serializer=serializer)
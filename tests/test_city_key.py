@@ -0,0 +1,50 @@
+"""Tests for canonical city keys."""
+
+import pytest
+from weather_cli.city_key import city_key, qualify_city
+
+
+class TestCityKey:
+    """Test cases for city_key."""
+
+    @pytest.mark.parametrize("spelling", ["paris", " Paris", "PARIS", "Paris  ", "\tpArIs\n"])
+    def test_spellings_share_a_key(self, spelling):
+        """Test that case and surrounding whitespace do not matter."""
+        assert city_key(spelling) == "paris"
+
+    def test_inner_whitespace_is_collapsed(self):
+        """Test that runs of inner whitespace become one space."""
+        assert city_key("New   York") == city_key("new york") == "new york"
+
+    def test_unicode_normalization(self):
+        """Test that composed and decomposed forms share a key."""
+        composed = "Z\u00fcrich"
+        decomposed = "Zu\u0308rich"
+
+        assert city_key(composed) == city_key(decomposed) == "z\u00fcrich"
+
+    def test_casefolding(self):
+        """Test that full casefolding is applied, not just lowercasing."""
+        assert city_key("STRASSE") == city_key("Straße")
+
+    def test_country_qualifier(self):
+        """Test that qualified names lose the spaces around the commas."""
+        assert city_key("Paris , FR") == city_key("paris,fr") == "paris,fr"
+
+    def test_qualify_city(self):
+        """Test that only unqualified names get the default country."""
+        assert qualify_city("Paris", "FR") == "Paris,FR"
+        assert qualify_city("Paris,US", "FR") == "Paris,US"
+        assert qualify_city("Paris", " ") == "Paris"
+        assert qualify_city("Paris", None) == "Paris"
+
+    def test_keys_are_interned(self):
+        """Test that equal keys from different spellings are the same object."""
+        first = city_key("".join(["Lon", "don"]))
+        second = city_key(" LONDON ")
+
+        assert first is second
+
+    def test_blank_name(self):
+        """Test that a blank name has an empty key."""
+        assert city_key("   ") == ""
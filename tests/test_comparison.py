@@ -0,0 +1,209 @@
+"""Tests for the multi-city weather comparison."""
+
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from weather_cli.cache import WeatherCache
+from weather_cli.comparison import ComparisonResult, compare_cities, format_comparison_table
+from weather_cli.units import Units
+from weather_cli.weather_client import WeatherApiClient
+from weather_cli.weather_data import WeatherData
+from weather_cli.weather_service import WeatherService
+from weather_cli.exceptions import WeatherApiException
+
+TEMPERATURES = {"Oslo": 4.0, "Madrid": 31.5, "London": 15.0, "Cairo": 35.0}
+
+
+class SlowClient(WeatherApiClient):
+    """Client that answers after a per-city delay and counts upstream calls."""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_weather_from_api(self, city: str) -> WeatherData:
+        with self.lock:
+            self.calls.append(city)
+        time.sleep(self.delays.get(city, 0.05))
+        if city not in TEMPERATURES:
+            raise WeatherApiException("City not found. Please check the city name and try again.")
+        return WeatherData(city=city, temperature_celsius=TEMPERATURES[city], description="Clear")
+
+
+class TestCompareCities:
+    """Test cases for compare_cities."""
+
+    def test_ranks_by_temperature_descending(self):
+        """Test that results are ranked hottest first by default."""
+        service = WeatherService(client=SlowClient())
+
+        result = compare_cities(service, ["Oslo", "Madrid", "London"])
+
+        assert [data.city for data in result.results] == ["Madrid", "London", "Oslo"]
+        assert result.complete
+        assert result.errors == {}
+
+    def test_ranks_by_other_field_ascending(self):
+        """Test ranking by city name in ascending order."""
+        service = WeatherService(client=SlowClient())
+
+        result = compare_cities(
+            service, ["Oslo", "Madrid", "Cairo"], sort_by="city", descending=False
+        )
+
+        assert [data.city for data in result.results] == ["Cairo", "Madrid", "Oslo"]
+
+    def test_fetches_concurrently(self):
+        """Test that total time tracks the slowest city rather than the sum."""
+        client = SlowClient(delays={city: 0.2 for city in TEMPERATURES})
+        service = WeatherService(client=client)
+
+        start = time.monotonic()
+        result = compare_cities(service, list(TEMPERATURES))
+        elapsed = time.monotonic() - start
+
+        assert len(result.results) == 4
+        assert elapsed < 0.6
+
+    def test_duplicate_cities_fetched_once(self):
+        """Test that repeated city names cost a single upstream call."""
+        client = SlowClient()
+        service = WeatherService(client=client)
+
+        result = compare_cities(service, ["Oslo", " Oslo", "Oslo "])
+
+        assert len(result.results) == 1
+        assert client.calls == ["Oslo"]
+
+    def test_cached_cities_answered_by_one_lookup(self):
+        """Test that cities cached by an earlier lookup are not fetched again."""
+        client = SlowClient()
+        service = WeatherService(client=client, cache=WeatherCache())
+        service.get_weather("Oslo")
+        service.get_weather("Madrid")
+
+        result = compare_cities(service, ["OSLO", "Madrid", "London"])
+
+        assert [data.city for data in result.results] == ["Madrid", "London", "Oslo"]
+        assert client.calls == ["Oslo", "Madrid", "London"]
+
+        result = compare_cities(service, ["Oslo", "Madrid"])
+        assert len(result.results) == 2
+        assert len(client.calls) == 3
+
+    def test_spelling_variants_fetched_once(self):
+        """Test that different spellings of a city are compared once, as first written."""
+        client = SlowClient()
+        service = WeatherService(client=client)
+
+        result = compare_cities(service, ["Oslo", "OSLO", "oslo ", "Madrid"])
+
+        assert len(result.results) == 2
+        assert sorted(client.calls) == ["Madrid", "Oslo"]
+
+    def test_default_country_variants_fetched_once(self):
+        """Test that names with and without the default country are compared once."""
+        client = SlowClient()
+        service = WeatherService(client=client, default_country="FR")
+
+        result = compare_cities(service, ["Paris", "paris,fr", "Paris,US"])
+
+        assert sorted(result.errors) == ["Paris", "Paris,US"]
+        assert sorted(client.calls) == ["Paris,FR", "Paris,US"]
+
+    def test_errors_reported_per_city(self):
+        """Test that a failing city does not hide the others."""
+        service = WeatherService(client=SlowClient())
+
+        result = compare_cities(service, ["Oslo", "Atlantis"])
+
+        assert [data.city for data in result.results] == ["Oslo"]
+        assert "City not found" in result.errors["Atlantis"]
+
+    def test_deadline_returns_partial_results(self):
+        """Test that slow cities are reported as pending after the deadline."""
+        client = SlowClient(delays={"Oslo": 0.01, "Cairo": 2.0})
+        service = WeatherService(client=client)
+
+        start = time.monotonic()
+        result = compare_cities(service, ["Oslo", "Cairo"], deadline=0.3)
+        elapsed = time.monotonic() - start
+
+        assert [data.city for data in result.results] == ["Oslo"]
+        assert result.pending == ["Cairo"]
+        assert not result.complete
+        assert elapsed < 1.0
+
+    def test_abandoned_lookups_do_not_delay_exit(self):
+        """Test that the process exits at the deadline, not when slow lookups finish."""
+        script = textwrap.dedent("""
+            import time
+            from weather_cli.comparison import compare_cities
+            from weather_cli.weather_client import WeatherApiClient
+            from weather_cli.weather_data import WeatherData
+            from weather_cli.weather_service import WeatherService
+
+            class StuckClient(WeatherApiClient):
+                def get_weather_from_api(self, city):
+                    time.sleep(30)
+                    return WeatherData(city=city, temperature_celsius=1.0, description="Fog")
+
+            result = compare_cities(WeatherService(client=StuckClient()), ["Oslo"], deadline=0.2)
+            assert result.pending == ["Oslo"]
+            """)
+        env = {**os.environ, "PYTHONPATH": str(Path(__file__).parent.parent / "src")}
+
+        start = time.monotonic()
+        completed = subprocess.run([sys.executable, "-c", script], env=env, timeout=20)
+
+        assert completed.returncode == 0
+        assert time.monotonic() - start < 10
+
+    def test_invalid_arguments(self):
+        """Test validation of the sort field and city list."""
+        service = WeatherService(client=SlowClient())
+
+        with pytest.raises(ValueError, match="Unknown sort field"):
+            compare_cities(service, ["Oslo"], sort_by="pressure")
+        with pytest.raises(ValueError, match="At least one city"):
+            compare_cities(service, [])
+
+
+class TestFormatComparisonTable:
+    """Test cases for format_comparison_table."""
+
+    def test_table_layout(self):
+        """Test the ranked table with failed and pending cities."""
+        result = ComparisonResult(
+            results=[
+                WeatherData(city="Madrid", temperature_celsius=31.5, description="Clear Sky"),
+                WeatherData(city="Oslo", temperature_celsius=4.0, description="Snow"),
+            ],
+            errors={"Atlantis": "City not found."},
+            pending=["Cairo"],
+        )
+
+        lines = format_comparison_table(result).splitlines()
+
+        assert lines[0].split() == ["Rank", "City", "Temperature", "Conditions"]
+        assert lines[2].split() == ["1", "Madrid", "31.5°C", "Clear", "Sky"]
+        assert lines[3].split() == ["2", "Oslo", "4.0°C", "Snow"]
+        assert lines[4] == "Failed: Atlantis - City not found."
+        assert lines[5] == "No response before deadline: Cairo"
+
+    def test_table_in_other_units(self):
+        """Test that the table converts temperatures for display."""
+        result = ComparisonResult(
+            results=[WeatherData(city="Austin", temperature_celsius=30.0, description="Hot")]
+        )
+
+        table = format_comparison_table(result, Units.IMPERIAL)
+
+        assert "86.0°F" in table
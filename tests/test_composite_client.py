@@ -0,0 +1,195 @@
+"""Tests for the multi-provider failover client."""
+
+import threading
+import time
+
+import pytest
+from unittest.mock import Mock
+from weather_cli.composite_client import FailoverClient, LatencyTracker
+from weather_cli.weather_client import WeatherApiClient
+from weather_cli.weather_data import WeatherData
+from weather_cli.exceptions import WeatherApiException
+
+
+class FakeProvider(WeatherApiClient):
+    """Provider with a configurable delay and failure."""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get_weather_from_api(self, city: str) -> WeatherData:
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return WeatherData(city=city, temperature_celsius=10.0, description=self.name)
+
+
+class TestLatencyTracker:
+    """Test cases for the LatencyTracker class."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles over the sliding window."""
+        tracker = LatencyTracker(window=10)
+        for value in range(1, 11):
+            tracker.record(value / 10)
+
+        assert tracker.percentile(50) == 0.5
+        assert tracker.percentile(90) == 0.9
+        assert tracker.percentile(100) == 1.0
+        assert len(tracker) == 10
+
+    def test_window_discards_old_samples(self):
+        """Test that only the most recent samples are kept."""
+        tracker = LatencyTracker(window=2)
+        for value in (5.0, 1.0, 2.0):
+            tracker.record(value)
+
+        assert tracker.percentile(100) == 2.0
+
+    def test_empty_and_invalid(self):
+        """Test an empty tracker and an invalid window."""
+        assert LatencyTracker().percentile(99) is None
+        with pytest.raises(ValueError, match="window must be positive"):
+            LatencyTracker(window=0)
+
+
+class TestFailoverClient:
+    """Test cases for the FailoverClient class."""
+
+    def test_requires_providers(self):
+        """Test validation of the constructor arguments."""
+        with pytest.raises(ValueError, match="At least one weather provider"):
+            FailoverClient([])
+        with pytest.raises(ValueError, match="hedge_percentile"):
+            FailoverClient([FakeProvider("a")], hedge_percentile=0)
+
+    def test_primary_answers(self):
+        """Test that the first provider is used when healthy."""
+        primary, secondary = FakeProvider("Primary"), FakeProvider("Secondary")
+        client = FailoverClient([primary, secondary])
+
+        assert client.get_weather_from_api("Oslo").description == "Primary"
+        assert secondary.calls == 0
+
+    @pytest.mark.parametrize("status_code", [None, 401, 429, 503])
+    def test_fails_over_on_provider_errors(self, status_code):
+        """Test failover on network, auth, rate-limit and server errors."""
+        primary = FakeProvider("Primary", error=WeatherApiException("down", status_code))
+        secondary = FakeProvider("Secondary")
+        client = FailoverClient([primary, secondary])
+
+        assert client.get_weather_from_api("Oslo").description == "Secondary"
+
+    def test_city_not_found_is_not_failed_over(self):
+        """Test that a definitive 404 is returned without trying other providers."""
+        primary = FakeProvider("Primary", error=WeatherApiException("City not found", 404))
+        secondary = FakeProvider("Secondary")
+        client = FailoverClient([primary, secondary])
+
+        with pytest.raises(WeatherApiException, match="City not found"):
+            client.get_weather_from_api("Atlantis")
+        assert secondary.calls == 0
+
+    def test_all_providers_fail(self):
+        """Test that the last error is raised when every provider fails."""
+        client = FailoverClient(
+            [
+                FakeProvider("A", error=WeatherApiException("first", 500)),
+                FakeProvider("B", error=WeatherApiException("second", 503)),
+            ]
+        )
+
+        with pytest.raises(WeatherApiException, match="second"):
+            client.get_weather_from_api("Oslo")
+
+    def test_unexpected_errors_are_wrapped_and_failed_over(self):
+        """Test that non-API errors count as provider failures."""
+        client = FailoverClient([FakeProvider("A", error=RuntimeError("boom")), FakeProvider("B")])
+
+        assert client.get_weather_from_api("Oslo").description == "B"
+
+    def test_rejects_foreign_result_types(self):
+        """Test that providers must answer with WeatherData."""
+        bad = Mock(spec=WeatherApiClient)
+        bad.get_weather_from_api.return_value = {"temp": 1}
+        client = FailoverClient([bad, FakeProvider("B")])
+
+        assert client.get_weather_from_api("Oslo").description == "B"
+
+    def test_hedged_request_wins_when_primary_is_slow(self):
+        """Test that a request past the latency percentile is hedged to the next provider."""
+        primary = FakeProvider("Primary", delay=0.01)
+        secondary = FakeProvider("Secondary")
+        client = FailoverClient([primary, secondary], hedge_percentile=90, hedge_min_samples=5)
+        for _ in range(5):
+            client.get_weather_from_api("Oslo")
+        assert secondary.calls == 0
+
+        primary.delay = 1.0
+        start = time.monotonic()
+        result = client.get_weather_from_api("Oslo")
+        elapsed = time.monotonic() - start
+
+        assert result.description == "Secondary"
+        assert client.hedged_requests == 1
+        assert elapsed < 0.5
+        client.close()
+
+    def test_losing_request_does_not_delay_exit(self):
+        """Test that provider requests run on daemon threads the interpreter does not join."""
+        primary = FakeProvider("Primary", delay=1.0)
+        client = FailoverClient([primary, FakeProvider("Secondary")], hedge_percentile=90)
+        client.hedge_min_samples = 0
+        client.latencies[0].record(0.01)
+
+        assert client.get_weather_from_api("Oslo").description == "Secondary"
+
+        workers = [t for t in threading.enumerate() if t.name.startswith("weather-provider")]
+        assert workers and all(thread.daemon for thread in workers)
+        client.close()
+
+    def test_no_hedging_without_enough_samples(self):
+        """Test that hedging waits for enough latency samples."""
+        primary = FakeProvider("Primary", delay=0.05)
+        secondary = FakeProvider("Secondary")
+        client = FailoverClient([primary, secondary], hedge_percentile=50, hedge_min_samples=10)
+
+        assert client.get_weather_from_api("Oslo").description == "Primary"
+        assert client.hedged_requests == 0
+
+    def test_forecast_failover(self):
+        """Test that forecasts fail over past providers without forecast support."""
+        forecast = object()
+        plain = FakeProvider("Plain")
+        capable = Mock(spec=WeatherApiClient)
+        capable.get_forecast_from_api.return_value = forecast
+        client = FailoverClient([plain, capable])
+
+        assert client.get_forecast_from_api("Oslo") is forecast
+
+    def test_forecast_not_found_not_failed_over(self):
+        """Test that a definitive forecast error is raised immediately."""
+        primary = Mock(spec=WeatherApiClient)
+        primary.get_forecast_from_api.side_effect = WeatherApiException("City not found", 404)
+        secondary = Mock(spec=WeatherApiClient)
+        client = FailoverClient([primary, secondary])
+
+        with pytest.raises(WeatherApiException, match="City not found"):
+            client.get_forecast_from_api("Atlantis")
+        secondary.get_forecast_from_api.assert_not_called()
+
+    def test_coordinates_failover(self):
+        """Test that coordinate lookups fail over past unsupported providers."""
+        weather = WeatherData(city="London", temperature_celsius=15.0, description="Clear")
+        capable = Mock(spec=WeatherApiClient)
+        capable.get_weather_by_coordinates.return_value = weather
+        client = FailoverClient([FakeProvider("Plain"), capable])
+
+        assert client.get_weather_by_coordinates(51.5, -0.12) is weather
+        capable.get_weather_by_coordinates.assert_called_once_with(51.5, -0.12)
@@ -0,0 +1,212 @@
+"""Tests for adaptive concurrency control."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import Mock
+from weather_cli.concurrency import AdaptiveConcurrencyClient, AimdLimiter, is_overload
+from weather_cli.weather_client import FetchResult, WeatherApiClient
+from weather_cli.weather_data import WeatherData
+from weather_cli.exceptions import WeatherApiException
+
+
+class FakeClock:
+    """Manually advanced clock for deterministic latency tests."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class CapacityClient(WeatherApiClient):
+    """Upstream that answers 429 whenever more than `capacity` requests run at once."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.running = 0
+        self.peak = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def get_weather_from_api(self, city: str) -> WeatherData:
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            overloaded = self.running > self.capacity
+            if overloaded:
+                self.rejected += 1
+        try:
+            if overloaded:
+                raise WeatherApiException("Rate limit exceeded. Please try again later.", 429)
+            time.sleep(0.002)
+            return WeatherData(city=city, temperature_celsius=10.0, description="Clear")
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+def saturate(limiter, clock, latency=0.1, overloaded=False):
+    """Run as many requests as the limit allows and finish them all."""
+    starts = [limiter.acquire() for _ in range(limiter.limit)]
+    clock.now += latency
+    for started in starts:
+        limiter.release(started, overloaded)
+
+
+class TestIsOverload:
+    """Test cases for classifying errors."""
+
+    @pytest.mark.parametrize(
+        "status_code, expected",
+        [(429, True), (500, True), (503, True), (404, False), (None, False)],
+    )
+    def test_classification(self, status_code, expected):
+        """Test that only rate limiting and server errors signal overload."""
+        assert is_overload(WeatherApiException("error", status_code)) is expected
+
+
+class TestAimdLimiter:
+    """Test cases for the AIMD limiter."""
+
+    def setup_method(self, method):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        self.limiter = AimdLimiter(initial_limit=4, max_limit=10, clock=self.clock)
+
+    def test_grows_additively_while_saturated(self):
+        """Test that busy windows of fast successes raise the limit by about one each."""
+        for _ in range(4):
+            saturate(self.limiter, self.clock)
+        assert self.limiter.limit == 5
+
+        for _ in range(40):
+            saturate(self.limiter, self.clock)
+        assert self.limiter.limit == 10
+        assert self.limiter.stats.decreases == 0
+
+    def test_does_not_grow_while_underused(self):
+        """Test that the limit is not raised by requests that never come near it."""
+        for _ in range(50):
+            self.limiter.release(self.limiter.acquire())
+
+        assert self.limiter.limit == 4
+
+    def test_overload_cuts_once_per_event(self):
+        """Test that concurrent 429s from one burst halve the limit only once."""
+        limiter = AimdLimiter(initial_limit=8, clock=self.clock)
+
+        saturate(limiter, self.clock, overloaded=True)
+
+        assert limiter.limit == 4
+        assert limiter.stats.overloads == 8
+        assert limiter.stats.decreases == 1
+
+        saturate(limiter, self.clock, overloaded=True)
+        assert limiter.limit == 2
+
+    def test_never_below_minimum(self):
+        """Test that repeated overloads stop at the minimum limit."""
+        for _ in range(10):
+            saturate(self.limiter, self.clock, overloaded=True)
+            self.clock.now += 1
+
+        assert self.limiter.limit == 1
+
+    def test_rising_latency_cuts_limit(self):
+        """Test that requests far slower than the baseline count as overload."""
+        for _ in range(3):
+            saturate(self.limiter, self.clock, latency=0.1)
+        saturate(self.limiter, self.clock, latency=0.15)
+        limit = self.limiter.limit
+        assert self.limiter.stats.decreases == 0
+
+        saturate(self.limiter, self.clock, latency=0.5)
+
+        assert self.limiter.limit < limit
+        assert self.limiter.stats.slow > 0
+
+    def test_acquire_waits_for_a_slot(self):
+        """Test that requests beyond the limit wait until one finishes."""
+        limiter = AimdLimiter(initial_limit=1)
+        started = limiter.acquire()
+        acquired = threading.Event()
+
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+        assert not acquired.wait(0.05)
+        assert limiter.in_flight == 1
+
+        limiter.release(started)
+        assert acquired.wait(1)
+        thread.join()
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"initial_limit": 0},
+            {"initial_limit": 8, "max_limit": 4},
+            {"min_limit": 5, "initial_limit": 4},
+            {"backoff": 1.0},
+            {"latency_tolerance": 1.0},
+        ],
+    )
+    def test_invalid_configuration(self, kwargs):
+        """Test that inconsistent settings are rejected."""
+        with pytest.raises(ValueError):
+            AimdLimiter(**kwargs)
+
+
+class TestAdaptiveConcurrencyClient:
+    """Test cases for the limited client."""
+
+    def test_delegates_and_reports_outcomes(self):
+        """Test that every request type is passed through and its outcome recorded."""
+        inner = Mock(spec=WeatherApiClient)
+        inner.fetch_weather.return_value = FetchResult(data=None)
+        inner.get_forecast_from_api.side_effect = WeatherApiException("busy", 503)
+        client = AdaptiveConcurrencyClient(inner)
+
+        assert client.fetch_weather("London").data is None
+        client.get_weather_by_coordinates(51.5, -0.1)
+        with pytest.raises(WeatherApiException):
+            client.get_forecast_from_api("London")
+
+        inner.get_weather_by_coordinates.assert_called_once_with(51.5, -0.1)
+        assert client.limiter.stats.successes == 2
+        assert client.limiter.stats.overloads == 1
+        assert client.limiter.in_flight == 0
+
+    def test_not_found_is_not_overload(self):
+        """Test that errors about the request do not cut the limit."""
+        inner = Mock(spec=WeatherApiClient)
+        inner.get_weather_from_api.side_effect = WeatherApiException("City not found.", 404)
+        client = AdaptiveConcurrencyClient(inner)
+
+        with pytest.raises(WeatherApiException):
+            client.get_weather_from_api("Atlantis")
+
+        assert client.limiter.stats.decreases == 0
+        assert client.limit == 4
+
+    def test_large_batch_settles_near_capacity(self):
+        """Test that a batch far wider than the upstream allows converges on its capacity."""
+        upstream = CapacityClient(capacity=6)
+        client = AdaptiveConcurrencyClient(upstream, AimdLimiter(initial_limit=2, max_limit=64))
+
+        def fetch(index):
+            try:
+                client.get_weather_from_api(f"City{index}")
+                return True
+            except WeatherApiException:
+                return False
+
+        with ThreadPoolExecutor(max_workers=32) as executor:
+            results = list(executor.map(fetch, range(400)))
+
+        assert sum(results) > 0.85 * len(results)
+        assert 2 <= client.limit <= 12
+        assert upstream.peak <= 13
@@ -108,3 +108,323 @@ class TestConfigUtil:
             # Check that the default URL is mentioned in log messages
             log_messages = [record.message for record in caplog.records]
             assert any(ConfigUtil.DEFAULT_API_BASE_URL in msg for msg in log_messages)
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_history_dir(self, mock_load_dotenv):
+        """Test reading the observation history directory."""
+        with patch.dict(os.environ, {"WEATHER_HISTORY_DIR": "  /var/lib/weather  "}):
+            assert ConfigUtil.get_history_dir() == "/var/lib/weather"
+
+        with patch.dict(os.environ, {"WEATHER_HISTORY_DIR": "~/history", "HOME": "/home/me"}):
+            assert ConfigUtil.get_history_dir() == "/home/me/history"
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_history_dir() is None
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_fallback_api_urls(self, mock_load_dotenv):
+        """Test reading the ordered fallback API URLs."""
+        with patch.dict(
+            os.environ,
+            {"OPENWEATHERMAP_FALLBACK_API_URLS": " https://a.example , ,https://b.example"},
+        ):
+            assert ConfigUtil.get_fallback_api_urls() == ["https://a.example", "https://b.example"]
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_fallback_api_urls() == []
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_hedge_percentile(self, mock_load_dotenv):
+        """Test reading and validating the hedge percentile."""
+        with patch.dict(os.environ, {"WEATHER_HEDGE_PERCENTILE": "95"}):
+            assert ConfigUtil.get_hedge_percentile() == 95.0
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_hedge_percentile() is None
+
+        with patch.dict(os.environ, {"WEATHER_HEDGE_PERCENTILE": "fast"}):
+            with pytest.raises(ConfigException, match="must be a number"):
+                ConfigUtil.get_hedge_percentile()
+
+        with patch.dict(os.environ, {"WEATHER_HEDGE_PERCENTILE": "150"}):
+            with pytest.raises(ConfigException, match="between 0 and 100"):
+                ConfigUtil.get_hedge_percentile()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_api_keys(self, mock_load_dotenv):
+        """Test reading a pool of API keys."""
+        with patch.dict(os.environ, {"OPENWEATHERMAP_API_KEYS": "key-one, key-two,,"}):
+            assert ConfigUtil.get_api_keys() == ["key-one", "key-two"]
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_api_keys() == []
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_api_key_quota(self, mock_load_dotenv):
+        """Test reading and validating the per-key quota."""
+        with patch.dict(os.environ, {"OPENWEATHERMAP_API_KEY_QUOTA": "60"}):
+            assert ConfigUtil.get_api_key_quota() == 60
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_api_key_quota() is None
+
+        with patch.dict(os.environ, {"OPENWEATHERMAP_API_KEY_QUOTA": "lots"}):
+            with pytest.raises(ConfigException, match="must be an integer"):
+                ConfigUtil.get_api_key_quota()
+
+        with patch.dict(os.environ, {"OPENWEATHERMAP_API_KEY_QUOTA": "0"}):
+            with pytest.raises(ConfigException, match="must be positive"):
+                ConfigUtil.get_api_key_quota()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_nearby_radius_km(self, mock_load_dotenv):
+        """Test reading and validating the nearby radius."""
+        with patch.dict(os.environ, {"WEATHER_NEARBY_RADIUS_KM": "2.5"}):
+            assert ConfigUtil.get_nearby_radius_km() == 2.5
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_nearby_radius_km() == ConfigUtil.DEFAULT_NEARBY_RADIUS_KM
+
+        with patch.dict(os.environ, {"WEATHER_NEARBY_RADIUS_KM": "near"}):
+            with pytest.raises(ConfigException, match="must be a number"):
+                ConfigUtil.get_nearby_radius_km()
+
+        with patch.dict(os.environ, {"WEATHER_NEARBY_RADIUS_KM": "-1"}):
+            with pytest.raises(ConfigException, match="must not be negative"):
+                ConfigUtil.get_nearby_radius_km()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_default_country(self, mock_load_dotenv):
+        """Test reading and validating the default country."""
+        with patch.dict(os.environ, {"WEATHER_DEFAULT_COUNTRY": " fr "}):
+            assert ConfigUtil.get_default_country() == "FR"
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_default_country() is None
+
+        with patch.dict(os.environ, {"WEATHER_DEFAULT_COUNTRY": "France"}):
+            with pytest.raises(ConfigException, match="two-letter country code"):
+                ConfigUtil.get_default_country()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_cassette_settings(self, mock_load_dotenv):
+        """Test reading the record/replay cassette settings."""
+        with patch.dict(
+            os.environ,
+            {
+                "WEATHER_CASSETTE": "traffic.jsonl",
+                "WEATHER_CASSETTE_MODE": " Record ",
+                "WEATHER_REPLAY_SPEED": "10",
+            },
+        ):
+            assert ConfigUtil.get_cassette_path() == "traffic.jsonl"
+            assert ConfigUtil.get_cassette_mode() == "record"
+            assert ConfigUtil.get_replay_speed() == 10.0
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_cassette_path() is None
+            assert ConfigUtil.get_cassette_mode() == "replay"
+            assert ConfigUtil.get_replay_speed() == 1.0
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_invalid_cassette_settings(self, mock_load_dotenv):
+        """Test validation of the cassette mode and replay speed."""
+        with patch.dict(os.environ, {"WEATHER_CASSETTE_MODE": "rewind"}):
+            with pytest.raises(ConfigException, match="WEATHER_CASSETTE_MODE"):
+                ConfigUtil.get_cassette_mode()
+
+        with patch.dict(os.environ, {"WEATHER_REPLAY_SPEED": "fast"}):
+            with pytest.raises(ConfigException, match="must be a number"):
+                ConfigUtil.get_replay_speed()
+
+        with patch.dict(os.environ, {"WEATHER_REPLAY_SPEED": "-1"}):
+            with pytest.raises(ConfigException, match="must not be negative"):
+                ConfigUtil.get_replay_speed()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_log_settings(self, mock_load_dotenv):
+        """Test reading the log format and sample rate."""
+        with patch.dict(
+            os.environ, {"WEATHER_LOG_FORMAT": " JSON ", "WEATHER_LOG_SAMPLE_RATE": "0.1"}
+        ):
+            assert ConfigUtil.get_log_format() == "json"
+            assert ConfigUtil.get_log_sample_rate() == 0.1
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_log_format() == "text"
+            assert ConfigUtil.get_log_sample_rate() == 1.0
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_invalid_log_settings(self, mock_load_dotenv):
+        """Test validation of the log format and sample rate."""
+        with patch.dict(os.environ, {"WEATHER_LOG_FORMAT": "xml"}):
+            with pytest.raises(ConfigException, match="WEATHER_LOG_FORMAT"):
+                ConfigUtil.get_log_format()
+
+        with patch.dict(os.environ, {"WEATHER_LOG_SAMPLE_RATE": "often"}):
+            with pytest.raises(ConfigException, match="must be a number"):
+                ConfigUtil.get_log_sample_rate()
+
+        for rate in ("0", "1.5"):
+            with patch.dict(os.environ, {"WEATHER_LOG_SAMPLE_RATE": rate}):
+                with pytest.raises(ConfigException, match="greater than 0"):
+                    ConfigUtil.get_log_sample_rate()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_negative_cache_settings(self, mock_load_dotenv):
+        """Test reading the negative cache TTL and file."""
+        with patch.dict(
+            os.environ,
+            {"WEATHER_NEGATIVE_CACHE_TTL": "120", "WEATHER_NEGATIVE_CACHE_FILE": "bad.json"},
+        ):
+            assert ConfigUtil.get_negative_cache_ttl() == 120.0
+            assert ConfigUtil.get_negative_cache_path() == "bad.json"
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_negative_cache_ttl() == 300.0
+            assert ConfigUtil.get_negative_cache_path() is None
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_invalid_negative_cache_ttl(self, mock_load_dotenv):
+        """Test validation of the negative cache TTL."""
+        with patch.dict(os.environ, {"WEATHER_NEGATIVE_CACHE_TTL": "soon"}):
+            with pytest.raises(ConfigException, match="must be a number"):
+                ConfigUtil.get_negative_cache_ttl()
+
+        with patch.dict(os.environ, {"WEATHER_NEGATIVE_CACHE_TTL": "-5"}):
+            with pytest.raises(ConfigException, match="must not be negative"):
+                ConfigUtil.get_negative_cache_ttl()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_cache_backend_settings(self, mock_load_dotenv):
+        """Test reading the cache backend, location and serializer."""
+        with patch.dict(
+            os.environ,
+            {
+                "WEATHER_CACHE_BACKEND": "Redis",
+                "WEATHER_CACHE_URL": " redis://cache:6379/1 ",
+                "WEATHER_CACHE_DIR": "cache",
+                "WEATHER_CACHE_SERIALIZER": "zlib",
+            },
+        ):
+            assert ConfigUtil.get_cache_backend() == "redis"
+            assert ConfigUtil.get_cache_url() == "redis://cache:6379/1"
+            assert ConfigUtil.get_cache_dir() == "cache"
+            assert ConfigUtil.get_cache_serializer() == "zlib"
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_cache_backend() == "memory"
+            assert ConfigUtil.get_cache_url() is None
+            assert ConfigUtil.get_cache_dir() is None
+            assert ConfigUtil.get_cache_serializer() == "json"
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_invalid_cache_backend_settings(self, mock_load_dotenv):
+        """Test validation of the cache backend and serializer."""
+        with patch.dict(os.environ, {"WEATHER_CACHE_BACKEND": "memcached"}):
+            with pytest.raises(ConfigException, match="WEATHER_CACHE_BACKEND"):
+                ConfigUtil.get_cache_backend()
+
+        with patch.dict(os.environ, {"WEATHER_CACHE_SERIALIZER": "pickle"}):
+            with pytest.raises(ConfigException, match="WEATHER_CACHE_SERIALIZER"):
+                ConfigUtil.get_cache_serializer()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_max_concurrency(self, mock_load_dotenv):
+        """Test reading and validating the adaptive concurrency ceiling."""
+        with patch.dict(os.environ, {"WEATHER_MAX_CONCURRENCY": "16"}):
+            assert ConfigUtil.get_max_concurrency() == 16
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_max_concurrency() is None
+
+        for value, message in (("many", "must be an integer"), ("0", "must be positive")):
+            with patch.dict(os.environ, {"WEATHER_MAX_CONCURRENCY": value}):
+                with pytest.raises(ConfigException, match=message):
+                    ConfigUtil.get_max_concurrency()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_scheduler_concurrency(self, mock_load_dotenv):
+        """Test reading and validating the scheduler's concurrency."""
+        with patch.dict(os.environ, {"WEATHER_SCHEDULER_CONCURRENCY": "8"}):
+            assert ConfigUtil.get_scheduler_concurrency() == 8
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_scheduler_concurrency() is None
+
+        for value, message in (("some", "must be an integer"), ("-1", "must be positive")):
+            with patch.dict(os.environ, {"WEATHER_SCHEDULER_CONCURRENCY": value}):
+                with pytest.raises(ConfigException, match=message):
+                    ConfigUtil.get_scheduler_concurrency()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_trace_settings(self, mock_load_dotenv):
+        """Test reading the trace file and the collector endpoint."""
+        env = {"WEATHER_TRACE_FILE": " ~/traces.jsonl ", "WEATHER_TRACE_OTLP_URL": "http://c:4318"}
+        with patch.dict(os.environ, env):
+            assert ConfigUtil.get_trace_file() == os.path.expanduser("~/traces.jsonl")
+            assert ConfigUtil.get_trace_otlp_url() == "http://c:4318"
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_trace_file() is None
+            assert ConfigUtil.get_trace_otlp_url() is None
+
+        with patch.dict(os.environ, {"WEATHER_TRACE_OTLP_URL": "collector:4318"}):
+            with pytest.raises(ConfigException, match="http"):
+                ConfigUtil.get_trace_otlp_url()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_connection_settings(self, mock_load_dotenv):
+        """Test reading the pre-warming, DNS cache and keep-alive settings."""
+        env = {
+            "WEATHER_PREWARM": "Yes",
+            "WEATHER_DNS_CACHE_TTL": "60",
+            "WEATHER_KEEPALIVE_INTERVAL": "15",
+        }
+        with patch.dict(os.environ, env):
+            assert ConfigUtil.get_prewarm() is True
+            assert ConfigUtil.get_dns_cache_ttl() == 60.0
+            assert ConfigUtil.get_keepalive_interval() == 15.0
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_prewarm() is False
+            assert ConfigUtil.get_dns_cache_ttl() == 300.0
+            assert ConfigUtil.get_keepalive_interval() is None
+
+        invalid = [
+            ("WEATHER_PREWARM", "maybe", ConfigUtil.get_prewarm),
+            ("WEATHER_DNS_CACHE_TTL", "-1", ConfigUtil.get_dns_cache_ttl),
+            ("WEATHER_KEEPALIVE_INTERVAL", "0", ConfigUtil.get_keepalive_interval),
+            ("WEATHER_KEEPALIVE_INTERVAL", "often", ConfigUtil.get_keepalive_interval),
+        ]
+        for name, value, getter in invalid:
+            with patch.dict(os.environ, {name: value}):
+                with pytest.raises(ConfigException, match=name):
+                    getter()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_http_transport(self, mock_load_dotenv):
+        """Test reading the HTTP backend, which defaults to requests."""
+        with patch.dict(os.environ, {"WEATHER_HTTP_TRANSPORT": " StdLib "}):
+            assert ConfigUtil.get_http_transport() == "stdlib"
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_http_transport() == "requests"
+
+        with patch.dict(os.environ, {"WEATHER_HTTP_TRANSPORT": "curl"}):
+            with pytest.raises(ConfigException, match="WEATHER_HTTP_TRANSPORT"):
+                ConfigUtil.get_http_transport()
+
+    @patch("weather_cli.config_util.load_dotenv")
+    def test_get_forecast_fallback_max_age(self, mock_load_dotenv):
+        """Test reading the forecast fallback age, which is disabled by default."""
+        with patch.dict(os.environ, {"WEATHER_FORECAST_FALLBACK_MAX_AGE": "7200"}):
+            assert ConfigUtil.get_forecast_fallback_max_age() == 7200.0
+
+        with patch.dict(os.environ, {}, clear=True):
+            assert ConfigUtil.get_forecast_fallback_max_age() == 0.0
+
+        for value in ("-1", "soon"):
+            with patch.dict(os.environ, {"WEATHER_FORECAST_FALLBACK_MAX_AGE": value}):
+                with pytest.raises(ConfigException, match="WEATHER_FORECAST_FALLBACK_MAX_AGE"):
+                    ConfigUtil.get_forecast_fallback_max_age()
@@ -0,0 +1,159 @@
+"""Tests for warm pooled connections and the DNS cache."""
+
+import socket
+import time
+
+import pytest
+from weather_cli.connections import DnsCache, PooledTransport, keepalive_options, origin
+from weather_cli.stub_server import StubServer
+from weather_cli.weather_client import OpenWeatherMapClient
+
+
+class FakeResolver:
+    """Resolver answering every host with fixed addresses and counting calls."""
+
+    def __init__(self, addresses=("127.0.0.1",)):
+        self.addresses = addresses
+        self.calls = []
+
+    def __call__(self, host, port, family=0, type=0):
+        self.calls.append((host, port))
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))
+            for address in self.addresses
+        ]
+
+
+class FakeClock:
+    """Clock moved by hand."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait until condition() is true or the timeout passes."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestDnsCache:
+    """Test cases for the DnsCache class."""
+
+    def test_answers_are_reused_until_expired(self):
+        """Test that a host is resolved once per TTL."""
+        resolver = FakeResolver()
+        clock = FakeClock()
+        cache = DnsCache(ttl_seconds=60, resolver=resolver, clock=clock)
+
+        assert cache.resolve("api.example.com", 443) == ["127.0.0.1"]
+        assert cache.resolve("api.example.com", 443) == ["127.0.0.1"]
+        assert len(resolver.calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        clock.now += 61
+        cache.resolve("api.example.com", 443)
+        assert len(resolver.calls) == 2
+
+    def test_distinct_addresses_in_resolver_order(self):
+        """Test that duplicate answers, such as one per protocol, are merged."""
+        resolver = FakeResolver(("10.0.0.2", "10.0.0.1", "10.0.0.2"))
+
+        assert DnsCache(resolver=resolver).resolve("h", 80) == ["10.0.0.2", "10.0.0.1"]
+
+    def test_zero_ttl_disables_caching(self):
+        """Test that a TTL of 0 resolves every time and stores nothing."""
+        resolver = FakeResolver()
+        cache = DnsCache(ttl_seconds=0, resolver=resolver)
+
+        cache.resolve("h", 80)
+        cache.resolve("h", 80)
+
+        assert len(resolver.calls) == 2
+        assert len(cache) == 0
+
+    def test_negative_ttl(self):
+        """Test that a negative TTL is rejected."""
+        with pytest.raises(ValueError):
+            DnsCache(ttl_seconds=-1)
+
+
+class TestPooledTransport:
+    """Test cases for the PooledTransport class against the stub server."""
+
+    def make_client(self, server, transport):
+        """Create a client sending requests to a stub server through a transport."""
+        return OpenWeatherMapClient(api_key="k", base_url=server.base_url, transport=transport)
+
+    def test_connection_and_dns_answer_are_reused(self):
+        """Test that consecutive requests share one connection and one resolution."""
+        resolver = FakeResolver()
+        with StubServer() as server:
+            transport = PooledTransport(resolver=resolver)
+            client = self.make_client(server, transport)
+            for city in ("Oslo", "Rome", "Lima"):
+                client.get_weather_from_api(city)
+            transport.close()
+
+        assert server.stats.connections == 1
+        assert server.stats.requests == 3
+        assert len(resolver.calls) == 1
+
+    def test_prewarm_opens_connection_before_first_request(self):
+        """Test that pre-warming resolves and connects, and the first request reuses it."""
+        resolver = FakeResolver()
+        with StubServer() as server:
+            transport = PooledTransport(resolver=resolver)
+            transport.prewarm(server.base_url).join()
+            assert server.stats.connections == 1
+
+            self.make_client(server, transport).get_weather_from_api("Oslo")
+            transport.close()
+
+        assert server.stats.connections == 1
+        assert server.stats.responses == {200: 2}
+        assert len(resolver.calls) == 1
+
+    def test_prewarm_failure_is_ignored(self):
+        """Test that an unreachable server only makes pre-warming a no-op."""
+        transport = PooledTransport(resolver=FakeResolver())
+
+        transport.prewarm("http://127.0.0.1:9/data/2.5", timeout=0.5).join()
+
+        transport.close()
+
+    def test_keepalive_pings_idle_pool(self):
+        """Test that an idle pool is pinged over the same connection."""
+        with StubServer() as server:
+            transport = PooledTransport(keepalive_interval=0.05)
+            self.make_client(server, transport).get_weather_from_api("Oslo")
+
+            assert wait_for(lambda: server.stats.requests >= 3)
+            transport.close()
+
+        assert server.stats.connections == 1
+
+    @pytest.mark.parametrize("kwargs", [{"keepalive_interval": 0}, {"pool_size": 0}])
+    def test_invalid_settings(self, kwargs):
+        """Test that the keep-alive interval and pool size must be positive."""
+        with pytest.raises(ValueError):
+            PooledTransport(**kwargs)
+
+
+class TestHelpers:
+    """Test cases for the module helpers."""
+
+    def test_origin(self):
+        """Test that the root URL keeps scheme, host and port only."""
+        assert (
+            origin("https://api.example.com:8443/data/2.5?q=x") == "https://api.example.com:8443/"
+        )
+
+    def test_keepalive_options(self):
+        """Test that TCP keep-alive is always enabled."""
+        assert (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1) in keepalive_options()
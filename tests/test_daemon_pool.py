@@ -0,0 +1,56 @@
+"""Tests for the daemon thread pool."""
+
+import threading
+from concurrent.futures import wait
+
+import pytest
+from weather_cli.daemon_pool import DaemonThreadPool
+
+
+class TestDaemonThreadPool:
+    """Test cases for the DaemonThreadPool class."""
+
+    def test_runs_calls_on_daemon_threads(self):
+        """Test that results and exceptions reach the futures."""
+        pool = DaemonThreadPool(max_workers=2)
+
+        ok = pool.submit(lambda x: (x * 2, threading.current_thread().daemon), 21)
+        failing = pool.submit(lambda: 1 / 0)
+        wait([ok, failing], timeout=5)
+        pool.shutdown()
+
+        assert ok.result() == (42, True)
+        assert isinstance(failing.exception(), ZeroDivisionError)
+
+    def test_worker_count_is_bounded(self):
+        """Test that no more than max_workers threads are started."""
+        pool = DaemonThreadPool(max_workers=3)
+        release = threading.Event()
+
+        futures = [pool.submit(release.wait, 5) for _ in range(10)]
+        release.set()
+        wait(futures, timeout=5)
+        pool.shutdown()
+
+        assert len(pool._threads) == 3
+        assert all(future.result() for future in futures)
+
+    def test_shutdown_cancels_queued_work(self):
+        """Test that queued calls are cancelled and new work is refused."""
+        pool = DaemonThreadPool(max_workers=1)
+        release = threading.Event()
+        running = pool.submit(release.wait, 5)
+        queued = pool.submit(lambda: "never")
+
+        pool.shutdown(wait=False, cancel_futures=True)
+        release.set()
+
+        assert queued.cancelled()
+        assert running.result(timeout=5)
+        with pytest.raises(RuntimeError):
+            pool.submit(lambda: None)
+
+    def test_invalid_size(self):
+        """Test that the pool needs at least one worker."""
+        with pytest.raises(ValueError):
+            DaemonThreadPool(max_workers=0)
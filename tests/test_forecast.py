@@ -0,0 +1,218 @@
+"""Tests for the forecast time series model."""
+
+import json
+from array import array
+
+import pytest
+from weather_cli.forecast import ForecastSeries, SECONDS_PER_DAY
+from weather_cli.units import Units
+
+DAY = 1726617600  # 2024-09-18 00:00:00 UTC
+
+
+def make_response(temps, start=DAY, step=10800, timezone=0):
+    """Build a /forecast style response with one slot per temperature."""
+    return {
+        "city": {"name": "London", "timezone": timezone},
+        "list": [
+            {
+                "dt": start + i * step,
+                "main": {"temp": temp, "humidity": 50 + i % 50},
+                "wind": {"speed": 1.5 * i},
+                "weather": [{"description": f"sky {i}"}],
+            }
+            for i, temp in enumerate(temps)
+        ],
+    }
+
+
+class TestForecastSeries:
+    """Test cases for the ForecastSeries class."""
+
+    def test_from_response_builds_columns(self):
+        """Test that a response is stored as typed arrays."""
+        series = ForecastSeries.from_response(make_response([10.0, 12.5, 11.0]))
+
+        assert series.city == "London"
+        assert len(series) == 3
+        assert isinstance(series.timestamps, array) and series.timestamps.typecode == "q"
+        assert isinstance(series.temperatures, array) and series.temperatures.typecode == "d"
+        assert list(series.temperatures) == [10.0, 12.5, 11.0]
+        assert list(series.humidity) == [50, 51, 52]
+        assert list(series.wind_speeds) == [0.0, 1.5, 3.0]
+
+    def test_from_response_sorts_slots(self):
+        """Test that out-of-order slots are sorted by time."""
+        response = make_response([1.0, 2.0])
+        response["list"].reverse()
+
+        series = ForecastSeries.from_response(response)
+
+        assert list(series.timestamps) == [DAY, DAY + 10800]
+        assert list(series.temperatures) == [1.0, 2.0]
+
+    def test_from_response_missing_field(self):
+        """Test that a missing required field raises KeyError."""
+        with pytest.raises(KeyError):
+            ForecastSeries.from_response({"list": []})
+
+    def test_mismatched_columns_rejected(self):
+        """Test that columns of different length are rejected."""
+        with pytest.raises(ValueError, match="same length"):
+            ForecastSeries("London", array("q", [1, 2]), array("d", [1.0]), array("B"), array("d"))
+
+    def test_empty_city_rejected(self):
+        """Test that an empty city name is rejected."""
+        with pytest.raises(ValueError, match="city cannot be empty"):
+            ForecastSeries(" ", array("q"), array("d"), array("B"), array("d"))
+
+    def test_daily_summary(self):
+        """Test daily min/max/mean aggregation across two days."""
+        temps = [float(t) for t in range(16)]  # 8 slots per day
+        summary = ForecastSeries.from_response(make_response(temps)).daily_summary()
+
+        assert list(summary.days) == [DAY, DAY + SECONDS_PER_DAY]
+        assert list(summary.minimum) == [0.0, 8.0]
+        assert list(summary.maximum) == [7.0, 15.0]
+        assert list(summary.mean) == [3.5, 11.5]
+
+    def test_daily_summary_uses_timezone(self):
+        """Test that days follow the city's local calendar."""
+        series = ForecastSeries.from_response(make_response([1.0, 2.0, 3.0], timezone=7200))
+
+        summary = series.daily_summary()
+
+        # The 21:00 UTC slot would be 23:00 local, still the same day at +2h shift
+        assert list(summary.days) == [DAY - 7200]
+        assert len(summary) == 1
+
+    def test_daily_summary_empty(self):
+        """Test aggregation of an empty series."""
+        series = ForecastSeries.from_response(make_response([]))
+
+        assert len(series.daily_summary()) == 0
+
+    def test_threshold_crossings(self):
+        """Test detecting upward and downward threshold crossings."""
+        series = ForecastSeries.from_response(make_response([-2.0, -1.0, 1.0, 2.0, -0.5]))
+
+        crossings = series.threshold_crossings(0)
+
+        assert list(crossings) == [DAY + 2 * 10800, DAY + 4 * 10800]
+
+    def test_threshold_crossings_none(self):
+        """Test a series that never crosses the threshold."""
+        series = ForecastSeries.from_response(make_response([5.0, 6.0, 7.0]))
+
+        assert len(series.threshold_crossings(0.0)) == 0
+
+    def test_hours_above(self):
+        """Test counting forecast hours above a threshold."""
+        series = ForecastSeries.from_response(make_response([5.0, 25.0, 26.0, 10.0]))
+
+        assert series.hours_above(20.0) == 6.0
+        assert ForecastSeries.from_response(make_response([30.0])).hours_above(20.0) == 0.0
+
+    def test_dict_round_trip(self):
+        """Test that a series survives conversion to JSON-ready columns and back."""
+        series = ForecastSeries.from_response(make_response([1.0, 2.0], timezone=3600))
+
+        restored = ForecastSeries.from_dict(json.loads(json.dumps(series.to_dict())))
+
+        assert restored.to_dict() == series.to_dict()
+        assert restored.humidity.typecode == "B"
+        assert restored.description_codes.typecode == "H"
+        assert [restored.description(i) for i in range(2)] == ["sky 0", "sky 1"]
+
+    def test_format(self):
+        """Test that the forecast is shown as one temperature range per local day."""
+        series = ForecastSeries.from_response(
+            make_response([10.0, 16.0, 13.0], start=DAY + SECONDS_PER_DAY - 10800)
+        )
+
+        assert series.format() == (
+            "Forecast for London:\n"
+            "2024-09-18: 10.0°C to 10.0°C, mean 10.0°C\n"
+            "2024-09-19: 13.0°C to 16.0°C, mean 14.5°C"
+        )
+        assert "50.0°F to 50.0°F" in series.format(Units.IMPERIAL)
+        assert series.window(0, 0).format().endswith("No forecast slots available")
+
+    def test_window(self):
+        """Test selecting a time window of slots."""
+        series = ForecastSeries.from_response(make_response([1.0, 2.0, 3.0, 4.0]))
+
+        window = series.window(DAY + 10800, DAY + 3 * 10800)
+
+        assert list(window.temperatures) == [2.0, 3.0]
+        assert window.city == "London"
+
+    def test_descriptions(self):
+        """Test that slot descriptions are kept and sliced with the other columns."""
+        series = ForecastSeries.from_response(make_response([1.0, 2.0, 3.0]))
+
+        window = series.window(DAY + 10800, DAY + 2 * 10800)
+
+        assert [series.description(i) for i in range(3)] == ["sky 0", "sky 1", "sky 2"]
+        assert list(window.description_codes) == [1]
+        assert window.description(0) == "sky 1"
+        assert series.step_seconds == 10800
+        assert ForecastSeries.from_response(make_response([1.0])).step_seconds is None
+
+    def test_descriptions_are_dictionary_encoded(self):
+        """Test that repeated descriptions are stored once, as codes into a table."""
+        series = ForecastSeries(
+            "Oslo",
+            array("q", [0, 10800, 21600]),
+            array("d", [1.0, 2.0, 3.0]),
+            array("B", [80, 80, 80]),
+            array("d", [1.0, 1.0, 1.0]),
+            descriptions=["snow", "fog", "snow"],
+        )
+
+        assert series.description_table == ("snow", "fog")
+        assert list(series.description_codes) == [0, 1, 0]
+        assert series.description(2) == "snow"
+        with pytest.raises(ValueError, match="out of range"):
+            ForecastSeries(
+                "Oslo",
+                array("q", [0]),
+                array("d", [1.0]),
+                array("B", [80]),
+                array("d", [1.0]),
+                description_codes=array("H", [1]),
+                description_table=("snow",),
+            )
+
+    def test_interpolate_between_slots(self):
+        """Test linear interpolation and the description of the nearest slot."""
+        series = ForecastSeries.from_response(make_response([10.0, 16.0]))
+
+        point = series.interpolate(DAY + 7200)
+
+        assert point.temperature_celsius == pytest.approx(14.0)
+        assert point.description == "sky 1"
+        assert point.slot_distance_seconds == 3600
+        assert series.interpolate(DAY).temperature_celsius == 10.0
+        assert series.interpolate(DAY + 10800).slot_distance_seconds == 0
+
+    def test_interpolate_outside_series(self):
+        """Test that edge slots are held only within max_extrapolation."""
+        series = ForecastSeries.from_response(make_response([10.0, 16.0]))
+
+        assert series.interpolate(DAY - 600) is None
+        before = series.interpolate(DAY - 600, max_extrapolation=3600)
+        after = series.interpolate(DAY + 10800 + 600, max_extrapolation=3600)
+
+        assert (before.temperature_celsius, before.slot_distance_seconds) == (10.0, 600)
+        assert (after.temperature_celsius, after.slot_distance_seconds) == (16.0, 600)
+        assert series.window(0, 0).interpolate(DAY, max_extrapolation=3600) is None
+
+    def test_large_series_stays_columnar(self):
+        """Test that thousands of slots are held without per-slot objects."""
+        temps = [float(i % 30) for i in range(40 * 1000)]
+        series = ForecastSeries.from_response(make_response(temps))
+
+        assert series.temperatures.itemsize * len(series) == 8 * 40 * 1000
+        assert len(series.threshold_crossings(15.0)) > 0
+        assert len(series.daily_summary()) == 40 * 1000 * 10800 // SECONDS_PER_DAY
@@ -0,0 +1,164 @@
+"""Tests for estimating current weather from cached forecasts."""
+
+from array import array
+
+import pytest
+from weather_cli.cache_backends import DiskBackend
+from weather_cli.forecast import ForecastSeries
+from weather_cli.forecast_fallback import ForecastFallback
+from weather_cli.exceptions import InvalidCityNameException, WeatherApiException
+
+START = 1726617600  # 2024-09-18 00:00:00 UTC
+STEP = 10800
+
+
+class FakeClock:
+    """Settable clock for age and rate limit tests."""
+
+    def __init__(self, now=START + 3600.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def make_series(temps=(10.0, 16.0, 13.0), city="London"):
+    """Build a 3-hourly forecast series starting at START."""
+    return ForecastSeries(
+        city,
+        array("q", [START + i * STEP for i in range(len(temps))]),
+        array("d", temps),
+        array("B", [50] * len(temps)),
+        array("d", [2.0] * len(temps)),
+        descriptions=[f"sky {i}" for i in range(len(temps))],
+    )
+
+
+class TestForecastFallback:
+    """Test cases for the ForecastFallback class."""
+
+    def setup_method(self):
+        """Set up a fallback with a fake clock and a stored forecast."""
+        self.clock = FakeClock()
+        self.fallback = ForecastFallback(max_age_seconds=3600, clock=self.clock)
+        self.fallback.put("london", make_series())
+
+    def test_invalid_settings(self):
+        """Test that settings out of range are rejected."""
+        for kwargs in (
+            {"max_age_seconds": 0},
+            {"min_confidence": 1.5},
+            {"rate_limit_seconds": -1},
+            {"max_entries": 0},
+        ):
+            with pytest.raises(ValueError):
+                ForecastFallback(**kwargs)
+
+    def test_estimate_is_interpolated_and_flagged(self):
+        """Test that an estimate interpolates the forecast and carries confidence and age."""
+        estimate = self.fallback.estimate("london")
+
+        assert estimate.derived
+        assert estimate.city == "London"
+        assert estimate.temperature_celsius == 12.0
+        assert estimate.description == "sky 0"
+        assert estimate.age_seconds == 0.0
+        assert estimate.confidence == pytest.approx(0.833)
+        assert (self.fallback.stats.stores, self.fallback.stats.estimates) == (1, 1)
+
+    def test_confidence_falls_with_age(self):
+        """Test that older forecasts give less confident estimates until they expire."""
+        self.clock.now += 900
+        aged = self.fallback.estimate("london")
+
+        assert aged.age_seconds == 900.0
+        assert aged.confidence < 0.833
+
+        self.clock.now += 2700
+        assert self.fallback.estimate("london") is None
+        assert len(self.fallback) == 0
+        assert self.fallback.stats.misses == 1
+
+    def test_minimum_confidence(self):
+        """Test that estimates below the minimum confidence are not served."""
+        fallback = ForecastFallback(max_age_seconds=3600, min_confidence=0.9, clock=self.clock)
+        fallback.put("london", make_series())
+
+        assert fallback.estimate("london") is None
+        self.clock.now = START + STEP
+        fallback.put("london", make_series())
+        assert fallback.estimate("london").confidence == 1.0
+
+    def test_time_not_covered(self):
+        """Test that a forecast is held one slot spacing past its ends and no further."""
+        self.clock.now = START - STEP / 2
+        assert self.fallback.estimate("london").temperature_celsius == 10.0
+
+        self.clock.now = START - STEP - 1
+        assert self.fallback.estimate("london") is None
+        assert self.fallback.estimate("paris") is None
+
+    def test_single_slot_and_empty_series(self):
+        """Test that a single slot is usable and an empty series is not stored."""
+        self.fallback.put("oslo", make_series((5.0,), city="Oslo"))
+        self.fallback.put("rome", make_series(()))
+
+        assert self.fallback.estimate("oslo").temperature_celsius == 5.0
+        assert self.fallback.estimate("rome") is None
+        assert len(self.fallback) == 2
+
+    def test_bounded_size(self):
+        """Test that the least recently used forecast is evicted."""
+        fallback = ForecastFallback(max_entries=2, clock=self.clock)
+        for key in ("a", "b"):
+            fallback.put(key, make_series())
+        fallback.estimate("a")
+        fallback.put("c", make_series())
+
+        assert fallback.estimate("b") is None
+        assert fallback.estimate("a") is not None
+
+    def test_shared_backend(self, tmp_path):
+        """Test that a forecast kept in a disk backend is used by a later fallback."""
+        first = ForecastFallback(
+            max_age_seconds=3600, clock=self.clock, backend=DiskBackend(str(tmp_path))
+        )
+        first.put("london", make_series())
+
+        second = ForecastFallback(
+            max_age_seconds=3600, clock=self.clock, backend=DiskBackend(str(tmp_path))
+        )
+        estimate = second.estimate("london")
+
+        assert estimate.temperature_celsius == 12.0
+        assert estimate.description == "sky 0"
+        self.clock.now += 3600
+        assert second.estimate("london") is None
+        assert len(first) == 0
+
+    @pytest.mark.parametrize(
+        "error, expected",
+        [
+            (WeatherApiException("Rate limit exceeded.", 429), True),
+            (WeatherApiException("Service unavailable.", 503), True),
+            (WeatherApiException("Request timeout."), True),
+            (WeatherApiException("City not found.", 404), False),
+            (WeatherApiException("Invalid API key.", 401), False),
+            (InvalidCityNameException("City name contains invalid characters."), False),
+        ],
+    )
+    def test_can_stand_in_for(self, error, expected):
+        """Test that only availability problems are answered with estimates."""
+        assert ForecastFallback.can_stand_in_for(error) is expected
+
+    def test_rate_limit_window(self):
+        """Test that a rate limit answer starts a window of estimating without API calls."""
+        assert not self.fallback.rate_limited
+
+        self.fallback.record_error(WeatherApiException("Service unavailable.", 503))
+        assert not self.fallback.rate_limited
+
+        self.fallback.record_error(WeatherApiException("Rate limit exceeded.", 429))
+        assert self.fallback.rate_limited
+        self.clock.now += ForecastFallback.DEFAULT_RATE_LIMIT_SECONDS
+        assert not self.fallback.rate_limited
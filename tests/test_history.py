@@ -0,0 +1,212 @@
+"""Tests for the observation history recorder and log."""
+
+import os
+
+import pytest
+from weather_cli.history import (
+    MAGIC,
+    RECORD,
+    CityAggregate,
+    Observation,
+    ObservationLog,
+    ObservationRecorder,
+)
+from weather_cli.weather_data import WeatherData
+
+
+def observation(city_id, observed_at, temperature, condition_id=800, city="Test City"):
+    """Build weather data suitable for recording."""
+    return WeatherData(
+        city=city,
+        temperature_celsius=temperature,
+        description="Clear",
+        observed_at=observed_at,
+        city_id=city_id,
+        condition_id=condition_id,
+    )
+
+
+class TestObservationRecorder:
+    """Test cases for the ObservationRecorder class."""
+
+    def test_record_writes_fixed_width_records(self, tmp_path):
+        """Test that each observation becomes one fixed-width record."""
+        recorder = ObservationRecorder(tmp_path, shards=4)
+
+        assert recorder.record(observation(2643743, 1000, 12.5))
+        assert recorder.record(observation(2643743, 1600, 13.0))
+        recorder.close()
+
+        path = recorder.shard_path(2643743)
+        assert path.name == "shard-003.wxh"
+        assert path.read_bytes()[: len(MAGIC)] == MAGIC
+        assert path.stat().st_size == len(MAGIC) + 2 * RECORD.size
+
+    def test_record_skips_unindexed_observations(self, tmp_path):
+        """Test that observations without a city ID or time are skipped."""
+        recorder = ObservationRecorder(tmp_path)
+
+        assert not recorder.record(WeatherData("London", 10.0, "Rain"))
+        assert not recorder.record(WeatherData("London", 10.0, "Rain", city_id=1))
+        assert list(tmp_path.iterdir()) == []
+
+    def test_invalid_shards(self, tmp_path):
+        """Test that a non-positive shard count is rejected."""
+        with pytest.raises(ValueError, match="shards must be positive"):
+            ObservationRecorder(tmp_path, shards=0)
+
+    def test_reopened_recorder_appends(self, tmp_path):
+        """Test that a new recorder appends to existing shards without a second header."""
+        first = ObservationRecorder(tmp_path, shards=1)
+        first.record(observation(1, 100, 1.0))
+        first.close()
+        second = ObservationRecorder(tmp_path, shards=1)
+        second.record(observation(1, 200, 2.0))
+        second.close()
+
+        log = ObservationLog(tmp_path, shards=1)
+        assert [obs.observed_at for obs in log.observations()] == [100, 200]
+
+    def test_new_shard_is_created_with_its_header(self, tmp_path):
+        """Test that a shard another recorder created first gets no second header."""
+        first = ObservationRecorder(tmp_path, shards=1)
+        second = ObservationRecorder(tmp_path, shards=1)
+        first.record(observation(1, 100, 1.0))
+        # A recorder that also found the shard missing loses the race to create it
+        second._create_shard(second.shard_path(1))
+        second.record(observation(1, 200, 2.0))
+        first.record(observation(1, 300, 3.0))
+        first.close()
+        second.close()
+
+        assert [path.name for path in tmp_path.iterdir()] == ["shard-000.wxh"]
+        log = ObservationLog(tmp_path, shards=1)
+        assert [obs.observed_at for obs in log.observations()] == [100, 200, 300]
+
+    def test_partial_record_is_dropped_before_appending(self, tmp_path):
+        """Test that records appended after an interrupted write stay aligned."""
+        recorder = ObservationRecorder(tmp_path, shards=1)
+        recorder.record(observation(1, 100, 1.0))
+        recorder.close()
+        with open(tmp_path / "shard-000.wxh", "ab") as handle:
+            handle.write(b"\x01\x02\x03")
+
+        recorder = ObservationRecorder(tmp_path, shards=1)
+        recorder.record(observation(1, 200, 2.0))
+        recorder.close()
+
+        log = ObservationLog(tmp_path, shards=1)
+        assert [obs.observed_at for obs in log.observations()] == [100, 200]
+
+    def test_empty_shard_gets_a_header(self, tmp_path):
+        """Test that a shard left empty by an interrupted creation is repaired."""
+        (tmp_path / "shard-000.wxh").write_bytes(b"")
+
+        recorder = ObservationRecorder(tmp_path, shards=1)
+        recorder.record(observation(1, 100, 1.0))
+        recorder.close()
+
+        assert [obs.observed_at for obs in ObservationLog(tmp_path, shards=1).observations()] == [
+            100
+        ]
+
+
+class TestObservationLog:
+    """Test cases for the ObservationLog class."""
+
+    def setup_method(self, method):
+        """Set up test fixtures."""
+        self.records = [
+            observation(1, 1000, 10.0),
+            observation(2, 1000, 20.0, condition_id=500),
+            observation(1, 2000, 14.0),
+            observation(2, 2000, 22.0),
+            observation(1, 3000, 12.0),
+        ]
+
+    def _write(self, directory, shards=2):
+        recorder = ObservationRecorder(directory, shards=shards)
+        for data in self.records:
+            recorder.record(data)
+        recorder.close()
+        return ObservationLog(directory, shards=shards)
+
+    def test_observations_round_trip(self, tmp_path):
+        """Test that recorded observations are read back."""
+        log = self._write(tmp_path)
+
+        result = sorted(log.observations(), key=lambda obs: (obs.city_id, obs.observed_at))
+
+        assert result[0] == Observation(1, 1000, 10.0, 800)
+        assert result[3] == Observation(2, 1000, 20.0, 500)
+        assert len(result) == 5
+
+    def test_time_range_query(self, tmp_path):
+        """Test that range queries include the start and exclude the end."""
+        log = self._write(tmp_path)
+
+        result = list(log.observations(start=2000, end=3000))
+
+        assert sorted((obs.city_id, obs.observed_at) for obs in result) == [(1, 2000), (2, 2000)]
+
+    def test_city_query_reads_single_shard(self, tmp_path):
+        """Test that a city query only returns that city's observations."""
+        log = self._write(tmp_path, shards=1)
+
+        result = list(log.observations(city_id=1, start=1500))
+
+        assert [(obs.observed_at, obs.temperature_celsius) for obs in result] == [
+            (2000, 14.0),
+            (3000, 12.0),
+        ]
+
+    def test_aggregate(self, tmp_path):
+        """Test per-city aggregates over a time range."""
+        log = self._write(tmp_path)
+
+        result = log.aggregate(end=3000)
+
+        assert result[1] == CityAggregate(
+            city_id=1,
+            count=2,
+            minimum=10.0,
+            maximum=14.0,
+            mean=12.0,
+            first_observed_at=1000,
+            last_observed_at=2000,
+        )
+        assert result[2].count == 2
+        assert result[2].mean == 21.0
+        assert log.aggregate(city_id=2, start=1500)[2].count == 1
+
+    def test_missing_directory_is_empty(self, tmp_path):
+        """Test that an absent history yields no results."""
+        log = ObservationLog(tmp_path / "missing")
+
+        assert list(log.observations()) == []
+        assert log.aggregate() == {}
+
+    def test_trailing_partial_record_ignored(self, tmp_path):
+        """Test that an interrupted write does not corrupt queries."""
+        log = self._write(tmp_path, shards=1)
+        with open(tmp_path / "shard-000.wxh", "ab") as handle:
+            handle.write(b"\x01\x02\x03")
+
+        assert len(list(log.observations())) == 5
+
+    def test_rejects_foreign_file(self, tmp_path):
+        """Test that files without the history header are rejected."""
+        (tmp_path / "shard-000.wxh").write_bytes(b"NOTAHIST" + bytes(RECORD.size))
+
+        with pytest.raises(ValueError, match="Not an observation history file"):
+            list(ObservationLog(tmp_path, shards=1).observations())
+
+    def test_early_stop_releases_mapping(self, tmp_path):
+        """Test that abandoning a query part-way closes the memory map cleanly."""
+        log = self._write(tmp_path, shards=1)
+
+        iterator = log.observations()
+        next(iterator)
+        iterator.close()
+
+        os.remove(tmp_path / "shard-000.wxh")
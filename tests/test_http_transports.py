@@ -0,0 +1,192 @@
+"""Tests for the stdlib and HTTP/2 transport backends."""
+
+import gzip
+import http.client
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from weather_cli.http_transports import (
+    HTTPX_MISSING,
+    Http2Transport,
+    HttpClientTransport,
+    _decode_body,
+)
+from weather_cli.stub_server import FaultProfile, StubServer
+from weather_cli.weather_client import OpenWeatherMapClient
+from weather_cli.exceptions import WeatherApiException
+
+
+def make_client(server, transport):
+    """Create a client sending requests to a stub server through a transport."""
+    return OpenWeatherMapClient(api_key="k", base_url=server.base_url, transport=transport)
+
+
+def free_port():
+    """Return a local port nothing is listening on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestHttpClientTransport:
+    """Test cases for the HttpClientTransport class."""
+
+    def test_lookups_share_one_connection(self):
+        """Test that consecutive lookups are answered over one kept-alive connection."""
+        transport = HttpClientTransport()
+        with StubServer() as server:
+            client = make_client(server, transport)
+            results = [client.get_weather_from_api(city) for city in ("Oslo", "Rome", "Lima")]
+            transport.close()
+
+        assert [result.city for result in results] == ["Oslo", "Rome", "Lima"]
+        assert server.stats.requests == 3
+        assert server.stats.connections == 1
+
+    def test_executors_reuse_pooled_connections(self):
+        """Test that short-lived worker threads reuse connections instead of leaking them."""
+        transport = HttpClientTransport()
+        with StubServer() as server:
+            client = make_client(server, transport)
+            for _ in range(10):
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    list(executor.map(client.get_weather_from_api, ["Oslo", "Rome"] * 4))
+            transport.close()
+
+        assert server.stats.requests == 80
+        assert server.stats.connections <= 4
+        assert transport._idle == {}
+
+    def test_idle_connections_are_bounded(self):
+        """Test that connections beyond the idle limit are closed when returned."""
+        transport = HttpClientTransport(max_idle_per_host=2)
+        with StubServer(FaultProfile(latency_ms=50)) as server:
+            client = make_client(server, transport)
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(client.get_weather_from_api, ["Oslo", "Rome", "Lima", "Bern"]))
+            idle = [len(connections) for connections in transport._idle.values()]
+            transport.close()
+
+        assert server.stats.connections == 4
+        assert idle == [2]
+
+    def test_invalid_pool_size(self):
+        """Test that a negative pool size is rejected."""
+        with pytest.raises(ValueError):
+            HttpClientTransport(max_idle_per_host=-1)
+
+    def test_response_fields(self):
+        """Test that the response carries the status, headers, body and timing."""
+        transport = HttpClientTransport()
+        with StubServer(FaultProfile(error_rates={503: 1.0})) as server:
+            response = transport.get(f"{server.base_url}/weather?q=Oslo&appid=k", timeout=5)
+            transport.close()
+
+        assert response.status_code == 503
+        assert response.reason
+        assert response.url.endswith("q=Oslo&appid=k")
+        assert response.elapsed.total_seconds() >= 0
+        assert response.json()
+
+    def test_api_errors_are_mapped(self):
+        """Test that error statuses reach the client's usual error handling."""
+        with StubServer(FaultProfile(error_rates={503: 1.0})) as server:
+            with pytest.raises(WeatherApiException) as exc_info:
+                make_client(server, HttpClientTransport()).get_weather_from_api("Oslo")
+
+        assert exc_info.value.status_code == 503
+
+    def test_connection_refused(self):
+        """Test that an unreachable server raises a requests ConnectionError."""
+        transport = HttpClientTransport()
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            transport.get(f"http://127.0.0.1:{free_port()}/weather", timeout=1)
+
+    def test_timeout(self):
+        """Test that a slow server raises a requests Timeout and drops the connection."""
+        transport = HttpClientTransport()
+        with StubServer(FaultProfile(latency_ms=500)) as server:
+            with pytest.raises(requests.exceptions.Timeout):
+                transport.get(f"{server.base_url}/weather?q=Oslo&appid=k", timeout=0.05)
+
+        assert transport._idle == {}
+
+    def test_invalid_url(self):
+        """Test that URLs without an HTTP scheme and host are rejected."""
+        with pytest.raises(requests.exceptions.InvalidURL):
+            HttpClientTransport().get("ftp://example.com/weather", timeout=1)
+
+    def test_stale_connection_is_retried_once(self):
+        """Test that a kept-alive connection closed by the server is replaced."""
+        transport = HttpClientTransport()
+        stale = Mock(sock=None)
+        stale.request.side_effect = http.client.RemoteDisconnected("closed")
+        with StubServer() as server:
+            transport.get(f"{server.base_url}/weather?q=Oslo&appid=k", timeout=5)
+            key = ("http", server.base_url.split("//")[1].split("/")[0])
+            transport._idle[key][0].close()
+            transport._idle[key] = [stale]
+
+            response = transport.get(f"{server.base_url}/weather?q=Rome&appid=k", timeout=5)
+            transport.close()
+
+        assert response.status_code == 200
+        stale.close.assert_called_once()
+        assert server.stats.connections == 2
+
+    def test_new_connection_is_not_retried(self):
+        """Test that a fresh connection dropped by the server fails without a retry."""
+        transport = HttpClientTransport()
+        with patch("weather_cli.http_transports.http.client.HTTPConnection") as mock_connection:
+            mock_connection.return_value.request.side_effect = ConnectionResetError("reset")
+            with pytest.raises(requests.exceptions.ConnectionError):
+                transport.get("http://api.example.com/weather", timeout=1)
+
+        assert mock_connection.call_count == 1
+
+    def test_decode_body(self):
+        """Test that gzip bodies are decoded and other encodings left alone."""
+        headers = {"Content-Encoding": "gzip", "Content-Type": "application/json"}
+
+        assert _decode_body(headers, gzip.compress(b"{}")) == b"{}"
+        assert headers == {"Content-Type": "application/json"}
+
+        headers = {"content-encoding": "br"}
+        assert _decode_body(headers, b"raw") == b"raw"
+        assert headers == {"content-encoding": "br"}
+
+
+class TestHttp2Transport:
+    """Test cases for the Http2Transport class."""
+
+    def test_missing_httpx(self):
+        """Test that a missing httpx is reported with the install command."""
+        with patch("weather_cli.http_transports.importlib.import_module") as mock_import:
+            mock_import.side_effect = ImportError("No module named 'httpx'")
+            with pytest.raises(ImportError, match="pip install"):
+                Http2Transport()
+
+        assert "httpx" in HTTPX_MISSING
+
+    def test_lookup_against_stub(self):
+        """Test a lookup over HTTP/1.1 against the plain HTTP stub server."""
+        pytest.importorskip("httpx")
+        transport = Http2Transport(http2=False)
+        with StubServer() as server:
+            result = make_client(server, transport).get_weather_from_api("Oslo")
+            transport.close()
+
+        assert result.city == "Oslo"
+
+    def test_errors_are_mapped(self):
+        """Test that httpx errors are raised as requests exceptions."""
+        pytest.importorskip("httpx")
+        transport = Http2Transport(http2=False)
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            transport.get(f"http://127.0.0.1:{free_port()}/weather", timeout=1)
+        transport.close()
@@ -0,0 +1,120 @@
+"""Tests for the API key pool."""
+
+import logging
+
+import pytest
+from weather_cli.key_pool import ApiKeyPool
+from weather_cli.exceptions import WeatherApiException
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestApiKeyPool:
+    """Test cases for the ApiKeyPool class."""
+
+    def setup_method(self):
+        """Set up a pool of two keys with a small quota."""
+        self.clock = FakeClock()
+        self.pool = ApiKeyPool(
+            ["key-one", "key-two"],
+            quota_per_minute=2,
+            quarantine_seconds=30,
+            invalid_key_quarantine_seconds=300,
+            clock=self.clock,
+        )
+
+    def test_invalid_arguments(self):
+        """Test validation of the constructor arguments."""
+        with pytest.raises(ValueError, match="At least one API key"):
+            ApiKeyPool([" ", ""])
+        with pytest.raises(ValueError, match="quota_per_minute"):
+            ApiKeyPool(["key"], quota_per_minute=0)
+
+    def test_duplicates_are_ignored(self):
+        """Test that blank and duplicate keys are dropped."""
+        pool = ApiKeyPool(["a", " a ", "b", ""])
+
+        assert pool.keys == ["a", "b"]
+        assert len(pool) == 2
+
+    def test_acquire_picks_most_headroom(self):
+        """Test that requests go to the key with the most remaining quota."""
+        assert [self.pool.acquire() for _ in range(4)] == [
+            "key-one",
+            "key-two",
+            "key-one",
+            "key-two",
+        ]
+        assert self.pool.headroom("key-one") == 0
+
+    def test_quota_exhausted_then_window_slides(self):
+        """Test that exhausted keys become available once the minute passes."""
+        for _ in range(4):
+            self.pool.acquire()
+
+        with pytest.raises(WeatherApiException) as exc_info:
+            self.pool.acquire()
+        assert exc_info.value.status_code == 429
+
+        self.clock.now = 60.5
+        assert self.pool.acquire() == "key-one"
+
+    def test_rate_limited_key_is_quarantined(self):
+        """Test that a 429 sets the key aside for the quarantine period."""
+        self.pool.quarantine("key-one", 429)
+
+        assert self.pool.headroom("key-one") == 0
+        assert self.pool.acquire() == "key-two"
+
+        self.clock.now = 31
+        assert self.pool.headroom("key-one") == 2
+
+    def test_rejected_key_is_quarantined_longer(self):
+        """Test that a 401 uses the longer quarantine period."""
+        self.pool.quarantine("key-one", 401)
+
+        self.clock.now = 100
+        assert self.pool.headroom("key-one") == 0
+        self.clock.now = 301
+        assert self.pool.headroom("key-one") == 2
+
+    def test_unlimited_keys_rotate(self):
+        """Test that keys without a quota are used in turn."""
+        pool = ApiKeyPool(["a", "b", "c"], clock=self.clock)
+
+        used = []
+        for step in range(6):
+            self.clock.now = step
+            used.append(pool.acquire())
+
+        assert used == ["a", "b", "c", "a", "b", "c"]
+        assert pool.headroom("a") == float("inf")
+
+    def test_keys_never_logged(self, caplog):
+        """Test that log messages refer to keys by label only."""
+        with caplog.at_level(logging.DEBUG, logger="weather_cli.key_pool"):
+            self.pool.acquire()
+            self.pool.quarantine("key-two", 429)
+            self.pool.quarantine("key-one", 401)
+            with pytest.raises(WeatherApiException):
+                self.pool.acquire()
+
+        assert "key-one" not in caplog.text
+        assert "key-two" not in caplog.text
+        assert "#2" in caplog.text
+
+    def test_redact_and_label(self):
+        """Test redaction of every key and log-safe labels."""
+        text = "appid=key-one and appid=key-two"
+
+        assert self.pool.redact(text) == "appid=REDACTED and appid=REDACTED"
+        assert self.pool.label("key-two") == "#2"
+        assert self.pool.label("other") == "unknown"
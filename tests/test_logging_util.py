@@ -0,0 +1,162 @@
+"""Tests for the logging setup."""
+
+import io
+import json
+import logging
+import sys
+
+import pytest
+from unittest.mock import Mock, patch
+from weather_cli.logging_util import (
+    HANDLER_NAME,
+    SAMPLED,
+    JsonFormatter,
+    SamplingFilter,
+    configure_logging,
+)
+from weather_cli.weather_client import OpenWeatherMapClient
+
+
+def make_record(message="Fetched %s", args=("London",), level=logging.INFO, **extra):
+    """Create a log record as a logger would."""
+    record = logging.LogRecord("weather_cli.test", level, __file__, 1, message, args, None)
+    for name, value in extra.items():
+        setattr(record, name, value)
+    return record
+
+
+@pytest.fixture
+def root_logger():
+    """Yield the root logger and remove the application handler afterwards."""
+    root = logging.getLogger()
+    level = root.level
+    yield root
+    for handler in list(root.handlers):
+        if handler.get_name() == HANDLER_NAME:
+            root.removeHandler(handler)
+    root.setLevel(level)
+
+
+class TestJsonFormatter:
+    """Test cases for the JSON formatter."""
+
+    def test_formats_record_as_json(self):
+        """Test that a record becomes one JSON object with its fields and extras."""
+        line = JsonFormatter().format(make_record(city_id=2643743, sampled=True))
+
+        entry = json.loads(line)
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "weather_cli.test"
+        assert entry["message"] == "Fetched London"
+        assert entry["city_id"] == 2643743
+        assert "sampled" not in entry
+        assert entry["time"].endswith("+00:00")
+
+    def test_includes_exception(self):
+        """Test that exception tracebacks are included."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord(
+                "x", logging.ERROR, __file__, 1, "failed", None, sys.exc_info()
+            )
+
+        entry = json.loads(JsonFormatter().format(record))
+        assert "ValueError: boom" in entry["exception"]
+
+
+class TestSamplingFilter:
+    """Test cases for the sampling filter."""
+
+    def test_keeps_one_in_n_sampled_records(self):
+        """Test that a rate of 0.25 keeps every fourth sampled record."""
+        sampling = SamplingFilter(0.25)
+
+        kept = [sampling.filter(make_record(**SAMPLED)) for _ in range(8)]
+
+        assert kept == [True, False, False, False, True, False, False, False]
+
+    def test_unmarked_records_are_always_kept(self):
+        """Test that records without the sampled marker are never dropped."""
+        sampling = SamplingFilter(0.01)
+
+        assert all(sampling.filter(make_record(level=logging.ERROR)) for _ in range(10))
+
+    def test_templates_are_sampled_independently(self):
+        """Test that each message template has its own counter."""
+        sampling = SamplingFilter(0.5)
+
+        assert sampling.filter(make_record("Fetching %s", **SAMPLED))
+        assert sampling.filter(make_record("Served %s", **SAMPLED))
+
+    @pytest.mark.parametrize("rate", [0, -0.5, 1.5])
+    def test_invalid_rate(self, rate):
+        """Test that rates outside (0, 1] are rejected."""
+        with pytest.raises(ValueError):
+            SamplingFilter(rate)
+
+
+class TestConfigureLogging:
+    """Test cases for configure_logging."""
+
+    def test_installs_one_handler(self, root_logger):
+        """Test that repeated configuration reuses the handler."""
+        first = configure_logging(logging.INFO)
+        second = configure_logging(logging.DEBUG, "json", 0.5)
+
+        assert first is second
+        assert [h for h in root_logger.handlers if h.get_name() == HANDLER_NAME] == [first]
+        assert root_logger.level == logging.DEBUG
+        assert isinstance(first.formatter, JsonFormatter)
+        assert len([f for f in first.filters if isinstance(f, SamplingFilter)]) == 1
+
+        configure_logging(logging.INFO, "text", 1.0)
+        assert not first.filters
+
+    def test_writes_json_lines(self, root_logger):
+        """Test that records are written as JSON lines to the stream."""
+        stream = io.StringIO()
+        configure_logging(logging.INFO, "json", stream=stream)
+
+        logging.getLogger("weather_cli.test").info("Fetched %s", "Oslo", extra={"ms": 12})
+
+        entry = json.loads(stream.getvalue().splitlines()[-1])
+        assert entry["message"] == "Fetched Oslo"
+        assert entry["ms"] == 12
+
+    def test_invalid_format(self, root_logger):
+        """Test that unsupported formats are rejected."""
+        with pytest.raises(ValueError):
+            configure_logging(log_format="xml")
+
+
+class TestLoggingCost:
+    """Check that disabled log levels cost nothing on the request path."""
+
+    def make_client(self):
+        """Create a client whose transport answers instantly."""
+        with patch("weather_cli.config_util.ConfigUtil.get_api_key", return_value="secret"):
+            client = OpenWeatherMapClient(transport=Mock())
+        client.transport.get.return_value = Mock(status_code=200)
+        return client
+
+    def test_no_redaction_or_formatting_at_info(self, root_logger):
+        """Test that debug messages are neither redacted nor formatted at INFO level."""
+        configure_logging(logging.INFO, stream=io.StringIO())
+        client = self.make_client()
+
+        with patch.object(client, "_redact_api_key", wraps=client._redact_api_key) as redact:
+            client._send_request("https://api.example/weather?q=London&appid=secret")
+
+        redact.assert_not_called()
+
+    def test_redacts_at_debug(self, root_logger):
+        """Test that the redacted URL is still logged at DEBUG level."""
+        stream = io.StringIO()
+        configure_logging(logging.DEBUG, stream=stream)
+        client = self.make_client()
+
+        client._send_request("https://api.example/weather?q=London&appid=secret")
+
+        assert "appid=REDACTED" in stream.getvalue()
+        assert "secret" not in stream.getvalue()
@@ -1,13 +1,55 @@
 """Tests for the main application module."""
 
+import json
+import logging
 import sys
+import urllib.parse
 import pytest
 from unittest.mock import Mock, patch
 from io import StringIO
 
-from weather_cli.main import parse_arguments, run_weather_cli, main, setup_logging
+from weather_cli.bench import BenchResult
+from weather_cli.bulk import BulkState
+from weather_cli.cache import WeatherCache
+from weather_cli.cache_backends import DiskBackend, RedisBackend
+from weather_cli.comparison import ComparisonResult
+from weather_cli.composite_client import FailoverClient
+from weather_cli.concurrency import AdaptiveConcurrencyClient
+from weather_cli.connections import PooledTransport
+from weather_cli.forecast_fallback import ForecastFallback
+from weather_cli.http_transports import HttpClientTransport
+from weather_cli.logging_util import HANDLER_NAME, JsonFormatter, SamplingFilter
+from weather_cli.negative_cache import NegativeCache
+from weather_cli.scheduler import SchedulingClient
+from weather_cli.spatial import SpatialIndex
+from weather_cli.tracing import CompositeExporter, JsonlExporter, get_tracer, set_tracer
+from weather_cli.transport import RecordingTransport, ReplayTransport
+from weather_cli.units import Units
+from weather_cli.main import (
+    create_cache_backend,
+    create_transport,
+    create_weather_service,
+    parse_arguments,
+    parse_bulk_arguments,
+    parse_compare_arguments,
+    parse_forecast_arguments,
+    parse_snapshot_arguments,
+    parse_watch_arguments,
+    run_bulk_cli,
+    run_compare_cli,
+    run_forecast_cli,
+    run_snapshot_cli,
+    run_watch_cli,
+    run_weather_cli,
+    main,
+    parse_bench_arguments,
+    run_bench_cli,
+    setup_logging,
+    setup_tracing,
+)
 from weather_cli.weather_data import WeatherData
 from weather_cli.exceptions import WeatherApiException, ConfigException
+from weather_cli.forecast import ForecastSeries
 
 
 class TestParseArguments:
@@ -33,6 +75,31 @@ class TestParseArguments:
             args = parse_arguments()
             assert args.city == "New York"
 
+    def test_parse_arguments_default_units(self):
+        """Test that temperatures are shown in metric units by default."""
+        with patch.object(sys, "argv", ["weather-cli", "London"]):
+            assert parse_arguments().units == "metric"
+
+    def test_parse_arguments_with_units(self):
+        """Test parsing the --units option."""
+        with patch.object(sys, "argv", ["weather-cli", "London", "--units", "imperial"]):
+            assert parse_arguments().units == "imperial"
+
+        with patch.object(sys, "argv", ["weather-cli", "London", "--units", "rankine"]):
+            with pytest.raises(SystemExit):
+                parse_arguments()
+
+    def test_parse_arguments_coordinates(self):
+        """Test parsing coordinates instead of a city."""
+        with patch.object(sys, "argv", ["weather-cli", "--coordinates", "51.5", "-0.12"]):
+            args = parse_arguments()
+            assert args.city is None
+            assert args.coordinates == [51.5, -0.12]
+
+        with patch.object(sys, "argv", ["weather-cli", "London", "--coordinates", "1", "2"]):
+            with pytest.raises(SystemExit):
+                parse_arguments()
+
     def test_parse_arguments_missing_city(self):
         """Test that missing city argument raises SystemExit."""
         with patch.object(sys, "argv", ["weather-cli"]):
@@ -43,23 +110,70 @@ class TestParseArguments:
 class TestSetupLogging:
     """Test cases for logging setup."""
 
-    @patch("weather_cli.main.logging.basicConfig")
-    def test_setup_logging_default(self, mock_basic_config):
+    @pytest.fixture(autouse=True)
+    def restore_root_logger(self):
+        """Remove the application handler and restore the root level after each test."""
+        root = logging.getLogger()
+        level = root.level
+        yield
+        for handler in list(root.handlers):
+            if handler.get_name() == HANDLER_NAME:
+                root.removeHandler(handler)
+        root.setLevel(level)
+
+    @staticmethod
+    def app_handlers():
+        """Return the handlers installed by setup_logging."""
+        return [h for h in logging.getLogger().handlers if h.get_name() == HANDLER_NAME]
+
+    @patch("weather_cli.config_util.ConfigUtil.get_log_sample_rate", return_value=1.0)
+    @patch("weather_cli.config_util.ConfigUtil.get_log_format", return_value="text")
+    def test_setup_logging_default(self, mock_format, mock_rate):
         """Test logging setup with default settings."""
         setup_logging()
 
-        mock_basic_config.assert_called_once()
-        call_kwargs = mock_basic_config.call_args[1]
-        assert call_kwargs["level"] == 20  # logging.INFO
+        assert logging.getLogger().level == logging.INFO
+        assert len(self.app_handlers()) == 1
 
-    @patch("weather_cli.main.logging.basicConfig")
-    def test_setup_logging_debug(self, mock_basic_config):
+    @patch("weather_cli.config_util.ConfigUtil.get_log_sample_rate", return_value=1.0)
+    @patch("weather_cli.config_util.ConfigUtil.get_log_format", return_value="text")
+    def test_setup_logging_debug(self, mock_format, mock_rate):
         """Test logging setup with debug enabled."""
         setup_logging(debug=True)
 
-        mock_basic_config.assert_called_once()
-        call_kwargs = mock_basic_config.call_args[1]
-        assert call_kwargs["level"] == 10  # logging.DEBUG
+        assert logging.getLogger().level == logging.DEBUG
+
+    @patch("weather_cli.config_util.ConfigUtil.get_log_sample_rate", return_value=1.0)
+    @patch("weather_cli.config_util.ConfigUtil.get_log_format", return_value="text")
+    def test_setup_logging_is_idempotent(self, mock_format, mock_rate):
+        """Test that repeated setup installs one handler and only updates the level."""
+        setup_logging()
+        setup_logging(debug=True)
+        setup_logging()
+
+        assert len(self.app_handlers()) == 1
+        assert logging.getLogger().level == logging.INFO
+
+    @patch("weather_cli.config_util.ConfigUtil.get_log_sample_rate", return_value=0.5)
+    @patch("weather_cli.config_util.ConfigUtil.get_log_format", return_value="json")
+    def test_setup_logging_json_with_sampling(self, mock_format, mock_rate):
+        """Test that the configured format and sample rate are applied."""
+        setup_logging()
+
+        (handler,) = self.app_handlers()
+        assert isinstance(handler.formatter, JsonFormatter)
+        assert [f.rate for f in handler.filters if isinstance(f, SamplingFilter)] == [0.5]
+
+    @patch(
+        "weather_cli.config_util.ConfigUtil.get_log_format",
+        side_effect=ConfigException("WEATHER_LOG_FORMAT must be one of: text, json"),
+    )
+    def test_setup_logging_invalid_configuration_falls_back_to_text(self, mock_format):
+        """Test that an invalid logging configuration does not prevent logging."""
+        setup_logging()
+
+        (handler,) = self.app_handlers()
+        assert not isinstance(handler.formatter, JsonFormatter)
 
 
 class TestRunWeatherCli:
@@ -175,6 +289,20 @@ class TestRunWeatherCli:
         error_output = mock_stderr.getvalue()
         assert "Unexpected Error: Unexpected error" in error_output
 
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_weather_cli_converts_units(self, mock_setup_logging, mock_weather_service_class):
+        """Test that the canonical Celsius value is converted for display."""
+        mock_weather_service_class.return_value.get_weather.return_value = WeatherData(
+            city="Boston", temperature_celsius=20.0, description="Sunny"
+        )
+
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            result = run_weather_cli("Boston", units=Units.IMPERIAL)
+
+        assert result == 0
+        assert "Temperature: 68.0°F" in mock_stdout.getvalue()
+
 
 class TestMain:
     """Test cases for the main entry point."""
@@ -188,6 +316,7 @@ class TestMain:
         mock_args = Mock()
         mock_args.city = "London"
         mock_args.debug = False
+        mock_args.units = "metric"
         mock_parse_args.return_value = mock_args
         mock_run_cli.return_value = 0
 
@@ -196,7 +325,7 @@ class TestMain:
 
         # Verify calls
         mock_parse_args.assert_called_once()
-        mock_run_cli.assert_called_once_with("London", False)
+        mock_run_cli.assert_called_once_with("London", False, units=Units.METRIC)
         mock_exit.assert_called_once_with(0)
 
     @patch("weather_cli.main.run_weather_cli")
@@ -208,6 +337,7 @@ class TestMain:
         mock_args = Mock()
         mock_args.city = "NonExistentCity"
         mock_args.debug = True
+        mock_args.units = "metric"
         mock_parse_args.return_value = mock_args
         mock_run_cli.return_value = 1
 
@@ -216,7 +346,7 @@ class TestMain:
 
         # Verify calls
         mock_parse_args.assert_called_once()
-        mock_run_cli.assert_called_once_with("NonExistentCity", True)
+        mock_run_cli.assert_called_once_with("NonExistentCity", True, units=Units.METRIC)
         mock_exit.assert_called_once_with(1)
 
     @patch("weather_cli.main.run_weather_cli")
@@ -228,6 +358,7 @@ class TestMain:
         mock_args = Mock()
         mock_args.city = "Tokyo"
         mock_args.debug = True
+        mock_args.units = "metric"
         mock_parse_args.return_value = mock_args
         mock_run_cli.return_value = 0
 
@@ -235,7 +366,33 @@ class TestMain:
         main()
 
         # Verify debug flag is passed
-        mock_run_cli.assert_called_once_with("Tokyo", True)
+        mock_run_cli.assert_called_once_with("Tokyo", True, units=Units.METRIC)
+
+    @patch("weather_cli.main.run_weather_cli", return_value=0)
+    @patch("sys.exit")
+    def test_main_with_coordinates(self, mock_exit, mock_run_cli):
+        """Test that coordinates are passed on instead of a city."""
+        with patch.object(sys, "argv", ["weather-cli", "--coordinates", "51.5", "-0.12"]):
+            main()
+
+        mock_run_cli.assert_called_once_with(
+            None, False, units=Units.METRIC, coordinates=(51.5, -0.12)
+        )
+
+    @patch("weather_cli.main.create_weather_service")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_weather_cli_with_coordinates(self, mock_setup_logging, mock_create_service):
+        """Test that a coordinate lookup prints the nearest observation."""
+        mock_create_service.return_value.get_weather_at.return_value = WeatherData(
+            city="London", temperature_celsius=15.5, description="Cloudy"
+        )
+
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            exit_code = run_weather_cli(None, coordinates=(51.5, -0.12))
+
+        assert exit_code == 0
+        assert "Weather for London:" in mock_stdout.getvalue()
+        mock_create_service.return_value.get_weather_at.assert_called_once_with(51.5, -0.12)
 
 
 class TestIntegration:
@@ -283,3 +440,1051 @@ class TestIntegration:
             result = run_weather_cli("Debug City", debug=True)
 
         assert result == 0
+
+
+class TestCompareCommand:
+    """Test cases for the compare command."""
+
+    def test_parse_compare_arguments_defaults(self):
+        """Test parsing the compare command with default options."""
+        args = parse_compare_arguments(["London", "New York"])
+
+        assert args.cities == ["London", "New York"]
+        assert args.sort_by == "temperature"
+        assert args.ascending is False
+        assert args.deadline is None
+
+    def test_parse_compare_arguments_options(self):
+        """Test parsing the compare command with all options."""
+        args = parse_compare_arguments(
+            ["Oslo", "Rome", "--sort-by", "city", "--ascending", "--deadline", "2.5", "--debug"]
+        )
+
+        assert args.sort_by == "city"
+        assert args.ascending is True
+        assert args.deadline == 2.5
+        assert args.debug is True
+
+    @pytest.mark.parametrize("deadline", ["0", "-1"])
+    def test_parse_compare_arguments_rejects_invalid_deadline(self, deadline):
+        """Test that a deadline that leaves no time for lookups is rejected."""
+        with pytest.raises(SystemExit):
+            parse_compare_arguments(["Oslo", "--deadline", deadline])
+
+    def test_parse_compare_arguments_requires_city(self):
+        """Test that the compare command needs at least one city."""
+        with pytest.raises(SystemExit):
+            parse_compare_arguments([])
+
+    @patch("weather_cli.comparison.compare_cities")
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_compare_cli_success(self, mock_setup_logging, mock_service_class, mock_compare):
+        """Test a successful comparison run."""
+        mock_compare.return_value = ComparisonResult(
+            results=[WeatherData(city="Rome", temperature_celsius=25.0, description="Sunny")]
+        )
+
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            result = run_compare_cli(["Rome"], sort_by="city", descending=False, deadline=1.0)
+
+        assert result == 0
+        assert "Rome" in mock_stdout.getvalue()
+        mock_compare.assert_called_once_with(
+            mock_service_class.return_value,
+            ["Rome"],
+            sort_by="city",
+            descending=False,
+            deadline=1.0,
+        )
+
+    @patch("weather_cli.comparison.compare_cities")
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_compare_cli_nothing_arrived(
+        self, mock_setup_logging, mock_service_class, mock_compare
+    ):
+        """Test that a comparison without any result exits with an error."""
+        mock_compare.return_value = ComparisonResult(results=[], errors={"X": "City not found."})
+
+        with patch("sys.stdout", new_callable=StringIO):
+            assert run_compare_cli(["X"]) == 1
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_compare_cli_config_exception(self, mock_setup_logging, mock_service_class):
+        """Test configuration errors in the compare command."""
+        mock_service_class.side_effect = ConfigException("API key not found")
+
+        with patch("sys.stderr", new_callable=StringIO) as mock_stderr:
+            assert run_compare_cli(["Rome"]) == 1
+
+        assert "Configuration Error: API key not found" in mock_stderr.getvalue()
+
+    @patch("weather_cli.main.run_compare_cli")
+    @patch("sys.exit")
+    def test_main_dispatches_compare(self, mock_exit, mock_run_compare):
+        """Test that main routes the compare command."""
+        mock_run_compare.return_value = 0
+
+        with patch.object(sys, "argv", ["weather-cli", "compare", "Oslo", "Rome", "--ascending"]):
+            main()
+
+        mock_run_compare.assert_called_once_with(
+            ["Oslo", "Rome"],
+            sort_by="temperature",
+            descending=False,
+            deadline=None,
+            debug=False,
+            units=Units.METRIC,
+        )
+        mock_exit.assert_called_once_with(0)
+
+
+class TestBulkCommand:
+    """Test cases for the bulk command."""
+
+    def test_parse_bulk_arguments_defaults(self):
+        """Test parsing the bulk command with default options."""
+        args = parse_bulk_arguments(["cities.txt", "-o", "out.csv"])
+
+        assert (args.input, args.output, args.state) == ("cities.txt", "out.csv", None)
+        assert args.resume is False
+        assert (args.chunk_size, args.workers) == (500, None)
+
+    def test_parse_bulk_arguments_options(self):
+        """Test parsing the bulk command with all options."""
+        args = parse_bulk_arguments(
+            ["in.txt", "--output", "out.csv", "--state", "job.state", "--resume"]
+            + ["--chunk-size", "50", "--workers", "4", "--debug"]
+        )
+
+        assert args.state == "job.state"
+        assert args.resume is True
+        assert (args.chunk_size, args.workers) == (50, 4)
+        assert args.debug is True
+
+    @pytest.mark.parametrize(
+        "argv",
+        [["in.txt"], ["in.txt", "-o", "o.csv", "--chunk-size", "0"], ["-o", "o.csv"]],
+    )
+    def test_parse_bulk_arguments_errors(self, argv):
+        """Test that the bulk command needs an input, an output and positive sizes."""
+        with pytest.raises(SystemExit):
+            parse_bulk_arguments(argv)
+
+    @patch("weather_cli.bulk.BulkJob")
+    @patch("weather_cli.main.create_weather_service")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_bulk_cli(self, mock_setup_logging, mock_create_service, mock_job_class):
+        """Test a bulk run, exiting with an error while cities have failed."""
+        mock_job_class.return_value.run.return_value = BulkState(input_path="in.txt", succeeded=9)
+
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            assert run_bulk_cli("in.txt", "out.csv", resume=True, chunk_size=5) == 0
+
+        assert "Wrote 9 results to out.csv." in mock_stdout.getvalue()
+        mock_job_class.assert_called_once_with(
+            mock_create_service.return_value,
+            "in.txt",
+            "out.csv",
+            state_path=None,
+            chunk_size=5,
+            max_workers=None,
+        )
+        mock_job_class.return_value.run.assert_called_once_with(resume=True)
+
+        mock_job_class.return_value.run.return_value.failed = {"X": "City not found."}
+        with patch("sys.stdout", new_callable=StringIO):
+            with patch("sys.stderr", new_callable=StringIO) as mock_stderr:
+                assert run_bulk_cli("in.txt", "out.csv") == 1
+        assert "1 cities failed; run again with --resume" in mock_stderr.getvalue()
+
+    @pytest.mark.parametrize(
+        "error, message",
+        [
+            (KeyboardInterrupt(), "run again with --resume to continue"),
+            (ValueError("State file belongs to input a.txt"), "Bulk Job Error: State file"),
+            (FileNotFoundError("in.txt"), "Bulk Job Error: in.txt"),
+        ],
+    )
+    @patch("weather_cli.bulk.BulkJob")
+    @patch("weather_cli.main.create_weather_service")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_bulk_cli_errors(
+        self, mock_setup_logging, mock_create_service, mock_job_class, error, message
+    ):
+        """Test that interruptions and file errors are reported with exit code 1."""
+        mock_job_class.return_value.run.side_effect = error
+
+        with patch("sys.stderr", new_callable=StringIO) as mock_stderr:
+            assert run_bulk_cli("in.txt", "out.csv") == 1
+
+        assert message in mock_stderr.getvalue()
+
+    @patch("weather_cli.main.run_bulk_cli")
+    @patch("sys.exit")
+    def test_main_dispatches_bulk(self, mock_exit, mock_run_bulk):
+        """Test that main routes the bulk command."""
+        mock_run_bulk.return_value = 0
+
+        with patch.object(sys, "argv", ["weather-cli", "bulk", "in.txt", "-o", "out.csv"]):
+            main()
+
+        mock_run_bulk.assert_called_once_with(
+            "in.txt",
+            "out.csv",
+            state_path=None,
+            resume=False,
+            chunk_size=500,
+            max_workers=None,
+            debug=False,
+        )
+        mock_exit.assert_called_once_with(0)
+
+
+class TestBenchCommand:
+    """Test cases for the bench command."""
+
+    def test_parse_bench_arguments_defaults(self):
+        """Test parsing the bench command with default options."""
+        args = parse_bench_arguments([])
+
+        assert args.cities == ["London", "Paris", "Tokyo", "New York", "Sydney"]
+        assert (args.requests, args.concurrency, args.rate) == (1000, 16, None)
+        assert (args.base_url, args.stub, args.cache, args.json) == (None, False, False, None)
+
+    def test_parse_bench_arguments_options(self):
+        """Test parsing the bench command with all options."""
+        args = parse_bench_arguments(
+            ["Oslo", "Rome", "-n", "50", "-c", "4", "--rate", "25.5", "--stub"]
+            + ["--stub-latency-ms", "20", "--cache", "--json", "-", "--debug"]
+        )
+
+        assert args.cities == ["Oslo", "Rome"]
+        assert (args.requests, args.concurrency, args.rate) == (50, 4, 25.5)
+        assert (args.stub, args.stub_latency_ms, args.cache) == (True, 20.0, True)
+        assert (args.json, args.debug) == ("-", True)
+
+    def test_parse_bench_arguments_transport(self):
+        """Test choosing the HTTP backend of a bench run."""
+        assert parse_bench_arguments([]).transport is None
+        assert parse_bench_arguments(["--transport", "stdlib"]).transport == "stdlib"
+        with pytest.raises(SystemExit):
+            parse_bench_arguments(["--transport", "curl"])
+
+    @pytest.mark.parametrize(
+        "argv",
+        [
+            ["-n", "0"],
+            ["-c", "-1"],
+            ["--rate", "0"],
+            ["--stub", "--base-url", "http://localhost:8080"],
+        ],
+    )
+    def test_parse_bench_arguments_errors(self, argv):
+        """Test that counts must be positive and only one target is given."""
+        with pytest.raises(SystemExit):
+            parse_bench_arguments(argv)
+
+    @patch("weather_cli.main.setup_logging")
+    def test_run_bench_cli_against_stub(self, mock_setup_logging, tmp_path):
+        """Test a cached run against a local stub, with the report and a JSON file."""
+        path = tmp_path / "bench.json"
+
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            exit_code = run_bench_cli(
+                ["Oslo", "Rome"],
+                requests=20,
+                concurrency=1,
+                stub=True,
+                cache=True,
+                json_path=str(path),
+            )
+
+        assert exit_code == 0
+        assert "Requests:    20 (20 ok, 0 failed)" in mock_stdout.getvalue()
+        document = json.loads(path.read_text(encoding="utf-8"))
+        assert document["format"] == "weather-cli-bench"
+        assert document["cache"]["hits"] == 18
+        assert document["upstream_requests"] == 2
+
+    @patch("weather_cli.bench.run_benchmark")
+    @patch("weather_cli.main.create_weather_service")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_bench_cli_json_to_stdout(
+        self, mock_setup_logging, mock_create_service, mock_run_benchmark
+    ):
+        """Test that failures exit with 1 and "-" prints only the JSON document."""
+        mock_run_benchmark.return_value = BenchResult(
+            requests=4, succeeded=3, duration_seconds=1.0, concurrency=2, errors={"boom": 1}
+        )
+
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            exit_code = run_bench_cli(["Oslo"], base_url="http://replica", json_path="-")
+
+        assert exit_code == 1
+        assert json.loads(mock_stdout.getvalue())["errors"] == {"boom": 1}
+        mock_create_service.assert_called_once_with(
+            None,
+            base_url="http://replica",
+            api_key="bench",
+            http_transport="requests",
+            isolated=True,
+        )
+
+    @patch("weather_cli.main.setup_logging")
+    def test_run_bench_cli_leaves_shared_state_alone(self, mock_setup_logging, tmp_path):
+        """Test that a bench run neither reads nor writes the configured persistent state."""
+        environment = {
+            "WEATHER_CACHE_BACKEND": "disk",
+            "WEATHER_CACHE_DIR": str(tmp_path / "cache"),
+            "WEATHER_HISTORY_DIR": str(tmp_path / "history"),
+            "WEATHER_NEGATIVE_CACHE_FILE": str(tmp_path / "negative.json"),
+            "WEATHER_CASSETTE": "",
+            "OPENWEATHERMAP_FALLBACK_API_URLS": "",
+        }
+        path = tmp_path / "bench.json"
+
+        with patch.dict("os.environ", environment):
+            with patch("sys.stdout", new_callable=StringIO):
+                exit_code = run_bench_cli(
+                    ["Oslo", "Rome"], requests=10, concurrency=1, stub=True, json_path=str(path)
+                )
+
+        assert exit_code == 0
+        document = json.loads(path.read_text(encoding="utf-8"))
+        assert document["cache"]["hits"] is None
+        assert document["upstream_requests"] == 10
+        assert list(tmp_path.iterdir()) == [path]
+
+    @patch("weather_cli.main.setup_logging")
+    def test_run_bench_cli_sends_no_real_keys(self, mock_setup_logging, tmp_path):
+        """Test that a bench run against the stub neither sends real keys nor records them."""
+        environment = {
+            "OPENWEATHERMAP_API_KEY": "real-key",
+            "OPENWEATHERMAP_API_KEYS": "pooled-1,pooled-2",
+            "WEATHER_CASSETTE": str(tmp_path / "cassette.jsonl"),
+            "WEATHER_CASSETTE_MODE": "record",
+            "WEATHER_CACHE_BACKEND": "memory",
+            "WEATHER_HISTORY_DIR": "",
+            "OPENWEATHERMAP_FALLBACK_API_URLS": "",
+        }
+
+        with patch.dict("os.environ", environment):
+            with patch("urllib.parse.parse_qsl", wraps=urllib.parse.parse_qsl) as mock_parse:
+                with patch("sys.stdout", new_callable=StringIO):
+                    exit_code = run_bench_cli(["Oslo"], requests=4, concurrency=1, stub=True)
+
+        queries = [dict(urllib.parse.parse_qsl(c.args[0])) for c in mock_parse.call_args_list]
+        assert exit_code == 0
+        assert {query["appid"] for query in queries if "appid" in query} == {"bench"}
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestCreateWeatherService:
+    """Test cases for building the configured weather service."""
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.ConfigUtil.get_negative_cache_ttl", return_value=0)
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_without_optional_features(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_keys,
+        mock_cassette,
+        mock_negative_ttl,
+        mock_service_class,
+    ):
+        """Test the default service when no optional feature is configured."""
+        create_weather_service()
+
+        mock_service_class.assert_called_once_with(
+            client=None,
+            recorder=None,
+            negative_cache=None,
+            forecast_fallback=None,
+            default_country=None,
+            max_concurrency=None,
+        )
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.ConfigUtil.get_negative_cache_path")
+    @patch("weather_cli.main.ConfigUtil.get_negative_cache_ttl", return_value=120.0)
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_with_persisted_negative_cache(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_keys,
+        mock_cassette,
+        mock_negative_ttl,
+        mock_negative_path,
+        mock_service_class,
+        tmp_path,
+    ):
+        """Test that the negative cache is created with the configured TTL and file."""
+        mock_negative_path.return_value = str(tmp_path / "not-found.json")
+
+        create_weather_service()
+
+        negative_cache = mock_service_class.call_args[1]["negative_cache"]
+        assert isinstance(negative_cache, NegativeCache)
+        assert negative_cache.ttl_seconds == 120.0
+        assert negative_cache.path == tmp_path / "not-found.json"
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.ConfigUtil.get_forecast_fallback_max_age", return_value=5400.0)
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_with_forecast_fallback(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_keys,
+        mock_cassette,
+        mock_max_age,
+        mock_service_class,
+    ):
+        """Test that the forecast fallback is created with the configured maximum age."""
+        create_weather_service()
+
+        forecast_fallback = mock_service_class.call_args[1]["forecast_fallback"]
+        assert isinstance(forecast_fallback, ForecastFallback)
+        assert forecast_fallback.max_age_seconds == 5400.0
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.ConfigUtil.get_cache_dir")
+    @patch("weather_cli.main.ConfigUtil.get_cache_backend", return_value="disk")
+    @patch("weather_cli.main.ConfigUtil.get_forecast_fallback_max_age", return_value=5400.0)
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_forecast_fallback_uses_shared_backend(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_keys,
+        mock_cassette,
+        mock_max_age,
+        mock_backend,
+        mock_cache_dir,
+        mock_service_class,
+        tmp_path,
+    ):
+        """Test that forecasts are kept in their own part of the shared cache backend."""
+        mock_cache_dir.return_value = str(tmp_path)
+
+        create_weather_service()
+
+        forecast_fallback = mock_service_class.call_args[1]["forecast_fallback"]
+        assert isinstance(forecast_fallback.backend, DiskBackend)
+        assert forecast_fallback.backend.directory == tmp_path / "forecasts"
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.ConfigUtil.get_cache_dir")
+    @patch("weather_cli.main.ConfigUtil.get_cache_backend", return_value="disk")
+    @patch("weather_cli.main.ConfigUtil.get_negative_cache_ttl", return_value=0)
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_with_shared_cache_backend(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_keys,
+        mock_cassette,
+        mock_negative_ttl,
+        mock_cache_backend,
+        mock_cache_dir,
+        mock_service_class,
+        tmp_path,
+    ):
+        """Test that a configured backend gives one-shot commands a shared cache."""
+        mock_cache_dir.return_value = str(tmp_path)
+
+        create_weather_service()
+
+        cache = mock_service_class.call_args[1]["cache"]
+        assert isinstance(cache.backend, DiskBackend)
+        assert cache.backend.directory == tmp_path
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.OpenWeatherMapClient")
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_hedge_percentile", return_value=95.0)
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls")
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_with_fallback_providers(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_hedge,
+        mock_keys,
+        mock_client_class,
+        mock_service_class,
+    ):
+        """Test that fallback URLs produce a failover client over replicas."""
+        mock_urls.return_value = ["https://replica.example.com"]
+
+        create_weather_service()
+
+        client = mock_service_class.call_args[1]["client"]
+        assert isinstance(client, FailoverClient)
+        assert len(client.providers) == 2
+        assert client.hedge_percentile == 95.0
+        mock_client_class.assert_any_call(
+            api_key=None, base_url="https://replica.example.com", key_pool=None, transport=None
+        )
+        client.close()
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.OpenWeatherMapClient")
+    @patch("weather_cli.main.ConfigUtil.get_max_concurrency", return_value=2)
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls")
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_with_adaptive_concurrency(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_keys,
+        mock_max_concurrency,
+        mock_client_class,
+        mock_service_class,
+    ):
+        """Test that every provider gets its own limiter under the configured ceiling."""
+        mock_urls.return_value = []
+        create_weather_service()
+
+        client = mock_service_class.call_args[1]["client"]
+        assert isinstance(client, AdaptiveConcurrencyClient)
+        assert client.client is mock_client_class.return_value
+        assert (client.limit, client.limiter.max_limit) == (2, 2)
+        assert mock_service_class.call_args[1]["max_concurrency"] == 2
+
+        mock_urls.return_value = ["https://replica.example.com"]
+        create_weather_service()
+
+        client = mock_service_class.call_args[1]["client"]
+        assert isinstance(client, FailoverClient)
+        assert all(isinstance(p, AdaptiveConcurrencyClient) for p in client.providers)
+        assert client.providers[0].limiter is not client.providers[1].limiter
+        client.close()
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.OpenWeatherMapClient")
+    @patch("weather_cli.main.ConfigUtil.get_scheduler_concurrency", return_value=3)
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_with_request_scheduler(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_keys,
+        mock_scheduler_concurrency,
+        mock_client_class,
+        mock_service_class,
+    ):
+        """Test that requests are scheduled by priority when a concurrency is configured."""
+        create_weather_service()
+
+        client = mock_service_class.call_args[1]["client"]
+        assert isinstance(client, SchedulingClient)
+        assert client.client is mock_client_class.return_value
+        assert client.scheduler.max_concurrency == 3
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.OpenWeatherMapClient")
+    @patch("weather_cli.main.ConfigUtil.get_api_key_quota", return_value=60)
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=["key-one", "key-two"])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_with_key_pool(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_keys,
+        mock_quota,
+        mock_client_class,
+        mock_service_class,
+    ):
+        """Test that a configured key pool is handed to the client."""
+        create_weather_service()
+
+        key_pool = mock_client_class.call_args[1]["key_pool"]
+        assert key_pool.keys == ["key-one", "key-two"]
+        assert key_pool.quota_per_minute == 60
+        assert mock_service_class.call_args[1]["client"] is mock_client_class.return_value
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.ConfigUtil.get_nearby_radius_km", return_value=2.5)
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_with_cache_indexes_locations(
+        self, mock_history_dir, mock_urls, mock_keys, mock_radius, mock_service_class
+    ):
+        """Test that a cached service also gets a spatial index for coordinate lookups."""
+        cache = WeatherCache()
+
+        create_weather_service(cache=cache)
+
+        kwargs = mock_service_class.call_args[1]
+        assert kwargs["cache"] is cache
+        assert isinstance(kwargs["spatial_index"], SpatialIndex)
+        assert kwargs["nearby_radius_km"] == 2.5
+
+    @patch("weather_cli.main.ConfigUtil.get_cassette_mode", return_value="record")
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path")
+    def test_record_transport(self, mock_cassette, mock_mode, tmp_path):
+        """Test that record mode wraps the network transport."""
+        mock_cassette.return_value = str(tmp_path / "traffic.jsonl")
+
+        transport = create_transport()
+
+        assert isinstance(transport, RecordingTransport)
+        transport.close()
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.ConfigUtil.get_replay_speed", return_value=0.0)
+    @patch("weather_cli.main.ConfigUtil.get_cassette_mode", return_value="replay")
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path")
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_replay_transport_needs_no_api_key(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_keys,
+        mock_cassette,
+        mock_mode,
+        mock_speed,
+        mock_service_class,
+        tmp_path,
+    ):
+        """Test that replay mode builds an offline client from the cassette."""
+        cassette = tmp_path / "traffic.jsonl"
+        RecordingTransport(cassette, transport=Mock()).close()
+        mock_cassette.return_value = str(cassette)
+
+        with patch.dict("os.environ", {}, clear=True):
+            create_weather_service()
+
+        client = mock_service_class.call_args[1]["client"]
+        assert isinstance(client.transport, ReplayTransport)
+        assert client.transport.speed == 0.0
+        assert client.api_key == ReplayTransport.PLACEHOLDER_API_KEY
+
+    @patch("weather_cli.main.ConfigUtil.get_keepalive_interval", return_value=20.0)
+    @patch("weather_cli.main.ConfigUtil.get_dns_cache_ttl", return_value=60.0)
+    @patch("weather_cli.main.ConfigUtil.get_prewarm", return_value=False)
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    def test_pooled_transport(self, mock_cassette, mock_prewarm, mock_ttl, mock_keepalive):
+        """Test that keep-alive selects the pooled transport with the configured settings."""
+        transport = create_transport()
+
+        assert isinstance(transport, PooledTransport)
+        assert transport.keepalive_interval == 20.0
+        assert transport.dns_cache.ttl_seconds == 60.0
+        transport.close()
+
+    @patch("weather_cli.main.ConfigUtil.get_keepalive_interval", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_prewarm", return_value=False)
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    def test_no_transport_by_default(self, mock_cassette, mock_prewarm, mock_keepalive):
+        """Test that the network is used as usual without connection settings."""
+        assert create_transport() is None
+
+    @patch("weather_cli.main.WeatherService")
+    @patch.object(PooledTransport, "prewarm")
+    @patch("weather_cli.main.ConfigUtil.get_keepalive_interval", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_prewarm", return_value=True)
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_api_keys", return_value=[])
+    @patch("weather_cli.main.ConfigUtil.get_fallback_api_urls", return_value=["http://replica"])
+    @patch("weather_cli.main.ConfigUtil.get_history_dir", return_value=None)
+    def test_prewarm(
+        self,
+        mock_history_dir,
+        mock_urls,
+        mock_keys,
+        mock_cassette,
+        mock_prewarm,
+        mock_keepalive,
+        mock_prewarm_method,
+        mock_service_class,
+    ):
+        """Test that connections to the primary and fallback APIs are warmed up."""
+        create_weather_service(base_url="http://primary", api_key="k")
+
+        assert [c.args[0] for c in mock_prewarm_method.call_args_list] == [
+            "http://primary",
+            "http://replica",
+        ]
+
+    @patch("weather_cli.main.ConfigUtil.get_http_transport", return_value="stdlib")
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    def test_stdlib_transport(self, mock_cassette, mock_backend):
+        """Test that the stdlib backend is selected by configuration."""
+        assert isinstance(create_transport(), HttpClientTransport)
+
+    @patch("weather_cli.main.ConfigUtil.get_prewarm", return_value=True)
+    @patch("weather_cli.main.ConfigUtil.get_http_transport", return_value="stdlib")
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    def test_warm_connection_settings_ignored_by_other_backends(
+        self, mock_cassette, mock_backend, mock_prewarm, caplog
+    ):
+        """Test that warm connection settings the stdlib backend cannot honour are reported."""
+        with caplog.at_level(logging.WARNING, logger="weather_cli.main"):
+            assert isinstance(create_transport(), HttpClientTransport)
+
+        assert "ignoring them for stdlib" in caplog.text
+
+    @patch("weather_cli.main.ConfigUtil.get_http_transport", return_value="stdlib")
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    def test_transport_argument_overrides_configuration(self, mock_cassette, mock_backend):
+        """Test that an explicit backend wins over the configured one."""
+        with patch("weather_cli.main.ConfigUtil.get_keepalive_interval", return_value=None):
+            with patch("weather_cli.main.ConfigUtil.get_prewarm", return_value=False):
+                assert create_transport("requests") is None
+
+    @patch("weather_cli.http_transports.Http2Transport", side_effect=ImportError("install httpx"))
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path", return_value=None)
+    def test_missing_http2_backend_is_config_error(self, mock_cassette, mock_http2):
+        """Test that selecting http2 without httpx is reported as a configuration error."""
+        with pytest.raises(ConfigException, match="install httpx"):
+            create_transport("http2")
+
+    @patch("weather_cli.main.ConfigUtil.get_cassette_mode", return_value="replay")
+    @patch("weather_cli.main.ConfigUtil.get_cassette_path")
+    def test_missing_cassette_is_config_error(self, mock_cassette, mock_mode, tmp_path):
+        """Test that an unreadable cassette is reported as a configuration error."""
+        mock_cassette.return_value = str(tmp_path / "missing.jsonl")
+
+        with pytest.raises(ConfigException, match="Cannot replay cassette"):
+            create_transport()
+
+    @patch("weather_cli.main.WeatherService")
+    @patch("weather_cli.main.ConfigUtil.get_history_dir")
+    def test_with_history(self, mock_history_dir, mock_service_class, tmp_path):
+        """Test that a recorder is attached when a history directory is configured."""
+        mock_history_dir.return_value = str(tmp_path)
+
+        create_weather_service()
+
+        recorder = mock_service_class.call_args[1]["recorder"]
+        assert recorder.directory == tmp_path
+
+
+class TestWatchCommand:
+    """Test cases for watch mode."""
+
+    def test_parse_watch_arguments(self):
+        """Test parsing watch mode arguments."""
+        args = parse_watch_arguments(["--watch", "London", "Paris", "--interval", "30"])
+
+        assert args.cities == ["London", "Paris"]
+        assert args.interval == 30.0
+        assert args.max_interval == 900.0
+        assert args.units == "metric"
+        assert args.load_snapshot is None
+        assert args.save_snapshot is None
+
+    def test_parse_watch_snapshot_arguments(self):
+        """Test parsing the snapshot files of watch mode."""
+        args = parse_watch_arguments(
+            ["--watch", "London", "--load-snapshot", "in.gz", "--save-snapshot", "out.gz"]
+        )
+
+        assert args.load_snapshot == "in.gz"
+        assert args.save_snapshot == "out.gz"
+
+    def test_parse_watch_arguments_rejects_bad_intervals(self):
+        """Test that inconsistent intervals are rejected."""
+        with pytest.raises(SystemExit):
+            parse_watch_arguments(["--watch", "London", "--interval", "0"])
+        with pytest.raises(SystemExit):
+            parse_watch_arguments(["--watch", "London", "--interval", "60", "--max-interval", "30"])
+
+    @patch("weather_cli.watch.WeatherWatcher")
+    @patch("weather_cli.main.create_weather_service")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_watch_cli_until_interrupted(
+        self, mock_setup_logging, mock_create_service, mock_watcher_class
+    ):
+        """Test that watch mode uses one cached service and exits cleanly on Ctrl+C."""
+        mock_watcher_class.return_value.run.side_effect = KeyboardInterrupt
+
+        exit_code = run_watch_cli(["London"], interval=30.0, units=Units.IMPERIAL)
+
+        assert exit_code == 0
+        cache = mock_create_service.call_args[1]["cache"]
+        assert cache.ttl_seconds == 15.0
+        mock_watcher_class.assert_called_once_with(
+            mock_create_service.return_value,
+            ["London"],
+            interval=30.0,
+            max_interval=900.0,
+            units=Units.IMPERIAL,
+        )
+
+    @patch("weather_cli.watch.WeatherWatcher")
+    @patch("weather_cli.main.create_weather_service")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_watch_cli_with_snapshots(
+        self, mock_setup_logging, mock_create_service, mock_watcher_class
+    ):
+        """Test that watch mode warms from one snapshot and saves another on exit."""
+        mock_watcher_class.return_value.run.side_effect = KeyboardInterrupt
+        service = mock_create_service.return_value
+
+        exit_code = run_watch_cli(["London"], load_snapshot="in.gz", save_snapshot="out.gz")
+
+        assert exit_code == 0
+        service.import_snapshot.assert_called_once_with("in.gz")
+        service.export_snapshot.assert_called_once_with("out.gz")
+
+    @patch("weather_cli.watch.WeatherWatcher")
+    @patch("weather_cli.main.create_weather_service")
+    @patch("weather_cli.main.setup_logging")
+    def test_run_watch_cli_snapshot_failures(
+        self, mock_setup_logging, mock_create_service, mock_watcher_class, capsys
+    ):
+        """Test that an unreadable snapshot starts cold and a failed save is reported."""
+        mock_watcher_class.return_value.run.side_effect = KeyboardInterrupt
+        service = mock_create_service.return_value
+        service.import_snapshot.side_effect = FileNotFoundError("in.gz")
+        service.export_snapshot.side_effect = PermissionError("out.gz")
+
+        exit_code = run_watch_cli(["London"], load_snapshot="in.gz", save_snapshot="out.gz")
+
+        assert exit_code == 0
+        mock_watcher_class.return_value.run.assert_called_once()
+        assert "Cannot save cache snapshot" in capsys.readouterr().err
+
+    @patch("weather_cli.main.run_watch_cli", return_value=0)
+    @patch("sys.exit")
+    def test_main_dispatches_watch(self, mock_exit, mock_run_watch):
+        """Test that --watch runs watch mode."""
+        with patch.object(sys, "argv", ["weather-cli", "London", "--watch", "Oslo"]):
+            main()
+
+        mock_run_watch.assert_called_once_with(
+            ["London", "Oslo"],
+            interval=60.0,
+            max_interval=900.0,
+            debug=False,
+            units=Units.METRIC,
+            load_snapshot=None,
+            save_snapshot=None,
+        )
+        mock_exit.assert_called_once_with(0)
+
+
+class TestSnapshotCommand:
+    """Test cases for saving and loading the shared cache."""
+
+    def test_parse_snapshot_arguments(self):
+        """Test parsing the snapshot command."""
+        args = parse_snapshot_arguments(["save", "cache.json.gz"])
+
+        assert (args.action, args.file, args.debug) == ("save", "cache.json.gz", False)
+        with pytest.raises(SystemExit):
+            parse_snapshot_arguments(["dump", "cache.json.gz"])
+
+    @patch("weather_cli.main.create_cache_backend")
+    @patch("weather_cli.main.setup_logging")
+    def test_save_and_load(self, mock_setup_logging, mock_create_backend, tmp_path, capsys):
+        """Test that a saved shared cache can be loaded into another one."""
+        path = str(tmp_path / "cache.json.gz")
+        source = DiskBackend(str(tmp_path / "source"))
+        WeatherCache(backend=source).put(
+            "london", WeatherData(city="London", temperature_celsius=15.5, description="Cloudy")
+        )
+        target = DiskBackend(str(tmp_path / "target"))
+        mock_create_backend.side_effect = [source, target]
+
+        assert run_snapshot_cli("save", path) == 0
+        assert run_snapshot_cli("load", path) == 0
+
+        assert WeatherCache(backend=target).get("london").city == "London"
+        out = capsys.readouterr().out
+        assert "Saved 1 cache entries" in out
+        assert "Loaded 1 cache entries" in out
+
+    @patch("weather_cli.main.create_cache_backend", return_value=None)
+    @patch("weather_cli.main.setup_logging")
+    def test_requires_shared_backend(self, mock_setup_logging, mock_create_backend, capsys):
+        """Test that the in-process cache cannot be saved or loaded."""
+        assert run_snapshot_cli("save", "cache.json.gz") == 1
+        assert "WEATHER_CACHE_BACKEND" in capsys.readouterr().err
+
+    @patch("weather_cli.main.create_cache_backend")
+    @patch("weather_cli.main.setup_logging")
+    def test_missing_file(self, mock_setup_logging, mock_create_backend, tmp_path, capsys):
+        """Test that an unreadable snapshot is reported."""
+        mock_create_backend.return_value = DiskBackend(str(tmp_path / "cache"))
+
+        assert run_snapshot_cli("load", str(tmp_path / "missing.json.gz")) == 1
+        assert "Snapshot Error" in capsys.readouterr().err
+
+    @patch("weather_cli.main.run_snapshot_cli", return_value=0)
+    @patch("sys.exit")
+    def test_main_dispatches_snapshot(self, mock_exit, mock_run_snapshot):
+        """Test that the snapshot command is dispatched."""
+        with patch.object(sys, "argv", ["weather-cli", "snapshot", "load", "cache.json.gz"]):
+            main()
+
+        mock_run_snapshot.assert_called_once_with("load", "cache.json.gz", debug=False)
+        mock_exit.assert_called_once_with(0)
+
+
+class TestForecastCommand:
+    """Test cases for the forecast command."""
+
+    def test_parse_forecast_arguments(self):
+        """Test parsing the forecast command."""
+        args = parse_forecast_arguments(["Oslo", "--units", "imperial"])
+
+        assert (args.city, args.units, args.debug) == ("Oslo", "imperial", False)
+        with pytest.raises(SystemExit):
+            parse_forecast_arguments([])
+
+    @patch("weather_cli.main.create_weather_service")
+    @patch("weather_cli.main.setup_logging")
+    def test_prints_forecast(self, mock_setup_logging, mock_create_service, capsys):
+        """Test that the forecast is fetched through the service and printed."""
+        forecast = ForecastSeries.from_dict(
+            {
+                "city": "Oslo",
+                "timestamps": [1726617600, 1726628400],
+                "temperatures": [1.0, 3.0],
+                "humidity": [80, 82],
+                "wind_speeds": [3.0, 4.0],
+            }
+        )
+        mock_create_service.return_value.get_forecast.return_value = forecast
+
+        assert run_forecast_cli("Oslo") == 0
+
+        mock_create_service.return_value.get_forecast.assert_called_once_with("Oslo")
+        assert capsys.readouterr().out == (
+            "Forecast for Oslo:\n2024-09-18: 1.0°C to 3.0°C, mean 2.0°C\n"
+        )
+
+    @patch("weather_cli.main.create_weather_service")
+    @patch("weather_cli.main.setup_logging")
+    def test_api_error(self, mock_setup_logging, mock_create_service, capsys):
+        """Test that API errors are reported."""
+        mock_create_service.return_value.get_forecast.side_effect = WeatherApiException(
+            "City not found.", 404
+        )
+
+        assert run_forecast_cli("Atlantis") == 1
+        assert "Weather Error: City not found." in capsys.readouterr().err
+
+    @patch("weather_cli.main.run_forecast_cli", return_value=0)
+    @patch("sys.exit")
+    def test_main_dispatches_forecast(self, mock_exit, mock_run_forecast):
+        """Test that the forecast command is dispatched."""
+        with patch.object(sys, "argv", ["weather-cli", "forecast", "Oslo"]):
+            main()
+
+        mock_run_forecast.assert_called_once_with("Oslo", debug=False, units=Units.METRIC)
+        mock_exit.assert_called_once_with(0)
+
+
+class TestCreateCacheBackend:
+    """Test cases for building the configured cache backend."""
+
+    @patch("weather_cli.main.ConfigUtil.get_cache_backend", return_value="memory")
+    def test_memory_needs_no_backend(self, mock_backend):
+        """Test that the default keeps entries in the process."""
+        assert create_cache_backend() is None
+
+    @patch("weather_cli.main.ConfigUtil.get_cache_serializer", return_value="zlib")
+    @patch("weather_cli.main.ConfigUtil.get_cache_url", return_value="redis://cache:6379/2")
+    @patch("weather_cli.main.ConfigUtil.get_cache_backend", return_value="redis")
+    def test_redis(self, mock_backend, mock_url, mock_serializer):
+        """Test that the redis backend connects to the configured URL."""
+        backend = create_cache_backend()
+
+        assert isinstance(backend, RedisBackend)
+        assert (backend.client.host, backend.client.db) == ("cache", 2)
+
+    @patch("weather_cli.main.ConfigUtil.get_cache_url", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_cache_backend", return_value="redis")
+    def test_missing_location(self, mock_backend, mock_url):
+        """Test that a backend without a location is a configuration error."""
+        with pytest.raises(ConfigException, match="redis cache backend"):
+            create_cache_backend()
+
+
+class TestSetupTracing:
+    """Test cases for installing the configured tracer."""
+
+    def teardown_method(self, method):
+        """Turn tracing off again."""
+        tracer = set_tracer(None)
+        if tracer is not None:
+            tracer.close()
+
+    @patch("weather_cli.main.ConfigUtil.get_trace_otlp_url", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_trace_file", return_value=None)
+    def test_off_by_default(self, mock_file, mock_url):
+        """Test that nothing is installed without a trace file or collector."""
+        assert setup_tracing() is None
+        assert get_tracer() is None
+
+    @patch("weather_cli.main.atexit.register")
+    @patch("weather_cli.main.ConfigUtil.get_trace_otlp_url", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_trace_file")
+    def test_trace_file(self, mock_file, mock_url, mock_register, tmp_path):
+        """Test that a trace file installs a JSON Lines exporter once, closed at exit."""
+        mock_file.return_value = str(tmp_path / "traces.jsonl")
+
+        tracer = setup_tracing()
+
+        assert isinstance(tracer.exporter, JsonlExporter)
+        assert get_tracer() is tracer
+        assert setup_tracing() is tracer
+        mock_register.assert_called_once_with(tracer.close)
+
+    @patch("weather_cli.main.atexit.register")
+    @patch("weather_cli.tracing.OtlpHttpExporter")
+    @patch("weather_cli.main.ConfigUtil.get_trace_otlp_url", return_value="http://c:4318/v1/traces")
+    @patch("weather_cli.main.ConfigUtil.get_trace_file")
+    def test_file_and_collector(
+        self, mock_file, mock_url, mock_otlp_class, mock_register, tmp_path
+    ):
+        """Test that spans go to both the file and the collector when both are set."""
+        mock_file.return_value = str(tmp_path / "traces.jsonl")
+
+        tracer = setup_tracing()
+
+        assert isinstance(tracer.exporter, CompositeExporter)
+        mock_otlp_class.assert_called_once_with("http://c:4318/v1/traces")
+
+    @patch("weather_cli.main.ConfigUtil.get_trace_otlp_url", return_value=None)
+    @patch("weather_cli.main.ConfigUtil.get_trace_file")
+    def test_unwritable_trace_file(self, mock_file, mock_url, tmp_path):
+        """Test that a trace file that cannot be opened is a configuration error."""
+        (tmp_path / "file").write_text("", encoding="utf-8")
+        mock_file.return_value = str(tmp_path / "file" / "traces.jsonl")
+
+        with pytest.raises(ConfigException, match="Cannot open trace file"):
+            setup_tracing()
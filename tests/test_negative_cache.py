@@ -0,0 +1,154 @@
+"""Tests for the negative cache of failed lookups."""
+
+import json
+
+import pytest
+from weather_cli.negative_cache import NegativeCache
+from weather_cli.exceptions import InvalidCityNameException, WeatherApiException
+
+NOT_FOUND = WeatherApiException("City not found. Please check the city name and try again.", 404)
+
+
+class FakeClock:
+    """Settable clock for expiry tests."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestNegativeCache:
+    """Test cases for the NegativeCache class."""
+
+    def setup_method(self):
+        """Set up a cache with a fake clock."""
+        self.clock = FakeClock()
+        self.cache = NegativeCache(ttl_seconds=60, max_entries=2, clock=self.clock)
+
+    def test_invalid_settings(self):
+        """Test that the TTL and size must be positive."""
+        with pytest.raises(ValueError):
+            NegativeCache(ttl_seconds=0)
+        with pytest.raises(ValueError):
+            NegativeCache(max_entries=0)
+
+    def test_remembers_not_found(self):
+        """Test that a 404 is answered locally with an equal error."""
+        assert self.cache.put("atlantis", NOT_FOUND)
+
+        error = self.cache.get("atlantis")
+
+        assert isinstance(error, WeatherApiException)
+        assert error is not NOT_FOUND
+        assert str(error) == str(NOT_FOUND)
+        assert error.status_code == 404
+        assert self.cache.stats.hits == 1
+        assert self.cache.stats.requests_saved == 1
+
+    def test_remembers_invalid_names_without_counting_saved_requests(self):
+        """Test that invalid names keep their type but saved no upstream request."""
+        self.cache.put("123", InvalidCityNameException("City name contains invalid characters."))
+
+        error = self.cache.get("123")
+
+        assert isinstance(error, InvalidCityNameException)
+        assert self.cache.stats.requests_saved == 0
+
+    @pytest.mark.parametrize("status_code", [None, 401, 429, 500, 503])
+    def test_transient_errors_are_not_cached(self, status_code):
+        """Test that errors that may go away on a retry are not remembered."""
+        assert not self.cache.put("london", WeatherApiException("Oops", status_code))
+        assert self.cache.get("london") is None
+        assert self.cache.stats.misses == 1
+
+    def test_entries_expire(self):
+        """Test that entries are forgotten after the TTL."""
+        self.cache.put("atlantis", NOT_FOUND)
+        self.clock.now += 60
+
+        assert self.cache.get("atlantis") is None
+        assert len(self.cache) == 0
+
+    def test_bounded_with_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        self.cache.put("a", NOT_FOUND)
+        self.cache.put("b", NOT_FOUND)
+        self.cache.get("a")
+        self.cache.put("c", NOT_FOUND)
+
+        assert self.cache.get("b") is None
+        assert self.cache.get("a") is not None
+        assert self.cache.get("c") is not None
+
+    def test_invalidate(self):
+        """Test that an entry can be forgotten explicitly."""
+        self.cache.put("atlantis", NOT_FOUND)
+        self.cache.invalidate("atlantis")
+
+        assert self.cache.get("atlantis") is None
+
+
+class TestNegativeCachePersistence:
+    """Test cases for persisting the negative cache."""
+
+    def test_entries_survive_restart(self, tmp_path):
+        """Test that unexpired entries are loaded by a new cache on the same file."""
+        path = tmp_path / "negative.json"
+        clock = FakeClock()
+        NegativeCache(ttl_seconds=60, path=path, clock=clock).put("atlantis", NOT_FOUND)
+
+        clock.now += 30
+        restored = NegativeCache(ttl_seconds=60, path=path, clock=clock)
+
+        assert restored.get("atlantis").status_code == 404
+
+        clock.now += 30
+        assert NegativeCache(ttl_seconds=60, path=path, clock=clock).get("atlantis") is None
+
+    def test_file_is_versioned_json(self, tmp_path):
+        """Test the persisted file layout."""
+        path = tmp_path / "nested" / "negative.json"
+        NegativeCache(path=path).put("atlantis", NOT_FOUND)
+
+        document = json.loads(path.read_text())
+
+        assert document["format"] == "weather-cli-negative-cache"
+        assert document["version"] == 1
+        assert document["entries"]["atlantis"]["status_code"] == 404
+        assert list(tmp_path.joinpath("nested").iterdir()) == [path]
+
+    def test_writes_are_batched(self, tmp_path):
+        """Test that stores within the save interval are written together by flush."""
+        path = tmp_path / "negative.json"
+        clock = FakeClock()
+        cache = NegativeCache(ttl_seconds=60, path=path, clock=clock, save_interval_seconds=10)
+
+        cache.put("atlantis", NOT_FOUND)
+        cache.put("lemuria", NOT_FOUND)
+        cache.put("mu", NOT_FOUND)
+        assert list(json.loads(path.read_text())["entries"]) == ["atlantis"]
+
+        clock.now += 10
+        cache.put("hy-brasil", NOT_FOUND)
+        assert len(json.loads(path.read_text())["entries"]) == 4
+
+        cache.put("thule", NOT_FOUND)
+        cache.flush()
+        assert len(json.loads(path.read_text())["entries"]) == 5
+
+    def test_invalid_save_interval(self):
+        """Test that a negative save interval is rejected."""
+        with pytest.raises(ValueError):
+            NegativeCache(save_interval_seconds=-1)
+
+    @pytest.mark.parametrize(
+        "content", ["not json", '{"format": "other", "version": 1}', '{"format": "x"}', "[]"]
+    )
+    def test_unreadable_file_starts_empty(self, tmp_path, content):
+        """Test that a corrupt or foreign file is ignored."""
+        path = tmp_path / "negative.json"
+        path.write_text(content)
+
+        assert len(NegativeCache(path=path)) == 0
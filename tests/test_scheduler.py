@@ -0,0 +1,222 @@
+"""Tests for the priority-aware request scheduler."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from unittest.mock import Mock
+from weather_cli.comparison import compare_cities
+from weather_cli.scheduler import (
+    Priority,
+    RequestClass,
+    RequestScheduler,
+    SchedulingClient,
+    current_request_class,
+    request_priority,
+)
+from weather_cli.weather_client import WeatherApiClient
+from weather_cli.weather_data import WeatherData
+from weather_cli.weather_service import WeatherService
+from weather_cli.exceptions import WeatherApiException
+
+
+class SlowClient(WeatherApiClient):
+    """Client that takes a fixed time per request."""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+
+    def get_weather_from_api(self, city: str) -> WeatherData:
+        time.sleep(self.delay)
+        return WeatherData(city=city, temperature_celsius=10.0, description="Clear")
+
+
+def wait_until(condition, timeout=2.0):
+    """Wait for a condition to become true."""
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "condition not reached"
+        time.sleep(0.001)
+
+
+class TestRequestPriority:
+    """Test cases for the request priority context."""
+
+    def test_default_is_interactive(self):
+        """Test that requests are interactive without a deadline by default."""
+        assert current_request_class() == RequestClass(Priority.INTERACTIVE, None)
+
+    def test_nesting_keeps_the_sooner_deadline(self):
+        """Test that inner scopes change the priority but cannot extend the deadline."""
+        with request_priority(Priority.BULK, timeout=10):
+            outer = current_request_class()
+            with request_priority(Priority.INTERACTIVE, timeout=60):
+                inner = current_request_class()
+                assert inner.priority is Priority.INTERACTIVE
+                assert inner.deadline == outer.deadline
+            with request_priority(Priority.BULK, timeout=1):
+                assert current_request_class().deadline < outer.deadline
+            assert current_request_class() == outer
+
+        assert current_request_class().priority is Priority.INTERACTIVE
+
+
+class TestRequestScheduler:
+    """Test cases for the request scheduler."""
+
+    def start_waiting(self, scheduler, priority, order, deadline=None):
+        """Start a thread that waits for a slot, records its turn and frees it."""
+        queued = scheduler.queued()
+
+        def run():
+            try:
+                scheduler.acquire(RequestClass(priority, deadline))
+            except WeatherApiException:
+                return
+            order.append(priority)
+            scheduler.release()
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        wait_until(lambda: scheduler.queued() == queued + 1)
+        return thread
+
+    def test_dispatches_immediately_below_capacity(self):
+        """Test that requests under the limit never queue."""
+        scheduler = RequestScheduler(max_concurrency=2)
+
+        scheduler.acquire()
+        scheduler.acquire(RequestClass(Priority.BULK))
+
+        assert scheduler.in_flight == 2
+        assert scheduler.queued() == 0
+        assert scheduler.stats.dispatched == {Priority.INTERACTIVE: 1, Priority.BULK: 1}
+
+    def test_weighted_fair_order(self):
+        """Test that waiting classes share freed slots in proportion to their weights."""
+        scheduler = RequestScheduler(
+            max_concurrency=1, weights={Priority.INTERACTIVE: 2.0, Priority.BULK: 1.0}
+        )
+        scheduler.acquire()
+        order = []
+        threads = [self.start_waiting(scheduler, Priority.BULK, order) for _ in range(4)]
+        threads += [self.start_waiting(scheduler, Priority.INTERACTIVE, order) for _ in range(4)]
+
+        scheduler.release()
+        for thread in threads:
+            thread.join()
+
+        interactive, bulk = Priority.INTERACTIVE, Priority.BULK
+        assert order == [interactive, bulk, interactive, interactive, bulk, interactive, bulk, bulk]
+
+    def test_interactive_overtakes_queued_bulk(self):
+        """Test that with the default weights interactive requests jump the bulk queue."""
+        scheduler = RequestScheduler(max_concurrency=1)
+        scheduler.acquire(RequestClass(Priority.BULK))
+        order = []
+        threads = [self.start_waiting(scheduler, Priority.BULK, order) for _ in range(5)]
+        threads.append(self.start_waiting(scheduler, Priority.INTERACTIVE, order))
+
+        scheduler.release()
+        for thread in threads:
+            thread.join()
+
+        assert order[0] is Priority.INTERACTIVE
+        assert scheduler.stats.queued == {Priority.INTERACTIVE: 1, Priority.BULK: 5}
+
+    def test_expired_requests_are_dropped(self):
+        """Test that a request whose deadline passes in the queue fails without a slot."""
+        scheduler = RequestScheduler(max_concurrency=1)
+        scheduler.acquire()
+
+        with pytest.raises(WeatherApiException, match="deadline"):
+            scheduler.acquire(RequestClass(Priority.BULK, time.monotonic() + 0.02))
+
+        assert scheduler.stats.expired[Priority.BULK] == 1
+        assert scheduler.queued() == 0
+        assert scheduler.in_flight == 1
+
+    def test_expired_heads_are_skipped_at_dispatch(self):
+        """Test that a freed slot skips requests that expired while waiting."""
+        clock = Mock(return_value=0.0)
+        scheduler = RequestScheduler(max_concurrency=1, clock=clock)
+        scheduler.acquire()
+        order = []
+        expired = self.start_waiting(scheduler, Priority.INTERACTIVE, order, deadline=5.0)
+        waiting = self.start_waiting(scheduler, Priority.BULK, order)
+
+        clock.return_value = 10.0
+        scheduler.release()
+        waiting.join()
+        scheduler.release()
+        expired.join(timeout=0.1)
+
+        assert order == [Priority.BULK]
+        assert scheduler.stats.expired[Priority.INTERACTIVE] == 1
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"max_concurrency": 0},
+            {"weights": {Priority.INTERACTIVE: 1.0}},
+            {"weights": {Priority.INTERACTIVE: 1.0, Priority.BULK: 0.0}},
+        ],
+    )
+    def test_invalid_configuration(self, kwargs):
+        """Test that invalid limits and weights are rejected."""
+        with pytest.raises(ValueError):
+            RequestScheduler(**kwargs)
+
+
+class TestSchedulingClient:
+    """Test cases for the scheduling client."""
+
+    def test_uses_the_context_priority(self):
+        """Test that requests are scheduled with the priority of their context."""
+        inner = Mock(spec=WeatherApiClient)
+        client = SchedulingClient(inner)
+
+        client.get_weather_from_api("London")
+        with request_priority(Priority.BULK):
+            client.fetch_weather("Oslo")
+            client.get_forecast_from_api("Oslo")
+            client.get_weather_by_coordinates(59.9, 10.7)
+
+        assert client.scheduler.stats.dispatched == {Priority.INTERACTIVE: 1, Priority.BULK: 3}
+        assert client.scheduler.in_flight == 0
+        inner.get_weather_by_coordinates.assert_called_once_with(59.9, 10.7)
+
+    def test_comparison_keeps_the_caller_priority(self):
+        """Test that lookups made on comparison worker threads keep the priority."""
+        client = SchedulingClient(SlowClient(delay=0))
+        service = WeatherService(client=client)
+
+        with request_priority(Priority.BULK):
+            result = compare_cities(service, ["Oslo", "Madrid", "Cairo"])
+
+        assert len(result.results) == 3
+        assert client.scheduler.stats.dispatched[Priority.BULK] == 3
+
+    def test_interactive_latency_stays_low_during_bulk_load(self):
+        """Test that an interactive lookup does not wait behind a queued batch."""
+        client = SchedulingClient(SlowClient(delay=0.02), RequestScheduler(max_concurrency=2))
+
+        def bulk(index):
+            with request_priority(Priority.BULK):
+                client.get_weather_from_api(f"City{index}")
+
+        with ThreadPoolExecutor(max_workers=40) as executor:
+            futures = [executor.submit(bulk, index) for index in range(40)]
+            wait_until(lambda: client.scheduler.queued(Priority.BULK) >= 30)
+
+            start = time.monotonic()
+            client.get_weather_from_api("London")
+            interactive_latency = time.monotonic() - start
+
+            assert client.scheduler.queued(Priority.BULK) > 0
+            for future in futures:
+                future.result()
+
+        # Waiting behind the batch in arrival order would take about 0.4 seconds
+        assert interactive_latency < 0.15
@@ -0,0 +1,200 @@
+"""Tests for cache snapshots."""
+
+import gzip
+import json
+
+import pytest
+from weather_cli.cache import CacheEntry, WeatherCache
+from weather_cli.snapshot import (
+    SNAPSHOT_FORMAT,
+    SNAPSHOT_VERSION,
+    load_snapshot,
+    read_snapshot,
+    write_snapshot,
+)
+from weather_cli.weather_data import WeatherData
+
+
+class FakeClock:
+    """Manually advanced clock for deterministic TTL tests."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def write_document(path, document):
+    """Write a raw snapshot document."""
+    path.write_bytes(gzip.compress(json.dumps(document).encode("utf-8")))
+
+
+class TestSnapshot:
+    """Test cases for writing and loading cache snapshots."""
+
+    def setup_method(self, method):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        self.cache = WeatherCache(ttl_seconds=60, clock=self.clock)
+        self.london = WeatherData(
+            city="London",
+            temperature_celsius=15.5,
+            description="Cloudy",
+            latitude=51.5085,
+            longitude=-0.1257,
+            observed_at=900,
+            city_id=2643743,
+            condition_id=803,
+        )
+        self.oslo = WeatherData(city="Oslo", temperature_celsius=-3.0, description="Snow")
+
+    def test_round_trip(self, tmp_path):
+        """Test that every entry and its validators survive a round trip in order."""
+        path = tmp_path / "cache.json.gz"
+        self.cache.put("london", self.london, etag='"abc"', last_modified="Mon")
+        self.cache.put("oslo", self.oslo)
+
+        assert write_snapshot(self.cache, path) == 2
+        warmed = WeatherCache(ttl_seconds=60, clock=self.clock)
+        load_snapshot(warmed, path)
+
+        assert warmed.entries() == self.cache.entries()
+        assert warmed.get("london") == self.london
+
+    def test_remaining_ttl_is_kept(self, tmp_path):
+        """Test that restored entries expire when the originals would have."""
+        path = tmp_path / "cache.json.gz"
+        self.cache.put("london", self.london)
+        write_snapshot(self.cache, path)
+
+        self.clock.now += 40
+        warmed = WeatherCache(ttl_seconds=600, clock=self.clock)
+        load_snapshot(warmed, path)
+        assert warmed.get("london") == self.london
+
+        self.clock.now += 20
+        assert warmed.get("london") is None
+
+    def test_expired_entries_keep_validators(self, tmp_path):
+        """Test that expired entries are restored for revalidation."""
+        path = tmp_path / "cache.json.gz"
+        self.cache.put("london", self.london, etag='"abc"')
+        write_snapshot(self.cache, path)
+        self.clock.now += 3600
+
+        warmed = WeatherCache(clock=self.clock)
+        load_snapshot(warmed, path)
+
+        entry = warmed.get_entry("london")
+        assert entry is not None
+        assert not entry.is_fresh(self.clock.now)
+        assert entry.etag == '"abc"'
+
+    def test_document_layout(self, tmp_path):
+        """Test that entries are stored as rows under one field list."""
+        path = tmp_path / "cache.json.gz"
+        self.cache.put("oslo", self.oslo)
+        write_snapshot(self.cache, path)
+
+        document = json.loads(gzip.decompress(path.read_bytes()))
+        assert document["format"] == SNAPSHOT_FORMAT
+        assert document["version"] == SNAPSHOT_VERSION
+        assert document["fields"][:3] == ["key", "stored_at", "expires_at"]
+        assert len(document["entries"]) == 1
+        assert len(document["entries"][0]) == len(document["fields"])
+
+    def test_write_replaces_existing_file(self, tmp_path):
+        """Test that writing leaves only the finished snapshot behind."""
+        path = tmp_path / "nested" / "cache.json.gz"
+        write_snapshot(self.cache, path)
+        self.cache.put("oslo", self.oslo)
+        write_snapshot(self.cache, path)
+
+        assert [p.name for p in path.parent.iterdir()] == ["cache.json.gz"]
+        assert len(read_snapshot(path)) == 1
+
+    def test_unknown_fields_are_ignored(self, tmp_path):
+        """Test that fields added by newer writers do not break loading."""
+        path = tmp_path / "cache.json.gz"
+        write_document(
+            path,
+            {
+                "format": SNAPSHOT_FORMAT,
+                "version": SNAPSHOT_VERSION,
+                "fields": [
+                    "key",
+                    "stored_at",
+                    "expires_at",
+                    "city",
+                    "temperature_celsius",
+                    "description",
+                    "wind",
+                ],
+                "entries": [["oslo", 990.0, 1050.0, "Oslo", -3.0, "Snow", 4.2]],
+            },
+        )
+
+        [(key, entry)] = read_snapshot(path)
+        assert key == "oslo"
+        assert entry == CacheEntry(
+            data=WeatherData(city="Oslo", temperature_celsius=-3.0, description="Snow"),
+            stored_at=990.0,
+            expires_at=1050.0,
+        )
+
+    def test_invalid_rows_are_skipped(self, tmp_path):
+        """Test that rows that do not make valid entries are dropped."""
+        path = tmp_path / "cache.json.gz"
+        write_document(
+            path,
+            {
+                "format": SNAPSHOT_FORMAT,
+                "version": SNAPSHOT_VERSION,
+                "fields": [
+                    "key",
+                    "stored_at",
+                    "expires_at",
+                    "city",
+                    "temperature_celsius",
+                    "description",
+                ],
+                "entries": [
+                    ["oslo", 990.0, 1050.0, "Oslo", -3.0, "Snow"],
+                    ["bad", 990.0, 1050.0, "Bad", "warm", "Sunny"],
+                    ["short", 990.0],
+                    ["soon", "soon", 1050.0, "Soon", 1.0, "Rain"],
+                ],
+            },
+        )
+
+        assert [key for key, _ in read_snapshot(path)] == ["oslo"]
+
+    @pytest.mark.parametrize(
+        "document, message",
+        [
+            ({"format": "other", "version": SNAPSHOT_VERSION}, "Not a cache snapshot"),
+            ([], "Not a cache snapshot"),
+            ({"format": SNAPSHOT_FORMAT, "version": 99}, "Unsupported cache snapshot version"),
+        ],
+    )
+    def test_unsupported_documents(self, tmp_path, document, message):
+        """Test that foreign or newer documents are rejected."""
+        path = tmp_path / "cache.json.gz"
+        write_document(path, document)
+
+        with pytest.raises(ValueError, match=message):
+            read_snapshot(path)
+
+    def test_not_gzip(self, tmp_path):
+        """Test that uncompressed files are rejected."""
+        path = tmp_path / "cache.json"
+        path.write_text("{}")
+
+        with pytest.raises(ValueError, match="Not a cache snapshot"):
+            read_snapshot(path)
+
+    def test_missing_file(self, tmp_path):
+        """Test that a missing file raises OSError."""
+        with pytest.raises(OSError):
+            read_snapshot(tmp_path / "missing.json.gz")
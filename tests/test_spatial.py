@@ -0,0 +1,88 @@
+"""Tests for the spatial index."""
+
+import random
+
+import pytest
+from weather_cli.spatial import SpatialIndex, haversine_km
+
+
+class TestHaversine:
+    """Test cases for the great-circle distance."""
+
+    def test_known_distance(self):
+        """Test the London to Paris distance."""
+        assert haversine_km(51.5074, -0.1278, 48.8566, 2.3522) == pytest.approx(343.5, abs=1)
+
+    def test_zero_and_antimeridian(self):
+        """Test identical points and points across the antimeridian."""
+        assert haversine_km(10, 20, 10, 20) == 0
+        assert haversine_km(0, 179.99, 0, -179.99) < 3
+
+
+class TestSpatialIndex:
+    """Test cases for the SpatialIndex class."""
+
+    def test_within_sorted_by_distance(self):
+        """Test that radius queries return the keys inside the radius, nearest first."""
+        index = SpatialIndex()
+        index.insert("london", 51.5074, -0.1278)
+        index.insert("westminster", 51.4975, -0.1357)
+        index.insert("paris", 48.8566, 2.3522)
+
+        matches = index.within(51.5, -0.13, 5.0)
+
+        assert [key for key, _ in matches] == ["westminster", "london"]
+        assert matches[0][1] < matches[1][1] <= 5.0
+
+    def test_insert_replaces_and_remove(self):
+        """Test moving and removing keys."""
+        index = SpatialIndex()
+        index.insert("station", 10.0, 10.0)
+        index.insert("station", 20.0, 20.0)
+
+        assert len(index) == 1
+        assert index.within(10.0, 10.0, 10.0) == []
+        assert [key for key, _ in index.within(20.0, 20.0, 1.0)] == ["station"]
+
+        index.remove("station")
+        index.remove("station")
+        assert "station" not in index
+        assert len(index) == 0
+
+    def test_antimeridian_and_poles(self):
+        """Test queries that wrap around the antimeridian or cover a pole."""
+        index = SpatialIndex()
+        index.insert("east", 0.0, 179.99)
+        index.insert("north", 89.99, 0.0)
+
+        assert [key for key, _ in index.within(0.0, -179.99, 5.0)] == ["east"]
+        assert [key for key, _ in index.within(89.99, 180.0, 5.0)] == ["north"]
+
+    def test_matches_brute_force(self):
+        """Test that grid queries agree with a full scan."""
+        rng = random.Random(7)
+        index = SpatialIndex(cell_degrees=0.5)
+        points = {}
+        for number in range(500):
+            latitude = rng.uniform(40, 60)
+            longitude = rng.uniform(-10, 10)
+            points[str(number)] = (latitude, longitude)
+            index.insert(str(number), latitude, longitude)
+
+        for _ in range(20):
+            latitude, longitude = rng.uniform(40, 60), rng.uniform(-10, 10)
+            expected = {
+                key
+                for key, (lat, lon) in points.items()
+                if haversine_km(latitude, longitude, lat, lon) <= 100
+            }
+            assert {key for key, _ in index.within(latitude, longitude, 100)} == expected
+
+    def test_invalid_arguments(self):
+        """Test validation of the cell size and coordinates."""
+        with pytest.raises(ValueError, match="cell_degrees"):
+            SpatialIndex(cell_degrees=0)
+        with pytest.raises(ValueError, match="latitude"):
+            SpatialIndex().insert("x", 95.0, 0.0)
+        with pytest.raises(ValueError, match="longitude"):
+            SpatialIndex().within(0.0, 181.0, 1.0)
@@ -0,0 +1,273 @@
+"""Tests for the local OpenWeatherMap stub server."""
+
+import random
+import time
+
+import pytest
+import requests
+from unittest.mock import patch
+from weather_cli.stub_server import (
+    FaultProfile,
+    StubServer,
+    SyntheticWeather,
+    city_seed,
+    parse_arguments,
+    parse_error_rate,
+)
+from weather_cli.forecast import ForecastSeries
+from weather_cli.weather_client import OpenWeatherMapClient
+from weather_cli.exceptions import WeatherApiException
+
+NOW = 1726660758.0
+
+
+def make_client(server):
+    """Create a client pointed at a stub server."""
+    with (
+        patch("weather_cli.config_util.ConfigUtil.get_api_key", return_value="test_api_key"),
+        patch("weather_cli.config_util.ConfigUtil.get_api_base_url", return_value=server.base_url),
+    ):
+        return OpenWeatherMapClient()
+
+
+class TestFaultProfile:
+    """Test cases for the FaultProfile dataclass."""
+
+    def test_defaults_are_fault_free(self):
+        """Test that the default profile injects nothing."""
+        profile = FaultProfile()
+
+        assert profile.sample_latency(random.Random(1)) == 0.0
+        assert profile.error_rates == {}
+        assert profile.reset_rate == 0.0
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"distribution": "pareto"},
+            {"latency_ms": -1},
+            {"error_rates": {418: 0.1}},
+            {"error_rates": {429: 1.5}},
+            {"error_rates": {429: 0.6}, "reset_rate": 0.6},
+            {"slow_body_rate": -0.1},
+            {"update_seconds": 0},
+        ],
+    )
+    def test_invalid_settings(self, kwargs):
+        """Test that invalid settings are rejected."""
+        with pytest.raises(ValueError):
+            FaultProfile(**kwargs)
+
+    @pytest.mark.parametrize("distribution", ["constant", "uniform", "normal", "exponential"])
+    def test_latency_distributions_are_non_negative(self, distribution):
+        """Test that every distribution draws latencies around the mean and never below 0."""
+        profile = FaultProfile(latency_ms=100, jitter_ms=200, distribution=distribution)
+        rng = random.Random(7)
+
+        samples = [profile.sample_latency(rng) for _ in range(2000)]
+
+        assert min(samples) >= 0.0
+        assert 0.05 < sum(samples) / len(samples) < 0.2
+
+    def test_uniform_latency_stays_in_range(self):
+        """Test that uniform latencies stay within the jitter."""
+        profile = FaultProfile(latency_ms=100, jitter_ms=20, distribution="uniform")
+        rng = random.Random(3)
+
+        samples = [profile.sample_latency(rng) for _ in range(500)]
+
+        assert all(0.08 <= sample <= 0.12 for sample in samples)
+
+
+class TestSyntheticWeather:
+    """Test cases for the synthetic payload generator."""
+
+    def test_current_weather_is_deterministic_per_city(self):
+        """Test that the same city and time always give the same observation."""
+        weather = SyntheticWeather(clock=lambda: NOW)
+
+        assert weather.current("London") == weather.current("London")
+        assert weather.current("London") != weather.current("Paris")
+        assert city_seed("  new   YORK ") == city_seed("New York")
+
+    def test_current_weather_matches_documented_shape(self):
+        """Test that the payload has the fields of the documented API response."""
+        payload = SyntheticWeather(clock=lambda: NOW).current("London", "metric")
+
+        assert set(payload) >= {"coord", "weather", "main", "wind", "dt", "sys", "id", "name"}
+        assert payload["name"] == "London"
+        assert payload["dt"] == 1726660200
+        assert -90 <= payload["coord"]["lat"] <= 90
+        assert -180 <= payload["coord"]["lon"] <= 180
+        assert -60 < payload["main"]["temp"] < 60
+
+    def test_units(self):
+        """Test that temperatures are converted to the requested unit system."""
+        weather = SyntheticWeather(clock=lambda: NOW)
+        celsius = weather.current("Oslo", "metric")["main"]["temp"]
+
+        assert weather.current("Oslo")["main"]["temp"] == pytest.approx(celsius + 273.15)
+        assert weather.current("Oslo", "imperial")["main"]["temp"] == pytest.approx(
+            celsius * 9 / 5 + 32, abs=0.01
+        )
+
+    def test_observation_changes_each_update_period(self):
+        """Test that observations move on once per update period."""
+        clock = [NOW]
+        weather = SyntheticWeather(update_seconds=600, clock=lambda: clock[0])
+        first = weather.current("London")["dt"]
+
+        clock[0] += 30
+        assert weather.current("London")["dt"] == first
+        clock[0] += 600
+        assert weather.current("London")["dt"] == first + 600
+
+    def test_forecast_parses_as_series(self):
+        """Test that the forecast payload is accepted by ForecastSeries."""
+        payload = SyntheticWeather(clock=lambda: NOW).forecast("London", "metric")
+
+        series = ForecastSeries.from_response(payload)
+
+        assert len(series) == 40
+        assert series.city == "London"
+        assert list(series.timestamps) == sorted(series.timestamps)
+        assert series.timestamps[1] - series.timestamps[0] == 3 * 3600
+
+
+class TestStubServer:
+    """Test cases for the stub server over real HTTP."""
+
+    def test_serves_current_weather_to_client(self):
+        """Test that the client can fetch and parse weather from the stub."""
+        with StubServer(clock=lambda: NOW) as server:
+            data = make_client(server).get_weather_from_api("London")
+
+        assert data.city == "London"
+        assert data.observed_at == 1726660200
+        assert server.stats.requests == 1
+        assert server.stats.responses == {200: 1}
+
+    def test_serves_forecast_and_coordinates_to_client(self):
+        """Test that forecasts and coordinate lookups are served."""
+        with StubServer(clock=lambda: NOW) as server:
+            client = make_client(server)
+            forecast = client.get_forecast_from_api("Paris")
+            nearby = client.get_weather_by_coordinates(48.85, 2.35)
+
+        assert len(forecast) == 40
+        assert (nearby.latitude, nearby.longitude) == (48.85, 2.35)
+
+    def test_group_endpoint(self):
+        """Test that /group returns one observation per requested id."""
+        with StubServer(clock=lambda: NOW) as server:
+            response = requests.get(
+                f"{server.base_url}/group", params={"id": "524901,703448", "appid": "k"}
+            )
+
+        body = response.json()
+        assert response.status_code == 200
+        assert body["cnt"] == 2
+        assert [city["id"] for city in body["list"]] == [524901, 703448]
+
+    def test_head_and_connection_reuse(self):
+        """Test that HEAD is answered and keep-alive connections are counted once."""
+        with StubServer() as server:
+            with requests.Session() as session:
+                head = session.head(server.base_url)
+                session.get(f"{server.base_url}/weather", params={"q": "Oslo", "appid": "k"})
+
+        assert (head.status_code, head.content) == (200, b"")
+        assert server.stats.requests == 2
+        assert server.stats.connections == 1
+
+    def test_missing_api_key_is_rejected(self):
+        """Test that requests without an API key get a 401 like the real API."""
+        with StubServer() as server:
+            response = requests.get(f"{server.base_url}/weather", params={"q": "London"})
+
+        assert response.status_code == 401
+        assert response.json()["cod"] == 401
+
+    def test_unknown_city_and_endpoint_are_not_found(self):
+        """Test that cities outside known_cities and unknown endpoints get a 404."""
+        with StubServer(known_cities=frozenset({"London"})) as server:
+            client = make_client(server)
+            assert client.get_weather_from_api("london").city == "london"
+            with pytest.raises(WeatherApiException) as exc_info:
+                client.get_weather_from_api("Atlantis")
+            response = requests.get(f"{server.base_url}/onecall", params={"appid": "k"})
+
+        assert exc_info.value.status_code == 404
+        assert response.status_code == 404
+
+    def test_injected_errors(self):
+        """Test that error rates make the server answer with the injected status."""
+        with StubServer(FaultProfile(error_rates={503: 1.0})) as server:
+            with pytest.raises(WeatherApiException) as exc_info:
+                make_client(server).get_weather_from_api("London")
+
+        assert exc_info.value.status_code == 503
+        assert server.stats.responses == {503: 1}
+
+    def test_error_rates_are_reproducible_with_a_seed(self):
+        """Test that seeded profiles inject the same faults in the same order."""
+        profile = FaultProfile(error_rates={429: 0.3, 500: 0.2}, seed=11)
+        outcomes = []
+        for _ in range(2):
+            with StubServer(profile) as server:
+                outcomes.append(
+                    [
+                        requests.get(
+                            f"{server.base_url}/weather", params={"q": "Oslo", "appid": "k"}
+                        ).status_code
+                        for _ in range(30)
+                    ]
+                )
+
+        assert outcomes[0] == outcomes[1]
+        assert set(outcomes[0]) == {200, 429, 500}
+
+    def test_connection_reset(self):
+        """Test that reset connections surface as a network error in the client."""
+        with StubServer(FaultProfile(reset_rate=1.0)) as server:
+            with pytest.raises(WeatherApiException, match="Unable to connect"):
+                make_client(server).get_weather_from_api("London")
+
+        assert server.stats.resets == 1
+        assert server.stats.responses == {}
+
+    def test_latency_and_slow_body(self):
+        """Test that latency and slow bodies delay the response."""
+        profile = FaultProfile(latency_ms=50, slow_body_rate=1.0, slow_body_chunk_delay_ms=10)
+        with StubServer(profile) as server:
+            start = time.perf_counter()
+            data = make_client(server).get_weather_from_api("London")
+            elapsed = time.perf_counter() - start
+
+        assert data.city == "London"
+        assert elapsed >= 0.05 + 0.08
+        assert server.stats.slow_bodies == 1
+
+
+class TestCommandLine:
+    """Test cases for the stub server command line."""
+
+    def test_parse_error_rate(self):
+        """Test parsing STATUS=RATE values."""
+        assert parse_error_rate("429=0.05") == (429, 0.05)
+
+    def test_parse_arguments(self):
+        """Test that repeated options are collected."""
+        args = parse_arguments(
+            ["--port", "0", "--error-rate", "429=0.1", "--error-rate", "503=0.2", "--city", "Oslo"]
+        )
+
+        assert args.port == 0
+        assert dict(args.error_rate) == {429: 0.1, 503: 0.2}
+        assert args.cities == ["Oslo"]
+        assert args.distribution == "constant"
+
+    def test_invalid_error_rate_exits(self):
+        """Test that malformed error rates are rejected by the parser."""
+        with pytest.raises(SystemExit):
+            parse_arguments(["--error-rate", "often"])
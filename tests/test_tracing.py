@@ -0,0 +1,290 @@
+"""Tests for request-level tracing."""
+
+import contextvars
+import json
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from weather_cli.cache import WeatherCache
+from weather_cli.composite_client import FailoverClient
+from weather_cli.stub_server import StubServer
+from weather_cli.tracing import (
+    InMemoryExporter,
+    JsonlExporter,
+    OtlpHttpExporter,
+    SpanContext,
+    Tracer,
+    continue_trace,
+    current_traceparent,
+    otlp_document,
+    record_span,
+    set_tracer,
+    span,
+)
+from weather_cli.weather_client import OpenWeatherMapClient
+from weather_cli.weather_service import WeatherService
+from weather_cli.exceptions import WeatherApiException
+
+TRACEPARENT = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+
+
+@pytest.fixture
+def exporter():
+    """Install a tracer keeping spans in memory for the duration of a test."""
+    exporter = InMemoryExporter()
+    previous = set_tracer(Tracer(exporter))
+    yield exporter
+    set_tracer(previous)
+
+
+def by_name(spans):
+    """Index spans by name."""
+    return {span.name: span for span in spans}
+
+
+class TestSpanContext:
+    """Test cases for W3C trace context parsing and formatting."""
+
+    def test_traceparent_round_trip(self):
+        """Test that a valid header is parsed and formatted back unchanged."""
+        context = SpanContext.from_traceparent(TRACEPARENT)
+
+        assert context.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+        assert context.span_id == "00f067aa0ba902b7"
+        assert context.sampled
+        assert context.traceparent == TRACEPARENT
+
+    @pytest.mark.parametrize(
+        "value",
+        [
+            None,
+            "",
+            "garbage",
+            "ff-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01",
+            "00-00000000000000000000000000000000-00f067aa0ba902b7-01",
+            "00-4bf92f3577b34da6a3ce929d0e0e4736-0000000000000000-01",
+        ],
+    )
+    def test_invalid_traceparent(self, value):
+        """Test that missing, malformed and all-zero headers are ignored."""
+        assert SpanContext.from_traceparent(value) is None
+
+    def test_generate(self):
+        """Test that generated contexts have IDs of the right length."""
+        context = SpanContext.generate()
+
+        assert len(context.trace_id) == 32 and len(context.span_id) == 16
+        assert SpanContext.generate(context.trace_id).trace_id == context.trace_id
+
+
+class TestTracer:
+    """Test cases for creating and exporting spans."""
+
+    def test_disabled_by_default(self):
+        """Test that spans are no-ops and no header is produced without a tracer."""
+        with span("anything", city="Oslo") as current:
+            current.set_attribute("ignored", True)
+            assert current_traceparent() is None
+
+        assert current.attributes == {}
+
+    def test_nested_spans_export_once_per_trace(self, exporter):
+        """Test that children share the trace and the trace is exported when the root ends."""
+        with span("root", city="Oslo") as root:
+            with span("child") as child:
+                assert current_traceparent() == child.context.traceparent
+            assert exporter.spans == []
+
+        assert [s.name for s in exporter.spans] == ["child", "root"]
+        assert child.context.trace_id == root.context.trace_id
+        assert child.parent_id == root.context.span_id
+        assert root.parent_id is None
+        assert root.attributes == {"city": "Oslo"}
+        assert root.end_ns >= child.end_ns >= child.start_ns >= root.start_ns
+
+    def test_error_is_recorded_and_raised(self, exporter):
+        """Test that an exception ends the span with an error and propagates."""
+        with pytest.raises(ValueError):
+            with span("failing"):
+                raise ValueError("bad input")
+
+        assert exporter.spans[0].error == "ValueError: bad input"
+
+    def test_record_span(self, exporter):
+        """Test that spans measured elsewhere become children of the current span."""
+        with span("root") as root:
+            record_span("http.wait", 10, 30, bytes=5)
+
+        wait = by_name(exporter.spans)["http.wait"]
+        assert wait.parent_id == root.context.span_id
+        assert wait.duration_ms == pytest.approx(2e-5)
+
+    def test_context_follows_copied_context_into_threads(self, exporter):
+        """Test that work run in a copied context joins the caller's trace."""
+        with span("root") as root:
+
+            def work():
+                with span("work"):
+                    pass
+
+            thread = threading.Thread(target=contextvars.copy_context().run, args=(work,))
+            thread.start()
+            thread.join()
+
+        assert by_name(exporter.spans)["work"].parent_id == root.context.span_id
+
+    def test_continue_trace(self, exporter):
+        """Test that spans started under a remote parent join its trace."""
+        with continue_trace(TRACEPARENT) as remote:
+            with span("server"):
+                pass
+        with continue_trace("invalid") as missing:
+            with span("fresh"):
+                pass
+
+        spans = by_name(exporter.spans)
+        assert remote.span_id == "00f067aa0ba902b7"
+        assert spans["server"].context.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+        assert spans["server"].parent_id == "00f067aa0ba902b7"
+        assert missing is None
+        assert spans["fresh"].parent_id is None
+
+
+class TestExporters:
+    """Test cases for the span exporters."""
+
+    def test_jsonl_exporter(self, tmp_path):
+        """Test that every span is appended to the file as one JSON object."""
+        path = tmp_path / "traces" / "spans.jsonl"
+        tracer = Tracer(JsonlExporter(path))
+        with tracer.span("root", city="Oslo"):
+            with tracer.span("child"):
+                pass
+        tracer.close()
+
+        records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+        assert [record["name"] for record in records] == ["child", "root"]
+        assert records[0]["parent_id"] == records[1]["span_id"]
+        assert records[1]["attributes"] == {"city": "Oslo"}
+
+    def test_otlp_document(self):
+        """Test the OTLP/HTTP JSON encoding of spans and typed attributes."""
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporter)
+        with pytest.raises(KeyError):
+            with tracer.span("root", city="Oslo", hit=True, status_code=200, ratio=0.5):
+                tracer.record("http.wait", 1, 2)
+                raise KeyError("x")
+
+        document = otlp_document(exporter.spans)
+
+        spans = document["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        wait, root = spans
+        assert wait["parentSpanId"] == root["spanId"]
+        assert wait["kind"] == 3
+        assert (wait["startTimeUnixNano"], wait["endTimeUnixNano"]) == ("1", "2")
+        assert "parentSpanId" not in root
+        assert root["status"]["code"] == 2
+        assert root["attributes"] == [
+            {"key": "city", "value": {"stringValue": "Oslo"}},
+            {"key": "hit", "value": {"boolValue": True}},
+            {"key": "status_code", "value": {"intValue": "200"}},
+            {"key": "ratio", "value": {"doubleValue": 0.5}},
+        ]
+
+    @patch("weather_cli.tracing.requests.post")
+    def test_otlp_exporter_posts_in_background(self, mock_post):
+        """Test that spans are posted to the collector and flushed on close."""
+        mock_post.return_value = Mock(status_code=200)
+        exporter = OtlpHttpExporter("http://collector:4318/v1/traces")
+        tracer = Tracer(exporter)
+        with tracer.span("root"):
+            pass
+
+        tracer.close()
+
+        url = mock_post.call_args.args[0]
+        body = mock_post.call_args.kwargs["json"]
+        assert url == "http://collector:4318/v1/traces"
+        assert body["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == "root"
+        assert exporter.exported == 1
+
+    @patch("weather_cli.tracing.requests.post")
+    def test_otlp_exporter_survives_collector_failures(self, mock_post):
+        """Test that an unreachable collector is logged and never raised."""
+        mock_post.side_effect = requests.exceptions.ConnectionError("refused")
+        exporter = OtlpHttpExporter()
+        tracer = Tracer(exporter)
+        with tracer.span("root"):
+            pass
+
+        tracer.close()
+
+        assert mock_post.called
+        assert exporter.exported == 0
+
+
+class TestInstrumentation:
+    """Test cases for the spans recorded by a lookup end to end."""
+
+    def make_client(self, server):
+        """Create a client pointed at a stub server."""
+        with (
+            patch("weather_cli.config_util.ConfigUtil.get_api_key", return_value="k"),
+            patch(
+                "weather_cli.config_util.ConfigUtil.get_api_base_url",
+                return_value=server.base_url,
+            ),
+        ):
+            return OpenWeatherMapClient()
+
+    def test_lookup_phases(self, exporter):
+        """Test that a lookup records each phase and the stub joins the client's trace."""
+        with StubServer() as server:
+            service = WeatherService(client=self.make_client(server), cache=WeatherCache())
+            service.get_weather("London")
+            service.get_weather("London")
+
+        spans = by_name(exporter.spans)
+        for name in ("validate", "cache.lookup", "http.wait", "http.body", "parse", "model"):
+            assert name in spans
+        request = spans["http.request"]
+        assert request.attributes == {"status_code": 200}
+        assert spans["http.wait"].parent_id == request.context.span_id
+        assert spans["stub.handle"].parent_id == request.context.span_id
+        assert spans["stub.handle"].context.trace_id == request.context.trace_id
+        assert server.stats.traced == 1
+
+        roots = [s for s in exporter.spans if s.name == "weather.get_weather"]
+        assert [root.attributes["cache_hit"] for root in roots] == [False, True]
+
+    def test_failed_lookup_records_error(self, exporter):
+        """Test that a failing lookup marks its root span with the error."""
+        with pytest.raises(WeatherApiException):
+            WeatherService(client=Mock()).get_weather("  ")
+
+        root = by_name(exporter.spans)["weather.get_weather"]
+        assert root.error.startswith("WeatherApiException")
+        assert by_name(exporter.spans)["validate"].error is not None
+
+    def test_no_header_without_tracer(self):
+        """Test that requests carry no trace context while tracing is off."""
+        with StubServer() as server:
+            self.make_client(server).get_weather_from_api("London")
+
+        assert server.stats.traced == 0
+
+    def test_failover_keeps_the_trace(self, exporter):
+        """Test that provider requests made on failover threads stay under the service span."""
+        with StubServer() as server:
+            client = FailoverClient([self.make_client(server)])
+            WeatherService(client=client).get_weather("London")
+            client.close()
+
+        spans = by_name(exporter.spans)
+        root = spans["weather.get_weather"]
+        assert spans["client.fetch_weather"].parent_id == root.context.span_id
+        assert spans["http.request"].context.trace_id == root.context.trace_id
+        assert spans["stub.handle"].context.trace_id == root.context.trace_id
@@ -0,0 +1,243 @@
+"""Tests for the record/replay transports."""
+
+import json
+
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from weather_cli.transport import (
+    CassetteMissError,
+    RecordingTransport,
+    ReplayTransport,
+    RequestsTransport,
+    build_response,
+    normalize_url,
+)
+from weather_cli.weather_client import OpenWeatherMapClient, Validators
+from weather_cli.exceptions import WeatherApiException
+
+LONDON_URL = "https://api.example/weather?q=London&appid=secret_key&units=metric"
+LONDON_BODY = {
+    "dt": 1700000000,
+    "name": "London",
+    "main": {"temp": 15.5},
+    "weather": [{"description": "clear sky"}],
+}
+
+
+class FakeTransport(RequestsTransport):
+    """Transport answering from a fixed table of responses."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def get(self, url, timeout, headers=None):
+        self.calls.append(url)
+        status_code, body = self.responses[normalize_url(url)]
+        return build_response(
+            url, status_code, {"Content-Type": "application/json", "ETag": '"v1"'}, body
+        )
+
+
+class FakeClock:
+    """Clock advancing by a fixed step on every reading."""
+
+    def __init__(self, step):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def record_cassette(path, step=0.25):
+    """Record a cassette with one London and one missing-city interaction."""
+    fake = FakeTransport(
+        {
+            normalize_url(LONDON_URL): (200, json.dumps(LONDON_BODY).encode()),
+            "https://api.example/weather?q=Atlantis&units=metric": (404, b'{"message": "no"}'),
+        }
+    )
+    recorder = RecordingTransport(path, transport=fake, clock=FakeClock(step))
+    client = OpenWeatherMapClient(
+        api_key="secret_key", base_url="https://api.example", transport=recorder
+    )
+    client.get_weather_from_api("London")
+    with pytest.raises(WeatherApiException):
+        client.get_weather_from_api("Atlantis")
+    recorder.close()
+    return recorder
+
+
+class TestHelpers:
+    """Test cases for URL normalization and response building."""
+
+    def test_normalize_url_drops_key_and_sorts(self):
+        """Test that the API key is removed and parameters are sorted."""
+        assert normalize_url(LONDON_URL) == "https://api.example/weather?q=London&units=metric"
+        assert normalize_url(
+            "https://api.example/weather?units=metric&q=New%20York&appid=x"
+        ) == normalize_url("https://api.example/weather?q=New%20York&appid=y&units=metric")
+
+    def test_build_response(self):
+        """Test that built responses behave like network responses."""
+        response = build_response("https://x", 200, {"etag": '"v1"'}, b'{"a": 1}')
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] == '"v1"'
+        assert response.json() == {"a": 1}
+        assert response.text == '{"a": 1}'
+
+
+class TestRequestsTransport:
+    """Test cases for the network transport."""
+
+    @patch("weather_cli.transport.requests.get")
+    def test_headers_only_sent_when_given(self, mock_get):
+        """Test the requests calling convention."""
+        transport = RequestsTransport()
+
+        transport.get("https://x", timeout=5)
+        transport.get("https://x", timeout=5, headers={"If-None-Match": '"v1"'})
+
+        assert mock_get.call_args_list[0] == (("https://x",), {"timeout": 5})
+        assert mock_get.call_args_list[1][1]["headers"] == {"If-None-Match": '"v1"'}
+
+
+class TestRecordingTransport:
+    """Test cases for recording cassettes."""
+
+    def test_records_interactions_without_secrets(self, tmp_path):
+        """Test that interactions and timings are written and the key is not."""
+        path = tmp_path / "cassettes" / "traffic.jsonl"
+
+        recorder = record_cassette(path)
+
+        assert recorder.recorded == 2
+        text = path.read_text()
+        assert "secret_key" not in text
+        lines = [json.loads(line) for line in text.splitlines()]
+        assert lines[0] == {"format": "weather-cli-cassette", "version": 1}
+        assert lines[1]["request"]["url"] == "https://api.example/weather?q=London&units=metric"
+        assert lines[1]["response"]["status_code"] == 200
+        assert lines[1]["elapsed"] == pytest.approx(0.25)
+        assert lines[2]["response"]["status_code"] == 404
+
+    def test_failed_requests_are_not_recorded(self, tmp_path):
+        """Test that transport errors propagate and leave no interaction behind."""
+        inner = Mock()
+        inner.get.side_effect = requests.exceptions.ConnectionError("down")
+        recorder = RecordingTransport(tmp_path / "traffic.jsonl", transport=inner)
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            recorder.get(LONDON_URL, timeout=5)
+        recorder.close()
+
+        assert recorder.recorded == 0
+        assert len((tmp_path / "traffic.jsonl").read_text().splitlines()) == 1
+
+
+class TestReplayTransport:
+    """Test cases for replaying cassettes through the full client stack."""
+
+    def setup_method(self, method):
+        """Set up the sleep recorder."""
+        self.sleeps = []
+
+    def _client(self, path, speed=1.0):
+        """Build a client replaying the cassette with any API key."""
+        transport = ReplayTransport(path, speed=speed, sleep=self.sleeps.append)
+        client = OpenWeatherMapClient(
+            api_key="another_key", base_url="https://api.example", transport=transport
+        )
+        return client, transport
+
+    def test_replays_full_client_stack(self, tmp_path):
+        """Test that recorded responses are parsed exactly like live ones."""
+        record_cassette(tmp_path / "traffic.jsonl")
+        client, transport = self._client(tmp_path / "traffic.jsonl")
+
+        weather = client.get_weather_from_api("London")
+        with pytest.raises(WeatherApiException) as exc_info:
+            client.get_weather_from_api("Atlantis")
+
+        assert weather.city == "London"
+        assert weather.observed_at == 1700000000
+        assert exc_info.value.status_code == 404
+        assert transport.replayed == 2
+        assert len(transport) == 2
+
+    def test_replayed_validators_support_revalidation(self, tmp_path):
+        """Test that replayed headers and bodies drive conditional fetches."""
+        record_cassette(tmp_path / "traffic.jsonl")
+        client, _ = self._client(tmp_path / "traffic.jsonl", speed=0)
+
+        first = client.fetch_weather("London")
+        second = client.fetch_weather("London", Validators(observed_at=1700000000))
+
+        assert first.etag == '"v1"'
+        assert second.not_modified
+
+    @pytest.mark.parametrize("speed, expected", [(1.0, 0.25), (10.0, 0.025)])
+    def test_recorded_and_accelerated_speed(self, tmp_path, speed, expected):
+        """Test that recorded latency is reproduced, optionally faster."""
+        record_cassette(tmp_path / "traffic.jsonl")
+        client, _ = self._client(tmp_path / "traffic.jsonl", speed=speed)
+
+        client.get_weather_from_api("London")
+
+        assert self.sleeps == [pytest.approx(expected)]
+
+    def test_instant_replay(self, tmp_path):
+        """Test that speed 0 replays without delays."""
+        record_cassette(tmp_path / "traffic.jsonl")
+        client, _ = self._client(tmp_path / "traffic.jsonl", speed=0)
+
+        client.get_weather_from_api("London")
+
+        assert self.sleeps == []
+
+    def test_slow_recording_replays_as_timeout(self, tmp_path):
+        """Test that a recorded latency above the timeout becomes a timeout."""
+        record_cassette(tmp_path / "traffic.jsonl", step=40)
+        client, _ = self._client(tmp_path / "traffic.jsonl")
+
+        with pytest.raises(WeatherApiException, match="Request timeout"):
+            client.get_weather_from_api("London")
+
+    def test_unrecorded_request(self, tmp_path):
+        """Test that an unrecorded request fails like a network error."""
+        record_cassette(tmp_path / "traffic.jsonl")
+        client, transport = self._client(tmp_path / "traffic.jsonl")
+
+        with pytest.raises(WeatherApiException, match="Network error: No recorded response"):
+            client.get_weather_from_api("Paris")
+        with pytest.raises(CassetteMissError):
+            transport.get("https://api.example/forecast?q=London", timeout=5)
+
+    def test_repeated_requests_and_rewind(self, tmp_path):
+        """Test that repeated requests reuse the last recording until rewound."""
+        record_cassette(tmp_path / "traffic.jsonl")
+        _, transport = self._client(tmp_path / "traffic.jsonl", speed=0)
+
+        for _ in range(3):
+            assert transport.get(LONDON_URL, timeout=5).status_code == 200
+        transport.rewind()
+        assert transport.get(LONDON_URL, timeout=5).status_code == 200
+        assert transport.replayed == 4
+
+    def test_invalid_cassettes(self, tmp_path):
+        """Test that foreign files and unsupported versions are rejected."""
+        other = tmp_path / "other.jsonl"
+        other.write_text('{"hello": "world"}\n')
+        future = tmp_path / "future.jsonl"
+        future.write_text('{"format": "weather-cli-cassette", "version": 99}\n')
+
+        with pytest.raises(ValueError, match="Not a weather cassette"):
+            ReplayTransport(other)
+        with pytest.raises(ValueError, match="Unsupported cassette version"):
+            ReplayTransport(future)
+        with pytest.raises(ValueError, match="speed"):
+            ReplayTransport(other, speed=-1)
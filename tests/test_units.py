@@ -0,0 +1,38 @@
+"""Tests for unit systems and local unit conversion."""
+
+import pytest
+from weather_cli.units import CANONICAL_UNITS, Units
+
+
+class TestUnits:
+    """Test cases for the Units enum."""
+
+    def test_canonical_units_are_metric(self):
+        """Test that observations are fetched in metric units."""
+        assert CANONICAL_UNITS is Units.METRIC
+
+    @pytest.mark.parametrize(
+        "units, celsius, expected",
+        [
+            (Units.METRIC, 21.5, 21.5),
+            (Units.IMPERIAL, 0.0, 32.0),
+            (Units.IMPERIAL, 100.0, 212.0),
+            (Units.IMPERIAL, -40.0, -40.0),
+            (Units.STANDARD, 0.0, 273.15),
+        ],
+    )
+    def test_convert_temperature(self, units, celsius, expected):
+        """Test temperature conversion from Celsius."""
+        assert units.convert_temperature(celsius) == pytest.approx(expected)
+
+    def test_format_temperature(self):
+        """Test formatted temperatures with unit symbols."""
+        assert Units.METRIC.format_temperature(15.55) == "15.6°C"
+        assert Units.IMPERIAL.format_temperature(15.0) == "59.0°F"
+        assert Units.STANDARD.format_temperature(15.0) == "288.1K"
+
+    def test_lookup_by_value(self):
+        """Test that unit systems can be selected by their API name."""
+        assert Units("imperial") is Units.IMPERIAL
+        with pytest.raises(ValueError):
+            Units("rankine")
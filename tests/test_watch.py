@@ -0,0 +1,174 @@
+"""Tests for watch mode."""
+
+from io import StringIO
+from unittest.mock import Mock
+
+import pytest
+from weather_cli.units import Units
+from weather_cli.watch import PollSchedule, WeatherWatcher, changed_fields, format_changes
+from weather_cli.weather_client import WeatherApiClient
+from weather_cli.weather_data import WeatherData
+from weather_cli.weather_service import WeatherService
+from weather_cli.exceptions import WeatherApiException
+
+
+def make_weather(temperature=15.0, description="clear sky", observed_at=1000):
+    """Build weather data for London."""
+    return WeatherData(
+        city="London",
+        temperature_celsius=temperature,
+        description=description,
+        observed_at=observed_at,
+    )
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep moves time forward."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestChanges:
+    """Test cases for change detection and formatting."""
+
+    def test_changed_fields(self):
+        """Test that only differing watched fields are reported."""
+        changes = changed_fields(make_weather(), make_weather(16.5, observed_at=1600))
+
+        assert changes == {"temperature_celsius": (15.0, 16.5)}
+        assert changed_fields(make_weather(), make_weather(observed_at=1600)) == {}
+
+    def test_format_changes(self):
+        """Test the one-line change summary in the chosen units."""
+        changes = {
+            "temperature_celsius": (15.0, 16.5),
+            "description": ("clear sky", "light rain"),
+        }
+
+        line = format_changes("London", changes, Units.IMPERIAL)
+
+        assert line == "London: Temperature 59.0°F -> 61.7°F, Conditions clear sky -> light rain"
+
+
+class TestPollSchedule:
+    """Test cases for the PollSchedule class."""
+
+    def test_backs_off_while_unchanged_and_resets_on_change(self):
+        """Test the interval doubling up to the maximum and resetting."""
+        schedule = PollSchedule(interval=60, max_interval=200, update_seconds=0)
+
+        assert schedule.next_poll(0, changed=False) == 120
+        assert schedule.next_poll(0, changed=False) == 200
+        assert schedule.next_poll(0, changed=False) == 200
+        assert schedule.next_poll(0, changed=True) == 60
+
+    def test_aligns_with_next_upstream_update(self):
+        """Test that no poll is scheduled before a new observation can exist."""
+        schedule = PollSchedule(interval=60, max_interval=900, update_seconds=600)
+
+        assert schedule.next_poll(1100, changed=True, observed_at=1000) == 1600
+        # The upstream is late: fall back to the regular interval
+        assert schedule.next_poll(1700, changed=True, observed_at=1000) == 1760
+
+    def test_alignment_is_capped_by_max_interval(self):
+        """Test that alignment never waits longer than the maximum interval."""
+        schedule = PollSchedule(interval=10, max_interval=100, update_seconds=600)
+
+        assert schedule.next_poll(1000, changed=True, observed_at=1000) == 1100
+
+    def test_invalid_arguments(self):
+        """Test validation of the schedule parameters."""
+        with pytest.raises(ValueError, match="interval must be positive"):
+            PollSchedule(interval=0, max_interval=10)
+        with pytest.raises(ValueError, match="max_interval"):
+            PollSchedule(interval=10, max_interval=5)
+        with pytest.raises(ValueError, match="backoff"):
+            PollSchedule(interval=10, max_interval=20, backoff=0.5)
+
+
+class TestWeatherWatcher:
+    """Test cases for the WeatherWatcher class."""
+
+    def setup_method(self):
+        """Set up a watcher over a mock service and fake clock."""
+        self.service = Mock()
+        self.clock = FakeClock()
+        self.output = StringIO()
+        self.watcher = WeatherWatcher(
+            self.service,
+            ["London", " London "],
+            interval=60,
+            max_interval=900,
+            output=self.output,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+
+    def test_requires_cities(self):
+        """Test that at least one city must be watched."""
+        with pytest.raises(ValueError, match="At least one city"):
+            WeatherWatcher(Mock(), [])
+
+    def test_spelling_variants_watched_once(self):
+        """Test that spellings of the same city are watched once, as first written."""
+        service = WeatherService(client=Mock(spec=WeatherApiClient), default_country="GB")
+        watcher = WeatherWatcher(service, ["London", " london", "LONDON", "London,GB", "Paris"])
+
+        assert watcher.cities == ["London", "Paris"]
+
+    def test_prints_full_report_then_only_changes(self):
+        """Test the first poll prints everything and later polls print changes only."""
+        self.service.get_weather.side_effect = [
+            make_weather(observed_at=1000),
+            make_weather(observed_at=1000),
+            make_weather(17.0, observed_at=1600),
+        ]
+
+        self.watcher.run(max_polls=3)
+
+        assert self.watcher.cities == ["London"]
+        lines = self.output.getvalue().splitlines()
+        assert lines == [
+            "Weather for London:",
+            "Temperature: 15.0°C",
+            "Conditions: clear sky",
+            "London: Temperature 15.0°C -> 17.0°C",
+        ]
+
+    def test_polls_are_aligned_and_backed_off(self):
+        """Test that polls wait for the next upstream update and back off when unchanged."""
+        self.service.get_weather.side_effect = [
+            make_weather(observed_at=1000),
+            make_weather(observed_at=1600),
+            make_weather(observed_at=None),
+            make_weather(observed_at=None),
+        ]
+
+        self.watcher.run(max_polls=4)
+
+        # Wait for the observations at 1600 and 2200, then back off to 240s
+        assert self.clock.sleeps == [600.0, 600.0, 240.0]
+        assert self.service.get_weather.call_count == 4
+
+    def test_errors_are_reported_and_polling_continues(self):
+        """Test that a failed poll is reported and retried later."""
+        self.service.get_weather.side_effect = [
+            WeatherApiException("Network error"),
+            make_weather(),
+        ]
+
+        self.watcher.run(max_polls=2)
+
+        output = self.output.getvalue()
+        assert "London: error: Network error" in output
+        assert "Weather for London:" in output
+        assert self.clock.sleeps == [120.0]
@@ -1,11 +1,20 @@
 """Tests for the weather API client."""
 
+import json
+
 import pytest
 from unittest.mock import Mock, patch
 import requests
-from weather_cli.weather_client import OpenWeatherMapClient, WeatherApiClient
+from weather_cli.weather_client import (
+    FetchResult,
+    OpenWeatherMapClient,
+    Validators,
+    WeatherApiClient,
+)
+from weather_cli.key_pool import ApiKeyPool
+from weather_cli.stub_server import FaultProfile, StubServer
 from weather_cli.weather_data import WeatherData
-from weather_cli.exceptions import WeatherApiException
+from weather_cli.exceptions import InvalidCityNameException, WeatherApiException
 
 
 class TestOpenWeatherMapClient:
@@ -150,6 +159,14 @@ class TestOpenWeatherMapClient:
         with pytest.raises(WeatherApiException, match="City name contains invalid characters"):
             self.client._validate_city_name("Paris&Berlin")
 
+    def test_invalid_city_name_exception_type(self):
+        """Test that rejected names raise InvalidCityNameException with a 400 status."""
+        with pytest.raises(InvalidCityNameException) as exc_info:
+            self.client._validate_city_name("Paris&Berlin")
+
+        assert isinstance(exc_info.value, WeatherApiException)
+        assert exc_info.value.status_code == 400
+
     def test_build_api_url(self):
         """Test API URL building."""
         url = self.client._build_api_url("London")
@@ -177,6 +194,19 @@ class TestOpenWeatherMapClient:
         assert "REDACTED" in redacted
         assert "London" in redacted
 
+    @patch("weather_cli.weather_client.requests.get")
+    def test_network_error_message_is_redacted(self, mock_get):
+        """Test that transport errors quoting the URL do not leak the API key."""
+        mock_get.side_effect = requests.exceptions.RequestException(
+            "Max retries exceeded with url: /weather?q=London&appid=test_api_key"
+        )
+
+        with pytest.raises(WeatherApiException) as exc_info:
+            self.client.get_weather_from_api("London")
+
+        assert "test_api_key" not in str(exc_info.value)
+        assert "appid=REDACTED" in str(exc_info.value)
+
     def test_parse_weather_response_valid(self):
         """Test parsing of valid weather response."""
         response_data = {
@@ -191,6 +221,60 @@ class TestOpenWeatherMapClient:
         assert result.temperature_celsius == 20.0
         assert result.description == "Clear Sky"
 
+    def test_parse_weather_response_identifiers(self):
+        """Test parsing of the observation time, city ID and condition code."""
+        response_data = {
+            "id": 2988507,
+            "dt": 1726660758,
+            "name": "Paris",
+            "main": {"temp": 20.0},
+            "weather": [{"id": 800, "description": "clear sky"}],
+        }
+
+        result = self.client._parse_weather_response(response_data)
+
+        assert result.observed_at == 1726660758
+        assert result.city_id == 2988507
+        assert result.condition_id == 800
+
+    def test_parse_weather_response_coordinates(self):
+        """Test parsing of the observation coordinates."""
+        response_data = {
+            "coord": {"lon": 2.3488, "lat": 48.8534},
+            "name": "Paris",
+            "main": {"temp": 20.0},
+            "weather": [{"description": "clear sky"}],
+        }
+
+        result = self.client._parse_weather_response(response_data)
+
+        assert result.latitude == 48.8534
+        assert result.longitude == 2.3488
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_get_weather_by_coordinates(self, mock_get):
+        """Test a coordinate lookup against the weather endpoint."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "coord": {"lon": -0.1257, "lat": 51.5085},
+            "name": "London",
+            "main": {"temp": 15.5},
+            "weather": [{"description": "clear sky"}],
+        }
+        mock_get.return_value = mock_response
+
+        result = self.client.get_weather_by_coordinates(51.5, -0.12)
+
+        assert result.city == "London"
+        url = mock_get.call_args[0][0]
+        assert "/weather?lat=51.500000&lon=-0.120000&appid=test_api_key" in url
+
+    def test_get_weather_by_coordinates_out_of_range(self):
+        """Test that invalid coordinates are rejected before any request."""
+        with pytest.raises(WeatherApiException, match="out of range"):
+            self.client.get_weather_by_coordinates(91.0, 0.0)
+
     def test_parse_weather_response_missing_name(self):
         """Test parsing of response missing city name."""
         response_data = {
@@ -244,6 +328,263 @@ class TestOpenWeatherMapClient:
         assert result.temperature_celsius == 28.0
         assert result.description == "Sunny"
 
+    @patch("weather_cli.weather_client.requests.get")
+    def test_api_errors_carry_status_code(self, mock_get):
+        """Test that API errors expose the HTTP status code."""
+        for status_code in (401, 404, 429, 503, 418):
+            mock_response = Mock()
+            mock_response.status_code = status_code
+            mock_response.text = "error"
+            mock_get.return_value = mock_response
+
+            with pytest.raises(WeatherApiException) as exc_info:
+                self.client.get_weather_from_api("London")
+
+            assert exc_info.value.status_code == status_code
+
+    def test_explicit_key_and_base_url(self):
+        """Test that a replica client can be configured without the environment."""
+        client = OpenWeatherMapClient(api_key="replica_key", base_url="https://replica.example")
+
+        assert client.api_key == "replica_key"
+        assert client._build_api_url("Oslo").startswith("https://replica.example/weather?q=Oslo")
+
+    def test_build_forecast_url(self):
+        """Test API URL building for the forecast endpoint."""
+        url = self.client._build_api_url("London", endpoint="forecast")
+
+        assert "https://api.openweathermap.org/data/2.5/forecast?q=London" in url
+        assert "units=metric" in url
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_get_forecast_success(self, mock_get):
+        """Test successful forecast retrieval into a columnar series."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "city": {"name": "London", "timezone": 3600},
+            "list": [
+                {"dt": 1726660800, "main": {"temp": 14.0, "humidity": 70}, "wind": {"speed": 3}},
+                {"dt": 1726671600, "main": {"temp": 16.5, "humidity": 65}, "wind": {"speed": 4}},
+            ],
+        }
+        mock_get.return_value = mock_response
+
+        series = self.client.get_forecast_from_api("London")
+
+        assert series.city == "London"
+        assert series.timezone_offset == 3600
+        assert list(series.temperatures) == [14.0, 16.5]
+        assert "/forecast?q=London" in mock_get.call_args[0][0]
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_get_forecast_city_not_found(self, mock_get):
+        """Test forecast error handling for unknown cities."""
+        mock_response = Mock()
+        mock_response.status_code = 404
+        mock_response.text = "city not found"
+        mock_get.return_value = mock_response
+
+        with pytest.raises(WeatherApiException, match="City not found"):
+            self.client.get_forecast_from_api("Atlantis")
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_get_forecast_invalid_response(self, mock_get):
+        """Test forecast error handling for malformed responses."""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"city": {"name": "London"}}
+        mock_get.return_value = mock_response
+
+        with pytest.raises(WeatherApiException, match="missing field 'list'"):
+            self.client.get_forecast_from_api("London")
+
+
+class TestConditionalFetch:
+    """Test cases for conditional (revalidating) fetches."""
+
+    def setup_method(self, method):
+        """Set up test fixtures."""
+        with (
+            patch("weather_cli.config_util.ConfigUtil.get_api_key", return_value="test_api_key"),
+            patch(
+                "weather_cli.config_util.ConfigUtil.get_api_base_url",
+                return_value="https://api.openweathermap.org/data/2.5",
+            ),
+        ):
+            self.client = OpenWeatherMapClient()
+
+    def _response(self, status_code, payload=None, headers=None):
+        response = Mock()
+        response.status_code = status_code
+        response.headers = headers or {}
+        response.content = json.dumps(payload).encode() if payload is not None else b""
+        response.json.return_value = payload
+        return response
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_fetch_captures_validators(self, mock_get):
+        """Test that ETag and Last-Modified headers are returned with the data."""
+        mock_get.return_value = self._response(
+            200,
+            {
+                "name": "London",
+                "main": {"temp": 15.5},
+                "weather": [{"description": "rain"}],
+                "dt": 1726660758,
+            },
+            {"ETag": '"abc"', "Last-Modified": "Wed, 18 Sep 2024 12:00:00 GMT"},
+        )
+
+        result = self.client.fetch_weather("London")
+
+        assert result.data.observed_at == 1726660758
+        assert result.etag == '"abc"'
+        assert result.last_modified == "Wed, 18 Sep 2024 12:00:00 GMT"
+        assert "headers" not in mock_get.call_args[1]
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_fetch_sends_conditional_headers(self, mock_get):
+        """Test that validators are sent as conditional request headers."""
+        mock_get.return_value = self._response(304)
+
+        result = self.client.fetch_weather(
+            "London", Validators(etag='"abc"', last_modified="Wed", observed_at=1)
+        )
+
+        assert result.not_modified
+        headers = mock_get.call_args[1]["headers"]
+        assert headers == {"If-None-Match": '"abc"', "If-Modified-Since": "Wed"}
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_fetch_same_observation_skips_parse(self, mock_get):
+        """Test that an unchanged dt is detected without decoding the body."""
+        response = self._response(
+            200,
+            {
+                "name": "London",
+                "main": {"temp": 15.5},
+                "weather": [{"description": "rain"}],
+                "dt": 1726660758,
+            },
+        )
+        mock_get.return_value = response
+
+        result = self.client.fetch_weather("London", Validators(observed_at=1726660758))
+
+        assert result.not_modified
+        response.json.assert_not_called()
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_fetch_new_observation_parsed(self, mock_get):
+        """Test that a newer dt is parsed as fresh data."""
+        mock_get.return_value = self._response(
+            200,
+            {
+                "name": "London",
+                "main": {"temp": 16.0},
+                "weather": [{"description": "rain"}],
+                "dt": 1726661000,
+            },
+        )
+
+        result = self.client.fetch_weather("London", Validators(observed_at=1726660758))
+
+        assert not result.not_modified
+        assert result.data.temperature_celsius == 16.0
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_unconditional_304_is_error(self, mock_get):
+        """Test that a 304 without validators is treated as an API error."""
+        mock_get.return_value = self._response(304)
+
+        with pytest.raises(WeatherApiException, match="HTTP status code 304"):
+            self.client.fetch_weather("London")
+
+    def test_get_weather_without_data_is_error(self):
+        """Test that an unconditional fetch without data raises instead of returning None."""
+        with patch.object(self.client, "fetch_weather", return_value=FetchResult(data=None)):
+            with pytest.raises(WeatherApiException, match="no change"):
+                self.client.get_weather_from_api("London")
+
+    def test_default_fetch_weather_compares_observation_time(self):
+        """Test the base class fallback for clients without conditional requests."""
+
+        class PlainClient(WeatherApiClient):
+            def get_weather_from_api(self, city: str) -> WeatherData:
+                return WeatherData(
+                    city=city, temperature_celsius=1.0, description="Fog", observed_at=42
+                )
+
+        client = PlainClient()
+
+        assert client.fetch_weather("Oslo", Validators(observed_at=42)) == FetchResult(data=None)
+        assert client.fetch_weather("Oslo", Validators(observed_at=41)).data.observed_at == 42
+        assert client.fetch_weather("Oslo").data.city == "Oslo"
+
+    def test_default_forecast_not_supported(self):
+        """Test that clients without forecast support raise an API error."""
+
+        class PlainClient(WeatherApiClient):
+            def get_weather_from_api(self, city: str) -> WeatherData:
+                return WeatherData(city=city, temperature_celsius=1.0, description="Fog")
+
+        with pytest.raises(WeatherApiException, match="not supported"):
+            PlainClient().get_forecast_from_api("Oslo")
+
+
+class TestRevalidationAgainstStubServer:
+    """Demonstrate bandwidth and parse savings against a local stub server."""
+
+    def setup_method(self, method):
+        """Start a local stub server and point a client at it."""
+        self.server = StubServer(clock=lambda: 1726660758.0).start()
+        with (
+            patch("weather_cli.config_util.ConfigUtil.get_api_key", return_value="test_api_key"),
+            patch(
+                "weather_cli.config_util.ConfigUtil.get_api_base_url",
+                return_value=self.server.base_url,
+            ),
+        ):
+            self.client = OpenWeatherMapClient()
+
+    def teardown_method(self, method):
+        """Stop the stub server."""
+        self.server.stop()
+
+    def test_etag_revalidation_saves_bandwidth_and_parsing(self):
+        """Test that revalidating with an ETag transfers no body and skips parsing."""
+        first = self.client.fetch_weather("London")
+        bytes_after_first = self.server.stats.bytes_sent
+
+        with patch.object(
+            self.client, "_parse_weather_response", wraps=self.client._parse_weather_response
+        ) as parse:
+            second = self.client.fetch_weather(
+                "London",
+                Validators(etag=first.etag, observed_at=first.data.observed_at),
+            )
+
+        assert second.not_modified
+        assert self.server.stats.not_modified == 1
+        assert self.server.stats.bytes_sent == bytes_after_first
+        parse.assert_not_called()
+
+    def test_observation_time_revalidation_skips_parsing(self):
+        """Test that servers without validators still avoid a parse for unchanged data."""
+        self.server.profile = FaultProfile(send_validators=False)
+        first = self.client.fetch_weather("London")
+
+        with patch.object(
+            self.client, "_parse_weather_response", wraps=self.client._parse_weather_response
+        ) as parse:
+            second = self.client.fetch_weather(
+                "London", Validators(observed_at=first.data.observed_at)
+            )
+
+        assert second.not_modified
+        parse.assert_not_called()
+
 
 class TestWeatherApiClientInterface:
     """Test cases for the WeatherApiClient abstract base class."""
@@ -275,3 +616,73 @@ class TestWeatherApiClientInterface:
         assert result.city == "Test City"
         assert result.temperature_celsius == 20.0
         assert result.description == "Test weather"
+
+
+class TestKeyPoolRotation:
+    """Test cases for rotating requests through an API key pool."""
+
+    def setup_method(self):
+        """Set up a client over a pool of three keys."""
+        self.pool = ApiKeyPool(["key-one", "key-two", "key-three"], quota_per_minute=10)
+        self.client = OpenWeatherMapClient(base_url="https://api.example", key_pool=self.pool)
+
+    @staticmethod
+    def _response(status_code):
+        """Build a mock response with the given status code."""
+        response = Mock()
+        response.status_code = status_code
+        response.text = "error"
+        response.json.return_value = {
+            "name": "London",
+            "main": {"temp": 15.5},
+            "weather": [{"description": "clear sky"}],
+        }
+        return response
+
+    @staticmethod
+    def _used_keys(mock_get):
+        """Return the appid of every request made."""
+        return [call[0][0].split("appid=")[1].split("&")[0] for call in mock_get.call_args_list]
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_requests_spread_over_keys(self, mock_get):
+        """Test that consecutive requests go to the key with the most headroom."""
+        mock_get.return_value = self._response(200)
+
+        for _ in range(3):
+            self.client.get_weather_from_api("London")
+
+        assert self._used_keys(mock_get) == ["key-one", "key-two", "key-three"]
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_rate_limited_key_is_quarantined_and_retried(self, mock_get):
+        """Test that a 429 quarantines the key and the request moves on."""
+        mock_get.side_effect = [self._response(429), self._response(200)]
+
+        result = self.client.get_weather_from_api("London")
+
+        assert result.city == "London"
+        assert self._used_keys(mock_get) == ["key-one", "key-two"]
+        assert self.pool.headroom("key-one") == 0
+
+    @patch("weather_cli.weather_client.requests.get")
+    def test_all_keys_rejected(self, mock_get):
+        """Test that the last rejection is reported once every key was tried."""
+        mock_get.return_value = self._response(401)
+
+        with pytest.raises(WeatherApiException) as exc_info:
+            self.client.get_weather_from_api("London")
+
+        assert exc_info.value.status_code == 401
+        assert mock_get.call_count == 3
+        with pytest.raises(WeatherApiException, match="All API keys are rate limited"):
+            self.client.get_weather_from_api("London")
+
+    def test_every_pooled_key_is_redacted(self):
+        """Test that URLs are redacted for every key in the pool."""
+        url = self.client._build_api_url("London", api_key="key-two")
+
+        redacted = self.client._redact_api_key(url)
+
+        assert "key-two" not in redacted
+        assert "appid=REDACTED" in redacted
@@ -1,7 +1,8 @@
 """Tests for the weather data model."""
 
 import pytest
-from weather_cli.weather_data import WeatherData
+from weather_cli.units import Units
+from weather_cli.weather_data import DerivedWeatherData, WeatherData
 
 
 class TestWeatherData:
@@ -103,3 +104,88 @@ class TestWeatherData:
         # Can be used in sets
         weather_set = {weather}
         assert len(weather_set) == 1
+
+    def test_optional_identifiers(self):
+        """Test the optional observation time, city ID and condition code."""
+        weather = WeatherData(
+            city="Oslo",
+            temperature_celsius=3.0,
+            description="Snow",
+            observed_at=1726660758,
+            city_id=3143244,
+            condition_id=600,
+        )
+
+        assert weather.observed_at == 1726660758
+        assert weather.city_id == 3143244
+        assert weather.condition_id == 600
+        assert WeatherData(city="Oslo", temperature_celsius=3.0, description="Snow").city_id is None
+
+    def test_invalid_identifier_types(self):
+        """Test type validation of the optional identifiers."""
+        with pytest.raises(TypeError, match="observed_at must be an integer timestamp"):
+            WeatherData(city="Oslo", temperature_celsius=3.0, description="Snow", observed_at="x")
+        with pytest.raises(TypeError, match="city_id must be an integer"):
+            WeatherData(city="Oslo", temperature_celsius=3.0, description="Snow", city_id=1.5)
+        with pytest.raises(TypeError, match="condition_id must be an integer"):
+            WeatherData(
+                city="Oslo", temperature_celsius=3.0, description="Snow", condition_id="800"
+            )
+
+    def test_coordinates(self):
+        """Test the optional observation coordinates and their validation."""
+        weather = WeatherData(
+            city="Oslo", temperature_celsius=3.0, description="Snow", latitude=59.9, longitude=10.7
+        )
+
+        assert (weather.latitude, weather.longitude) == (59.9, 10.7)
+        assert (
+            WeatherData(city="Oslo", temperature_celsius=3.0, description="Snow").latitude is None
+        )
+        with pytest.raises(TypeError, match="latitude must be a number"):
+            WeatherData(city="Oslo", temperature_celsius=3.0, description="Snow", latitude="59")
+        with pytest.raises(ValueError, match="longitude must be between -180 and 180"):
+            WeatherData(city="Oslo", temperature_celsius=3.0, description="Snow", longitude=200.0)
+
+    def test_format_in_other_units(self):
+        """Test that formatting converts the canonical Celsius temperature."""
+        weather = WeatherData(city="Denver", temperature_celsius=25.0, description="Clear")
+
+        assert "Temperature: 77.0°F" in weather.format(Units.IMPERIAL)
+        assert "Temperature: 298.1K" in weather.format(Units.STANDARD)
+        assert weather.format() == str(weather)
+        assert weather.temperature_celsius == 25.0
+
+
+class TestDerivedWeatherData:
+    """Test cases for the DerivedWeatherData class."""
+
+    def test_flagged_as_derived(self):
+        """Test that estimates are flagged and formatted with confidence and age."""
+        derived = DerivedWeatherData(
+            city="Oslo",
+            temperature_celsius=3.0,
+            description="Snow",
+            confidence=0.75,
+            age_seconds=1800.0,
+        )
+
+        assert derived.derived
+        assert not WeatherData(city="Oslo", temperature_celsius=3.0, description="Snow").derived
+        assert "Temperature: 3.0°C" in derived.format()
+        assert "fetched 30 min ago (75% confidence)" in str(derived)
+
+    def test_invalid_values(self):
+        """Test that confidence and age are validated."""
+        with pytest.raises(ValueError, match="confidence"):
+            DerivedWeatherData(
+                city="Oslo", temperature_celsius=3.0, description="Snow", confidence=2
+            )
+        with pytest.raises(ValueError, match="age_seconds"):
+            DerivedWeatherData(
+                city="Oslo", temperature_celsius=3.0, description="Snow", age_seconds=-1
+            )
+        with pytest.raises(TypeError, match="confidence"):
+            DerivedWeatherData(
+                city="Oslo", temperature_celsius=3.0, description="Snow", confidence="high"
+            )
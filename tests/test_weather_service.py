@@ -1,11 +1,22 @@
 """Tests for the weather service."""
 
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from unittest.mock import Mock, patch
+from weather_cli.cache import WeatherCache
+from weather_cli.forecast import ForecastSeries
+from weather_cli.forecast_fallback import ForecastFallback
+from weather_cli.history import ObservationRecorder
+from weather_cli.negative_cache import NegativeCache
+from weather_cli.spatial import SpatialIndex
 from weather_cli.weather_service import WeatherService
-from weather_cli.weather_client import WeatherApiClient
+from weather_cli.weather_client import WeatherApiClient, FetchResult, Validators
 from weather_cli.weather_data import WeatherData
-from weather_cli.exceptions import WeatherApiException
+from weather_cli.exceptions import InvalidCityNameException, WeatherApiException
 
 
 class TestWeatherService:
@@ -200,3 +211,632 @@ class TestWeatherService:
         assert result1 == weather1
         assert result2 == weather2
         assert mock_client.get_weather_from_api.call_count == 2
+
+    def test_get_forecast(self):
+        """Test forecast retrieval through the service."""
+        mock_client = Mock(spec=WeatherApiClient)
+        forecast = ForecastSeries(
+            "Oslo", array("q", [1]), array("d", [2.0]), array("B", [80]), array("d", [1.0])
+        )
+        mock_client.get_forecast_from_api.return_value = forecast
+
+        service = WeatherService(client=mock_client)
+
+        assert service.get_forecast(" Oslo ") is forecast
+        mock_client.get_forecast_from_api.assert_called_once_with("Oslo")
+
+    def test_get_forecast_empty_city(self):
+        """Test forecast error handling for empty city names."""
+        mock_client = Mock(spec=WeatherApiClient)
+        service = WeatherService(client=mock_client)
+
+        with pytest.raises(WeatherApiException, match="City name cannot be null or empty"):
+            service.get_forecast("  ")
+
+        mock_client.get_forecast_from_api.assert_not_called()
+
+    def test_get_forecast_unexpected_exception_wrapped(self):
+        """Test that unexpected forecast errors are wrapped in WeatherApiException."""
+        mock_client = Mock(spec=WeatherApiClient)
+        mock_client.get_forecast_from_api.side_effect = RuntimeError("boom")
+        service = WeatherService(client=mock_client)
+
+        with pytest.raises(WeatherApiException, match="Unexpected error: boom"):
+            service.get_forecast("Oslo")
+
+    def test_concurrent_lookups_share_one_upstream_call(self):
+        """Test that concurrent lookups for the same city are deduplicated."""
+        calls = []
+        release = threading.Event()
+
+        def slow_fetch(city):
+            calls.append(city)
+            release.wait(1)
+            return WeatherData(city=city, temperature_celsius=10.0, description="Rain")
+
+        mock_client = Mock(spec=WeatherApiClient)
+        mock_client.get_weather_from_api.side_effect = slow_fetch
+        service = WeatherService(client=mock_client)
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(service.get_weather("Bergen")))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert calls == ["Bergen"]
+        assert len(results) == 5
+        assert all(result is results[0] for result in results)
+
+    def test_concurrent_lookups_share_errors(self):
+        """Test that callers joining an in-flight lookup receive its error."""
+        release = threading.Event()
+
+        def failing_fetch(city):
+            release.wait(1)
+            raise WeatherApiException("City not found")
+
+        mock_client = Mock(spec=WeatherApiClient)
+        mock_client.get_weather_from_api.side_effect = failing_fetch
+        service = WeatherService(client=mock_client)
+
+        errors = []
+
+        def lookup():
+            try:
+                service.get_weather("Atlantis")
+            except WeatherApiException as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=lookup) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == ["City not found"] * 3
+        assert mock_client.get_weather_from_api.call_count == 1
+
+    def test_get_weather_batch(self):
+        """Test that a batch keeps input order and records failed cities as errors."""
+        mock_client = Mock(spec=WeatherApiClient)
+
+        def lookup(city):
+            if city == "Atlantis":
+                raise WeatherApiException("City not found.", 404)
+            time.sleep(0.01 if city == "Oslo" else 0)
+            return WeatherData(city=city, temperature_celsius=5.0, description="Clear")
+
+        mock_client.get_weather_from_api.side_effect = lookup
+        service = WeatherService(client=mock_client)
+
+        batch = service.get_weather_batch(["Oslo", "Atlantis", "Lima", "Rome"], max_workers=2)
+
+        assert [data.city for data in batch] == ["Oslo", "Lima", "Rome"]
+        assert batch.errors == {"Atlantis": "City not found."}
+
+    def test_get_weather_batch_reads_input_lazily(self):
+        """Test that only a bounded number of cities are read ahead of finished lookups."""
+        mock_client = Mock(spec=WeatherApiClient)
+        mock_client.get_weather_from_api.side_effect = lambda city: WeatherData(
+            city=city, temperature_celsius=5.0, description="Clear"
+        )
+        service = WeatherService(client=mock_client)
+        read = []
+
+        def cities():
+            for index in range(100):
+                read.append(index)
+                # Never more than twice the workers ahead of the lookups that ran
+                assert len(read) - mock_client.get_weather_from_api.call_count <= 4
+                yield f"City{index}"
+
+        batch = service.get_weather_batch(cities(), max_workers=2)
+
+        assert len(batch) == 100
+
+    def test_get_weather_batch_workers_follow_concurrency_ceiling(self):
+        """Test that a batch runs as many workers as the adaptive limiter may allow."""
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def lookup(city):
+            with lock:
+                running.append(city)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(city)
+            return WeatherData(city=city, temperature_celsius=5.0, description="Clear")
+
+        mock_client = Mock(spec=WeatherApiClient)
+        mock_client.get_weather_from_api.side_effect = lookup
+        service = WeatherService(client=mock_client, max_concurrency=12)
+
+        batch = service.get_weather_batch([f"City{index}" for index in range(24)])
+
+        assert len(batch) == 24
+        assert WeatherService.DEFAULT_BATCH_WORKERS < max(peak) <= 12
+        with pytest.raises(ValueError):
+            WeatherService(client=mock_client, max_concurrency=0)
+
+    def test_get_weather_batch_rejects_invalid_workers(self):
+        """Test that the batch needs at least one worker."""
+        with pytest.raises(ValueError):
+            WeatherService(client=Mock(spec=WeatherApiClient)).get_weather_batch(["Oslo"], 0)
+
+
+class TestWeatherServiceCaching:
+    """Test cases for WeatherService with a cache."""
+
+    def setup_method(self, method):
+        """Set up test fixtures."""
+        self.now = 1000.0
+        self.cache = WeatherCache(ttl_seconds=60, clock=lambda: self.now)
+        self.client = Mock(spec=WeatherApiClient)
+        self.service = WeatherService(client=self.client, cache=self.cache)
+        self.weather = WeatherData(
+            city="London", temperature_celsius=15.5, description="Cloudy", observed_at=900
+        )
+
+    def test_fresh_entry_served_from_cache(self):
+        """Test that a second lookup within the TTL does not go upstream."""
+        self.client.fetch_weather.return_value = FetchResult(data=self.weather, etag='"v1"')
+
+        assert self.service.get_weather("London") == self.weather
+        assert self.service.get_weather("  London ") == self.weather
+
+        self.client.fetch_weather.assert_called_once_with("London", None)
+        assert self.cache.stats.hits == 1
+
+    def test_get_cached_weather(self):
+        """Test that cached cities are returned by the given name without fetching."""
+        self.client.fetch_weather.return_value = FetchResult(data=self.weather)
+        self.service.get_weather("London")
+        self.client.fetch_weather.reset_mock()
+
+        cached = self.service.get_cached_weather(["LONDON", "Paris", " "])
+
+        assert cached == {"LONDON": self.weather}
+        self.client.fetch_weather.assert_not_called()
+        self.now += 61
+        assert self.service.get_cached_weather(["London"]) == {}
+        assert WeatherService(client=self.client).get_cached_weather(["London"]) == {}
+
+    def test_spelling_variants_share_cache_entry(self):
+        """Test that different spellings of a city hit the same cache entry."""
+        self.client.fetch_weather.return_value = FetchResult(data=self.weather)
+        variants = ["London", "london", " LONDON", "London  ", "lon\u0064on"]
+
+        for variant in variants:
+            assert self.service.get_weather(variant) == self.weather
+
+        self.client.fetch_weather.assert_called_once_with("London", None)
+        assert self.cache.stats.hits == len(variants) - 1
+        assert self.cache.get_entry("london") is not None
+
+    def test_default_country_qualifies_names(self):
+        """Test that names without a country are looked up and cached with the default."""
+        self.client.fetch_weather.return_value = FetchResult(data=self.weather)
+        service = WeatherService(client=self.client, cache=self.cache, default_country="GB")
+
+        service.get_weather("London")
+        service.get_weather("london,gb")
+        service.get_weather("London,CA")
+
+        assert [c.args[0] for c in self.client.fetch_weather.call_args_list] == [
+            "London,GB",
+            "London,CA",
+        ]
+        assert service.get_cached_weather(["LONDON"]) == {"LONDON": self.weather}
+        assert self.cache.get_entry("london") is None
+
+    def test_spelling_variants_share_in_flight_request(self):
+        """Test that concurrent lookups of different spellings make one upstream call."""
+        release = threading.Event()
+
+        def slow_fetch(city, validators):
+            release.wait(1)
+            return FetchResult(data=self.weather)
+
+        self.client.fetch_weather.side_effect = slow_fetch
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(self.service.get_weather, city)
+                for city in ["Paris", " paris", "PARIS"]
+            ]
+            time.sleep(0.05)
+            release.set()
+            results = [future.result() for future in futures]
+
+        assert results == [self.weather] * 3
+        self.client.fetch_weather.assert_called_once()
+
+    def test_expired_entry_revalidated_with_validators(self):
+        """Test that an expired entry is revalidated and its TTL extended when unchanged."""
+        self.client.fetch_weather.side_effect = [
+            FetchResult(data=self.weather, etag='"v1"', last_modified="Mon"),
+            FetchResult(data=None, etag='"v1"'),
+        ]
+        self.service.get_weather("London")
+        self.now += 61
+
+        result = self.service.get_weather("London")
+
+        assert result is self.weather
+        self.client.fetch_weather.assert_called_with(
+            "London", Validators(etag='"v1"', last_modified="Mon", observed_at=900)
+        )
+        assert self.cache.get_entry("london").expires_at == self.now + 60
+        assert self.cache.stats.revalidations == 1
+        assert self.cache.stats.not_modified == 1
+
+    def test_expired_entry_replaced_when_changed(self):
+        """Test that new data from a revalidation replaces the cached entry."""
+        updated = WeatherData(
+            city="London", temperature_celsius=17.0, description="Sunny", observed_at=1500
+        )
+        self.client.fetch_weather.side_effect = [
+            FetchResult(data=self.weather),
+            FetchResult(data=updated, etag='"v2"'),
+        ]
+        self.service.get_weather("London")
+        self.now += 61
+
+        assert self.service.get_weather("London") == updated
+        assert self.cache.get_entry("london").etag == '"v2"'
+        assert self.cache.stats.not_modified == 0
+
+    def test_not_modified_without_entry_is_error(self):
+        """Test that an unexpected not-modified result for an uncached city is an error."""
+        self.client.fetch_weather.return_value = FetchResult(data=None)
+
+        with pytest.raises(WeatherApiException, match="no change for an uncached city"):
+            self.service.get_weather("London")
+
+    def test_errors_are_not_cached(self):
+        """Test that failed lookups leave the cache untouched."""
+        self.client.fetch_weather.side_effect = WeatherApiException("City not found")
+
+        with pytest.raises(WeatherApiException, match="City not found"):
+            self.service.get_weather("London")
+
+        assert len(self.cache) == 0
+
+
+class TestWeatherServiceHistory:
+    """Test cases for WeatherService with a history recorder."""
+
+    def setup_method(self, method):
+        """Set up test fixtures."""
+        self.client = Mock(spec=WeatherApiClient)
+        self.recorder = Mock(spec=ObservationRecorder)
+        self.weather = WeatherData(
+            city="London",
+            temperature_celsius=15.5,
+            description="Cloudy",
+            observed_at=900,
+            city_id=2643743,
+        )
+
+    def test_fetched_observation_recorded(self):
+        """Test that upstream results are appended to the history."""
+        self.client.get_weather_from_api.return_value = self.weather
+        service = WeatherService(client=self.client, recorder=self.recorder)
+
+        service.get_weather("London")
+
+        self.recorder.record.assert_called_once_with(self.weather)
+
+    def test_cache_hits_and_unchanged_data_not_recorded(self):
+        """Test that only new observations are recorded when caching."""
+        now = [1000.0]
+        cache = WeatherCache(ttl_seconds=60, clock=lambda: now[0])
+        self.client.fetch_weather.side_effect = [
+            FetchResult(data=self.weather),
+            FetchResult(data=None),
+        ]
+        service = WeatherService(client=self.client, cache=cache, recorder=self.recorder)
+
+        service.get_weather("London")
+        service.get_weather("London")
+        now[0] += 61
+        service.get_weather("London")
+
+        self.recorder.record.assert_called_once_with(self.weather)
+
+    def test_recording_failure_does_not_fail_lookup(self, caplog):
+        """Test that history write errors are logged and ignored."""
+        self.client.get_weather_from_api.return_value = self.weather
+        self.recorder.record.side_effect = OSError("disk full")
+        service = WeatherService(client=self.client, recorder=self.recorder)
+
+        with caplog.at_level("WARNING"):
+            assert service.get_weather("London") == self.weather
+
+        assert "Failed to record observation for London: disk full" in caplog.text
+
+    def test_unpackable_observation_does_not_fail_lookup(self, tmp_path, caplog):
+        """Test that values the record format cannot hold are logged and ignored."""
+        far_future = WeatherData(
+            city="London",
+            temperature_celsius=15.5,
+            description="Cloudy",
+            observed_at=2**40,
+            city_id=2643743,
+        )
+        too_large = WeatherData(
+            city="Nowhere",
+            temperature_celsius=1.0,
+            description="Fog",
+            observed_at=900,
+            city_id=2**40,
+        )
+        self.client.get_weather_from_api.side_effect = [far_future, too_large]
+        recorder = ObservationRecorder(tmp_path)
+        service = WeatherService(client=self.client, recorder=recorder)
+
+        with caplog.at_level("WARNING"):
+            assert service.get_weather("London") == far_future
+            assert service.get_weather("Nowhere") == too_large
+        recorder.close()
+
+        assert "Failed to record observation for Nowhere" in caplog.text
+        assert "London" not in caplog.text
+
+
+class TestWeatherServiceCoordinates:
+    """Test cases for coordinate lookups backed by the spatial index."""
+
+    def setup_method(self, method):
+        """Set up a cached service with a spatial index."""
+        self.now = 1000.0
+        self.cache = WeatherCache(ttl_seconds=60, clock=lambda: self.now)
+        self.client = Mock(spec=WeatherApiClient)
+        self.service = WeatherService(
+            client=self.client,
+            cache=self.cache,
+            spatial_index=SpatialIndex(),
+            nearby_radius_km=5.0,
+        )
+        self.london = WeatherData(
+            city="London",
+            temperature_celsius=15.5,
+            description="Cloudy",
+            latitude=51.5085,
+            longitude=-0.1257,
+        )
+
+    def test_requires_cache_for_index(self):
+        """Test that a spatial index cannot be used without a cache."""
+        with pytest.raises(ValueError, match="requires a cache"):
+            WeatherService(client=self.client, spatial_index=SpatialIndex())
+
+    def test_nearby_lookup_served_from_cache(self):
+        """Test that a point near a fresh city observation is answered locally."""
+        self.client.fetch_weather.return_value = FetchResult(data=self.london)
+        self.service.get_weather("London")
+
+        assert self.service.get_weather_at(51.52, -0.10) == self.london
+        self.client.get_weather_by_coordinates.assert_not_called()
+
+    def test_index_is_rebuilt_from_cache(self):
+        """Test that observations cached before the service existed answer nearby lookups."""
+        self.cache.put("london", self.london)
+        self.cache.put(
+            "paris", WeatherData(city="Paris", temperature_celsius=18.0, description="Clear")
+        )
+        service = WeatherService(client=self.client, cache=self.cache, spatial_index=SpatialIndex())
+
+        assert service.get_weather_at(51.52, -0.10) == self.london
+        self.client.get_weather_by_coordinates.assert_not_called()
+
+    def test_far_or_stale_lookups_go_upstream(self):
+        """Test that only real misses fetch from the upstream."""
+        self.client.fetch_weather.return_value = FetchResult(data=self.london)
+        self.client.get_weather_by_coordinates.return_value = self.london
+        self.service.get_weather("London")
+
+        self.service.get_weather_at(48.85, 2.35)
+        self.now += 61
+        self.service.get_weather_at(51.52, -0.10)
+
+        assert self.client.get_weather_by_coordinates.call_count == 2
+
+    def test_coordinate_results_are_cached_and_indexed(self):
+        """Test that a fetched coordinate lookup answers later nearby lookups."""
+        self.client.get_weather_by_coordinates.return_value = self.london
+
+        self.service.get_weather_at(51.50, -0.12)
+        self.service.get_weather_at(51.51, -0.13)
+
+        self.client.get_weather_by_coordinates.assert_called_once_with(51.50, -0.12)
+
+    def test_evicted_entries_leave_the_index(self):
+        """Test that index entries of evicted cache entries are dropped."""
+        self.client.fetch_weather.return_value = FetchResult(data=self.london)
+        self.client.get_weather_by_coordinates.return_value = self.london
+        self.service.get_weather("London")
+        self.cache.invalidate("london")
+
+        self.service.get_weather_at(51.52, -0.10)
+
+        assert "London" not in self.service.spatial_index
+
+    def test_invalid_coordinates(self):
+        """Test that out-of-range coordinates are rejected."""
+        with pytest.raises(WeatherApiException, match="Invalid coordinates"):
+            self.service.get_weather_at(100.0, 0.0)
+
+    def test_snapshot_warm_start(self, tmp_path):
+        """Test that a warmed service answers city and nearby lookups without fetching."""
+        self.client.fetch_weather.return_value = FetchResult(data=self.london)
+        self.service.get_weather("London")
+        path = tmp_path / "cache.json.gz"
+        assert self.service.export_snapshot(path) == 1
+
+        client = Mock(spec=WeatherApiClient)
+        warmed = WeatherService(
+            client=client,
+            cache=WeatherCache(ttl_seconds=60, clock=lambda: self.now),
+            spatial_index=SpatialIndex(),
+            nearby_radius_km=5.0,
+        )
+
+        assert warmed.import_snapshot(path) == 1
+        assert warmed.get_weather(" LONDON ") == self.london
+        assert warmed.get_weather_at(51.52, -0.10) == self.london
+        client.fetch_weather.assert_not_called()
+        client.get_weather_by_coordinates.assert_not_called()
+
+    def test_snapshot_requires_cache(self, tmp_path):
+        """Test that snapshots cannot be used without a cache."""
+        service = WeatherService(client=self.client)
+
+        with pytest.raises(ValueError, match="requires a cache"):
+            service.export_snapshot(tmp_path / "cache.json.gz")
+        with pytest.raises(ValueError, match="requires a cache"):
+            service.import_snapshot(tmp_path / "cache.json.gz")
+
+
+class TestWeatherServiceNegativeCache:
+    """Test cases for WeatherService with a negative cache."""
+
+    def setup_method(self, method):
+        """Set up a service with a negative cache."""
+        self.client = Mock(spec=WeatherApiClient)
+        self.negative_cache = NegativeCache(ttl_seconds=60)
+        self.service = WeatherService(client=self.client, negative_cache=self.negative_cache)
+
+    def test_not_found_answered_locally_for_every_spelling(self):
+        """Test that repeated lookups of an unknown city make one upstream call."""
+        self.client.get_weather_from_api.side_effect = WeatherApiException(
+            "City not found. Please check the city name and try again.", 404
+        )
+
+        for city in ["Atlantis", "atlantis", " ATLANTIS "]:
+            with pytest.raises(WeatherApiException, match="City not found") as exc_info:
+                self.service.get_weather(city)
+            assert exc_info.value.status_code == 404
+
+        self.client.get_weather_from_api.assert_called_once_with("Atlantis")
+        assert self.negative_cache.stats.requests_saved == 2
+
+    def test_invalid_name_answered_locally(self):
+        """Test that a rejected name is rejected again without reaching the client."""
+        self.client.get_weather_from_api.side_effect = InvalidCityNameException(
+            "City name contains invalid characters."
+        )
+
+        for _ in range(3):
+            with pytest.raises(InvalidCityNameException):
+                self.service.get_weather("L0nd0n")
+
+        self.client.get_weather_from_api.assert_called_once()
+
+    def test_transient_errors_are_retried(self):
+        """Test that rate limiting is not remembered."""
+        self.client.get_weather_from_api.side_effect = WeatherApiException("Slow down", 429)
+
+        for _ in range(2):
+            with pytest.raises(WeatherApiException):
+                self.service.get_weather("London")
+
+        assert self.client.get_weather_from_api.call_count == 2
+
+    def test_endpoints_remember_failures_separately(self):
+        """Test that a forecast not found does not block current weather, and back."""
+        self.client.get_forecast_from_api.side_effect = WeatherApiException("City not found", 404)
+        self.client.get_weather_from_api.return_value = WeatherData(
+            city="Atlantis", temperature_celsius=20.0, description="Underwater"
+        )
+        for _ in range(2):
+            with pytest.raises(WeatherApiException, match="City not found"):
+                self.service.get_forecast("Atlantis")
+
+        assert self.service.get_weather("atlantis").city == "Atlantis"
+        self.client.get_forecast_from_api.assert_called_once_with("Atlantis")
+        assert self.negative_cache.get("atlantis") is None
+
+
+class TestWeatherServiceForecastFallback:
+    """Test cases for WeatherService answering from cached forecasts."""
+
+    def setup_method(self, method):
+        """Set up a cached service with a forecast fallback and a fetched forecast."""
+        self.now = 1726617600.0
+        self.client = Mock(spec=WeatherApiClient)
+        self.client.get_forecast_from_api.return_value = ForecastSeries(
+            "London",
+            array("q", [int(self.now), int(self.now) + 10800]),
+            array("d", [10.0, 16.0]),
+            array("B", [50, 60]),
+            array("d", [1.0, 2.0]),
+            descriptions=["clear sky", "light rain"],
+        )
+        self.fallback = ForecastFallback(clock=lambda: self.now)
+        self.cache = WeatherCache()
+        self.service = WeatherService(
+            client=self.client, cache=self.cache, forecast_fallback=self.fallback
+        )
+        self.service.get_forecast("London")
+
+    def test_outage_answered_from_forecast(self):
+        """Test that an unavailable API is answered with an uncached estimate."""
+        self.now += 3600
+        self.client.fetch_weather.side_effect = WeatherApiException("Unavailable", 503)
+
+        weather = self.service.get_weather("london")
+
+        assert weather.derived
+        assert weather.temperature_celsius == 12.0
+        assert weather.description == "clear sky"
+        assert weather.age_seconds == 3600.0
+        assert 0 < weather.confidence < 1
+        assert self.cache.get("london") is None
+
+    def test_request_errors_are_raised(self):
+        """Test that errors about the request itself are not hidden by an estimate."""
+        self.client.fetch_weather.side_effect = WeatherApiException("City not found", 404)
+
+        with pytest.raises(WeatherApiException, match="City not found"):
+            self.service.get_weather("London")
+
+    def test_no_forecast_raises_original_error(self):
+        """Test that cities without a recent forecast fail as before."""
+        self.client.fetch_weather.side_effect = WeatherApiException("Unavailable", 503)
+
+        with pytest.raises(WeatherApiException, match="Unavailable"):
+            self.service.get_weather("Paris")
+        assert self.fallback.stats.misses == 1
+
+    def test_rate_limit_skips_api_calls(self):
+        """Test that after a rate limit answer, cities with a forecast are not looked up."""
+        self.client.fetch_weather.side_effect = WeatherApiException("Rate limit exceeded", 429)
+
+        for _ in range(3):
+            assert self.service.get_weather("London").derived
+
+        assert self.client.fetch_weather.call_count == 1
+        assert self.fallback.stats.requests_saved == 2
+
+        with pytest.raises(WeatherApiException, match="Rate limit"):
+            self.service.get_weather("Paris")
+        assert self.fallback.stats.misses == 1
+
+    def test_fresh_data_preferred(self):
+        """Test that the API and cache answer as usual while available."""
+        observed = WeatherData(city="London", temperature_celsius=11.0, description="Mist")
+        self.client.fetch_weather.return_value = FetchResult(data=observed)
+
+        assert self.service.get_weather("London") is observed
+        assert self.fallback.stats.estimates == 0